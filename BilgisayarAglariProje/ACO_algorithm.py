@@ -1,6 +1,11 @@
 import math
 import random
+import threading
+from collections import OrderedDict
 
+import numpy as np
+
+import kernels
 
 
 # Import metric functions from your graph file
@@ -8,8 +13,15 @@ from Ag_olusturma import (
     G,                      # graph object created from CSVs
     total_delay,
     reliability_cost,
-    resource_cost
+    resource_cost,
+    make_deadline,
+    time_is_up,
+    remaining_ms,
+    is_significant_improvement,
+    directed_edge_cost
 )
+from lower_bounds import get_goal_bounds
+from qos_routing import make_guard
 
 # compute_edge_cost(G, u, v)
 # ACO'nun bir sonraki kenarı seçebilmesi için tek bir kenarın
@@ -57,11 +69,29 @@ def choose_next_node(G, pheromone, current, visited, heuristic_map, alpha=1.0, b
     # OPTIMIZATION: Use candidate list if available
     if candidate_map is not None:
         neighbors = candidate_map.get(current, [])
-        # Provide fallback if all candidates are visited (optional, but good for robustness options)
-        # For now, strict candidate list.
     else:
         neighbors = list(G.neighbors(current))
+
+    candidates = _score_neighbors(pheromone, current, neighbors, visited, heuristic_map, alpha)
+
+    # Aday listesindeki herkes ziyaret edildiyse karınca ölmesin:
+    # tüm komşu kümesine geri dönülür
+    if not candidates and candidate_map is not None:
+        candidates = _score_neighbors(pheromone, current, G.neighbors(current), visited, heuristic_map, alpha)
+
+    if not candidates:
+        return None
+
+    nodes, weights = zip(*candidates)
+    total_w = sum(weights)
+    if total_w == 0:
+        return random.choice(nodes)
         
+    probs = [w / total_w for w in weights]
+    return random.choices(nodes, probs)[0]
+
+
+def _score_neighbors(pheromone, current, neighbors, visited, heuristic_map, alpha):
     candidates = []
 
     for v in neighbors:
@@ -80,16 +110,7 @@ def choose_next_node(G, pheromone, current, visited, heuristic_map, alpha=1.0, b
 
         candidates.append((v, prob_val))
 
-    if not candidates:
-        return None
-
-    nodes, weights = zip(*candidates)
-    total_w = sum(weights)
-    if total_w == 0:
-        return random.choice(nodes)
-        
-    probs = [w / total_w for w in weights]
-    return random.choices(nodes, probs)[0]
+    return candidates
 
 
 # Bir karıncanın start → end arasında oluşturduğu tek bir yolu üretir.
@@ -97,16 +118,36 @@ def choose_next_node(G, pheromone, current, visited, heuristic_map, alpha=1.0, b
 # 'path' listesi – karıncanın gerçek izlediği düğüm sırasıdır.
 # 'visited' seti – döngü oluşmasını engellemek için kullanılan kontrol listesi.
 # Eğer karınca sıkışırsa (ilerleyebileceği düğüm kalmazsa) None döner.
+# deadline verilmişse yol ortasında süre dolduğunda da None döner.
+# guard (qos_routing.QoSGuard) verilirse gecikme / güvenilirlik kısıtını
+# artık sağlayamayacak komşular seçim sırasında elenir.
 
-def build_path(G, pheromone, S, D, heuristic_map, alpha=1.0,  beta=2.0, candidate_map=None):
+def build_path(G, pheromone, S, D, heuristic_map, alpha=1.0,  beta=2.0, candidate_map=None, deadline=None,
+               guard=None):
     current = S
     visited = {S}
     path = [S]
+    state = guard.start() if guard is not None else None
 
     while current != D:
-        next_node = choose_next_node(G, pheromone, current, visited, heuristic_map, alpha, beta, candidate_map)
-        if next_node is None:
-            return None  # dead end
+        if time_is_up(deadline):
+            return None  # süre bitti, yarım yol kullanılmaz
+
+        blocked = visited
+        while True:
+            next_node = choose_next_node(G, pheromone, current, blocked, heuristic_map, alpha, beta, candidate_map)
+            if next_node is None:
+                return None  # dead end
+            if guard is None:
+                break
+            next_state = guard.step(state, current, next_node)
+            if next_state is not None:
+                state = next_state
+                break
+            # QoS: bu adımdan sonra kısıt sağlanamaz, komşu bu adım için elenir
+            if blocked is visited:
+                blocked = set(visited)
+            blocked.add(next_node)
 
         visited.add(next_node)
         path.append(next_node)
@@ -165,40 +206,35 @@ def deposit_pheromone(pheromone, path, cost, Q=1.0):
 #   4) Feromon bu yollara göre güncellenir (buharlaşma + birikim).
 # Sonuç olarak en düşük maliyetli yol döndürülür.
 # Arayüz (UI) sadece bu fonksiyonu çağırmalı.
+#
+# goal_directed: sezgisel bilgiye hedefe kalan maliyet alt sınırı eklenir
+#   (lower_bounds.py); karıncalar hedef yönünü bilir.
+# deadline_ms: milisaniye cinsinden süre bütçesi. Süre dolduğunda
+#   (iterasyon ya da karınca ortasında bile) o ana kadarki en iyi yol döner.
+# tol: yakınsama toleransı. En iyi maliyet bu orandan az iyileşirse
+#   iterasyon "iyileşmedi" sayılır ve max_no_improve sonrası durulur.
+# max_delay / min_reliability: kesin QoS kısıtları (qos_routing.py). Karıncalar
+#   kısıtı artık sağlayamayacak adımları yol kurarken eler.
 
 def ACO(G, S, D,
         w_delay=0.33, w_rel=0.33, w_res=0.34,
         n_ants=25, n_iter=20,
-        alpha=1.0, beta=3.0, rho=0.1):
+        alpha=1.0, beta=3.0, rho=0.1,
+        deadline_ms=None, tol=0.0, max_no_improve=5, goal_directed=True,
+        max_delay=None, min_reliability=None):
 
-    # Pre-calculate heuristic based on USER weights
-    heuristic_map = {}
-    for u, v in G.edges():
-        edge_cost = compute_edge_cost(G, u, v, w_delay, w_rel, w_res)
-        h_val = 1.0 / max(0.0001, edge_cost)
-        
-        # OPTIMIZATION: Pre-calculate (heuristic ** beta) here
-        h_pow_beta = h_val ** beta
-        
-        heuristic_map[(u, v)] = h_pow_beta
-        heuristic_map[(v, u)] = h_pow_beta
-
-    # OPTIMIZATION: Pre-calc CANDIDATE LIST (Top K neighbors by heuristic)
-    candidate_map = {}
-    K_NEIGHBORS = 20
-    for node in G.nodes():
-        # Get all neighbors
-        nbrs = list(G.neighbors(node))
-        # Sort by heuristic value desc (higher = better/lower cost)
-        # Note: heuristic_map keys are (u, v)
-        # We did h_pow_beta calculation above.
-        
-        # Safe get for heuristic (undirected check)
-        def get_h(n):
-            return heuristic_map.get((node, n), 0)
-            
-        nbrs.sort(key=get_h, reverse=True)
-        candidate_map[node] = nbrs[:K_NEIGHBORS]
+    deadline = make_deadline(deadline_ms)
+
+    guard = make_guard(G, S, D, max_delay, min_reliability)
+    if guard is not None and not guard.can_start(S):
+        return None, float('inf'), None
+
+    heuristic_map, candidate_map = get_heuristic_tables(G, w_delay, w_rel, w_res, beta,
+                                                        target=D if goal_directed else None)
+
+    if guard is None and kernels.enabled() and S in G and D in G:
+        return _aco_kernel(G, S, D, w_delay, w_rel, w_res, n_ants, n_iter, alpha, rho,
+                           deadline, tol, max_no_improve, heuristic_map, candidate_map)
 
     pheromone = initialize_pheromones(G)
     best_path = None
@@ -207,27 +243,35 @@ def ACO(G, S, D,
 
     # EARLY STOPPING tracking
     no_improve_count = 0
-    MAX_NO_IMPROVE = 5
 
     for iteration in range(n_iter):
         for ant in range(n_ants):
-            path = build_path(G, pheromone, S, D, heuristic_map, alpha, beta, candidate_map)
+            if time_is_up(deadline):
+                break
+
+            path = build_path(G, pheromone, S, D, heuristic_map, alpha, beta, candidate_map, deadline, guard)
             if path is None:
                 continue
 
             cost, td, rc, rs = evaluate_path(path, G, w_delay, w_rel, w_res)
 
             if cost < best_cost:
+                if is_significant_improvement(cost, best_cost, tol):
+                    no_improve_count = 0 # Reset counter
                 best_cost = cost
                 best_path = path
                 best_metrics = (td, rc, rs)
-                no_improve_count = 0 # Reset counter
             
             deposit_pheromone(pheromone, path, cost)
 
+        # DEADLINE CHECK: en iyi yol ile hemen dön
+        if time_is_up(deadline):
+            print(f"Deadline reached at iteration {iteration}")
+            break
+
         # EARLY STOPPING CHECK
         no_improve_count += 1
-        if no_improve_count >= MAX_NO_IMPROVE:
+        if no_improve_count >= max_no_improve:
             print(f"Early stop at iteration {iteration}")
             break
 
@@ -240,13 +284,433 @@ def ACO(G, S, D,
     return best_path, best_cost, best_metrics
 
 
+# ACO'nun derlenmiş çekirdekle çalışan hâli (kernels.py): aynı döngü, ama
+# bir iterasyonun karıncaları (yol kurma + maliyet + feromon bırakma) tek
+# çekirdek çağrısında. Feromon yay dizisinde tutulur; aynı seed ile sonuç
+# Python yoluyla birebir aynıdır. Süre bütçesi iterasyonlar arasında
+# kontrol edilir.
+
+def _aco_kernel(G, S, D, w_delay, w_rel, w_res, n_ants, n_iter, alpha, rho,
+                deadline, tol, max_no_improve, heuristic_map, candidate_map):
+    kg = kernels.kernel_graph(G)
+    eta, cand_ptr, cand_nbr, cand_arc = kernels.aco_tables(kg, heuristic_map, candidate_map)
+    s, d = kg.index[S], kg.index[D]
+
+    tau = np.full(kg.m, 0.1)   # initialize_pheromones
+    paths = np.empty((n_ants, kg.n), dtype=np.int64)
+    lengths = np.zeros(n_ants, dtype=np.int64)
+    costs = np.empty(n_ants, dtype=np.float64)
+
+    best_path = None
+    best_arcs = None
+    best_cost = float('inf')
+    no_improve_count = 0
+
+    for iteration in range(n_iter):
+        if not time_is_up(deadline):
+            with kernels.python_rng() as mt:
+                kernels.aco_ants(mt, n_ants, s, d, cand_ptr, cand_nbr, cand_arc, kg.ptr, kg.nbr, kg.rev, tau, eta,
+                                 float(alpha), kg.link_delay, kg.proc, kg.neglog_rlink, kg.neglog_rnode,
+                                 kg.inv_bandwidth, w_delay, w_rel, w_res, kernels.NEUMAIER_SUM, paths, lengths,
+                                 costs)
+
+            for ant in range(n_ants):
+                if not lengths[ant]:
+                    continue
+                cost = float(costs[ant])
+                if cost < best_cost:
+                    if is_significant_improvement(cost, best_cost, tol):
+                        no_improve_count = 0
+                    best_cost = cost
+                    idx = paths[ant, :lengths[ant]]
+                    best_path = kg.ids(idx.tolist())
+                    best_arcs = kg.arcs(idx[:-1], idx[1:])
+
+        if time_is_up(deadline):
+            print(f"Deadline reached at iteration {iteration}")
+            break
+
+        no_improve_count += 1
+        if no_improve_count >= max_no_improve:
+            print(f"Early stop at iteration {iteration}")
+            break
+
+        if best_path:
+            amount = 2.0 / best_cost
+            tau[best_arcs] += amount
+            tau[kg.rev[best_arcs]] += amount
+
+        tau *= (1 - rho)
+
+    best_metrics = evaluate_path(best_path, G, w_delay, w_rel, w_res)[1:] if best_path else None
+    return best_path, best_cost, best_metrics
+
+
+# Sezgisel bilgi (heuristic ** beta) ve aday listeleri (her düğümün en iyi
+# K_NEIGHBORS komşusu). Sadece graf, ağırlıklar ve beta'ya bağlıdır.
+# Kenar maliyetleri tek geçişte dizilere alınıp NumPy ile hesaplanır;
+# komşular sezgisel değere göre tek bir lexsort ile sıralanır.
+#
+# target verilirse sezgisel hedefe yönlüdür (A* gibi): eta(u, v), hedefe
+# kalan maliyet alt sınırıyla indirgenmiş kenar maliyetinden gelir
+# (GoalBounds.guide). beta=3 ile etkin sıcaklık GUIDE_TEMPERATURE / 3'tür.
+# Hedefe ulaşamayan komşuların sezgiseli 0'dır ve aday listesine girmez.
+
+K_NEIGHBORS = 20
+GUIDE_TEMPERATURE = 0.3
+
+def build_heuristic_tables(G, w_delay, w_rel, w_res, beta, k=K_NEIGHBORS, target=None):
+    edges = list(G.edges(data=True))
+    if not edges:
+        return {}, {node: [] for node in G.nodes()}
+
+    u = np.array([e[0] for e in edges])
+    v = np.array([e[1] for e in edges])
+    delay = np.array([e[2]['link_delay'] for e in edges], dtype=np.float64)
+    bw = np.array([e[2]['bandwidth'] for e in edges], dtype=np.float64)
+    rel = np.array([e[2]['link_reliability'] for e in edges], dtype=np.float64)
+
+    # compute_edge_cost'un vektörel hali
+    edge_cost = (w_delay * delay) + (w_res * (1000 / bw)) + (w_rel * -np.log(rel))
+    h_pow_beta = (1.0 / np.maximum(0.0001, edge_cost)) ** beta
+
+    # Her iki yön
+    src = np.concatenate([u, v])
+    dst = np.concatenate([v, u])
+    h = np.concatenate([h_pow_beta, h_pow_beta])
+
+    if target is not None:
+        bounds = get_goal_bounds(G, target, w_delay, w_rel, w_res)
+        guided = {}
+        for node in G.nodes():
+            neighbors, weights = bounds.guide(node, GUIDE_TEMPERATURE)
+            guided.update(((node, n), w ** beta) for n, w in zip(neighbors, weights))
+        h = np.array([guided.get(arc, 0.0) for arc in zip(src.tolist(), dst.tolist())], dtype=np.float64)
+
+    heuristic_map = dict(zip(zip(src.tolist(), dst.tolist()), h.tolist()))
+
+    # Kaynak düğüme göre grupla, grup içinde sezgisel değer azalan sırada
+    order = np.lexsort((-h, src))
+    src, dst = src[order], dst[order]
+    starts = np.flatnonzero(np.r_[True, src[1:] != src[:-1]])
+    ends = np.r_[starts[1:], len(src)]
+
+    candidate_map = {node: [] for node in G.nodes()}
+    h_sorted = h[order]
+    for a, b in zip(starts.tolist(), ends.tolist()):
+        b = min(b, a + k)
+        if target is not None:
+            # Sıralı olduğu için sıfırlar sonda: ilk sıfıra kadar al
+            b = a + int(np.count_nonzero(h_sorted[a:b]))
+        candidate_map[src[a].item()] = dst[a:b].tolist()
+
+    return heuristic_map, candidate_map
+
+
+# Sezgisel tablo önbelleği (LRU): tüm ACO / MMAS çalışmaları paylaşır.
+# Anahtar: (graf sürümü, bandwidth eşiği, kenar sayısı, ağırlıklar, beta, K, hedef).
+# Sürüm bilgisi olmayan graflar (ör. elle kurulmuş test grafları) önbelleğe
+# alınmaz; canlı güncelleme sürümü artırdığı için eski girdiler kullanılmaz.
+
+HEURISTIC_CACHE_SIZE = 32
+_heuristic_cache = OrderedDict()
+_heuristic_lock = threading.Lock()
+heuristic_cache_stats = {"hits": 0, "misses": 0}
+
+def get_heuristic_tables(G, w_delay, w_rel, w_res, beta, k=K_NEIGHBORS, target=None):
+    version = G.graph.get("version")
+    if version is None:
+        return build_heuristic_tables(G, w_delay, w_rel, w_res, beta, k, target)
+
+    key = (version, G.graph.get("min_bandwidth"), G.number_of_edges(),
+           round(w_delay, 6), round(w_rel, 6), round(w_res, 6), beta, k, target)
+    with _heuristic_lock:
+        tables = _heuristic_cache.get(key)
+        if tables is not None:
+            _heuristic_cache.move_to_end(key)
+            heuristic_cache_stats["hits"] += 1
+            return tables
+        heuristic_cache_stats["misses"] += 1
+
+    tables = build_heuristic_tables(G, w_delay, w_rel, w_res, beta, k, target)
+    with _heuristic_lock:
+        _heuristic_cache[key] = tables
+        while len(_heuristic_cache) > HEURISTIC_CACHE_SIZE:
+            _heuristic_cache.popitem(last=False)
+    return tables
+
+
+# ===========================================================
+# MAX-MIN ANT SYSTEM (MMAS)
+#
+# ACO'dan farkları:
+#   - Feromon [tau_min, tau_max] aralığında tutulur → koloni tek yola
+#     kilitlenmez (durgunluk), erken durdurmaya gerek kalmaz.
+#   - Buharlaşma tembeldir: tüm kenarları gezmek yerine tek bir ölçek
+#     çarpanı güncellenir (O(1)). Gerçek feromon = ham değer * ölçek.
+#     Hiç dokunulmamış kenarlar ortak bir ham değerle (default_raw) tau_max
+#     ile başlar (MMAS başlangıcı) ve diğerleri gibi buharlaşır.
+#   - Her iterasyonda TEK karınca feromon bırakır: başta iterasyonun en
+#     iyisi, ilerledikçe giderek daha sık şimdiye kadarki en iyi yol.
+#   - En iyi karıncanın yolu yerel aramayla (kestirme + tek düğüm
+#     değişimi) iyileştirilir.
+# ===========================================================
+
+class LazyPheromone:
+    def __init__(self, rho, tau_max=1.0, tau_min=0.01):
+        self.rho = rho
+        self.tau_max = tau_max
+        self.tau_min = tau_min
+        self.scale = 1.0
+        self.raw = {}
+        # Feromon bırakılmamış kenarların ham değeri
+        self.default_raw = tau_max
+
+    def get(self, u, v):
+        tau = self.raw.get((u, v), self.default_raw) * self.scale
+        if tau < self.tau_min:
+            return self.tau_min
+        if tau > self.tau_max:
+            return self.tau_max
+        return tau
+
+    def evaporate(self):
+        self.scale *= (1 - self.rho)
+        # Ölçek çok küçülünce (taşma/sıfıra yuvarlanma olmasın) ham değerlere yansıt
+        if self.scale < 1e-100:
+            for key in self.raw:
+                self.raw[key] *= self.scale
+            self.default_raw *= self.scale
+            self.scale = 1.0
+
+    def deposit(self, path, amount):
+        for u, v in zip(path[:-1], path[1:]):
+            tau = min(self.get(u, v) + amount, self.tau_max)
+            self.raw[(u, v)] = self.raw[(v, u)] = tau / self.scale
+
+    # tau_max = 1 / (rho * en iyi maliyet); tau_min, en iyi yolun
+    # p_best olasılıkla üretileceği şekilde (Stützle & Hoos) seçilir
+    def set_bounds(self, best_cost, n_nodes, p_best=0.05, avg_choices=K_NEIGHBORS / 2):
+        self.tau_max = 1.0 / (self.rho * best_cost)
+        root = p_best ** (1.0 / max(1, n_nodes))
+        self.tau_min = min(self.tau_max, self.tau_max * (1 - root) / max(1e-12, (avg_choices - 1) * root))
+        # İlk sınırlar (henüz feromon bırakılmadan): başlangıç değeri yeni tau_max
+        if not self.raw:
+            self.default_raw = self.tau_max / self.scale
+
+
+def mmas_choose_next_node(G, pheromone, current, visited, heuristic_map, alpha=1.0, candidate_map=None):
+    neighbors = candidate_map.get(current, []) if candidate_map is not None else G.neighbors(current)
+
+    nodes, weights = [], []
+    for attempt in (neighbors, G.neighbors(current)):
+        for v in attempt:
+            if v in visited:
+                continue
+            tau = pheromone.get(current, v)
+            weights.append((tau if alpha == 1.0 else tau ** alpha) * heuristic_map[(current, v)])
+            nodes.append(v)
+        # Adaylar tükendiyse tüm komşulara geri dön
+        if nodes or candidate_map is None:
+            break
+
+    if not nodes:
+        return None
+    if sum(weights) <= 0:
+        return random.choice(nodes)
+    return random.choices(nodes, weights)[0]
+
+
+def mmas_build_path(G, pheromone, S, D, heuristic_map, alpha=1.0, candidate_map=None, deadline=None,
+                    guard=None):
+    current = S
+    visited = {S}
+    path = [S]
+    state = guard.start() if guard is not None else None
+
+    while current != D:
+        if time_is_up(deadline):
+            return None
+
+        blocked = visited
+        while True:
+            next_node = mmas_choose_next_node(G, pheromone, current, blocked, heuristic_map, alpha, candidate_map)
+            if next_node is None:
+                return None
+            if guard is None:
+                break
+            next_state = guard.step(state, current, next_node)
+            if next_state is not None:
+                state = next_state
+                break
+            if blocked is visited:
+                blocked = set(visited)
+            blocked.add(next_node)
+
+        visited.add(next_node)
+        path.append(next_node)
+        current = next_node
+
+    return path
+
+
+# Yerel arama: yolun ara parçalarını tek kenarla kısaltır (kestirme) ve
+# her ara düğümü, komşularına daha ucuz bağlanan ortak bir komşuyla
+# değiştirmeyi dener. Yön maliyetleri (directed_edge_cost) kullanılır;
+# kaynak/hedef sabit olduğundan toplam maliyetle aynı sıralamayı verir.
+
+def local_search(G, path, w_delay, w_rel, w_res):
+    def arc(u, v):
+        return directed_edge_cost(G, u, v, w_delay, w_rel, w_res)
+
+    path = list(path)
+    improved = True
+    while improved:
+        improved = False
+
+        # 1) Kestirme: path[i] → path[j] doğrudan kenarı ara parçadan ucuzsa
+        for i in range(len(path) - 2):
+            segment = 0.0
+            best_j = None
+            for j in range(i + 1, len(path)):
+                segment += arc(path[j - 1], path[j])
+                if j >= i + 2 and G.has_edge(path[i], path[j]) and arc(path[i], path[j]) < segment - 1e-12:
+                    best_j = j
+            if best_j is not None:
+                path = path[:i + 1] + path[best_j:]
+                improved = True
+                break
+        if improved:
+            continue
+
+        # 2) Tek düğüm değişimi: path[i-1] → x → path[i+1]
+        on_path = set(path)
+        for i in range(1, len(path) - 1):
+            a, b = path[i - 1], path[i + 1]
+            current = arc(a, path[i]) + arc(path[i], b)
+            best_x, best_val = None, current - 1e-12
+            for x in G.neighbors(a):
+                if x in on_path or not G.has_edge(x, b):
+                    continue
+                val = arc(a, x) + arc(x, b)
+                if val < best_val:
+                    best_x, best_val = x, val
+            if best_x is not None:
+                path[i] = best_x
+                improved = True
+                break
+
+    return path
+
+
+# Şimdiye kadarki en iyi yolun feromon bırakma sıklığı; ilerleme (0-1)
+# arttıkça artar. Süre bütçesi varsa ilerleme geçen süreye göre de ölçülür.
+def best_so_far_period(progress):
+    if progress < 0.2:
+        return None   # sadece iterasyonun en iyisi
+    if progress < 0.4:
+        return 5
+    if progress < 0.6:
+        return 3
+    if progress < 0.8:
+        return 2
+    return 1
+
+
+def MMAS(G, S, D,
+         w_delay=0.33, w_rel=0.33, w_res=0.34,
+         n_ants=25, n_iter=40,
+         alpha=1.0, beta=3.0, rho=0.05, p_best=0.05,
+         use_local_search=True,
+         deadline_ms=None, tol=0.0, max_no_improve=None, goal_directed=True,
+         max_delay=None, min_reliability=None):
+
+    deadline = make_deadline(deadline_ms)
+
+    guard = make_guard(G, S, D, max_delay, min_reliability)
+    if guard is not None and not guard.can_start(S):
+        return None, float('inf'), None
+
+    heuristic_map, candidate_map = get_heuristic_tables(G, w_delay, w_rel, w_res, beta,
+                                                        target=D if goal_directed else None)
+    pheromone = LazyPheromone(rho)
+
+    best_path = None
+    best_cost = float('inf')
+    best_metrics = None
+    no_improve_count = 0
+
+    for iteration in range(n_iter):
+        iter_path, iter_cost = None, float('inf')
+
+        for ant in range(n_ants):
+            if time_is_up(deadline):
+                break
+
+            path = mmas_build_path(G, pheromone, S, D, heuristic_map, alpha, candidate_map, deadline, guard)
+            if path is None:
+                continue
+
+            cost = evaluate_path(path, G, w_delay, w_rel, w_res)[0]
+            if cost < iter_cost:
+                iter_path, iter_cost = path, cost
+
+        if iter_path is not None and use_local_search:
+            improved_path = local_search(G, iter_path, w_delay, w_rel, w_res)
+            # Yerel arama maliyeti düşürürken QoS kısıtını bozabilir
+            if guard is None or guard.path_ok(improved_path):
+                iter_path = improved_path
+                iter_cost = evaluate_path(iter_path, G, w_delay, w_rel, w_res)[0]
+
+        improved = False
+        if iter_cost < best_cost:
+            improved = is_significant_improvement(iter_cost, best_cost, tol)
+            best_path, best_cost = iter_path, iter_cost
+            best_metrics = evaluate_path(best_path, G, w_delay, w_rel, w_res)[1:]
+            pheromone.set_bounds(best_cost, G.number_of_nodes(), p_best)
+
+        if time_is_up(deadline):
+            print(f"Deadline reached at iteration {iteration}")
+            break
+
+        if max_no_improve is not None:
+            no_improve_count = 0 if improved else no_improve_count + 1
+            if no_improve_count >= max_no_improve:
+                print(f"Early stop at iteration {iteration}")
+                break
+
+        # Buharlaşma (O(1)) + tek karıncanın feromon bırakması
+        pheromone.evaporate()
+        progress = (iteration + 1) / n_iter
+        if deadline_ms:
+            progress = max(progress, 1 - remaining_ms(deadline) / deadline_ms)
+        period = best_so_far_period(progress)
+        if best_path is not None and (iter_path is None or (period is not None and iteration % period == 0)):
+            pheromone.deposit(best_path, 1.0 / best_cost)
+        elif iter_path is not None:
+            pheromone.deposit(iter_path, 1.0 / iter_cost)
+
+    return best_path, best_cost, best_metrics
+
+
+def run_mmas(G_in, S, D,
+             w_delay=0.33, w_rel=0.33, w_res=0.34,
+             n_ants=25, n_iter=40, alpha=1.0, beta=3.0, rho=0.05, p_best=0.05,
+             deadline_ms=None, tol=0.0, max_delay=None, min_reliability=None):
+    return MMAS(G_in, S, D, w_delay=w_delay, w_rel=w_rel, w_res=w_res,
+                n_ants=n_ants, n_iter=n_iter, alpha=alpha, beta=beta, rho=rho, p_best=p_best,
+                deadline_ms=deadline_ms, tol=tol,
+                max_delay=max_delay, min_reliability=min_reliability)
+
+
 # run_aco(S, D, w_delay, w_rel, w_res, n_ants, n_iter) parametreleri ve print ifadeleri ile
 # ACO algoritmasını çalıştırır ve sonuçları ekrana yazdırır.
 
 
 def run_aco(G_in, S, D,
             w_delay=0.33, w_rel=0.33, w_res=0.34,
-            n_ants=20, n_iter=15):
+            n_ants=20, n_iter=15, alpha=1.0, beta=3.0, rho=0.1,
+            deadline_ms=None, tol=0.0, max_delay=None, min_reliability=None):
 
     best_path, best_cost, metrics = ACO(
         G_in, S, D,
@@ -254,7 +718,14 @@ def run_aco(G_in, S, D,
         w_rel=w_rel,
         w_res=w_res,
         n_ants=n_ants,
-        n_iter=n_iter
+        n_iter=n_iter,
+        alpha=alpha,
+        beta=beta,
+        rho=rho,
+        deadline_ms=deadline_ms,
+        tol=tol,
+        max_delay=max_delay,
+        min_reliability=min_reliability
     )
 
     print("\n=== FINAL BEST RESULT ===")
@@ -275,4 +746,4 @@ def run_aco(G_in, S, D,
 if __name__ == "__main__":
     S = 47
     D = 177
-    run_aco(S, D)
+    run_aco(G, S, D)
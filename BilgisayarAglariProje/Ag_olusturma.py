@@ -70,6 +70,15 @@ for _, row in edge_df.iterrows():
     G.edges[u,v]["link_delay"]=row["delay_ms"]
     G.edges[u,v]["link_reliability"]=row["r_link"]
 
+# --- sürüm ---
+# Graf canlı güncellendikçe (link düşmesi, gecikme değişimi vb.) artar.
+# Önbellekler bu numara ile graf durumunu tanır; G.copy() da taşır.
+G.graph["version"] = 0
+
+# CSV / API alan adları → graf içindeki öznitelik adları
+EDGE_ATTRS = {"capacity_mbps": "bandwidth", "delay_ms": "link_delay", "r_link": "link_reliability"}
+NODE_ATTRS = {"s_ms": "processing_delay", "r_node": "node_reliability"}
+
 print("Graf başarıyla oluşturuldu.")
 print("Toplam Düğüm:",len(G.nodes()))
 print("Toplam Kenar:",len(G.edges()))
@@ -211,20 +220,24 @@ def is_valid_path(path, G, min_bandwidth=None):
 
 
 # -----------------------------------------------------------
-# Kaynak ve hedef arasındaki tüm yolları bulur
-# max_hops → maksimum kenar sayısı
+# Kaynak ve hedef arasındaki yolları maliyet sırasıyla üretir
+# (eskiden nx.all_simple_paths ile hepsi listeleniyordu; derecesi ~100
+#  olan grafikte bu patlıyordu).
+# Artık tembel (lazy) bir iterator döner: Yen k-en-kısa-yol motoru
+# yolları weighted_sum_method'a göre artan sırada üretir.
+# max_hops  → maksimum kenar sayısı (aşan yollar atlanır)
+# max_paths → en fazla kaç yol üretileceği (None → sınırsız)
 # -----------------------------------------------------------
-def find_all_paths(G, source, target, max_hops=10):
+def find_all_paths(G, source, target, max_hops=10, max_paths=100,
+                   w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+    from k_shortest import k_shortest_paths
 
     if source not in G.nodes or target not in G.nodes:
-        return []
-
-    try:
-        paths = list(nx.all_simple_paths(G, source=source, target=target, cutoff=max_hops))
-    except nx.NetworkXNoPath:
-        return []
+        return iter(())
 
-    return paths
+    return k_shortest_paths(G, source, target, k=max_paths,
+                            w_delay=w_delay, w_reliability=w_reliability, w_resource=w_resource,
+                            min_bandwidth=min_bandwidth, max_hops=max_hops)
 
 
 
@@ -244,26 +257,123 @@ def weighted_sum_method(path, G,
     return total
 
 
+# -----------------------------------------------------------
+# Bandwidth eşiğini sağlamayan kenarları çıkarılmış bir kopya döndürür
+# (ACO ve Q-Learning filtrelenmiş graf üzerinde çalışır)
+# CompactGraph (compact_graph.py) kopyalanmaz: yalnızca yeni CSR dizileri
+# kurulur, kenar öznitelikleri paylaşılır.
+# -----------------------------------------------------------
+def filter_graph_by_bandwidth(G, min_bandwidth):
+    if hasattr(G, "filter_bandwidth"):
+        return G.filter_bandwidth(min_bandwidth)
+    Gf = G.copy()
+    for u, v, data in list(Gf.edges(data=True)):
+        if data.get("bandwidth", 0) < min_bandwidth:
+            Gf.remove_edge(u, v)
+    Gf.graph["min_bandwidth"] = min_bandwidth
+    return Gf
+
 
 # -----------------------------------------------------------
-# ÖRNEK TEST KODU — istediğin path'i buraya yaz
+# Yönlü kenar maliyeti (u → v)
+# weighted_sum_method'u kenarlara dağıtır: kenarın kendi metrikleri
+# + varılan düğüm v'nin işlem gecikmesi ve güvenilirlik maliyeti.
+# Bir yol boyunca toplandığında:
+#   toplam = weighted_sum_method(path)
+#          + w_delay * processing_delay(hedef)
+#          - w_reliability * (-log r_node(kaynak))
+# Bu fark yalnızca kaynak/hedefe bağlı bir sabit olduğu için
+# yolların sıralaması weighted_sum_method ile birebir aynıdır.
+# Dijkstra tabanlı kesin algoritmalar bu maliyeti kullanır.
+# -----------------------------------------------------------
+def directed_edge_cost(G, u, v, w_delay=0.33, w_reliability=0.33, w_resource=0.34):
+    edge = G.edges[u, v]
+    node = G.nodes[v]
+
+    delay = edge["link_delay"] + node["processing_delay"]
+    rel = -math.log(edge["link_reliability"]) - math.log(node["node_reliability"])
+    res = 1000 / edge["bandwidth"]
+
+    return w_delay * delay + w_reliability * rel + w_resource * res
+
+
+def path_cost_offset(G, source, target, w_delay=0.33, w_reliability=0.33, w_resource=0.34):
+    # weighted_sum_method(path) = sum(directed_edge_cost) + path_cost_offset
+    if source == target:
+        return 0.0
+    return (w_reliability * -math.log(G.nodes[source]["node_reliability"])
+            - w_delay * G.nodes[target]["processing_delay"])
+
+
+# -----------------------------------------------------------
+# Yönlü komşuluk listesi: {u: [(v, maliyet), ...]}
+# min_bandwidth verilirse bu değerin altındaki kenarlar listeye girmez.
+# -----------------------------------------------------------
+def build_cost_adjacency(G, w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+    adj = {n: [] for n in G.nodes()}
+    for u, v, data in G.edges(data=True):
+        if min_bandwidth is not None and data.get("bandwidth", 0) < min_bandwidth:
+            continue
+        adj[u].append((v, directed_edge_cost(G, u, v, w_delay, w_reliability, w_resource)))
+        adj[v].append((u, directed_edge_cost(G, v, u, w_delay, w_reliability, w_resource)))
+    return adj
+
+
+# -----------------------------------------------------------
+# ZAMAN BÜTÇESİ (deadline) yardımcıları
+# Tüm algoritmalar milisaniye cinsinden bir süre bütçesi alabilir.
+# make_deadline → bitiş anını (perf_counter saniyesi) döndürür,
+# bütçe verilmediyse None döner ve algoritma sınırsız çalışır.
 # -----------------------------------------------------------
+import time
+
+def make_deadline(deadline_ms):
+    if deadline_ms is None:
+        return None
+    return time.perf_counter() + max(0.0, float(deadline_ms)) / 1000.0
+
+
+def time_is_up(deadline):
+    return deadline is not None and time.perf_counter() >= deadline
+
+
+def remaining_ms(deadline):
+    if deadline is None:
+        return None
+    return max(0.0, (deadline - time.perf_counter()) * 1000.0)
+
 
-example_path = [0, 2]   # Buraya istediğin path'i yazabilirsin
+# -----------------------------------------------------------
+# Yakınsama kontrolü: yeni maliyet eskisinden en az "tol" oranında
+# daha iyiyse anlamlı bir iyileşme sayılır (tol=0 → her iyileşme sayılır)
+# -----------------------------------------------------------
+def is_significant_improvement(new_cost, best_cost, tol=0.0):
+    if best_cost == float("inf"):
+        return True
+    return new_cost < best_cost - abs(best_cost) * tol
+
+
+
+# -----------------------------------------------------------
+# ÖRNEK TEST KODU — istediğin path'i buraya yaz
+# (sadece dosya doğrudan çalıştırıldığında; import edildiğinde çalışmaz)
+# -----------------------------------------------------------
 
-print("Test Edilen Yol:", example_path)
-print("---------------------------------------")
+if __name__ == "__main__":
+    example_path = [0, 2]   # Buraya istediğin path'i yazabilirsin
 
-# Yol geçerli mi?
-valid = is_valid_path(example_path, G, min_bandwidth=0)  
-print("Geçerli yol mu?:", valid)
+    print("Test Edilen Yol:", example_path)
+    print("---------------------------------------")
 
-if valid:
-    print("Toplam Delay:", total_delay(example_path, G))
-    print("Toplam Güvenilirlik (0-1):", total_reliability(example_path, G))
-    print("Güvenilirlik Cost:", reliability_cost(example_path, G))
-    print("Kaynak Cost:", resource_cost(example_path, G))
-    print("Weighted Cost:", weighted_sum_method(example_path, G))
-else:
-    print("Bu yol grafik içinde mevcut değil.")
+    # Yol geçerli mi?
+    valid = is_valid_path(example_path, G, min_bandwidth=0)  
+    print("Geçerli yol mu?:", valid)
 
+    if valid:
+        print("Toplam Delay:", total_delay(example_path, G))
+        print("Toplam Güvenilirlik (0-1):", total_reliability(example_path, G))
+        print("Güvenilirlik Cost:", reliability_cost(example_path, G))
+        print("Kaynak Cost:", resource_cost(example_path, G))
+        print("Weighted Cost:", weighted_sum_method(example_path, G))
+    else:
+        print("Bu yol grafik içinde mevcut değil.")
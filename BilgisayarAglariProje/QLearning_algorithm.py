@@ -3,13 +3,43 @@ import networkx as nx
 import random 
 import math
 import time
+import heapq
 from tqdm import tqdm
 
 import Ag_olusturma as ag
+import kernels
+from graph_arrays import get_compiled
+from lower_bounds import get_goal_bounds
+from qos_routing import make_guard
+
+GOAL_BONUS = 200
+STEP_PENALTY = 0.5
+MAX_STEPS = 50
+# Derlenmiş çekirdekte (kernels.py) bir çağrıda oynanan en fazla bölüm;
+# süre bütçesi ve yakınsama kontrolü çağrılar arasında yapılır
+KERNEL_CHUNK = 100
 
 class QLearningAgent:
+    # planning: None → sadece örneklenen bölümlerden öğrenir (klasik Q-learning)
+    #           "dyna"  → her gerçek adımdan sonra modelden planning_steps adet
+    #                     rastgele simüle güncelleme (Dyna-Q)
+    #           "sweep" → Bellman hatası öncelik kuyruğuyla hedeften geriye
+    #                     doğru güncelleme (prioritized sweeping)
+    # traces:   None → tek adımlık güncelleme
+    #           "sarsa"   → SARSA(λ)
+    #           "watkins" → Watkins Q(λ) (keşif adımında izler kesilir)
+    #           trace_decay = λ; izler sadece bölümde ziyaret edilen
+    #           (durum, eylem) çiftleri için tutulur
+    # lower_bounds: keşif adımlarında komşular kenar maliyeti + hedefe kalan
+    #           maliyet alt sınırıyla ağırlıklanır; hedefe ulaşamayan
+    #           komşular hiç seçilmez (lower_bounds.py)
+    # max_delay / min_reliability: kesin QoS kısıtları; kısıtı artık
+    #           sağlayamayacak adım bölümü cezayla bitirir (qos_routing.py)
     def __init__(self, graph, w_delay=0.33, w_reliability=0.33, w_resource=0.34,
-                 learning_rate=0.1, discount_factor=0.9, exploration_rate=1.0, exploration_decay=0.9992):
+                 learning_rate=0.1, discount_factor=0.9, exploration_rate=1.0, exploration_decay=0.9992,
+                 planning=None, planning_steps=10, sweep_threshold=1e-3,
+                 traces=None, trace_decay=0.8, trace_min=1e-3, lower_bounds=True,
+                 max_delay=None, min_reliability=None):
         self.graph = graph
         self.q_table = {}
         
@@ -24,12 +54,90 @@ class QLearningAgent:
         self.exploration_rate = exploration_rate
         self.exploration_decay = exploration_decay
 
+        # Eğitim sırasında hedefe ulaşan en iyi bölüm (episode) yolu.
+        # Süre bütçesi dolduğunda greedy yol henüz oluşmamışsa yedek cevap olarak kullanılır.
+        self.best_episode_path = None
+        self.best_episode_cost = float('inf')
+
+        # Planlama (model tabanlı güncellemeler)
+        if planning not in (None, "dyna", "sweep"):
+            raise ValueError(f"Geçersiz planning modu: {planning}")
+        self.planning = planning
+        self.planning_steps = planning_steps
+        self.sweep_threshold = sweep_threshold
+        # Model: (u, v) → hedef bonusu hariç gözlenen ödül. Ödüller kenar/düğüm
+        # özniteliklerinden deterministik geldiği için model kesindir.
+        self.model = {}
+        self._static_rewards = {}
+        self._model_keys = []
+        self._pqueue = []
+        self._planning_goal = None
+        self.planning_updates = 0
+
+        # Uygunluk izleri (eligibility traces)
+        if traces not in (None, "sarsa", "watkins"):
+            raise ValueError(f"Geçersiz traces modu: {traces}")
+        self.traces = traces
+        self.trace_decay = trace_decay
+        self.trace_min = trace_min
+
+        self.lower_bounds = lower_bounds
+        self._bounds = None
+
+        self.max_delay = max_delay
+        self.min_reliability = min_reliability
+        self._guard = None
+        # Hedefe ulaşan bölüm sayısı (tüm train çağrıları boyunca)
+        self.goal_episodes = 0
+        # Derlenmiş çekirdek için yay dizileri (graf değişince yeniden kurulur)
+        self._kernel_tables = None
+
         # Q-Learning Tablosunu başlatma kısmı 
         for node in self.graph.nodes():
             self.q_table[node] = {}
             for neighbor in self.graph.neighbors(node):
                 self.q_table[node][neighbor] = 0.0
     
+    #================================
+    # Canlı graf güncellemesi sonrası Q-tablosunu onarma
+    # Sadece değişen kenarın (u, v) iki yönlü Q-değerleri sıfırlanır;
+    # kenar grafikten kalktıysa tablodan da silinir. Geri kalan
+    # öğrenilmiş değerler korunur (sıcak başlangıç).
+    #================================
+    def refresh_edge(self, u, v):
+        for a, b in ((u, v), (v, u)):
+            if self.graph.has_edge(a, b):
+                self.q_table.setdefault(a, {})[b] = 0.0
+            elif a in self.q_table:
+                self.q_table[a].pop(b, None)
+            self._forget_model(a, b)
+        # Düğüm öznitelikleri de ödüle girdiğinden önbellek komple yenilenir
+        self._static_rewards.clear()
+        self._kernel_tables = None
+
+        if self.best_episode_path is not None and any(
+                {a, b} == {u, v} for a, b in zip(self.best_episode_path, self.best_episode_path[1:])):
+            self.best_episode_path = None
+            self.best_episode_cost = float('inf')
+
+    def drop_node(self, node):
+        for neighbor in self.q_table.pop(node, {}):
+            self.q_table.get(neighbor, {}).pop(node, None)
+            self._forget_model(node, neighbor)
+            self._forget_model(neighbor, node)
+        self._static_rewards.clear()
+        self._kernel_tables = None
+
+        if self.best_episode_path is not None and node in self.best_episode_path:
+            self.best_episode_path = None
+            self.best_episode_cost = float('inf')
+
+    def _forget_model(self, u, v):
+        if self.model.pop((u, v), None) is not None:
+            self._model_keys = list(self.model)
+        # Hedef değişmiş gibi: bir sonraki eğitimde kuyruk yeniden tohumlanır
+        self._planning_goal = None
+
     #================================
     # Q-değerini alma fonksiyonu
     #================================
@@ -76,10 +184,10 @@ class QLearningAgent:
         
         reward = -total_cost
 
-        reward -= step_count * 0.5
+        reward -= step_count * STEP_PENALTY
 
         if is_goal:
-            reward += 200
+            reward += GOAL_BONUS
         
         return reward
 
@@ -91,6 +199,11 @@ class QLearningAgent:
         if not neighbors: return None
 
         if random.random() < self.exploration_rate:
+            if self._bounds is not None:
+                guided, weights = self._bounds.guide(state)
+                if guided:
+                    return random.choices(guided, weights=weights, k=1)[0]
+
             h_values = [self.get_heuristic(state, n) for n in neighbors]
             
             # Koruma: Ağırlıklar toplamı 0 ise normal rastgele seç
@@ -120,39 +233,381 @@ class QLearningAgent:
         new_q = current_q + self.learning_rate * (reward + self.discount_factor * best_next_q - current_q)
         self.q_table[state][action] = new_q
 
+    #================================
+    # PLANLAMA (Dyna-Q / Prioritized Sweeping)
+    #================================
+    # Modelden ödül: gözlenmiş geçiş varsa o, yoksa özniteliklerden hesaplanır.
+    # Adım cezası bölümdeki adım sayısına bağlı olduğundan gözlenmemiş
+    # geçişlerde 0. adım kabul edilir.
+    def _model_reward(self, u, v, goal):
+        r = self.model.get((u, v))
+        if r is None:
+            r = self._static_rewards.get((u, v))
+            if r is None:
+                r = self._static_rewards[(u, v)] = self.calculate_reward(u, v, False, 0)
+        return r + GOAL_BONUS if v == goal else r
+
+    def _state_value(self, state, goal):
+        # Hedef terminal durumdur
+        if state == goal:
+            return 0.0
+        return max(self.q_table[state].values(), default=0.0)
+
+    def _bellman_error(self, u, v, goal, v_value=None):
+        if v_value is None:
+            v_value = self._state_value(v, goal)
+        target = self._model_reward(u, v, goal) + self.discount_factor * v_value
+        return target - self.q_table[u][v]
+
+    def _remember(self, u, v, reward, goal):
+        if (u, v) not in self.model:
+            self._model_keys.append((u, v))
+        self.model[(u, v)] = reward - GOAL_BONUS if v == goal else reward
+
+    def _push(self, u, v, goal, v_value=None):
+        if u == goal:
+            return
+        priority = abs(self._bellman_error(u, v, goal, v_value))
+        if priority > self.sweep_threshold:
+            heapq.heappush(self._pqueue, (-priority, u, v))
+
+    # Kuyruğu hedefe bağlı kenarlarla tohumlar: hedef bonusu buradan geriye yayılır
+    def _start_planning(self, goal, deadline=None):
+        if self._planning_goal == goal:
+            return
+        self._planning_goal = goal
+        self._pqueue = []
+        if self.planning == "sweep":
+            for p in self.graph.neighbors(goal):
+                self._push(p, goal, goal)
+            # Tek bölüm oynanmadan önce hedef değeri grafın geneline yayılır
+            self._sweep(goal, self.planning_steps * self.graph.number_of_nodes(), deadline)
+
+    def _sweep(self, goal, n, deadline=None):
+        for i in range(n):
+            if not self._pqueue or (i & 63 == 0 and ag.time_is_up(deadline)):
+                break
+            _, u, v = heapq.heappop(self._pqueue)
+            # Kuyrukta bekleyen eski (bayat) öncelikler: hata yeniden hesaplanır.
+            # Model deterministik olduğundan tam (α=1) güncelleme yapılır.
+            error = self._bellman_error(u, v, goal)
+            if abs(error) <= self.sweep_threshold:
+                continue
+            old_value = self._state_value(u, goal)
+            self.q_table[u][v] += error
+            self.planning_updates += 1
+
+            # u'nun değeri (max Q) değiştiyse u'ya giden kenarların önceliği güncellenir
+            u_value = self._state_value(u, goal)
+            if u_value == old_value:
+                continue
+            for p in self.graph.neighbors(u):
+                self._push(p, u, goal, u_value)
+
+    def _dyna(self, goal, n):
+        for _ in range(n):
+            u, v = random.choice(self._model_keys)
+            if u == goal:
+                continue
+            self.q_table[u][v] += self.learning_rate * self._bellman_error(u, v, goal)
+            self.planning_updates += 1
+
+    def _plan(self, state, action, reward, goal, deadline=None):
+        self._remember(state, action, reward, goal)
+        if self.planning == "dyna":
+            self._dyna(goal, self.planning_steps)
+        elif self.planning == "sweep":
+            self._push(state, action, goal)
+            self._sweep(goal, self.planning_steps, deadline)
+
     #================================
     # Eğitim fonksiyonu
+    # deadline_ms: süre bütçesi (ms). Süre dolunca bölüm ortasında da durulur.
+    # tol / max_no_improve: her check_every bölümde greedy yolun maliyeti
+    #   ölçülür; max_no_improve kontrol boyunca tol oranından fazla
+    #   iyileşmezse eğitim erken biter (None → kapalı).
     #================================
-    def train(self, start_node, goal_node, episodes=1000):
+    def train(self, start_node, goal_node, episodes=1000,
+              deadline_ms=None, tol=0.0, max_no_improve=None, check_every=100):
         print(f"Eğitim Başlıyor: {start_node} -> {goal_node}")
+
+        deadline = ag.make_deadline(deadline_ms)
+        best_greedy_cost = float('inf')
+        no_improve_count = 0
+
+        self._bounds = get_goal_bounds(self.graph, goal_node, self.w_delay, self.w_reliability, self.w_resource) \
+            if self.lower_bounds else None
+        self._guard = make_guard(self.graph, start_node, goal_node, self.max_delay, self.min_reliability)
+        if self._guard is not None and not self._guard.can_start(start_node):
+            print("QoS kısıtlarını sağlayan yol yok")
+            return
+
+        if self._kernel_ready(start_node, goal_node):
+            self._train_kernel(start_node, goal_node, episodes, deadline, tol, max_no_improve, check_every)
+            return
+
+        if self.planning:
+            self._start_planning(goal_node, deadline)
         
         for episode in tqdm(range(episodes), desc="Eğitim İlerlemesi"):
-            state = start_node
-            steps = 0
-            visited = {start_node}
+            if ag.time_is_up(deadline):
+                print(f"Deadline reached at episode {episode}")
+                break
+
+            if self.traces:
+                state, path = self._trace_episode(start_node, goal_node, deadline)
+            else:
+                state, path = self._one_step_episode(start_node, goal_node, deadline)
+
+            if state == goal_node:
+                self.goal_episodes += 1
+                self._record_episode_path(path)
             
-            while state != goal_node and steps < 50:
-                action = self.choose_action(state)
+            self.exploration_rate = max(0.01, self.exploration_rate * self.exploration_decay)
 
-                if action is None or action in visited: 
-                    if action: # Sadece action varsa ceza ver (KeyError önleme)
-                        self.q_table[state][action] -= 10
+            # Yakınsama kontrolü
+            if max_no_improve is not None and (episode + 1) % check_every == 0:
+                best_greedy_cost, no_improve_count, stop = self._check_convergence(
+                    start_node, goal_node, best_greedy_cost, no_improve_count, tol, max_no_improve)
+                if stop:
+                    print(f"Early stop at episode {episode + 1}")
                     break
-                
-                reward = self.calculate_reward(state, action, action == goal_node, steps)
-                
-                next_neighbors = list(self.graph.neighbors(action))
-                max_next_q = max([self.q_table[action][n] for n in next_neighbors]) if next_neighbors else 0.0
 
-                self.q_table[state][action] += self.learning_rate * \
-                    (reward + self.discount_factor * max_next_q - self.q_table[state][action])
+    def _check_convergence(self, start_node, goal_node, best_greedy_cost, no_improve_count, tol, max_no_improve):
+        greedy = self.get_best_path(start_node, goal_node)
+        cost = ag.weighted_sum_method(greedy, self.graph, self.w_delay, self.w_reliability, self.w_resource) \
+            if greedy else float('inf')
+        if ag.is_significant_improvement(cost, best_greedy_cost, tol):
+            no_improve_count = 0
+        else:
+            no_improve_count += 1
+            if no_improve_count >= max_no_improve:
+                return best_greedy_cost, no_improve_count, True
+        return min(best_greedy_cost, cost), no_improve_count, False
+
+    #================================
+    # Derlenmiş çekirdekle eğitim (kernels.ql_episodes)
+    # Tek adımlık Q-learning, planlama / iz / QoS kısıtı yokken kullanılır.
+    # Q-tablosu yay dizisine alınır, bölümler KERNEL_CHUNK'lık gruplar
+    # hâlinde oynanır, değişen Q-değerleri tabloya geri yazılır. Aynı seed
+    # ile sonuç Python döngüsüyle birebir aynıdır.
+    #================================
+    def _kernel_ready(self, start_node, goal_node):
+        if not kernels.enabled() or self.planning or self.traces or self._guard is not None:
+            return False
+        return start_node in self.graph and goal_node in self.graph
+
+    def _kernel_arrays(self):
+        if self._kernel_tables is None:
+            # Ajanın grafı canlı güncellemelerde yerinde değiştiği için ortak
+            # önbellek yerine ajana ait tablo tutulur
+            kg = kernels.KernelGraph(self.graph)
+            v = kg.nbr
+            bw = kg.bandwidth
+
+            # calculate_reward(u, v, False, 0) ile aynı işlem sırası
+            delay = kg.link_delay + kg.proc[v]
+            val = kg.r_link * kg.r_node[v]
+            rel_cost = np.where(val > 0, kernels.neg_log(np.where(val > 0, val, 1.0)), 100.0)
+            res_cost = np.where(bw > 0, 1000 / np.where(bw > 0, bw, 1.0), 100.0)
+            reward = -((self.w_delay * delay) + (self.w_reliability * rel_cost) + (self.w_resource * res_cost))
+
+            # get_heuristic(u, v)
+            cost_score = (self.w_delay * kg.link_delay) + (self.w_reliability * (1 - kg.r_link) * 100) + \
+                         (self.w_resource * (1000 / bw))
+            heur = 1.0 / (cost_score + 1e-6)
+
+            node_ids = np.array(kg.node_ids, dtype=np.int64)
+            self._kernel_tables = (kg, reward, heur, node_ids)
+        return self._kernel_tables
+
+    def _train_kernel(self, start_node, goal_node, episodes, deadline, tol, max_no_improve, check_every):
+        kg, reward, heur, node_ids = self._kernel_arrays()
+        ids = kg.node_ids
+
+        if self._bounds is not None:
+            guide = kernels.guide_tables(kg, self._bounds)
+            use_guide = True
+        else:
+            guide = None
+        if guide is None:
+            empty = np.zeros(0, dtype=np.int64)
+            guide = (np.zeros(kg.n + 1, dtype=np.int64), empty, np.zeros(0), empty)
+            use_guide = False
+
+        src = kg.src.tolist()
+        nbr = kg.nbr.tolist()
+        q = np.array([self.q_table[ids[u]][ids[v]] for u, v in zip(src, nbr)], dtype=np.float64)
+        touched = np.zeros(kg.m, dtype=np.bool_)
+        goal_paths = np.empty((KERNEL_CHUNK, MAX_STEPS + 1), dtype=np.int64)
+        goal_lengths = np.empty(KERNEL_CHUNK, dtype=np.int64)
+        s, g = kg.index[start_node], kg.index[goal_node]
+
+        best_greedy_cost = float('inf')
+        no_improve_count = 0
+        seen = set()
+        done = 0
+        with tqdm(total=episodes, desc="Eğitim İlerlemesi") as bar:
+            while done < episodes:
+                if ag.time_is_up(deadline):
+                    print(f"Deadline reached at episode {done}")
+                    break
+
+                n = min(KERNEL_CHUNK, episodes - done)
+                if max_no_improve is not None:
+                    n = min(n, check_every - done % check_every)
+
+                with kernels.python_rng() as mt:
+                    n_goal, self.exploration_rate = kernels.ql_episodes(
+                        mt, n, s, g, kg.ptr, kg.nbr, node_ids, q, reward, heur, guide[0], guide[1], guide[2],
+                        guide[3], use_guide, float(self.exploration_rate), float(self.exploration_decay),
+                        float(self.learning_rate), float(self.discount_factor), MAX_STEPS, float(STEP_PENALTY),
+                        float(GOAL_BONUS), touched, goal_paths, goal_lengths)
+
+                for a in np.flatnonzero(touched).tolist():
+                    self.q_table[ids[src[a]]][ids[nbr[a]]] = float(q[a])
+                touched[:] = False
+
+                # Aynı yol tekrar kaydedilse en iyiyi değiştirmez: sadece yeni yollar
+                self.goal_episodes += n_goal
+                for i in range(n_goal):
+                    path = tuple(goal_paths[i, :goal_lengths[i]].tolist())
+                    if path not in seen:
+                        seen.add(path)
+                        self._record_episode_path(kg.ids(path))
+
+                done += n
+                bar.update(n)
 
-                visited.add(action)
-                state = action
-                steps += 1
+                if max_no_improve is not None and done % check_every == 0:
+                    best_greedy_cost, no_improve_count, stop = self._check_convergence(
+                        start_node, goal_node, best_greedy_cost, no_improve_count, tol, max_no_improve)
+                    if stop:
+                        print(f"Early stop at episode {done}")
+                        break
 
+    #================================
+    # Tek adımlık (one-step) Q-learning bölümü
+    #================================
+    def _one_step_episode(self, start_node, goal_node, deadline):
+        state = start_node
+        steps = 0
+        visited = {start_node}
+        path = [start_node]
+        qos = self._guard.start() if self._guard is not None else None
+
+        while state != goal_node and steps < MAX_STEPS:
+            if ag.time_is_up(deadline):
+                break
+
+            action = self.choose_action(state)
+
+            if action is None or action in visited: 
+                if action: # Sadece action varsa ceza ver (KeyError önleme)
+                    self.q_table[state][action] -= 10
+                break
+
+            # QoS kısıtı bu adımdan sonra sağlanamıyorsa döngü gibi cezalandırılır
+            if qos is not None:
+                qos = self._guard.step(qos, state, action)
+                if qos is None:
+                    self.q_table[state][action] -= 10
+                    break
             
-            self.exploration_rate = max(0.01, self.exploration_rate * self.exploration_decay)
+            reward = self.calculate_reward(state, action, action == goal_node, steps)
+            
+            next_neighbors = list(self.graph.neighbors(action))
+            max_next_q = max([self.q_table[action][n] for n in next_neighbors]) if next_neighbors else 0.0
+
+            self.q_table[state][action] += self.learning_rate * \
+                (reward + self.discount_factor * max_next_q - self.q_table[state][action])
+
+            if self.planning:
+                self._plan(state, action, reward, goal_node, deadline)
+
+            visited.add(action)
+            path.append(action)
+            state = action
+            steps += 1
+
+        return state, path
+
+    #================================
+    # λ-dönüşlü bölüm (SARSA(λ) / Watkins Q(λ))
+    # TD hatası bölümde şimdiye kadar ziyaret edilen tüm çiftlere izleri
+    # oranında dağıtılır; hedef bonusu tek bölümde kaynağa kadar geri yayılır.
+    # İzler seyrek tutulur (sözlük, replacing traces) ve trace_min altına
+    # düşenler silinir: adım maliyeti bölüm uzunluğuyla orantılı kalır.
+    #================================
+    def _trace_episode(self, start_node, goal_node, deadline):
+        state = start_node
+        steps = 0
+        visited = {start_node}
+        path = [start_node]
+        trace = {}
+        decay = self.discount_factor * self.trace_decay
+        qos = self._guard.start() if self._guard is not None else None
+
+        action = self.choose_action(state)
+        while state != goal_node and steps < MAX_STEPS:
+            if ag.time_is_up(deadline):
+                break
+
+            if action is None or action in visited:
+                if action: # Sadece action varsa ceza ver (KeyError önleme)
+                    self.q_table[state][action] -= 10
+                break
+
+            if qos is not None:
+                qos = self._guard.step(qos, state, action)
+                if qos is None:
+                    self.q_table[state][action] -= 10
+                    break
+
+            reward = self.calculate_reward(state, action, action == goal_node, steps)
+
+            # Hedef terminal: sonraki değer 0
+            next_action = None
+            next_q = best_next_q = 0.0
+            if action != goal_node:
+                next_action = self.choose_action(action)
+                if next_action is not None:
+                    next_q = self.q_table[action][next_action]
+                    best_next_q = max(self.q_table[action].values())
+
+            target_q = next_q if self.traces == "sarsa" else best_next_q
+            delta = reward + self.discount_factor * target_q - self.q_table[state][action]
+
+            trace[(state, action)] = 1.0
+            step = self.learning_rate * delta
+            for (u, v), e in trace.items():
+                self.q_table[u][v] += step * e
+
+            if self.planning:
+                self._plan(state, action, reward, goal_node, deadline)
+
+            # Watkins: keşif (greedy olmayan) eylemden sonra izler kesilir
+            if self.traces == "watkins" and next_q < best_next_q:
+                trace.clear()
+            else:
+                trace = {k: e * decay for k, e in trace.items() if e * decay >= self.trace_min}
+
+            visited.add(action)
+            path.append(action)
+            state = action
+            action = next_action
+            steps += 1
+
+        return state, path
+
+    #================================
+    # Hedefe ulaşan bölüm yolunu kaydetme (anytime yedek cevap)
+    #================================
+    def _record_episode_path(self, path):
+        cost = ag.weighted_sum_method(path, self.graph, self.w_delay, self.w_reliability, self.w_resource)
+        if cost < self.best_episode_cost:
+            self.best_episode_cost = cost
+            self.best_episode_path = list(path)
 
     #================================
     # En iyi yolu bulma
@@ -180,25 +635,115 @@ class QLearningAgent:
             
             if len(path) > 50: break 
             
-        return path if path[-1] == goal_node else None
+        if path[-1] != goal_node:
+            return None
+        # Greedy yol QoS kısıtını ihlal ediyorsa kabul edilmez (çağıran en iyi bölüm yoluna düşer)
+        if self._guard is not None and not self._guard.path_ok(path):
+            return None
+        return path
+#================================
+# DEĞER İTERASYONU (Value Iteration)
+# Geçişler ve calculate_reward deterministik ve tamamen bilindiği için
+# Q-learning'in öğrenmeye çalıştığı problem doğrudan çözülebilir.
+# Ödül şekillendirmesi aynıdır (adım cezası, hedef bonusu, en fazla
+# MAX_STEPS adım); adım cezası adım sayısına bağlı olduğundan çözüm
+# sonlu ufuklu geriye doğru tümevarımdır: her sweep kenar dizileri
+# üzerinde tek bir NumPy gather + segment max'tır (MAX_STEPS sweep).
+# Bir kez çözülünce hedefe doğru TÜM kaynaklar için politika elde edilir.
+# Not: bölüm içi "ziyaret edilen düğüme dönme" cezası modellenmez.
+#================================
+class ValueIterationSolver:
+    def __init__(self, graph, w_delay=0.33, w_reliability=0.33, w_resource=0.34,
+                 discount_factor=0.9, horizon=MAX_STEPS, min_bandwidth=None):
+        self.cg = get_compiled(graph)
+        self.discount_factor = discount_factor
+        self.horizon = horizon
+
+        # Yay ödülleri (hedef bonusu ve adım cezası hariç)
+        self.arc_reward = -self.cg.arc_costs(w_delay, w_reliability, w_resource)
+        if min_bandwidth:
+            self.arc_reward = np.where(self.cg.bandwidth >= min_bandwidth, self.arc_reward, -np.inf)
+
+        self.goal = None
+        self.policy = None   # (horizon, N): k. adımda düğümden gidilecek komşu index'i (-1: yok)
+        self.values = None   # V_0: 0. adımda başlayan bölümün değeri (hedef terminal, 0)
+
+    def solve(self, goal):
+        cg = self.cg
+        g = int(cg.index_of([goal])[0])
+        if g < 0:
+            raise KeyError(f"Düğüm yok: {goal}")
+
+        has_arcs = np.diff(cg.indptr) > 0
+        starts = cg.indptr[:-1][has_arcs]
+        arc_pos = np.arange(cg.m)
+        reward = self.arc_reward + np.where(cg.dst == g, GOAL_BONUS, 0.0)
+
+        V = np.zeros(cg.n)
+        policy = np.full((self.horizon, cg.n), -1, dtype=np.int64)
+        for k in range(self.horizon - 1, -1, -1):
+            q = reward - STEP_PENALTY * k + self.discount_factor * V[cg.dst]
+
+            best = np.full(cg.n, -np.inf)
+            best[has_arcs] = np.maximum.reduceat(q, starts)
+            # Her düğüm için en iyi yayın konumu (eşitlikte ilk yay)
+            first = np.minimum.reduceat(np.where(q == best[cg.src], arc_pos, cg.m), starts)
+            valid = np.isfinite(best)
+
+            policy[k][has_arcs] = np.where(valid[has_arcs], cg.dst[np.minimum(first, cg.m - 1)], -1)
+            policy[k][g] = -1
+            # Gidecek yeri olmayan düğümde bölüm biter (değer 0); hedef terminal
+            V = np.where(valid, best, 0.0)
+            V[g] = 0.0
+
+        self.goal = goal
+        self.goal_idx = g
+        self.policy = policy
+        self.values = V
+        return self
+
+    def get_best_path(self, start_node, goal_node=None):
+        if goal_node is not None and goal_node != self.goal:
+            self.solve(goal_node)
+        s = int(self.cg.index_of([start_node])[0])
+        if s < 0:
+            return None
+
+        path = [s]
+        for k in range(self.horizon):
+            if s == self.goal_idx:
+                break
+            s = int(self.policy[k][s])
+            if s < 0 or s in path:
+                return None
+            path.append(s)
+
+        if path[-1] != self.goal_idx:
+            return None
+        return [int(n) for n in self.cg.node_ids[path]]
+
 #================================
 # Q-Learn algoritmasını çalıştıran fonksiyon
+# graph: üzerinde çalışılacak graf (None → Ag_olusturma.G)
 #================================
-def run_qlearn(source, target, episodes=1000):
+def run_qlearn(source, target, episodes=1000, deadline_ms=None, tol=0.0, max_no_improve=None,
+               graph=None, w_delay=0.33, w_reliability=0.33, w_resource=0.34):
     start_total_time = time.time()
 
-    graph = ag.G
-    agent = QLearningAgent(graph)
+    if graph is None:
+        graph = ag.G
+    agent = QLearningAgent(graph, w_delay=w_delay, w_reliability=w_reliability, w_resource=w_resource)
     t0 = time.time()
-    agent.train(start_node=source, goal_node=target, episodes=episodes)
+    agent.train(start_node=source, goal_node=target, episodes=episodes,
+                deadline_ms=deadline_ms, tol=tol, max_no_improve=max_no_improve)
     t1 = time.time()
     train_time = round(t1 - t0, 3)
-    best_path = agent.get_best_path(source, target)
+    best_path = agent.get_best_path(source, target) or agent.best_episode_path
     
     if best_path:
         delay = ag.total_delay(best_path, graph)
         reliability = ag.total_reliability(best_path, graph)
-        resource_cost = ag.weighted_sum_method(best_path, graph)
+        resource_cost = ag.weighted_sum_method(best_path, graph, w_delay, w_reliability, w_resource)
     else:
         delay = float('inf')
         reliability = 0.0
@@ -1,17 +1,32 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 import networkx as nx
 import matplotlib
 matplotlib.use('Agg')  # Force non-interactive backend for stability
 import matplotlib.pyplot as plt
 import io
 import base64
+import functools
 import threading
+import time
 import Ag_olusturma as ag
 
 try:
-    from QLearning_algorithm import QLearningAgent
-    from ACO_algorithm import run_aco
-    from genetik_alg import run_ga
+    from QLearning_algorithm import ValueIterationSolver
+    from k_shortest import k_shortest_paths, disjoint_paths, backup_paths
+    from network_updates import NetworkState, weights_key
+    from evaluate_paths import evaluate_stream, iter_json, iter_ndjson
+    from exact_solvers import HopLimitedSolver, DEFAULT_MAX_HOPS
+    from qos_routing import violates
+    from solvers import Constraints, make_qlearning_agent, solve
+    from hub_labels import HubIndexManager
+    from solver_pool import POOL_ALGORITHMS, PoolBusy, SolverError, pool_from_env, run_algorithm, solve_job
+    from presets import presets_info
+    from portfolio import DEFAULT_TOL, portfolio_from_env
+    from multipath import DEFAULT_MAX_PATHS, split_demand
+    from singleflight import SingleFlight, canonical_request
+    from availability import DEFAULT_SAMPLES, estimate_availability
+    from simulation import DEFAULT_SIM_MS, simulate_demands, simulate_paths, synthetic_demands
+    from time_varying import parse_departure, path_timing, series_from_env
 except ImportError as e:
     print(f"Algoritma modülü yüklenemedi: {e}")
 
@@ -23,6 +38,42 @@ plot_lock = threading.Lock()
 G_ORIGINAL = ag.G
 app = Flask(__name__)
 
+# Canlı güncellemeler, rota önbelleği, routing table'lar ve sıcak Q-Learning ajanları
+network = NetworkState(G_ORIGINAL)
+
+# Önbellekte tutulan bir Q-Learning ajanı için ek (top-up) eğitim bölümü sayısı
+QL_WARM_EPISODES = 500
+
+# ACO / GA / Q-Learning işlerini çalıştıran süreç havuzu.
+# ROUTE_WORKERS=0 (varsayılan, geliştirme sunucusu) → istek thread'inde çalışır.
+# wsgi.py üretim modunda havuzu açar (bkz. gunicorn.conf.py).
+# ROUTE_BROKER verilirse işler broker üzerinden (başka makinelerdeki) işçilere
+# dağıtılır; işçiler canlı güncellemeleri network.snapshot() ile eşitler.
+solver_pool = pool_from_env(snapshot=network.snapshot)
+
+# Portföy: tüm çözücüleri yarıştırıp ilk yeterince iyi cevabı döndürür
+# (PORTFOLIO_RACES eşzamanlı yarış sınırı, PORTFOLIO_LOG kazanan log'u)
+portfolio = portfolio_from_env()
+
+# Hub label indeksleri (ağırlık profili + bandwidth başına, HUB_INDEX_DIR'e kalıcı)
+hub_indexes = HubIndexManager(G_ORIGINAL, network.lock)
+
+# Aynı anda gelen özdeş rota / karşılaştırma istekleri tek hesaplamaya bağlanır
+flights = SingleFlight()
+
+# Zamana bağlı link öznitelikleri (ROUTE_TIME_SERIES dizini, mmap ile açılır);
+# yoksa departure_time / Time-Dependent kullanılamaz
+edge_series = series_from_env()
+
+# Sunucu meşgulken (kuyruk dolu) istemciye önerilen bekleme süresi (s)
+RETRY_AFTER_S = 1
+
+# Değer iterasyonu politikaları: (hedef, graf sürümü, ağırlıklar) → çözücü.
+# Bir politika hedefe doğru tüm kaynakları kapsar; graf değişince sürüm
+# anahtarı değiştiği için eski girdiler kendiliğinden kullanılmaz olur.
+VI_CACHE_SIZE = 64
+_vi_policies = {}
+
 def safe_float(val, default):
     try:
         return float(val)
@@ -30,13 +81,122 @@ def safe_float(val, default):
         return default
 
 
+def path_summary(path, G, w_delay, w_rel, w_res):
+    """Yedek / alternatif yollar için kısa metrik özeti"""
+    return {
+        "path": [str(n) for n in path],
+        "cost": round(ag.weighted_sum_method(path, G, w_delay=w_delay, w_reliability=w_rel, w_resource=w_res), 4),
+        "delay": round(ag.total_delay(path, G), 2),
+        "reliability": round(ag.total_reliability(path, G) * 100, 2),
+    }
+
+
+def parse_qos(data):
+    """max_delay (ms) ve min_reliability (0-1) kısıtları; hatalıysa ValueError"""
+    max_delay = safe_float(data.get("max_delay"), None)
+    min_reliability = safe_float(data.get("min_reliability"), None)
+    if max_delay is not None and max_delay <= 0:
+        raise ValueError("max_delay pozitif olmalıdır.")
+    if min_reliability is not None and not 0 < min_reliability <= 1:
+        raise ValueError("min_reliability 0 ile 1 arasında olmalıdır.")
+    return max_delay, min_reliability
+
+
 def filter_graph_by_bandwidth(G, min_bandwidth):
     """ACO ve Q-Learning için bandwidth'i sağlamayan kenarları çıkarır"""
-    Gf = G.copy()
-    for u, v, data in list(Gf.edges(data=True)):
-        if data.get("bandwidth", 0) < min_bandwidth:
-            Gf.remove_edge(u, v)
-    return Gf
+    with network.lock:  # canlı güncelleme ile aynı anda kopyalanmasın
+        return ag.filter_graph_by_bandwidth(G, min_bandwidth)
+
+
+def busy_response(e):
+    """Havuz kuyruğu dolu: 429 + Retry-After (backpressure)"""
+    resp = jsonify({"error": str(e)})
+    resp.status_code = 429
+    resp.headers["Retry-After"] = str(RETRY_AFTER_S)
+    return resp
+
+
+def coalesced(name):
+    """
+    Özdeş (kanonik gövde + graf sürümü aynı) eşzamanlı istekleri birleştirir:
+    ilk istek hesaplar, diğerleri onun cevabının kopyasını alır (X-Coalesced: 1).
+    Gövdede "no_coalesce": true ile kapatılabilir.
+    """
+    def wrap(view):
+        @functools.wraps(view)
+        def inner(*args, **kwargs):
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or data.get("no_coalesce"):
+                return view(*args, **kwargs)
+            key = (name, G_ORIGINAL.graph.get("version"), canonical_request(data, ignore=("no_cache",)))
+
+            def compute():
+                resp = app.make_response(view(*args, **kwargs))
+                return resp.get_data(), resp.status_code, list(resp.headers.items())
+
+            (body, status, headers), shared = flights.do(key, compute)
+            resp = Response(body, status=status, headers=headers)
+            if shared:
+                resp.headers["X-Coalesced"] = "1"
+            return resp
+        return inner
+    return wrap
+
+
+def solve_path(G_filtered, algorithm, source, target, min_bandwidth,
+               w_delay, w_rel, w_res, deadline_ms=None, tol=0.0, episodes=None, planning=None,
+               max_delay=None, min_reliability=None):
+    """Havuz açıksa işi bir çözücü sürecine gönderir, değilse burada çalıştırır"""
+    if not solver_pool.enabled:
+        return run_algorithm(G_filtered, algorithm, source, target, min_bandwidth,
+                             w_delay, w_rel, w_res, deadline_ms=deadline_ms, tol=tol, episodes=episodes,
+                             planning=planning, max_delay=max_delay, min_reliability=min_reliability)
+
+    return solver_pool.run(solve_job, {
+        "algorithm": algorithm,
+        "source": source,
+        "target": target,
+        "min_bandwidth": min_bandwidth,
+        "w_delay": w_delay,
+        "w_rel": w_rel,
+        "w_res": w_res,
+        # Kuyrukta beklenen süre de bütçeden düşülsün diye mutlak zaman
+        "deadline_at": time.time() + deadline_ms / 1000 if deadline_ms is not None else None,
+        "tol": tol,
+        "episodes": episodes,
+        "planning": planning,
+        "max_delay": max_delay,
+        "min_reliability": min_reliability,
+    })
+
+
+def value_iteration_policy(target, w_delay, w_rel, w_res, min_bandwidth):
+    with network.lock:
+        key = (target, network.version) + weights_key(w_delay, w_rel, w_res, min_bandwidth)
+        solver = _vi_policies.get(key)
+        if solver is None:
+            solver = ValueIterationSolver(G_ORIGINAL, w_delay=w_delay, w_reliability=w_rel, w_resource=w_res,
+                                          min_bandwidth=min_bandwidth).solve(target)
+            if len(_vi_policies) >= VI_CACHE_SIZE:
+                _vi_policies.pop(next(iter(_vi_policies)))
+            _vi_policies[key] = solver
+    return solver
+
+
+# spring_layout tek başına ~0.25 s sürer; aynı graf sürümü ve bandwidth
+# eşiği için yerleşim bir kez hesaplanır
+_layout_cache = {}
+
+def graph_layout(G):
+    key = (G.graph.get("version"), G.graph.get("min_bandwidth"), G.number_of_nodes())
+    pos = _layout_cache.get(key)
+    if pos is None:
+        # Daha düzenli bir layout için k spring_layout parametrelerini ayarla
+        pos = nx.spring_layout(G, seed=42, k=0.15, iterations=50)
+        if len(_layout_cache) >= 16:
+            _layout_cache.pop(next(iter(_layout_cache)))
+        _layout_cache[key] = pos
+    return pos
 
 def draw_network_to_base64(G, path=None):
     # Lock kullanarak thread hatasını önle
@@ -44,8 +204,7 @@ def draw_network_to_base64(G, path=None):
         fig, ax = plt.subplots(figsize=(12, 10), dpi=100)
         ax.set_facecolor('#ffffff')
         
-        # Daha düzenli bir layout için k spring_layout parametrelerini ayarla
-        pos = nx.spring_layout(G, seed=42, k=0.15, iterations=50)
+        pos = graph_layout(G)
 
         # 1. TÜM KENARLAR (Arka Plan)
         nx.draw_networkx_edges(
@@ -111,6 +270,7 @@ def draw_network_to_base64(G, path=None):
 # ROUTE HESAPLAMA
 # --------------------------------------------------
 @app.route("/calculate_route", methods=["POST"])
+@coalesced("calculate_route")
 def calculate_route():
     try:
         data = request.get_json()
@@ -124,70 +284,215 @@ def calculate_route():
         w_rel = safe_float(data.get("w_rel"), 0.33)
         w_res = safe_float(data.get("w_res"), 0.34)
 
+        # Süre bütçesi (SLO): verilirse algoritma bu sürede bulduğu en iyi yolu döndürür
+        deadline_ms = safe_float(data.get("deadline_ms"), None)
+        tol = safe_float(data.get("tol"), 0.0)
+        t_start = time.perf_counter()
+
+        # Yedek (failover) yollar: birincil yoldan kenar- ya da düğüm-ayrık
+        n_backups = int(safe_float(data.get("backups"), 0))
+        disjoint_mode = data.get("disjoint", "link")
+
+        # Görsel çizimi (~2 s, tek kilit altında) yük testlerinde kapatılabilir
+        include_image = bool(data.get("include_image", True))
+
+        # Q-Learning planlama modu: "dyna" (Dyna-Q) veya "sweep" (prioritized sweeping)
+        planning = data.get("planning") or None
+        if planning not in (None, "dyna", "sweep"):
+            return jsonify({"error": "Geçersiz planning modu (dyna / sweep)"}), 400
+
+        # Hop-Limited: en fazla max_hops yaylı kesin en iyi yol
+        max_hops = int(safe_float(data.get("max_hops"), DEFAULT_MAX_HOPS))
+        if max_hops < 1:
+            return jsonify({"error": "max_hops en az 1 olmalıdır."}), 400
+
+        # SLA kısıtları: total_delay ≤ max_delay, total_reliability ≥ min_reliability
+        try:
+            max_delay, min_reliability = parse_qos(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        qos = (max_delay, min_reliability)
+
+        # Trafik simülasyonu: yol üzerinden demand_mbps (varsayılan min_bandwidth)
+        # sim_ms boyunca paket paket gönderilir; usage simülasyondan ölçülür
+        demand_mbps = safe_float(data.get("demand_mbps"), min_bandwidth)
+        sim_ms = safe_float(data.get("sim_ms"), DEFAULT_SIM_MS)
+        if demand_mbps < 0 or sim_ms <= 0:
+            return jsonify({"error": "demand_mbps negatif olamaz, sim_ms pozitif olmalıdır."}), 400
+
+        # Multipath: demand en fazla max_paths yola bölünür (min-cost flow)
+        max_paths = int(safe_float(data.get("max_paths"), DEFAULT_MAX_PATHS))
+        if max_paths < 1:
+            return jsonify({"error": "max_paths en az 1 olmalıdır."}), 400
+
+        # Kalkış anı ("HH:MM" ya da gün içi ms): verilirse gecikme her hop'a varılan
+        # zaman slot'unun değerleriyle de hesaplanır; Time-Dependent bununla yönlendirir
+        departure_ms = None
+        if data.get("departure_time") is not None or algorithm == "Time-Dependent":
+            if edge_series is None:
+                return jsonify({"error": "Zamana bağlı öznitelik verisi yüklü değil (ROUTE_TIME_SERIES)."}), 400
+            try:
+                departure_ms = parse_departure(data.get("departure_time", 0))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+        # Rota önbelleği: kötüleşmede sadece değişen öğeye dokunan girdiler, iyileşmede tümü silinir
+        cache_key = (algorithm, source, target, deadline_ms, tol if "tol" in data else None, n_backups,
+                     disjoint_mode, include_image, planning, max_hops if algorithm == "Hop-Limited" else None,
+                     max_paths if algorithm == "Multipath" else None, demand_mbps, sim_ms, departure_ms) + qos + \
+            weights_key(w_delay, w_rel, w_res, min_bandwidth)
+        if not data.get("no_cache"):
+            cached = network.routes.get(cache_key)
+            if cached is not None:
+                return jsonify(dict(cached, cached=True))
+        deadline = ag.make_deadline(deadline_ms)
+
         print("Calculating route...")
 
-        # Grafiği filtrele (bandwidth >= min_bandwidth)
-        G_filtered = filter_graph_by_bandwidth(G_ORIGINAL, min_bandwidth)
+        # Grafiği filtrele (bandwidth >= min_bandwidth); Multipath demand'i böldüğü
+        # için tek tek linklerin demand'i taşıması gerekmez, Time-Dependent eşiği
+        # hop anındaki kapasiteye kendisi uygular
+        G_filtered = filter_graph_by_bandwidth(
+            G_ORIGINAL, 0 if algorithm in ("Multipath", "Time-Dependent") else min_bandwidth)
 
         if source not in G_filtered.nodes or target not in G_filtered.nodes:
             return jsonify({"error": "Kaynak veya hedef düğüm grafikte yok."}), 404
 
         final_path = None
-        final_cost = None
-        metrics = None
+        portfolio_info = None
+        index_info = None
+        multipath_info = None
 
         # ---------------- ALGORİTMA SEÇİMİ (TUNED PARAMETERS) ----------------
-        if algorithm == "Q-Learning":
-            agent = QLearningAgent(
-                G_filtered,
-                w_delay=w_delay,
-                w_reliability=w_rel,
-                w_resource=w_res
-            )
-            # Episode sayısını bilerek 3000'de tuttuk (Hız ve Performans için)
-            agent.train(source, target, episodes=3000)
-            final_path = agent.get_best_path(source, target)
+        if algorithm == "Q-Learning" and not solver_pool.enabled:
+            # Aynı hedef/ağırlık için önceden eğitilmiş ajan varsa sıcak başlar
+            # (ajanlar süreç belleğinde tutulduğundan sadece havuzsuz modda)
+            agent_key = (target, planning) + qos + weights_key(w_delay, w_rel, w_res, min_bandwidth)
+            agent, agent_version = network.take_agent(agent_key)
+            episodes = QL_WARM_EPISODES
+            if agent is None:
+                # Öğrenme parametreleri ve bölüm sayısı graf boyutunun preset'inden (presets.py)
+                agent = make_qlearning_agent(G_filtered, w_delay, w_rel, w_res, planning=planning,
+                                             max_delay=max_delay, min_reliability=min_reliability)
+                agent_version = G_filtered.graph.get("version")
+                episodes = None
+            try:
+                final_path = run_algorithm(G_filtered, algorithm, source, target, min_bandwidth,
+                                           w_delay, w_rel, w_res, deadline_ms=ag.remaining_ms(deadline),
+                                           tol=tol, episodes=episodes, agent=agent)
+            finally:
+                # Eğitim sırasında graf değiştiyse ajan eşitlenmemiştir: önbelleğe geri konmaz
+                network.put_agent(agent_key, agent, min_bandwidth, version=agent_version)
+
+        elif algorithm in POOL_ALGORITHMS:
+            final_path = solve_path(G_filtered, algorithm, source, target, min_bandwidth,
+                                    w_delay, w_rel, w_res, deadline_ms=ag.remaining_ms(deadline), tol=tol,
+                                    planning=planning, max_delay=max_delay, min_reliability=min_reliability)
+
+        elif algorithm == "Portfolio":
+            # Kesin çözücü + sezgiseller ayrı süreçlerde yarışır; alt sınırın tol
+            # kadar yakınındaki ilk cevap (ya da süre sonunda en iyisi) döner
+            final_path, portfolio_info = portfolio.race(
+                G_filtered, source, target, min_bandwidth, w_delay, w_rel, w_res,
+                deadline_ms=ag.remaining_ms(deadline) if deadline_ms is not None else None,
+                tol=tol if "tol" in data else DEFAULT_TOL,
+                max_delay=max_delay, min_reliability=min_reliability)
+
             if final_path is None:
-                return jsonify({
-                    "error": f"Q-Learning algoritması uygun yol bulamadı: source={source}, target={target}"
-                }), 400
-
-        elif algorithm == "ACO":
-            # Ants/Iter azaltıldı (Hız)
-            final_path, final_cost, metrics = run_aco(
-                G_filtered,
-                source,
-                target,
-                w_delay=w_delay,
-                w_rel=w_rel,
-                n_ants=25, 
-                n_iter=20
-            )
+                return jsonify({"error": f"Portföy uygun yol bulamadı: source={source}, target={target}",
+                                "portfolio": portfolio_info}), 400
+
+        elif algorithm == "Multipath":
+            # Tek yolun darboğazına sığmayan demand min-cost flow ile yollara bölünür;
+            # birincil yol en büyük paylı yoldur
+            if demand_mbps <= 0:
+                return jsonify({"error": "Multipath için demand_mbps (ya da min_bandwidth) verilmelidir."}), 400
+            with network.lock:
+                multipath_info = split_demand(G_ORIGINAL, source, target, demand_mbps, w_delay, w_rel, w_res,
+                                              k=max_paths)
+            if not multipath_info["feasible"]:
+                return jsonify({"error": multipath_info["error"], "multipath": multipath_info}), 400
+            final_path = multipath_info["paths"][0]["path"]
+
+        elif algorithm == "Value-Iteration":
+            # Q-Learning ile aynı ödül modeli, eğitim yerine doğrudan Bellman sweep'leri
+            final_path = value_iteration_policy(target, w_delay, w_rel, w_res, min_bandwidth).get_best_path(source)
 
             if final_path is None:
-                return jsonify({
-                    "error": f"ACO algoritması uygun yol bulamadı: source={source}, target={target}"
-                }), 400
-
-        elif algorithm == "GA":
-            # Pop/Gen azaltıldı (Hız)
-            result = run_ga(
-                source,
-                target,
-                min_bandwidth,
-                pop_size=30,      # 40 -> 30
-                generations=40,   # 100 -> 40
-                mutation_rate=0.2,
-                max_hops=6
-            )
-            final_path = result["best_path"]
+                return jsonify({"error": f"Value-Iteration uygun yol bulamadı: source={source}, target={target}"}), 400
+
+        elif algorithm == "Hop-Limited":
+            # Kesin çözüm: hop başına tek vektörel Bellman-Ford gevşetmesi
+            with network.lock:
+                final_path = solve("Hop-Limited", G_ORIGINAL, source, target, (w_delay, w_rel, w_res),
+                                   Constraints(min_bandwidth, max_hops=max_hops)).path
 
             if final_path is None:
-                return jsonify({"error": result.get("error", "GA algoritması uygun yol bulamadı.")}), 400
+                return jsonify({"error": f"{max_hops} hop içinde uygun yol bulunamadı: source={source}, target={target}"}), 400
+
+        elif algorithm == "Hub-Label" and not any(v is not None for v in qos):
+            # Ön işlenmiş indeksle mikrosaniyelik sorgu; indeks henüz hazır
+            # değilse (ilk istek / graf değişti) arka planda kurulur, bu sırada Dijkstra
+            index = hub_indexes.get(w_delay, w_rel, w_res, min_bandwidth)
+            if index is not None:
+                t_query = time.perf_counter()
+                final_path = index.path(source, target)
+                index_info = {"status": "ready", "query_us": round((time.perf_counter() - t_query) * 1e6, 1),
+                              "avg_label": index.avg_label}
+            else:
+                with network.lock:
+                    final_path = network.routing_table(target, w_delay, w_rel, w_res, min_bandwidth).path(source)
+                index_info = {"status": "building"}
+
+            if final_path is None:
+                return jsonify({"error": f"Hub-Label uygun yol bulamadı: source={source}, target={target}"}), 400
+
+        elif algorithm == "Constrained" or (algorithm in ("Dijkstra", "Hub-Label") and any(v is not None for v in qos)):
+            # Kesin kısıtlı en kısa yol (Lagrange gevşetmesi + etiket budama)
+            with network.lock:
+                result = solve("Constrained", G_ORIGINAL, source, target, (w_delay, w_rel, w_res),
+                               Constraints(min_bandwidth, max_delay, min_reliability),
+                               budget=ag.remaining_ms(deadline))
+            final_path = result.path
+
+            if final_path is None:
+                return jsonify({"error": f"QoS kısıtlarını sağlayan yol bulunamadı: source={source}, target={target}",
+                                "qos": result.stats}), 400
+
+        elif algorithm == "Time-Dependent":
+            # Kalkış anından itibaren zamana bağlı Dijkstra (slot başına graf kurulmaz)
+            with network.lock:
+                result = solve("Time-Dependent", G_ORIGINAL, source, target, (w_delay, w_rel, w_res),
+                               Constraints(min_bandwidth), series=edge_series, departure_ms=departure_ms)
+            final_path = result.path
+
+            if final_path is None:
+                return jsonify({"error": result.error}), 400
+
+        elif algorithm == "Dijkstra":
+            # Kesin çözüm: hedefe doğru en kısa yol ağacı (canlı güncellemelerle onarılır)
+            with network.lock:
+                final_path = network.routing_table(target, w_delay, w_rel, w_res, min_bandwidth).path(source)
+
+            if final_path is None:
+                return jsonify({"error": f"Dijkstra uygun yol bulamadı: source={source}, target={target}"}), 400
 
         else:
             return jsonify({"error": "Geçersiz algoritma seçimi"}), 400
 
+        # Çözüm sırasında graf canlı güncellemeyle değiştiyse yol filtrelenmiş
+        # kopyada olmayan bir kenar kullanabilir
+        if any(not G_filtered.has_edge(u, v) for u, v in zip(final_path[:-1], final_path[1:])):
+            return jsonify({"error": f"{algorithm} yolu güncel grafta yok (graf çözüm sırasında değişti); "
+                                     f"tekrar deneyin."}), 409
+
+        # Kısıtları bilmeyen çözücüler (Value-Iteration, Hop-Limited) için son kontrol
+        if violates(final_path, G_filtered, max_delay, min_reliability):
+            return jsonify({"error": f"{algorithm} yolu QoS kısıtlarını sağlamıyor "
+                                     f"(max_delay={max_delay}, min_reliability={min_reliability})"}), 400
+
+        solve_ms = (time.perf_counter() - t_start) * 1000
+
         # ---------------- METRİKLER ----------------
         delay = ag.total_delay(final_path, G_filtered)
         reliability = ag.total_reliability(final_path, G_filtered) * 100
@@ -206,16 +511,37 @@ def calculate_route():
         bottleneck = min(bw_list) if bw_list else 0
         max_bw = max(bw_list) if bw_list else 0
         
+        # Usage: yoldaki en yoğun linkin simüle edilen kullanımı (demand yoksa 0)
+        simulation = None
         usage = 0
-        if bottleneck > 0:
-            if min_bandwidth > 0:
-                 usage = (min_bandwidth / bottleneck) * 100
-            else:
-                 # Fallback: Simulate 100 Mbps load if no demand specified (for better visibility)
-                 usage = (100 / bottleneck) * 100 
+        if demand_mbps > 0:
+            flows = [(p["path"], p["mbps"]) for p in multipath_info["paths"]] if multipath_info \
+                else [(final_path, demand_mbps)]
+            try:
+                simulation = simulate_paths(G_filtered, flows, duration_ms=sim_ms)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            usage = max(link["utilization"] for link in simulation["links"]) * 100
+
+        backups = []
+        availability = None
+        if n_backups > 0:
+            backup_list = backup_paths(G_filtered, final_path, k=n_backups, mode=disjoint_mode,
+                                       w_delay=w_delay, w_reliability=w_rel, w_resource=w_res)
+            backups = [path_summary(p, G_filtered, w_delay, w_rel, w_res) for p in backup_list]
+            # Birincil + yedeklerin birlikte erişilebilirliği (Monte Carlo, ortak öğeler dahil)
+            with network.lock:
+                availability = estimate_availability(G_ORIGINAL, [final_path] + backup_list)
+            del availability["paths"]
+
+        # Kalkış anına göre hop hop gecikme / kapasite (hangi algoritma seçilmiş olursa olsun)
+        departure = None
+        if departure_ms is not None:
+            departure = path_timing(final_path, G_filtered, edge_series, departure_ms)
+            departure["hops"] = [dict(h, u=str(h["u"]), v=str(h["v"])) for h in departure["hops"]]
 
         # Grafik görseli base64 olarak çiz
-        graph_img = draw_network_to_base64(G_filtered, final_path)
+        graph_img = draw_network_to_base64(G_filtered, final_path) if include_image else None
 
         # SONUÇ
         response_data = {
@@ -231,14 +557,40 @@ def calculate_route():
                 "path_length_hops": len(final_path) - 1,
                 "bottleneck_capacity": bottleneck,
                 "max_capacity": max_bw,
-                "reliability_cost": rel_cost
+                "reliability_cost": rel_cost,
+                "simulation": simulation
             },
+            "backup_paths": backups,
+            "availability": availability,
+            "graph_version": G_filtered.graph.get("version"),
+            "solve_ms": round(solve_ms, 1),
+            "deadline_ms": deadline_ms,
+            "max_delay": max_delay,
+            "min_reliability": min_reliability,
+            "portfolio": portfolio_info,
+            "index": index_info,
+            "multipath": multipath_info,
+            "departure": departure,
             "debug": f"Algorithm: {algorithm}, Cost: {cost:.4f}",
             "graph_image": graph_img
         }
 
+        # Yalnızca graf kopyalandığından beri değişmediyse önbelleğe alınır: aradaki
+        # bir güncellemenin geçersiz kılması bu girdiyi zaten kaçırmıştır
+        with network.lock:
+            if network.version == response_data["graph_version"]:
+                # Girdi kullandığı tüm yollarla (yedekler, çok yollu bölmenin her yolu) indekslenir
+                cached_paths = [final_path] + [[int(n) for n in b["path"]] for b in backups]
+                if multipath_info:
+                    cached_paths += [p["path"] for p in multipath_info["paths"][1:]]
+                network.routes.put(cache_key, cached_paths, response_data)
+
         return jsonify(response_data)
 
+    except SolverError as e:
+        return jsonify({"error": str(e)}), 400
+    except PoolBusy as e:
+        return busy_response(e)
     except Exception as e:
         import traceback
         return jsonify({
@@ -263,6 +615,7 @@ def compare():
     return render_template("compare.html")
 
 @app.route("/api/compare_all", methods=["POST"])
+@coalesced("compare_all")
 def api_compare_all():
     try:
         data = request.get_json()
@@ -272,26 +625,33 @@ def api_compare_all():
         w_delay = safe_float(data.get("w_delay"), 0.33)
         w_rel = safe_float(data.get("w_rel"), 0.33)
         w_res = safe_float(data.get("w_res"), 0.34)
+        tol = safe_float(data.get("tol"), 0.0)
+        try:
+            max_delay, min_reliability = parse_qos(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Toplam süre bütçesi algoritmalar arasında kalan süreye göre paylaştırılır
+        deadline = ag.make_deadline(safe_float(data.get("deadline_ms"), None))
 
         G_filtered = filter_graph_by_bandwidth(G_ORIGINAL, min_bandwidth)
         
         results = []
         algorithms = ["Q-Learning", "ACO", "GA"]
 
-        for alg in algorithms:
+        for idx, alg in enumerate(algorithms):
             final_path = None
-            
-            if alg == "Q-Learning":
-                agent = QLearningAgent(G_filtered, w_delay=w_delay, w_reliability=w_rel, w_resource=w_res)
-                agent.train(source, target, episodes=10000)
-                final_path = agent.get_best_path(source, target)
-            
-            elif alg == "ACO":
-                final_path, _, _ = run_aco(G_filtered, source, target, w_delay=w_delay, w_rel=w_rel, w_res=w_res, n_ants=25, n_iter=20)
-            
-            elif alg == "GA":
-                ga_res = run_ga(source, target, min_bandwidth, pop_size=30, generations=40)
-                final_path = ga_res["best_path"]
+            budget_ms = ag.remaining_ms(deadline)
+            if budget_ms is not None:
+                budget_ms /= len(algorithms) - idx
+
+            try:
+                final_path = solve_path(G_filtered, alg, source, target, min_bandwidth,
+                                        w_delay, w_rel, w_res, deadline_ms=budget_ms, tol=tol,
+                                        episodes=10000 if alg == "Q-Learning" else None,
+                                        max_delay=max_delay, min_reliability=min_reliability)
+            except SolverError:
+                pass
 
             if final_path:
                 delay = ag.total_delay(final_path, G_filtered)
@@ -310,10 +670,357 @@ def api_compare_all():
 
         return jsonify({"results": results})
 
+    except PoolBusy as e:
+        return busy_response(e)
+    except Exception as e:
+        import traceback
+        return jsonify({"error": str(e), "detail": traceback.format_exc()}), 500
+
+# --------------------------------------------------
+# k-EN-KISA YOLLAR VE AYRIK YEDEK YOLLAR
+# --------------------------------------------------
+@app.route("/api/k_shortest", methods=["POST"])
+def api_k_shortest():
+    try:
+        data = request.get_json()
+        source = int(data.get("source"))
+        target = int(data.get("target"))
+        k = int(safe_float(data.get("k"), 5))
+        max_hops = data.get("max_hops")
+        min_bandwidth = safe_float(data.get("min_bandwidth"), 0)
+        w_delay = safe_float(data.get("w_delay"), 0.33)
+        w_rel = safe_float(data.get("w_rel"), 0.33)
+        w_res = safe_float(data.get("w_res"), 0.34)
+
+        if source not in G_ORIGINAL.nodes or target not in G_ORIGINAL.nodes:
+            return jsonify({"error": "Kaynak veya hedef düğüm grafikte yok."}), 404
+
+        paths = k_shortest_paths(G_ORIGINAL, source, target, k=k,
+                                 w_delay=w_delay, w_reliability=w_rel, w_resource=w_res,
+                                 min_bandwidth=min_bandwidth,
+                                 max_hops=int(max_hops) if max_hops is not None else None)
+
+        return jsonify({"paths": [path_summary(p, G_ORIGINAL, w_delay, w_rel, w_res) for p in paths]})
+
+    except Exception as e:
+        import traceback
+        return jsonify({"error": str(e), "detail": traceback.format_exc()}), 500
+
+
+@app.route("/api/backup_paths", methods=["POST"])
+def api_backup_paths():
+    """
+    Birincil + (k-1) ayrık yedek yol (Suurballe). source/target verilmezse
+    demand dosyasındaki her talep için demand_mbps bandwidth eşiğiyle hesaplanır.
+    """
+    try:
+        data = request.get_json() or {}
+        k = int(safe_float(data.get("k"), 2))
+        mode = data.get("disjoint", "link")
+        w_delay = safe_float(data.get("w_delay"), 0.33)
+        w_rel = safe_float(data.get("w_rel"), 0.33)
+        w_res = safe_float(data.get("w_res"), 0.34)
+
+        if data.get("source") is not None and data.get("target") is not None:
+            demands = [(int(data["source"]), int(data["target"]), safe_float(data.get("min_bandwidth"), 0))]
+        else:
+            demands = [(int(r["src"]), int(r["dst"]), float(r["demand_mbps"])) for _, r in ag.demand_df.iterrows()]
+
+        results = []
+        for source, target, bw in demands:
+            paths = disjoint_paths(G_ORIGINAL, source, target, k=k, mode=mode,
+                                   w_delay=w_delay, w_reliability=w_rel, w_resource=w_res,
+                                   min_bandwidth=bw)
+            summaries = [path_summary(p, G_ORIGINAL, w_delay, w_rel, w_res) for p in paths]
+            results.append({
+                "source": source,
+                "target": target,
+                "min_bandwidth": bw,
+                "primary": summaries[0] if summaries else None,
+                "backups": summaries[1:]
+            })
+
+        return jsonify({"results": results})
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        import traceback
+        return jsonify({"error": str(e), "detail": traceback.format_exc()}), 500
+
+# --------------------------------------------------
+# ÇOK YOLLU BÖLME (MIN-COST FLOW)
+# source/target/demand_mbps verilirse tek talep, yoksa demand dosyasındaki
+# her talep en fazla k yola bölünür.
+# --------------------------------------------------
+@app.route("/api/multipath", methods=["POST"])
+def api_multipath():
+    try:
+        data = request.get_json() or {}
+        k = int(safe_float(data.get("k"), DEFAULT_MAX_PATHS))
+        w_delay = safe_float(data.get("w_delay"), 0.33)
+        w_rel = safe_float(data.get("w_rel"), 0.33)
+        w_res = safe_float(data.get("w_res"), 0.34)
+
+        if data.get("source") is not None and data.get("target") is not None:
+            demands = [(int(data["source"]), int(data["target"]), safe_float(data.get("demand_mbps"), 0))]
+        else:
+            demands = [(int(r.src), int(r.dst), float(r.demand_mbps)) for r in ag.demand_df.itertuples()]
+
+        results = []
+        with network.lock:
+            for source, target, demand in demands:
+                try:
+                    results.append(split_demand(G_ORIGINAL, source, target, demand, w_delay, w_rel, w_res, k=k))
+                except ValueError as e:
+                    results.append({"source": source, "target": target, "demand_mbps": demand,
+                                    "feasible": False, "error": str(e)})
+
+        return jsonify({"results": results})
+
+    except KeyError as e:
+        return jsonify({"error": str(e).strip("'\"")}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         import traceback
         return jsonify({"error": str(e), "detail": traceback.format_exc()}), 500
 
+# --------------------------------------------------
+# ERİŞİLEBİLİRLİK (MONTE CARLO)
+# "paths": [[...], ...] verilirse bu yol kümesi, yoksa source/target için
+# birincil + (k-1) ayrık yedek yol değerlendirilir. Küme, yollardan en az
+# biri ayaktaysa erişilebilirdir; ortak link / düğümler ve "srlgs" ile
+# verilen ortak risk grupları hesaba katılır.
+# --------------------------------------------------
+@app.route("/api/availability", methods=["POST"])
+def api_availability():
+    try:
+        data = request.get_json() or {}
+        samples = int(safe_float(data.get("samples"), DEFAULT_SAMPLES))
+        confidence = safe_float(data.get("confidence"), 0.95)
+        seed = int(safe_float(data.get("seed"), 0))
+
+        with network.lock:
+            if data.get("paths"):
+                paths = [[int(n) for n in p] for p in data["paths"]]
+            else:
+                if data.get("source") is None or data.get("target") is None:
+                    return jsonify({"error": "paths ya da source/target verilmelidir."}), 400
+                source, target = int(data["source"]), int(data["target"])
+                if source not in G_ORIGINAL.nodes or target not in G_ORIGINAL.nodes:
+                    return jsonify({"error": "Kaynak veya hedef düğüm grafikte yok."}), 404
+                paths = disjoint_paths(G_ORIGINAL, source, target, k=int(safe_float(data.get("k"), 2)),
+                                       mode=data.get("disjoint", "link"),
+                                       w_delay=safe_float(data.get("w_delay"), 0.33),
+                                       w_reliability=safe_float(data.get("w_rel"), 0.33),
+                                       w_resource=safe_float(data.get("w_res"), 0.34),
+                                       min_bandwidth=safe_float(data.get("min_bandwidth"), 0))
+                if not paths:
+                    return jsonify({"error": f"Yol bulunamadı: source={source}, target={target}"}), 400
+
+            result = estimate_availability(G_ORIGINAL, paths, samples=samples, seed=seed,
+                                           confidence=confidence, srlgs=data.get("srlgs"))
+
+        result["graph_version"] = G_ORIGINAL.graph.get("version")
+        return jsonify(result)
+
+    except KeyError as e:
+        return jsonify({"error": str(e).strip("'\"")}), 404
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        import traceback
+        return jsonify({"error": str(e), "detail": traceback.format_exc()}), 500
+
+# --------------------------------------------------
+# HOP SINIRINA GÖRE KESİN EN İYİ YOLLAR
+# 1..max_hops her sınır için en iyi yol (Bellman-Ford DP, tek çözüm)
+# --------------------------------------------------
+@app.route("/api/hop_limited", methods=["POST"])
+def api_hop_limited():
+    try:
+        data = request.get_json()
+        source = int(data.get("source"))
+        target = int(data.get("target"))
+        max_hops = int(safe_float(data.get("max_hops"), DEFAULT_MAX_HOPS))
+        min_bandwidth = safe_float(data.get("min_bandwidth"), 0)
+        w_delay = safe_float(data.get("w_delay"), 0.33)
+        w_rel = safe_float(data.get("w_rel"), 0.33)
+        w_res = safe_float(data.get("w_res"), 0.34)
+
+        if source not in G_ORIGINAL.nodes or target not in G_ORIGINAL.nodes:
+            return jsonify({"error": "Kaynak veya hedef düğüm grafikte yok."}), 404
+        if max_hops < 1:
+            return jsonify({"error": "max_hops en az 1 olmalıdır."}), 400
+
+        with network.lock:
+            solver = HopLimitedSolver(G_ORIGINAL, w_delay, w_rel, w_res, min_bandwidth).solve(source, max_hops)
+            paths = solver.paths_by_hops(target)
+
+            results = [{"max_hops": k, "path": path_summary(p, G_ORIGINAL, w_delay, w_rel, w_res) if p else None}
+                       for k, p in paths]
+
+        return jsonify({"results": results})
+
+    except Exception as e:
+        import traceback
+        return jsonify({"error": str(e), "detail": traceback.format_exc()}), 500
+
+# --------------------------------------------------
+# TRAFİK SİMÜLASYONU
+# Demand kümesi (varsayılan: demand dosyasındaki tüm demand'ler; "demands"
+# ile [[src, dst, mbps], ...] ya da "synthetic": N rastgele demand) seçilen
+# algoritmayla yönlendirilir ve paket seviyesinde simüle edilir.
+# Hub-Label (varsayılan) tüm demand'leri tek indeksle bandwidth filtresi
+# olmadan yönlendirir; kapasite aşımları simülasyonda kuyruk / kayıp olarak
+# görünür. Diğer algoritmalar her demand'i kendi bandwidth'iyle çözer.
+# --------------------------------------------------
+def parse_demands(data):
+    if data.get("synthetic") is not None:
+        n = int(safe_float(data.get("synthetic"), 0))
+        if n < 1:
+            raise ValueError("synthetic en az 1 olmalıdır.")
+        return synthetic_demands(G_ORIGINAL, n, parse_demands({}), seed=int(safe_float(data.get("seed"), 0)))
+    if data.get("demands") is None:
+        return [(int(r.src), int(r.dst), float(r.demand_mbps)) for r in ag.demand_df.itertuples()]
+    demands = []
+    for d in data["demands"]:
+        if isinstance(d, dict):
+            d = (d.get("src"), d.get("dst"), d.get("demand_mbps"))
+        source, target, demand = int(d[0]), int(d[1]), float(d[2])
+        if source not in G_ORIGINAL.nodes or target not in G_ORIGINAL.nodes:
+            raise ValueError(f"Düğüm grafikte yok: ({source}, {target})")
+        if demand < 0:
+            raise ValueError("Demand negatif olamaz.")
+        demands.append((source, target, demand))
+    return demands
+
+
+@app.route("/api/simulate", methods=["POST"])
+def api_simulate():
+    try:
+        data = request.get_json() or {}
+        algorithm = data.get("algorithm", "Hub-Label")
+        w_delay = safe_float(data.get("w_delay"), 0.33)
+        w_rel = safe_float(data.get("w_rel"), 0.33)
+        w_res = safe_float(data.get("w_res"), 0.34)
+        weights = (w_delay, w_rel, w_res)
+        sim_ms = safe_float(data.get("sim_ms"), DEFAULT_SIM_MS)
+        top_links = int(safe_float(data.get("top_links"), 20))
+        options = {key: data[key] for key in ("packet_bytes", "buffer_packets", "random_loss", "arrivals")
+                   if key in data}
+
+        try:
+            demands = parse_demands(data)
+        except (TypeError, ValueError, IndexError) as e:
+            return jsonify({"error": f"Geçersiz demand listesi: {e}"}), 400
+
+        # route network.lock altında çağrılır (indeks sürümü grafla tutarlı kalır)
+        if algorithm == "Hub-Label":
+            def route(source, target, demand):
+                index = hub_indexes.get(w_delay, w_rel, w_res)
+                if index is not None:
+                    return index.path(source, target)
+                return network.routing_table(target, w_delay, w_rel, w_res).path(source)
+        else:
+            def route(source, target, demand):
+                return solve(algorithm, G_ORIGINAL, source, target, weights,
+                             Constraints(demand)).path
+
+        # Yönlendirme ve link öznitelikleri kilit altında; simülasyon kilit bırakıldıktan
+        # sonra koşar (canlı güncellemeler ve diğer istekler beklemez)
+        report = simulate_demands(G_ORIGINAL, demands, route, duration_ms=sim_ms, top_links=top_links,
+                                  seed=int(safe_float(data.get("seed"), 0)), lock=network.lock, **options)
+
+        report["algorithm"] = algorithm
+        report["demands"] = len(demands)
+        return jsonify(report)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        import traceback
+        return jsonify({"error": str(e), "detail": traceback.format_exc()}), 500
+
+# --------------------------------------------------
+# TOPLU YOL DEĞERLENDİRME
+# Gövde: JSON ([[0,2,5], ...] ya da {"paths": [...]}) veya NDJSON
+# (Content-Type: application/x-ndjson, satır başına bir yol).
+# Ağırlıklar / min_bandwidth sorgu parametresi olarak verilir.
+# Cevap NDJSON olarak parça parça (stream) döner.
+# --------------------------------------------------
+@app.route("/api/evaluate_paths", methods=["POST"])
+def api_evaluate_paths():
+    args = request.args
+    options = {
+        "w_delay": safe_float(args.get("w_delay"), 0.33),
+        "w_reliability": safe_float(args.get("w_rel"), 0.33),
+        "w_resource": safe_float(args.get("w_res"), 0.34),
+        "min_bandwidth": safe_float(args.get("min_bandwidth"), None),
+    }
+    chunk_size = int(safe_float(args.get("chunk_size"), 8192))
+    if chunk_size < 1:
+        return jsonify({"error": "chunk_size en az 1 olmalıdır."}), 400
+
+    if "ndjson" in (request.content_type or ""):
+        records = iter_ndjson(request.stream)
+    else:
+        body = request.get_json(silent=True)
+        if body is None:
+            return jsonify({"error": "Gövde JSON (yol listesi) veya NDJSON olmalıdır."}), 400
+        records = iter_json(body)
+
+    # Değerlendirme süresince graf canlı güncellemeyle değişmesin diye derlenmiş
+    # kopya (sürüme göre önbellekli) kullanılır
+    return Response(stream_with_context(evaluate_stream(G_ORIGINAL, records, chunk_size, **options)),
+                    mimetype="application/x-ndjson")
+
+# --------------------------------------------------
+# CANLI AĞ GÜNCELLEMELERİ
+# Kenar/düğüm öznitelikleri CSV alan adlarıyla gönderilir:
+#   kenar: capacity_mbps, delay_ms, r_link   düğüm: s_ms, r_node
+# DELETE → link/düğüm arızası. Her değişiklik graf sürümünü artırır ve
+# yalnızca etkilenen rota/routing table/Q-tablosu girdileri onarılır.
+# --------------------------------------------------
+def network_update(fn, *args):
+    try:
+        result = fn(*args)
+        # Kullanılan hub label profilleri yeni sürüm için arka planda yeniden kurulur
+        hub_indexes.graph_changed()
+        return jsonify(result)
+    except KeyError as e:
+        return jsonify({"error": str(e).strip("'\"")}), 404
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@app.route("/network", methods=["GET"])
+def network_info():
+    return jsonify(dict(network.stats(), solver_pool=solver_pool.stats(), portfolio=portfolio.stats(),
+                        presets=presets_info(), hub_index=hub_indexes.stats(), coalescing=flights.stats(),
+                        time_series=edge_series.info() if edge_series is not None else None))
+
+
+@app.route("/network/edges/<int:u>/<int:v>", methods=["PATCH"])
+def patch_edge(u, v):
+    return network_update(network.patch_edge, u, v, request.get_json() or {})
+
+
+@app.route("/network/edges/<int:u>/<int:v>", methods=["DELETE"])
+def delete_edge(u, v):
+    return network_update(network.fail_edge, u, v)
+
+
+@app.route("/network/nodes/<int:n>", methods=["PATCH"])
+def patch_node(n):
+    return network_update(network.patch_node, n, request.get_json() or {})
+
+
+@app.route("/network/nodes/<int:n>", methods=["DELETE"])
+def delete_node(n):
+    return network_update(network.fail_node, n)
+
 # --------------------------------------------------
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,240 @@
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# ---------------------------------------------------------------
+# MONTE CARLO ERİŞİLEBİLİRLİK (AVAILABILITY) TAHMİNİ
+#
+# total_reliability tek bir yolun link / düğüm güvenilirliklerini çarpar
+# (bağımsızlık varsayımı); birincil + yedek yol kümesi ya da ortak risk
+# taşıyan öğeler hakkında bir şey söyleyemez. Burada her öğenin (link,
+# düğüm, ortak risk grubu) açık / kapalı durumu N örnekte r_link / r_node
+# olasılığıyla örneklenir ve yol kümesinin ayakta kalışı bit maskeleriyle
+# değerlendirilir:
+#
+#   - Bir öğenin N örnekteki "kapalı" durumları uint64 kelimelerine
+#     paketlenmiş bir maskedir (örnek başına 1 bit). Güvenilirlikler
+#     yüksek (0.95–0.999) olduğundan arızalar seyrektir: arıza konumları
+#     geometrik aralıklarla doğrudan üretilir, maliyet N değil arıza
+#     sayısıyla orantılıdır.
+#   - yol kapalı  = yoldaki öğe maskelerinin OR'u
+#     küme kapalı = yol maskelerinin AND'i (tüm yollar aynı anda kapalı)
+#     erişilebilirlik = 1 - popcount(küme kapalı) / N
+#   - Öğe maskeleri (seed, öğe) ile deterministik üretilir ve önbellekte
+#     tutulur: aynı öğeyi paylaşan yollar / kümeler aynı örnekleri kullanır
+#     (ortak rastgele sayılar), tekrar örnekleme yapılmaz ve farklı yol
+#     kümelerinin karşılaştırması tutarlı olur.
+#   - Ortak risk grubu (SRLG): {"links": [[u, v], ...], "nodes": [...],
+#     "reliability": r} → grup kapalıyken tüm üyeleri kapalı sayılır.
+#
+# Güven aralığı Wilson skor aralığıdır (çok küçük arıza oranlarında da
+# geçerli).
+# ---------------------------------------------------------------
+
+DEFAULT_SAMPLES = 1_000_000
+MAX_SAMPLES = 50_000_000
+# Öğe maskeleri önbelleğinin üst sınırı (bayt)
+MASK_CACHE_BYTES = 256 * 1024 * 1024
+
+Z_SCORES = {0.9: 1.6449, 0.95: 1.96, 0.99: 2.5758, 0.999: 3.2905}
+
+# Bayt başına bit sayısı tablosu: np.bitwise_count NumPy >= 2.0 ister,
+# popcount maskenin uint8 görünümü üzerinden tablo ile yapılır
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def wilson_interval(failures, n, confidence=0.95):
+    z = Z_SCORES.get(confidence)
+    if z is None:
+        raise ValueError(f"Desteklenmeyen güven düzeyi: {confidence} ({sorted(Z_SCORES)})")
+    p = failures / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class AvailabilityEstimator:
+    def __init__(self, G, samples=DEFAULT_SAMPLES, seed=0):
+        if not 0 < samples <= MAX_SAMPLES:
+            raise ValueError(f"Örnek sayısı 1 ile {MAX_SAMPLES} arasında olmalıdır.")
+        self.G = G
+        self.words = (int(samples) + 63) // 64
+        self.samples = self.words * 64
+        self.seed = seed
+        self.version = G.graph.get("version")
+        self._masks = OrderedDict()   # öğe → kapalı maskesi (uint64[words])
+        self._lock = threading.Lock()
+        self.sampled = 0              # üretilen öğe maskesi sayısı
+        self.reused = 0               # önbellekten gelen öğe maskesi sayısı
+
+    # Öğeler: ("link", u, v) (u < v), ("node", n), ("srlg", anahtar)
+    def link(self, u, v):
+        if not self.G.has_edge(u, v):
+            raise KeyError(f"Kenar yok: ({u}, {v})")
+        return ("link", u, v) if self.G.is_directed() or u <= v else ("link", v, u)
+
+    def elements_of(self, path):
+        elements = [("node", n) for n in path]
+        elements += [self.link(u, v) for u, v in zip(path[:-1], path[1:])]
+        return elements
+
+    def reliability_of(self, element):
+        if element[0] == "link":
+            return float(self.G.edges[element[1], element[2]].get("link_reliability", 1.0))
+        if element[0] == "node":
+            return float(self.G.nodes[element[1]].get("node_reliability", 1.0))
+        return element[1][0]
+
+    def _sample(self, element):
+        q = 1.0 - self.reliability_of(element)
+        mask = np.zeros(self.words, dtype=np.uint64)
+        if q <= 0:
+            return mask
+        if q >= 1:
+            mask[:] = np.uint64(0xFFFFFFFFFFFFFFFF)
+            return mask
+
+        # Öğeye özgü deterministik akış: aynı (seed, öğe) → aynı örnekler
+        rng = np.random.default_rng([self.seed & 0xFFFFFFFF, zlib.crc32(repr(element).encode())])
+        n = self.samples
+        expected = q * n
+        positions = []
+        last = -1
+        while last < n:
+            m = int(expected + 6 * math.sqrt(expected) + 64)
+            pos = last + np.cumsum(rng.geometric(q, m))
+            positions.append(pos)
+            last = int(pos[-1])
+        pos = np.concatenate(positions)
+        pos = pos[pos < n].astype(np.uint64)
+        np.bitwise_or.at(mask, (pos >> np.uint64(6)).astype(np.intp), np.uint64(1) << (pos & np.uint64(63)))
+        return mask
+
+    def mask(self, element):
+        with self._lock:
+            mask = self._masks.get(element)
+            if mask is not None:
+                self._masks.move_to_end(element)
+                self.reused += 1
+                return mask
+        mask = self._sample(element)
+        with self._lock:
+            self._masks[element] = mask
+            self.sampled += 1
+            while len(self._masks) * self.words * 8 > MASK_CACHE_BYTES and len(self._masks) > 1:
+                self._masks.popitem(last=False)
+        return mask
+
+    def srlg_elements(self, srlgs):
+        groups = []
+        for group in srlgs or []:
+            r = float(group["reliability"])
+            if not 0 <= r <= 1:
+                raise ValueError("SRLG reliability 0 ile 1 arasında olmalıdır.")
+            members = frozenset([self.link(int(u), int(v)) for u, v in group.get("links", [])] +
+                                [("node", int(n)) for n in group.get("nodes", [])])
+            key = (r, tuple(sorted(members)))
+            groups.append((("srlg", key), members))
+        return groups
+
+    def path_down(self, path, srlgs=()):
+        elements = self.elements_of(path)
+        members = set(elements)
+        down = np.zeros(self.words, dtype=np.uint64)
+        for element in elements:
+            np.bitwise_or(down, self.mask(element), out=down)
+        for element, group in srlgs:
+            if members & group:
+                np.bitwise_or(down, self.mask(element), out=down)
+        return down
+
+    def failures(self, mask):
+        return int(_POPCOUNT8[np.ascontiguousarray(mask).view(np.uint8)].sum(dtype=np.int64))
+
+    # paths: birincil + yedekler; küme en az bir yol ayaktaysa erişilebilir
+    def estimate(self, paths, confidence=0.95, srlgs=None):
+        t0 = time.perf_counter()
+        paths = [list(p) for p in paths if p]
+        if not paths:
+            raise ValueError("En az bir yol gereklidir.")
+        groups = self.srlg_elements(srlgs)
+
+        per_path = []
+        set_down = None
+        for path in paths:
+            down = self.path_down(path, groups)
+            failures = self.failures(down)
+            low, high = wilson_interval(failures, self.samples, confidence)
+            per_path.append({
+                "path": path,
+                "availability": 1 - failures / self.samples,
+                "ci": [1 - high, 1 - low],
+                "independent": math.prod(self.reliability_of(e) for e in self.elements_of(path)),
+            })
+            set_down = down if set_down is None else np.bitwise_and(set_down, down)
+
+        failures = self.failures(set_down)
+        low, high = wilson_interval(failures, self.samples, confidence)
+
+        # Karşılaştırma: yolların birbirinden bağımsız olduğu varsayımı
+        independent = 1 - math.prod(1 - p["independent"] for p in per_path)
+        # Yollar arasında ortak öğeler (uç düğümler her zaman ortaktır, listelenmez)
+        counts = {}
+        for path in paths:
+            for element in set(self.elements_of(path)):
+                counts[element] = counts.get(element, 0) + 1
+        shared = [list(e[1:]) if e[0] == "link" else e[1] for e, c in counts.items()
+                  if c > 1 and not (e[0] == "node" and e[1] in (paths[0][0], paths[0][-1]))]
+
+        elapsed = time.perf_counter() - t0
+        return {
+            "availability": 1 - failures / self.samples,
+            "ci": [1 - high, 1 - low],
+            "confidence": confidence,
+            "samples": self.samples,
+            "failures": failures,
+            "independent_estimate": independent,
+            "shared_elements": shared,
+            "paths": per_path,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "samples_per_s": round(self.samples / elapsed) if elapsed > 0 else None,
+        }
+
+    def stats(self):
+        with self._lock:
+            return {"samples": self.samples, "seed": self.seed, "version": self.version,
+                    "cached_masks": len(self._masks), "sampled": self.sampled, "reused": self.reused,
+                    "cache_mb": round(len(self._masks) * self.words * 8 / 2 ** 20, 1)}
+
+
+# ---------------------------------------------------------------
+# Tahminci önbelleği: (graf, sürüm, örnek sayısı, seed) başına bir tahminci,
+# böylece ardışık istekler aynı öğe maskelerini yeniden kullanır. Graf
+# güncellenince sürüm değiştiği için yeni tahminci kurulur.
+# ---------------------------------------------------------------
+ESTIMATOR_CACHE_SIZE = 4
+
+_estimators = OrderedDict()
+_estimators_lock = threading.Lock()
+
+
+def get_estimator(G, samples=DEFAULT_SAMPLES, seed=0):
+    key = (id(G), G.graph.get("version"), (int(samples) + 63) // 64 * 64, seed)
+    with _estimators_lock:
+        estimator = _estimators.get(key)
+        if estimator is not None:
+            _estimators.move_to_end(key)
+            return estimator
+        estimator = _estimators[key] = AvailabilityEstimator(G, samples, seed)
+        while len(_estimators) > ESTIMATOR_CACHE_SIZE:
+            _estimators.popitem(last=False)
+        return estimator
+
+
+def estimate_availability(G, paths, samples=DEFAULT_SAMPLES, seed=0, confidence=0.95, srlgs=None):
+    return get_estimator(G, samples, seed).estimate(paths, confidence, srlgs)
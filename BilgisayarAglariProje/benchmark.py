@@ -0,0 +1,831 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import secrets
+import sys
+import time
+
+import numpy as np
+
+# Eğitim ilerleme çubukları ölçümü kirletmesin
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+with contextlib.redirect_stdout(sys.stderr):
+    import Ag_olusturma as ag
+    from QLearning_algorithm import QLearningAgent
+    from ACO_algorithm import ACO, MMAS, build_path, get_heuristic_tables, initialize_pheromones
+    from genetik_alg import create_population, random_path, run_ga
+    import kernels
+    from exact_solvers import HopLimitedSolver
+    from qos_routing import QoSGuard, constrained_shortest_path, violates
+    from lower_bounds import GoalBounds, get_goal_bounds
+    from k_shortest import k_shortest_paths
+    from hub_labels import HubLabelIndex
+    from network_updates import ShortestPathTree
+    from simulation import TrafficSimulator, synthetic_demands
+    from broker import broker_from_url, start_server_thread
+    from solver_pool import BrokerPool, solve_job
+    from worker import Worker
+    from compact_graph import CompactGraph
+    from time_varying import EdgeSeries, time_dependent_path, total_delay_at
+
+# ---------------------------------------------------------------
+# ALGORİTMA KARŞILAŞTIRMALARI (demand dosyasındaki S → D çiftleri)
+#
+#   python benchmark.py qlearning --pairs 5
+#   python benchmark.py traces --pairs 5
+#   python benchmark.py aco --budgets 100,300,1000
+#   python benchmark.py bounds --pairs 10
+#   python benchmark.py ga --max-hops 6
+#   python benchmark.py qos --tightness 0.3
+#   python benchmark.py hub --queries 20000
+#   python benchmark.py workers --workers 1 2 4
+#   python benchmark.py kernels --pairs 5
+#   python benchmark.py memory --edges 1000000
+#   python benchmark.py timedep --slots 24 96 288 1440
+#
+# Her alt komut aynı çiftler üzerinde varyantları çalıştırır ve
+# ortalama süre / bölüm sayısı / maliyet tablosu yazdırır.
+# ---------------------------------------------------------------
+
+
+def demand_pairs(n):
+    rows = ag.demand_df.head(n) if n else ag.demand_df
+    return [(int(r["src"]), int(r["dst"]), float(r["demand_mbps"])) for _, r in rows.iterrows()]
+
+
+def path_cost(G, path):
+    return ag.weighted_sum_method(path, G) if path else float("inf")
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for r in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(r, widths)))
+
+
+def mean(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def fmt(value, digits=2):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+# ---------------------------------------------------------------
+# Q-LEARNING: varyantlar (planlama modları, uygunluk izleri)
+# Her varyant max_episodes boyunca chunk bölümlük parçalarla eğitilir;
+# her parçadan sonra get_best_path maliyeti ölçülür (ölçüm süresi eğitim
+# süresine dahil edilmez).
+#   hedef      : klasik Q-learning'in max_episodes sonundaki maliyetine
+#                (+ tol) ilk ulaşılan bölüm ve süre
+#   yakınsama  : greedy yolun bir daha değişmediği ilk ölçüm noktası
+# ---------------------------------------------------------------
+QL_VARIANTS = {
+    "q-learning": {},
+    "dyna": {"planning": "dyna"},
+    "sweep": {"planning": "sweep"},
+}
+
+# Uygunluk izleri: tek adımlık güncellemeye karşı λ-dönüşlü eğitim
+TRACE_VARIANTS = {
+    "q-learning": {},
+    "sarsa(λ)": {"traces": "sarsa"},
+    "watkins q(λ)": {"traces": "watkins"},
+}
+
+
+def train_until(G, source, target, options, max_episodes, chunk, target_cost=None, seed=42):
+    random.seed(seed)
+    agent = QLearningAgent(G, **options)
+    episodes, train_s = 0, 0.0
+    reached_episodes, reached_s = None, None
+    last_path, converged_episodes, converged_s = None, None, None
+
+    # İlk ölçüm 0 bölümle: prioritized sweeping tek bölüm oynamadan
+    # hedeften geriye planlama yapar
+    n = 0
+    while True:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent.train(source, target, episodes=n)
+        train_s += time.perf_counter() - t0
+        episodes += n
+        n = chunk
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            path = agent.get_best_path(source, target)
+        cost = path_cost(G, path)
+        if reached_episodes is None and target_cost is not None and cost <= target_cost:
+            reached_episodes, reached_s = episodes, train_s
+        if path is None or path != last_path:
+            converged_episodes, converged_s = (episodes, train_s) if path else (None, None)
+            last_path = path
+        if episodes >= max_episodes:
+            return {"cost": cost, "episodes": reached_episodes, "seconds": reached_s,
+                    "converged_episodes": converged_episodes, "converged_s": converged_s,
+                    "total_s": train_s, "total_episodes": episodes}
+
+
+def bench_qlearning(args, variants=QL_VARIANTS):
+    G = ag.G
+    stats = {name: [] for name in variants}
+
+    for source, target, bw in demand_pairs(args.pairs):
+        Gf = ag.filter_graph_by_bandwidth(G, bw) if args.bandwidth else G
+
+        # Referans: klasik Q-learning'in tam bütçe sonundaki kalitesi
+        with contextlib.redirect_stdout(io.StringIO()):
+            random.seed(args.seed)
+            ref_agent = QLearningAgent(Gf)
+            ref_agent.train(source, target, episodes=args.max_episodes)
+            ref_cost = path_cost(Gf, ref_agent.get_best_path(source, target))
+        target_cost = ref_cost * (1 + args.tol)
+
+        for name, options in variants.items():
+            r = train_until(Gf, source, target, options, args.max_episodes, args.chunk, target_cost, args.seed)
+            stats[name].append(r)
+            print(f"{source}->{target} {name}: cost={r['cost']:.4f} (ref {ref_cost:.4f}) "
+                  f"episodes={r['episodes']} s={fmt(r['seconds'])} "
+                  f"converged={r['converged_episodes']} total_s={r['total_s']:.2f}", file=sys.stderr)
+
+    rows = []
+    for name, results in stats.items():
+        reached = [r for r in results if r["episodes"] is not None]
+        converged = [r for r in results if r["converged_episodes"] is not None]
+        rows.append([
+            name,
+            f"{len(reached)}/{len(results)}",
+            fmt(mean([r["episodes"] for r in reached]), 0),
+            fmt(mean([r["seconds"] for r in reached]), 3),
+            fmt(mean([r["converged_episodes"] for r in converged]), 0),
+            fmt(mean([r["converged_s"] for r in converged]), 3),
+            fmt(mean([r["total_s"] for r in results]), 2),
+            fmt(mean([r["cost"] for r in results if r["cost"] != float("inf")]), 4),
+        ])
+    print(f"Hedef: klasik Q-learning {args.max_episodes} bölüm sonundaki maliyet (+%{args.tol * 100:.0f})")
+    print_table(["varyant", "hedefe ulaşan", "hedef bölüm", "hedef süre (s)",
+                 "yakınsama bölüm", "yakınsama süre (s)", "toplam süre (s)", "son maliyet"], rows)
+
+
+# ---------------------------------------------------------------
+# ACO / MMAS: süre bütçesi başına kalite
+# Her bütçe (ms) için iki varyant aynı çiftlerde çalıştırılır; kalite,
+# kesin en iyi yola (Yen k=1, bandwidth filtreli) göre yüzde fark olarak
+# ölçülür. "varsayılan" satırı her varyantın kendi varsayılan
+# parametreleriyle (bütçesiz) çalışmasıdır.
+# ---------------------------------------------------------------
+ACO_VARIANTS = {
+    "aco": ACO,
+    "mmas": MMAS,
+}
+
+
+def bench_aco(args):
+    budgets = [None] + [float(b) for b in args.budgets.split(",") if b]
+    pairs = []
+    for source, target, bw in demand_pairs(args.pairs):
+        Gf = ag.filter_graph_by_bandwidth(ag.G, bw)
+        optimum = next(k_shortest_paths(Gf, source, target, k=1), None)
+        if optimum is not None:
+            pairs.append((Gf, source, target, path_cost(Gf, optimum)))
+
+    rows = []
+    for budget in budgets:
+        for name, solver in ACO_VARIANTS.items():
+            gaps, times, hits, failures = [], [], 0, 0
+            for Gf, source, target, opt_cost in pairs:
+                random.seed(args.seed)
+                options = {} if budget is None else {"deadline_ms": budget, "n_iter": 10000}
+                t0 = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    path, cost, _ = solver(Gf, source, target, **options)
+                times.append(time.perf_counter() - t0)
+                if path is None:
+                    failures += 1
+                    continue
+                gaps.append((cost / opt_cost - 1) * 100)
+                hits += cost <= opt_cost * (1 + 1e-9)
+            rows.append([
+                "varsayılan" if budget is None else f"{budget:.0f} ms",
+                name,
+                fmt(mean(gaps), 2),
+                f"{hits}/{len(pairs)}",
+                failures,
+                fmt(mean(times), 3),
+            ])
+            print(f"{rows[-1][0]} {name}: gap={rows[-1][2]}%", file=sys.stderr)
+
+    print_table(["bütçe", "varyant", "ort. fark (%)", "en iyiye ulaşan", "yol yok", "ort. süre (s)"], rows)
+
+
+# ---------------------------------------------------------------
+# HEDEFE KALAN MALİYET ALT SINIRLARI: yönlendirmeli / yönlendirmesiz
+# Aynı çiftlerde stokastik çözücülerin yol kurma aşaması ölçülür:
+#   karınca  : ilk iterasyon feromonuyla kurulan yolların hedefe ulaşma oranı
+#   ga yolu  : random_path ile üretilen geçerli (bandwidth dahil) yol oranı
+#   q bölüm  : ilk --episodes bölümde hedefe ulaşan bölüm oranı
+# ve ilk geçerli yola kadar geçen süre (ms) ile bulunan yolların ortalama
+# maliyetinin kesin en iyiye farkı (%). Alt sınır hesap süresi (önbelleksiz)
+# ayrıca raporlanır.
+# ---------------------------------------------------------------
+def sample_walks(make_path, n, G, bw):
+    found, costs, first_ms = 0, [], None
+    t0 = time.perf_counter()
+    for _ in range(n):
+        path = make_path()
+        if path is not None and ag.is_valid_path(path, G, min_bandwidth=bw):
+            found += 1
+            costs.append(path_cost(G, path))
+            if first_ms is None:
+                first_ms = (time.perf_counter() - t0) * 1000
+    return found, costs, first_ms
+
+
+def bench_bounds(args):
+    stats = {}
+    bound_ms = []
+
+    def record(name, guided, n, found, costs, first_ms, opt_cost):
+        s = stats.setdefault((name, guided), {"n": 0, "found": 0, "gaps": [], "first": []})
+        s["n"] += n
+        s["found"] += found
+        s["gaps"].extend((c / opt_cost - 1) * 100 for c in costs)
+        if first_ms is not None:
+            s["first"].append(first_ms)
+
+    for source, target, bw in demand_pairs(args.pairs):
+        Gf = ag.filter_graph_by_bandwidth(ag.G, bw)
+        optimum = next(k_shortest_paths(Gf, source, target, k=1), None)
+        if optimum is None:
+            continue
+        opt_cost = path_cost(Gf, optimum)
+
+        t0 = time.perf_counter()
+        bounds = get_goal_bounds(Gf, target)
+        bound_ms.append((time.perf_counter() - t0) * 1000)
+
+        for guided in (False, True):
+            random.seed(args.seed)
+            tables = get_heuristic_tables(Gf, 0.33, 0.33, 0.34, 3.0, target=target if guided else None)
+            pheromone = initialize_pheromones(Gf)
+            record("karınca", guided, args.walks,
+                   *sample_walks(lambda: build_path(Gf, pheromone, source, target, tables[0], 1.0, 3.0, tables[1]),
+                                 args.walks, Gf, bw), opt_cost)
+
+            random.seed(args.seed)
+            record("ga yolu", guided, args.walks,
+                   *sample_walks(lambda: random_path(source, target, Gf, max_hops=6,
+                                                     bounds=bounds if guided else None),
+                                 args.walks, Gf, bw), opt_cost)
+
+            random.seed(args.seed)
+            agent = QLearningAgent(Gf, lower_bounds=guided)
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent.train(source, target, episodes=args.episodes)
+            train_ms = (time.perf_counter() - t0) * 1000
+            path = agent.get_best_path(source, target)
+            record("q bölüm", guided, args.episodes, agent.goal_episodes,
+                   [path_cost(Gf, path)] if path else [], train_ms if agent.goal_episodes else None, opt_cost)
+
+    rows = []
+    for (name, guided), s in stats.items():
+        rows.append([
+            name,
+            "alt sınır" if guided else "yok",
+            f"{s['found']}/{s['n']} ({s['found'] / s['n'] * 100:.1f}%)" if s["n"] else "-",
+            fmt(mean(s["first"]), 2),
+            fmt(mean(s["gaps"]), 1),
+        ])
+    print(f"Alt sınır hesabı (çift başına, önbelleksiz): {fmt(mean(bound_ms), 1)} ms")
+    print("q bölüm: ilk geçerli süre = toplam eğitim süresi, fark = eğitim sonundaki greedy yol")
+    print_table(["aşama", "yönlendirme", "hedefe ulaşan", "ilk geçerli (ms)", "ort. fark (%)"], rows)
+
+
+# ---------------------------------------------------------------
+# GA: hop sınırlı kesin en iyiye (HopLimitedSolver) göre kalite
+# GA'nın kendi max_hops sınırı ve demand bandwidth'iyle aynı problemin
+# kesin çözümü referans alınır; hedefe yönlü / yönsüz başlangıç
+# popülasyonu karşılaştırılır.
+# ---------------------------------------------------------------
+GA_VARIANTS = {
+    "ga": {"goal_directed": False},
+    "ga (alt sınır)": {"goal_directed": True},
+}
+
+
+def bench_ga(args):
+    pairs, dp_ms = [], []
+    for source, target, bw in demand_pairs(args.pairs):
+        t0 = time.perf_counter()
+        solver = HopLimitedSolver(ag.G, min_bandwidth=bw).solve(source, args.max_hops)
+        dp_ms.append((time.perf_counter() - t0) * 1000)
+        opt_cost = solver.path_cost(target)
+        if opt_cost is not None:
+            pairs.append((source, target, bw, opt_cost))
+
+    rows = []
+    for name, options in GA_VARIANTS.items():
+        gaps, times, hits, failures = [], [], 0, 0
+        for source, target, bw, opt_cost in pairs:
+            random.seed(args.seed)
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = run_ga(source, target, bw, pop_size=args.pop_size, generations=args.generations,
+                                max_hops=args.max_hops, **options)
+            times.append(time.perf_counter() - t0)
+            if result["best_path"] is None:
+                failures += 1
+                continue
+            gaps.append((result["cost"] / opt_cost - 1) * 100)
+            hits += result["cost"] <= opt_cost * (1 + 1e-9)
+        rows.append([name, fmt(mean(gaps), 2), f"{hits}/{len(pairs)}", failures, fmt(mean(times), 3)])
+
+    print(f"Referans: {args.max_hops} hop sınırlı kesin en iyi (Bellman-Ford DP, ort. {fmt(mean(dp_ms), 2)} ms)")
+    print_table(["varyant", "ort. fark (%)", "en iyiye ulaşan", "yol yok", "ort. süre (s)"], rows)
+
+
+# ---------------------------------------------------------------
+# QoS KISITLARI: gecikme bütçesi
+# Her çift için bütçe, en düşük olası gecikme ile kısıtsız en iyi yolun
+# gecikmesi arasına konur (--tightness: 0 → en sıkı, 1 → kısıt yok):
+#   max_delay = d_min + tightness * (d_opt - d_min)
+# Kısıtsız en iyi yolun zaten sağladığı çiftler atlanır. Referans kesin
+# kısıtlı çözümdür (constrained_shortest_path). Çözücüler iki şekilde
+# çalıştırılır: kısıt yol kurarken uygulanır (erken ret) / kısıtsız
+# çalışıp sonuç sonradan kontrol edilir.
+# ---------------------------------------------------------------
+QOS_SOLVERS = {
+    "aco": lambda Gf, s, t, bw, **kw: ACO(Gf, s, t, **kw)[0],
+    "mmas": lambda Gf, s, t, bw, **kw: MMAS(Gf, s, t, **kw)[0],
+    "ga": lambda Gf, s, t, bw, **kw: run_ga(s, t, bw, pop_size=30, generations=40, **kw)["best_path"],
+    "q-learning": lambda Gf, s, t, bw, **kw: qlearning_path(Gf, s, t, **kw),
+}
+
+
+def qlearning_path(G, source, target, episodes=3000, **kw):
+    agent = QLearningAgent(G, **kw)
+    agent.train(source, target, episodes=episodes)
+    return agent.get_best_path(source, target) or agent.best_episode_path
+
+
+def bench_qos(args):
+    cases, engine_ms, methods = [], [], {}
+    for source, target, bw in demand_pairs(args.pairs):
+        Gf = ag.filter_graph_by_bandwidth(ag.G, bw)
+        optimum = next(k_shortest_paths(Gf, source, target, k=1), None)
+        if optimum is None:
+            continue
+        guard = QoSGuard(Gf, source, target)
+        d_min = guard.bounds.delay_to_go_of[source] - Gf.nodes[source]["processing_delay"]
+        d_opt = ag.total_delay(optimum, Gf)
+        if d_opt - d_min < 1e-9:
+            continue
+        max_delay = d_min + args.tightness * (d_opt - d_min)
+
+        t0 = time.perf_counter()
+        path, info = constrained_shortest_path(Gf, source, target, max_delay=max_delay)
+        engine_ms.append((time.perf_counter() - t0) * 1000)
+        methods[info["method"]] = methods.get(info["method"], 0) + 1
+        if path is not None:
+            cases.append((Gf, source, target, bw, max_delay, path_cost(Gf, path)))
+
+    rows = []
+    for name, solver in QOS_SOLVERS.items():
+        for mode in ("erken ret", "sonradan kontrol"):
+            gaps, times, feasible = [], [], 0
+            for Gf, source, target, bw, max_delay, opt_cost in cases:
+                random.seed(args.seed)
+                options = {"max_delay": max_delay} if mode == "erken ret" else {}
+                t0 = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    path = solver(Gf, source, target, bw, **options)
+                times.append(time.perf_counter() - t0)
+                if path is None or violates(path, Gf, max_delay=max_delay):
+                    continue
+                feasible += 1
+                gaps.append((path_cost(Gf, path) / opt_cost - 1) * 100)
+            rows.append([name, mode, f"{feasible}/{len(cases)}", fmt(mean(gaps), 2), fmt(mean(times), 3)])
+            print(f"{name} {mode}: {rows[-1][2]}", file=sys.stderr)
+
+    print(f"Kesin kısıtlı çözüm: ort. {fmt(mean(engine_ms), 1)} ms, en fazla {fmt(max(engine_ms, default=None), 1)} ms, "
+          f"yöntemler {methods}")
+    print_table(["çözücü", "kısıt", "uygun yol", "ort. fark (%)", "ort. süre (s)"], rows)
+
+
+# ---------------------------------------------------------------
+# HUB LABEL: ön işlem süresi ve sorgu başına süre, kesin yöntemlerle
+# (istek başına Dijkstra / sıcak routing table) karşılaştırmalı.
+# Sorgular rastgele çiftlerdir; maliyetler ters Dijkstra ile doğrulanır.
+# ---------------------------------------------------------------
+def bench_hub(args):
+    rng = random.Random(args.seed)
+    nodes = sorted(ag.G.nodes)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(args.queries)]
+
+    t0 = time.perf_counter()
+    index = HubLabelIndex.build(ag.G, min_bandwidth=args.bandwidth or None)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for s, t in pairs:
+        index.path(s, t)
+    hub_us = (time.perf_counter() - t0) / len(pairs) * 1e6
+
+    sample = pairs[:args.check]
+    t0 = time.perf_counter()
+    wrong = 0
+    for s, t in sample:
+        expected = GoalBounds(ag.G, t, min_bandwidth=args.bandwidth or None).cost_to_target(s)
+        if s == t:
+            expected = 0.0
+        elif expected != float("inf"):
+            expected += ag.path_cost_offset(ag.G, s, t)
+        wrong += not (index.cost(s, t) == expected or abs(index.cost(s, t) - expected) < 1e-9)
+    dijkstra_us = (time.perf_counter() - t0) / len(sample) * 1e6
+
+    tables = {}
+    t0 = time.perf_counter()
+    for s, t in pairs:
+        if t not in tables:
+            tables[t] = ShortestPathTree(ag.G, t, min_bandwidth=args.bandwidth or None)
+        tables[t].path(s)
+    table_us = (time.perf_counter() - t0) / len(pairs) * 1e6
+
+    stats = index.stats()
+    print(f"Ön işlem {build_s:.2f} s, ort. etiket {stats['avg_label']}, en büyük {stats['max_label']}, "
+          f"hatalı maliyet {wrong}/{len(sample)}")
+    print_table(["yöntem", "sorgu başına (µs)"], [
+        ["hub label", fmt(hub_us, 1)],
+        ["dijkstra (istek başına)", fmt(dijkstra_us, 1)],
+        [f"routing table ({len(tables)} hedef, kurulum dahil)", fmt(table_us, 1)],
+    ])
+
+
+def bench_sim(args):
+    index = HubLabelIndex.build(ag.G)
+    demands = [(int(r.src), int(r.dst), float(r.demand_mbps)) for r in ag.demand_df.itertuples()]
+    engines = [("python", False)] + ([(kernels.BACKEND, True)] if kernels.enabled() else [])
+    rows = []
+    for n in args.demands:
+        ds = demands if n == 0 else synthetic_demands(ag.G, n, demands, seed=args.seed)
+        sim = TrafficSimulator(ag.G, buffer_packets=args.buffer, seed=args.seed)
+        for s, t, d in ds:
+            sim.add_flow(index.path(s, t), d)
+        for engine, flag in engines:
+            kernels.set_enabled(flag)
+            if flag:
+                sim.run(min(args.sim_ms, 1.0))   # ısınma: derleme ölçüme girmesin
+            report = sim.run(args.sim_ms)
+            rows.append([len(ds), engine, report["events"], fmt(report["wall_ms"], 1), report["events_per_s"],
+                         report["packets"]["queue_drops"], fmt(report["packets"]["loss"] * 100, 2),
+                         fmt(report["links"][0]["utilization"] * 100, 1)])
+        kernels.set_enabled(True)
+    print_table(["demand", "motor", "olay", "süre (ms)", "olay/s", "kuyruk düşmesi", "kayıp %", "en yoğun link %"],
+                rows)
+
+
+def _worker_process(url, authkey):
+    # Çözücülerin ilerleme çıktısı tabloyu kirletmesin
+    sys.stdout = open(os.devnull, "w")
+    Worker(broker_from_url(url, authkey), heartbeat_s=0.5).run()
+
+
+def bench_workers(args):
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor
+
+    authkey = secrets.token_bytes(32)   # süreç içi broker, yalnızca bu ölçüm için
+    host, port = start_server_thread(authkey=authkey)
+    url = f"tcp://{host}:{port}"
+    pairs = demand_pairs(0)
+    jobs = [dict(algorithm=args.algorithm, source=s, target=t, min_bandwidth=0.0,
+                 w_delay=0.33, w_rel=0.33, w_res=0.34) for s, t, _ in
+            (pairs[i % len(pairs)] for i in range(args.jobs))]
+
+    ctx = multiprocessing.get_context("fork")
+    rows = []
+    base = None
+    for n in args.workers:
+        broker = broker_from_url(url, authkey)
+        procs = [ctx.Process(target=_worker_process, args=(url, authkey), daemon=True) for _ in range(n)]
+        for p in procs:
+            p.start()
+        while len(broker.workers()) < n:
+            time.sleep(0.1)
+
+        pool = BrokerPool(broker, max_in_flight=len(jobs))
+        with contextlib.redirect_stdout(sys.stderr), ThreadPoolExecutor(len(jobs)) as executor:
+            t0 = time.perf_counter()
+            list(executor.map(lambda job: pool.run(solve_job, job), jobs))
+            elapsed = time.perf_counter() - t0
+
+        for p in procs:
+            p.terminate()
+            p.join()
+        # Ölen işçilerin heartbeat'i kaybolana kadar bekleme yerine yeni broker
+        host, port = start_server_thread(authkey=authkey)
+        url = f"tcp://{host}:{port}"
+
+        rate = len(jobs) / elapsed
+        base = base or rate / n
+        rows.append([n, len(jobs), fmt(elapsed, 2), fmt(rate, 1), fmt(rate / base, 2), pool.fallback])
+    print(f"{os.cpu_count()} CPU, {args.algorithm} işleri")
+    print_table(["işçi", "iş", "süre (s)", "iş/s", "hızlanma", "fallback"], rows)
+
+
+def bench_kernels(args):
+    if kernels.BACKEND is None:
+        print("Derlenmiş çekirdekler kapalı (numba kurulu değil ya da ROUTE_JIT=off); "
+              "derlenmeden eşdeğerlik için: ROUTE_JIT=python")
+        return
+
+    def qlearning(G, s, t, bw):
+        agent = QLearningAgent(G)
+        agent.train(s, t, episodes=args.episodes)
+        return agent.q_table, agent.best_episode_path, agent.get_best_path(s, t)
+
+    cases = [
+        ("aco (build_path + deposit)", lambda G, s, t, bw: ACO(G, s, t)),
+        ("qlearning (train)", qlearning),
+        ("ga (create_population)", lambda G, s, t, bw: create_population(
+            args.population, s, t, G, bw, bounds=get_goal_bounds(G, t, min_bandwidth=bw))),
+    ]
+    pairs = demand_pairs(args.pairs)
+    rows = []
+    for name, fn in cases:
+        times = {False: [], True: []}
+        same = 0
+        for s, t, bw in pairs:
+            Gf = ag.filter_graph_by_bandwidth(ag.G, bw)
+            results = {}
+            for flag in (False, True):
+                kernels.set_enabled(flag)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    fn(Gf, s, t, bw)   # ısınma: tablolar ve derleme ölçüme girmesin
+                    random.seed(args.seed)
+                    t0 = time.perf_counter()
+                    result = fn(Gf, s, t, bw)
+                    times[flag].append((time.perf_counter() - t0) * 1000)
+                results[flag] = (result, random.getstate())
+            same += results[False] == results[True]
+        kernels.set_enabled(True)
+        python_ms, kernel_ms = mean(times[False]), mean(times[True])
+        rows.append([name, fmt(python_ms, 1), fmt(kernel_ms, 1), fmt(python_ms / kernel_ms, 2), f"{same}/{len(pairs)}"])
+
+    print(f"Çekirdek: {kernels.BACKEND}")
+    print_table(["çekirdek", "python (ms)", "çekirdek (ms)", "hızlanma", "aynı sonuç"], rows)
+
+
+# Demand CSV'siyle aynı aralıklarda rastgele graf (düğüm / kenar öznitelikleri)
+def synthetic_graph(n_nodes, n_edges, seed):
+    rng = np.random.default_rng(seed)
+    src = rng.integers(0, n_nodes, n_edges)
+    dst = rng.integers(0, n_nodes, n_edges)
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    node_attrs = {"processing_delay": rng.uniform(0.5, 2.0, n_nodes).round(2),
+                  "node_reliability": rng.uniform(0.95, 0.999, n_nodes).round(3)}
+    edge_attrs = {"bandwidth": rng.integers(100, 1001, len(src)).astype(float),
+                  "link_delay": rng.integers(3, 16, len(src)).astype(float),
+                  "link_reliability": rng.uniform(0.95, 0.999, len(src)).round(3)}
+    return np.arange(n_nodes), src, dst, node_attrs, edge_attrs
+
+
+# /proc/self/status: RssAnon (sürece özel) ve RssFile (dosya / mmap sayfaları), bayt.
+# Önce serbest bırakılmış heap glibc'ye geri verilir (malloc_trim); yoksa
+# kurulumdaki geçici diziler ölçüme girer.
+def rss():
+    import ctypes
+    import gc
+
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    out = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                key, kb = line.split()[:2]
+                out[key[:-1]] = int(kb) * 1024
+    return out
+
+
+# Her varyant ayrı (fork'lanmış) süreçte ölçülür: önceki varyantların
+# serbest bırakılmış belleği sonuçları etkilemesin
+def _memory_process(kind, args, path, conn):
+    import networkx as nx
+
+    nodes, src, dst, node_attrs, edge_attrs = synthetic_graph(args.nodes, args.edges, args.seed)
+    before = rss()
+    t0 = time.perf_counter()
+    if kind == "networkx":
+        G = nx.Graph()
+        G.add_nodes_from((n, {name: vals[i] for name, vals in node_attrs.items()})
+                         for i, n in enumerate(nodes.tolist()))
+        G.add_edges_from((u, v, {name: vals[i] for name, vals in edge_attrs.items()})
+                         for i, (u, v) in enumerate(zip(src.tolist(), dst.tolist())))
+        G.graph["version"] = 0
+    elif kind == "mmap":
+        G = CompactGraph.load(path, mmap=True)
+        arrays = [G.node_ids, G.indptr, G.indices, G.arc_edge] + [c.data for c in G.edge_attrs.values()]
+        for a in arrays:
+            a.sum()   # tüm sayfalar okunsun (RssFile'a girer)
+    else:
+        G = CompactGraph.from_arrays(nodes, src, dst, node_attrs, edge_attrs, kind, graph={"version": 0})
+    build_s = time.perf_counter() - t0
+    built = rss()
+
+    Gf = ag.filter_graph_by_bandwidth(G, args.min_bandwidth)
+    filtered = rss()
+
+    sample = np.random.default_rng(args.seed).integers(0, len(src), 20000)
+    pairs = list(zip(src[sample].tolist(), dst[sample].tolist()))
+    t0 = time.perf_counter()
+    for u, v in pairs:
+        G.edges[u, v]["bandwidth"]
+    lookup_us = (time.perf_counter() - t0) / len(pairs) * 1e6
+
+    conn.send({
+        "edges": G.number_of_edges(),
+        "anon": built["RssAnon"] - before["RssAnon"],
+        "file": built["RssFile"] - before["RssFile"],
+        "filter": filtered["RssAnon"] - built["RssAnon"],
+        "filter_edges": Gf.number_of_edges(),
+        "build_s": build_s,
+        "lookup_us": lookup_us,
+    })
+
+
+def bench_memory(args):
+    import multiprocessing
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "graph.cg")
+    CompactGraph.from_arrays(*synthetic_graph(args.nodes, args.edges, args.seed), dtype="float32").save(path)
+
+    ctx = multiprocessing.get_context("fork")
+    rows = []
+    for kind in ("networkx", "float64", "float32", "quantized", "mmap"):
+        recv, send = ctx.Pipe(duplex=False)
+        p = ctx.Process(target=_memory_process, args=(kind, args, path, send))
+        p.start()
+        r = recv.recv()
+        p.join()
+        mb = 1024 * 1024
+        total = r["anon"] + r["file"]
+        rows.append([kind if kind in ("networkx", "mmap") else f"compact {kind}",
+                     r["edges"], fmt(r["anon"] / mb, 1), fmt(r["file"] / mb, 1),
+                     fmt(total / mb / r["edges"] * 1e6, 1), fmt(r["filter"] / mb, 1),
+                     fmt(r["build_s"], 2), fmt(r["lookup_us"], 2)])
+    os.remove(path)
+
+    print(f"{args.nodes} düğüm, bandwidth filtresi ≥ {args.min_bandwidth:g} "
+          f"({r['filter_edges']} kenar kalır); mmap: float32 dosyası, sayfalar okunduktan sonra")
+    print_table(["depo", "kenar", "anon MB", "dosya MB", "MB / 1M kenar", "filtre +MB", "kurulum (s)",
+                 "edges[u,v] (µs)"], rows)
+
+
+# Zamana bağlı öznitelikler: sentetik gün içi profil (tepe saati 20:00),
+# kalkış anları tepe saati ± 3 sa. Yükleme mmap ile; ilk sorgu yay → sütun
+# eşlemesini de içerir. Kazanç: statik en az gecikmeli yolun aynı kalkış
+# anındaki zamana bağlı gecikmesine göre.
+def bench_timedep(args):
+    import shutil
+    import tempfile
+
+    rng = random.Random(args.seed)
+    nodes = sorted(ag.G.nodes)
+    queries = [(*rng.sample(nodes, 2), (20 + rng.uniform(-3, 3)) * 3.6e6) for _ in range(args.queries)]
+    rows = []
+    for n_slots in args.slots:
+        t0 = time.perf_counter()
+        series = EdgeSeries.diurnal(ag.G, n_slots, seed=args.seed)
+        build_s = time.perf_counter() - t0
+        path = tempfile.mkdtemp()
+        series.save(path)
+        t0 = time.perf_counter()
+        series = EdgeSeries.load(path)
+        load_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        time_dependent_path(ag.G, series, *queries[0], 1, 0, 0)
+        first_ms = (time.perf_counter() - t0) * 1000
+
+        td_ms, static_ms, gains = [], [], []
+        for s, t, depart in queries:
+            t0 = time.perf_counter()
+            p, _ = time_dependent_path(ag.G, series, s, t, depart, 1, 0, 0)
+            td_ms.append((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            q, _ = constrained_shortest_path(ag.G, s, t, 1, 0, 0)
+            static_ms.append((time.perf_counter() - t0) * 1000)
+            a, b = total_delay_at(p, ag.G, series, depart), total_delay_at(q, ag.G, series, depart)
+            gains.append((b - a) / b * 100 if b else 0.0)
+        rows.append([n_slots, fmt(series.info()["bytes"] / 1e6, 1), fmt(build_s, 2), fmt(load_ms, 2),
+                     fmt(first_ms, 1), fmt(mean(td_ms), 2), fmt(mean(static_ms), 2), fmt(mean(gains), 2),
+                     fmt(max(gains), 1)])
+        shutil.rmtree(path)
+
+    print(f"{ag.G.number_of_edges()} kenar, {len(queries)} sorgu (kalkış 17:00-23:00), ağırlık (1, 0, 0)")
+    print_table(["slot", "MB", "kurulum (s)", "yükleme (ms)", "ilk sorgu (ms)", "zamana bağlı (ms)",
+                 "statik (ms)", "kazanç %", "en çok %"], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Algoritma karşılaştırmaları")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, variants, help_text in (
+            ("qlearning", QL_VARIANTS, "Q-learning planlama modları (Dyna-Q, prioritized sweeping)"),
+            ("traces", TRACE_VARIANTS, "Q-learning uygunluk izleri (SARSA(λ), Watkins Q(λ))")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--pairs", type=int, default=5, help="kullanılacak demand çifti sayısı (0 → hepsi)")
+        p.add_argument("--max-episodes", type=int, default=3000)
+        p.add_argument("--chunk", type=int, default=50, help="ölçümler arası bölüm sayısı")
+        p.add_argument("--tol", type=float, default=0.0, help="hedef maliyete göre bağıl tolerans")
+        p.add_argument("--bandwidth", action="store_true", help="demand_mbps eşiğiyle filtrelenmiş graf")
+        p.add_argument("--seed", type=int, default=42)
+        p.set_defaults(func=lambda a, v=variants: bench_qlearning(a, v))
+
+    p = sub.add_parser("aco", help="ACO ve MMAS: süre bütçesi başına kalite")
+    p.add_argument("--pairs", type=int, default=5, help="kullanılacak demand çifti sayısı (0 → hepsi)")
+    p.add_argument("--budgets", default="100,300,1000", help="virgülle ayrılmış süre bütçeleri (ms)")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_aco)
+
+    p = sub.add_parser("bounds", help="hedefe kalan maliyet alt sınırlarıyla yol kurma başarısı")
+    p.add_argument("--pairs", type=int, default=10, help="kullanılacak demand çifti sayısı (0 → hepsi)")
+    p.add_argument("--walks", type=int, default=200, help="çift başına karınca / GA yolu sayısı")
+    p.add_argument("--episodes", type=int, default=200, help="çift başına Q-learning bölüm sayısı")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_bounds)
+
+    p = sub.add_parser("ga", help="GA: hop sınırlı kesin en iyiye göre kalite")
+    p.add_argument("--pairs", type=int, default=10, help="kullanılacak demand çifti sayısı (0 → hepsi)")
+    p.add_argument("--max-hops", type=int, default=6)
+    p.add_argument("--pop-size", type=int, default=30)
+    p.add_argument("--generations", type=int, default=40)
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_ga)
+
+    p = sub.add_parser("qos", help="gecikme bütçesi: erken ret / sonradan kontrol, kesin kısıtlı çözüme göre")
+    p.add_argument("--pairs", type=int, default=10, help="kullanılacak demand çifti sayısı (0 → hepsi)")
+    p.add_argument("--tightness", type=float, default=0.3, help="0 → en sıkı bütçe, 1 → kısıtsız optimumun gecikmesi")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_qos)
+
+    p = sub.add_parser("hub", help="hub label indeksi: ön işlem ve sorgu süresi")
+    p.add_argument("--queries", type=int, default=20000)
+    p.add_argument("--check", type=int, default=200, help="Dijkstra ile doğrulanan sorgu sayısı")
+    p.add_argument("--bandwidth", type=float, default=0.0, help="bandwidth eşiği")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_hub)
+
+    p = sub.add_parser("sim", help="trafik simülatörü: olay/s, kuyruk ve kayıp")
+    p.add_argument("--demands", type=int, nargs="+", default=[0, 300, 1000],
+                   help="demand sayıları (0 → demand dosyası)")
+    p.add_argument("--sim-ms", type=float, default=100.0, help="simüle edilen süre (ms)")
+    p.add_argument("--buffer", type=int, default=64, help="link kuyruğu (paket)")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_sim)
+
+    p = sub.add_parser("workers", help="broker + işçi süreçleri: iş/s ölçeklenmesi")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="işçi süreç sayıları")
+    p.add_argument("--jobs", type=int, default=40)
+    p.add_argument("--algorithm", default="ACO")
+    p.set_defaults(func=bench_workers)
+
+    p = sub.add_parser("kernels", help="derlenmiş çekirdekler (numba): Python yoluna göre süre ve sonuç eşitliği")
+    p.add_argument("--pairs", type=int, default=5, help="kullanılacak demand çifti sayısı (0 → hepsi)")
+    p.add_argument("--episodes", type=int, default=1000, help="Q-learning bölüm sayısı")
+    p.add_argument("--population", type=int, default=200, help="GA popülasyon büyüklüğü")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_kernels)
+
+    p = sub.add_parser("memory", help="networkx ve CompactGraph: kenar başına bellek, filtre kopyası, arama süresi")
+    p.add_argument("--edges", type=int, default=1000000)
+    p.add_argument("--nodes", type=int, default=50000)
+    p.add_argument("--min-bandwidth", type=float, default=500.0, help="filtre eşiği")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser("timedep", help="zamana bağlı öznitelikler: yükleme, sorgu süresi, statik yola göre gecikme kazancı")
+    p.add_argument("--slots", type=int, nargs="+", default=[24, 96, 288, 1440], help="gün başına slot sayıları")
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_timedep)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import json
+import math
+import os
+import queue
+import threading
+import time
+from multiprocessing.managers import BaseManager
+from urllib.parse import urlparse
+
+# ---------------------------------------------------------------
+# ÇÖZÜCÜ İŞ KUYRUĞU (BROKER)
+#
+# app.py'nin çözücü katmanı işleri birden çok makinedeki işçi süreçlerine
+# (worker.py) bir broker üzerinden dağıtabilir; sonuçlar aynı broker'dan
+# geri gelir. Tüm arka uçlar aynı küçük arayüzü uygular; iş ve sonuçlar
+# JSON metinleridir:
+#
+#   put_job(payload)              iş kuyruğuna ekler
+#   get_job(timeout)              iş bekler (yoksa None)
+#   put_result(job_id, payload)   sonucu iş numarasıyla yazar
+#   get_result(job_id, timeout)   sonucu bekler (yoksa None)
+#   heartbeat(worker_id, info)    işçi canlılık / sayaç bilgisi
+#   workers()                     işçi → son bilgi (+ age_s)
+#   queue_size()                  bekleyen iş sayısı
+#
+# Arka uçlar (ROUTE_BROKER adresi):
+#   local           süreç içi kuyruk (testler, thread'li işçiler)
+#   tcp://host:port yerel soket kuyruğu: "python broker.py serve" ile açılan
+#                   süreç içi kuyruk, multiprocessing.managers üzerinden
+#                   paylaşılır (ROUTE_BROKER_KEY ile kimlik doğrulama)
+#   redis://...     Redis uyumlu sunucu (listeler + BRPOP; redis paketi gerekir)
+#
+# GÜVENLİK (tcp://): multiprocessing.managers çağrıları ve dönüş değerlerini
+# pickle ile taşır; anahtarı bilen ve porta erişebilen herkes broker
+# sürecinde (ve ona bağlanan app / işçilerde) kod çalıştırabilir. Bu yüzden
+# yerleşik bir anahtar yoktur: ROUTE_BROKER_KEY (ya da --authkey) verilmeden
+# sunucu açılmaz ve istemci bağlanmaz. Sunucu varsayılan olarak yalnızca
+# 127.0.0.1'i dinler; başka makinelere yalnızca güvenilir ağda (ya da SSH /
+# VPN tüneliyle) açılmalıdır.
+# ---------------------------------------------------------------
+
+# Alınmayan sonuçların (istemci zaman aşımına uğradı) tutulma süresi
+RESULT_TTL_S = 300
+# Bu süreden eski heartbeat'i olan işçi ölü sayılır
+WORKER_TIMEOUT_S = 10.0
+DEFAULT_BIND = "127.0.0.1:5800"
+
+
+# tcp broker anahtarı: verilen değer ya da ROUTE_BROKER_KEY; yoksa hata
+def broker_key(value=None):
+    value = value or os.environ.get("ROUTE_BROKER_KEY")
+    if not value:
+        raise RuntimeError("tcp:// broker için ROUTE_BROKER_KEY (ya da --authkey) gerekli; "
+                           "yerleşik anahtar yoktur.")
+    return value.encode() if isinstance(value, str) else value
+
+
+class LocalBroker:
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._results = {}
+        self._cond = threading.Condition()
+        self._beats = {}
+
+    def put_job(self, payload):
+        self._jobs.put(payload)
+
+    def get_job(self, timeout=1.0):
+        try:
+            return self._jobs.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put_result(self, job_id, payload):
+        now = time.time()
+        with self._cond:
+            self._results[job_id] = (now, payload)
+            for key in [k for k, (t, _) in self._results.items() if now - t > RESULT_TTL_S]:
+                del self._results[key]
+            self._cond.notify_all()
+
+    def get_result(self, job_id, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: job_id in self._results, timeout):
+                return None
+            return self._results.pop(job_id)[1]
+
+    def heartbeat(self, worker_id, info):
+        with self._cond:
+            self._beats[worker_id] = (time.time(), info)
+
+    def workers(self):
+        now = time.time()
+        with self._cond:
+            return {wid: dict(json.loads(info), age_s=round(now - t, 1))
+                    for wid, (t, info) in self._beats.items() if now - t < RESULT_TTL_S}
+
+    def queue_size(self):
+        return self._jobs.qsize()
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------
+# Soket arka ucu: bir LocalBroker, multiprocessing.managers ile TCP
+# üzerinden paylaşılır. Vekil (proxy) nesneler thread başına bağlantı
+# açar; fork'tan sonra yeniden bağlanılmalıdır (her işçi kendi bağlanır).
+# ---------------------------------------------------------------
+# Sunucu ve istemci kayıtları ayrı sınıflarda: aynı süreçte (testler) istemci
+# kaydı sunucunun callable'ını ezmesin
+class _ServerManager(BaseManager):
+    pass
+
+
+class _ClientManager(BaseManager):
+    pass
+
+
+_ClientManager.register("broker")
+
+
+def make_server(host="127.0.0.1", port=0, authkey=None):
+    authkey = broker_key(authkey)
+    broker = LocalBroker()
+    _ServerManager.register("broker", callable=lambda: broker)
+    return _ServerManager(address=(host, port), authkey=authkey).get_server()
+
+
+# Süreç içinde arka planda çalışan soket broker'ı (testler / benchmark); adres döner
+def start_server_thread(host="127.0.0.1", port=0, authkey=None):
+    server = make_server(host, port, authkey)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.address
+
+
+class SocketBroker:
+    def __init__(self, host, port, authkey=None):
+        manager = _ClientManager(address=(host, port), authkey=broker_key(authkey))
+        manager.connect()
+        self._proxy = manager.broker()
+
+    def put_job(self, payload):
+        self._proxy.put_job(payload)
+
+    def get_job(self, timeout=1.0):
+        return self._proxy.get_job(timeout)
+
+    def put_result(self, job_id, payload):
+        self._proxy.put_result(job_id, payload)
+
+    def get_result(self, job_id, timeout=None):
+        return self._proxy.get_result(job_id, timeout)
+
+    def heartbeat(self, worker_id, info):
+        self._proxy.heartbeat(worker_id, info)
+
+    def workers(self):
+        return self._proxy.workers()
+
+    def queue_size(self):
+        return self._proxy.queue_size()
+
+    def close(self):
+        pass
+
+
+class RedisBroker:
+    def __init__(self, url, prefix="route"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Redis broker için 'redis' paketi gerekli (pip install redis).")
+        self._redis = redis.Redis.from_url(url)
+        self._jobs = f"{prefix}:jobs"
+        self._result = f"{prefix}:result:"
+        self._beats = f"{prefix}:workers"
+
+    @staticmethod
+    def _seconds(timeout):
+        # BRPOP: 0 → süresiz bekler
+        return 0 if timeout is None else max(1, int(math.ceil(timeout)))
+
+    def put_job(self, payload):
+        self._redis.lpush(self._jobs, payload)
+
+    def get_job(self, timeout=1.0):
+        item = self._redis.brpop(self._jobs, timeout=self._seconds(timeout))
+        return item[1].decode("utf-8") if item else None
+
+    def put_result(self, job_id, payload):
+        key = self._result + job_id
+        pipe = self._redis.pipeline()
+        pipe.lpush(key, payload)
+        pipe.expire(key, RESULT_TTL_S)
+        pipe.execute()
+
+    def get_result(self, job_id, timeout=None):
+        item = self._redis.brpop(self._result + job_id, timeout=self._seconds(timeout))
+        return item[1].decode("utf-8") if item else None
+
+    def heartbeat(self, worker_id, info):
+        self._redis.hset(self._beats, worker_id, json.dumps({"t": time.time(), "info": info}))
+
+    def workers(self):
+        now = time.time()
+        result = {}
+        for wid, raw in self._redis.hgetall(self._beats).items():
+            beat = json.loads(raw)
+            if now - beat["t"] > RESULT_TTL_S:
+                self._redis.hdel(self._beats, wid)
+                continue
+            result[wid.decode("utf-8")] = dict(json.loads(beat["info"]), age_s=round(now - beat["t"], 1))
+        return result
+
+    def queue_size(self):
+        return self._redis.llen(self._jobs)
+
+    def close(self):
+        self._redis.close()
+
+
+_local = None
+
+
+# authkey yalnızca tcp:// için; None → ROUTE_BROKER_KEY
+def broker_from_url(url, authkey=None):
+    global _local
+    if url == "local":
+        if _local is None:
+            _local = LocalBroker()
+        return _local
+    parsed = urlparse(url)
+    if parsed.scheme == "tcp":
+        return SocketBroker(parsed.hostname, parsed.port, authkey)
+    if parsed.scheme in ("redis", "rediss", "unix"):
+        return RedisBroker(url)
+    raise ValueError(f"Geçersiz broker adresi: {url} (local / tcp://host:port / redis://...)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çözücü iş kuyruğu (soket broker)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="tcp:// broker'ı başlatır")
+    p.add_argument("--bind", default=DEFAULT_BIND,
+                   help="host:port (başka makinelere açmak için ör. 0.0.0.0:5800; yalnızca güvenilir ağda)")
+    p.add_argument("--authkey", default=None, help="varsayılan: ROUTE_BROKER_KEY")
+    p = sub.add_parser("status", help="işçiler ve kuyruk")
+    p.add_argument("url")
+    p.add_argument("--authkey", default=None, help="varsayılan: ROUTE_BROKER_KEY")
+    args = parser.parse_args()
+
+    try:
+        authkey = broker_key(args.authkey) if args.command == "serve" or args.url.startswith("tcp:") else None
+    except RuntimeError as e:
+        parser.error(str(e))
+
+    if args.command == "serve":
+        host, port = args.bind.rsplit(":", 1)
+        server = make_server(host, int(port), authkey)
+        print(f"Broker dinliyor: tcp://{host}:{port}")
+        server.serve_forever()
+    else:
+        broker = broker_from_url(args.url, authkey)
+        print(json.dumps({"queue": broker.queue_size(), "workers": broker.workers()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,481 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+# ---------------------------------------------------------------
+# SIKIŞTIRILMIŞ GRAF DEPOSU (CompactGraph)
+#
+# networkx her kenar için ayrı Python sözlükleri tutar (kenar başına
+# yüzlerce bayt); filter_graph_by_bandwidth de istek başına G.copy() ile
+# bunu ikiye katlar. CompactGraph aynı grafı tipli dizilerde saklar:
+#
+#   node_ids         : sıralı düğüm kimlikleri (index → id), int64
+#   indptr / indices : CSR komşuluk (int64 / int32), satır içinde sıralı;
+#                      her yönsüz kenar iki yay olarak
+#   arc_edge         : yay → kenar numarası (int32); öznitelikler kenar
+#                      başına bir kez saklanır, iki yön paylaşır
+#   öznitelikler     : "float32" (varsayılan), "float64" ya da "quantized"
+#                      (uint16 + sütun başına ölçek / öteleme)
+#
+# Salt okunurdur; metrik fonksiyonlarının ve çözücülerin kullandığı
+# networkx API'sinin alt kümesini sunar: G.nodes / G.nodes[n],
+# G.edges[u, v], G.edges(data=True), G.neighbors, G.adj[u], G.has_edge,
+# number_of_nodes / number_of_edges, G.graph, G.copy. G.nodes[n] ve
+# G.edges[u, v] her çağrıda yeni bir sözlük döner (yazmak grafı
+# değiştirmez). Komşular kimlik sırasıyla gezilir.
+#
+# filter_bandwidth(min_bw) yalnızca yeni CSR dizilerini kurar, kenar
+# öznitelikleri paylaşılır. save / load tek bir ikili dosya kullanır;
+# load(mmap=True) dizileri np.memmap ile açar: sayfalar ihtiyaç oldukça
+# okunur ve aynı dosyayı açan süreçler (işçiler) belleği paylaşır.
+#
+# Canlı güncellemeler (network_updates.NetworkState) grafı yerinde
+# değiştirdiği için networkx grafı gerektirir.
+#
+#   python compact_graph.py build graph.cg --dtype quantized
+#   python compact_graph.py info graph.cg
+# ---------------------------------------------------------------
+
+# CSV sütunları → öznitelik adları (Ag_olusturma.NODE_ATTRS / EDGE_ATTRS ile aynı)
+NODE_COLUMNS = {"s_ms": "processing_delay", "r_node": "node_reliability"}
+EDGE_COLUMNS = {"capacity_mbps": "bandwidth", "delay_ms": "link_delay", "r_link": "link_reliability"}
+NODE_CSV = "BSM307_317_Guz2025_TermProject_NodeData.csv"
+EDGE_CSV = "BSM307_317_Guz2025_TermProject_EdgeData.csv"
+
+DTYPES = ("float32", "float64", "quantized")
+MAGIC = b"CGRAPH1\n"
+ALIGN = 64
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+# ---------------------------------------------------------------
+# Öznitelik sütunu: "quantized" değerler uint16 olarak saklanır,
+# değer = offset + q * scale (en büyük hata scale / 2)
+# ---------------------------------------------------------------
+class Column:
+    __slots__ = ("data", "scale", "offset")
+
+    def __init__(self, data, scale=None, offset=0.0):
+        self.data = data
+        self.scale = scale
+        self.offset = offset
+
+    @classmethod
+    def encode(cls, values, dtype="float32"):
+        values = np.asarray(values, dtype=np.float64)
+        if dtype == "quantized":
+            lo = float(values.min()) if len(values) else 0.0
+            hi = float(values.max()) if len(values) else 0.0
+            scale = (hi - lo) / 65535 or 1.0
+            return cls(np.rint((values - lo) / scale).astype(np.uint16), scale, lo)
+        if dtype not in DTYPES:
+            raise ValueError(f"Geçersiz öznitelik tipi: {dtype} ({', '.join(DTYPES)})")
+        return cls(values.astype(dtype))
+
+    def __getitem__(self, i):
+        x = float(self.data[i])
+        return x if self.scale is None else self.offset + x * self.scale
+
+    # float64 dizi (idx verilirse yalnızca o konumlar)
+    def values(self, idx=None):
+        data = (self.data if idx is None else self.data[idx]).astype(np.float64)
+        if self.scale is not None:
+            data = self.offset + data * self.scale
+        return data
+
+    @property
+    def dtype(self):
+        return "quantized" if self.scale is not None else str(self.data.dtype)
+
+
+# ---------------------------------------------------------------
+# networkx görünümlerinin (NodeView, EdgeView, AdjacencyView) salt
+# okunur karşılıkları
+# ---------------------------------------------------------------
+class NodeView:
+    def __init__(self, G):
+        self._G = G
+
+    def __call__(self, data=False):
+        if data:
+            return [(n, self._G._node_data(i)) for i, n in enumerate(self._G.ids)]
+        return self
+
+    def __iter__(self):
+        return iter(self._G.ids)
+
+    def __len__(self):
+        return self._G.n
+
+    def __contains__(self, n):
+        return self._G._index(n) >= 0
+
+    def __getitem__(self, n):
+        i = self._G._index(n)
+        if i < 0:
+            raise KeyError(n)
+        return self._G._node_data(i)
+
+
+class EdgeView:
+    def __init__(self, G, data=False):
+        self._G = G
+        self._data = data
+
+    def __call__(self, data=False):
+        return EdgeView(self._G, data)
+
+    # Her yönsüz kenar bir kez: (u, v) u'nun index'i v'ninkinden büyük değil
+    def __iter__(self):
+        G = self._G
+        ids = G.ids
+        indptr = G.indptr
+        for i in range(G.n):
+            lo, hi = int(indptr[i]), int(indptr[i + 1])
+            start = lo + int(np.searchsorted(G.indices[lo:hi], i))
+            if start == hi:
+                continue
+            u = ids[i]
+            nbrs = G.indices[start:hi].tolist()
+            if not self._data:
+                for j in nbrs:
+                    yield u, ids[j]
+                continue
+            rows = G._edge_rows(G.arc_edge[start:hi])
+            for k, j in enumerate(nbrs):
+                yield u, ids[j], {name: vals[k] for name, vals in rows}
+
+    def __len__(self):
+        return self._G.number_of_edges()
+
+    def __contains__(self, edge):
+        return self._G.has_edge(*edge)
+
+    def __getitem__(self, edge):
+        u, v = edge
+        arc = self._G._arc(u, v)
+        if arc < 0:
+            raise KeyError(edge)
+        return self._G._edge_data(int(self._G.arc_edge[arc]))
+
+
+class AdjView:
+    def __init__(self, G):
+        self._G = G
+
+    def __iter__(self):
+        return iter(self._G.ids)
+
+    def __len__(self):
+        return self._G.n
+
+    def __contains__(self, n):
+        return self._G._index(n) >= 0
+
+    def __getitem__(self, n):
+        G = self._G
+        i = G._index(n)
+        if i < 0:
+            raise KeyError(n)
+        lo, hi = int(G.indptr[i]), int(G.indptr[i + 1])
+        ids = G.ids
+        rows = G._edge_rows(G.arc_edge[lo:hi])
+        return {ids[j]: {name: vals[k] for name, vals in rows}
+                for k, j in enumerate(G.indices[lo:hi].tolist())}
+
+
+class CompactGraph:
+    def __init__(self, node_ids, indptr, indices, arc_edge, node_attrs, edge_attrs, graph=None, n_edges=None):
+        self.node_ids = node_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.arc_edge = arc_edge
+        self.node_attrs = node_attrs      # ad → Column (node_ids sırasıyla)
+        self.edge_attrs = edge_attrs      # ad → Column (kenar numarasıyla)
+        self.graph = dict(graph or {})
+        self.n = len(node_ids)
+        # Tekil (u, v) aramaları için düğüm başına Python tabloları; ilk
+        # kullanımda kurulur (düğüm sayısıyla orantılı, kenarlarla değil)
+        self._ids = None
+        self._pos = None
+        self._ptr = None
+
+        if n_edges is None:
+            # yönsüz: döngü olmayan kenar iki yay, döngü (u, u) tek yay
+            src = np.repeat(np.arange(self.n, dtype=np.int32), np.diff(indptr))
+            n_edges = (len(indices) + int(np.count_nonzero(indices == src))) // 2
+        self._n_edges = int(n_edges)
+
+        self.nodes = NodeView(self)
+        self.edges = EdgeView(self)
+        self.adj = AdjView(self)
+
+    # ---------------- kurulum ----------------
+    # node_attrs / edge_attrs: ad → değerler (node_ids / src-dst sırasıyla).
+    # Aynı kenar birden çok kez verilirse (u, v ya da v, u) sonuncusu geçerlidir.
+    @classmethod
+    def from_arrays(cls, node_ids, src, dst, node_attrs, edge_attrs, dtype="float32", graph=None):
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        order = np.argsort(node_ids, kind="stable")
+        node_ids = node_ids[order]
+        if len(node_ids) > 1 and not np.all(np.diff(node_ids)):
+            raise ValueError("Düğüm kimlikleri tekrarlanıyor.")
+        n = len(node_ids)
+        nodes = {name: Column.encode(np.asarray(vals, dtype=np.float64)[order], dtype)
+                 for name, vals in node_attrs.items()}
+
+        si = _index_of(node_ids, src)
+        di = _index_of(node_ids, dst)
+        if (si < 0).any() or (di < 0).any():
+            raise ValueError("Kenar uçlarından biri düğüm listesinde yok.")
+        keys = np.minimum(si, di) * n + np.maximum(si, di)
+        # ters çevrilmiş dizide ilk görülen = orijinalde son görülen
+        keys, last = np.unique(keys[::-1], return_index=True)
+        pick = len(si) - 1 - last
+        edges = {name: Column.encode(np.asarray(vals, dtype=np.float64)[pick], dtype)
+                 for name, vals in edge_attrs.items()}
+
+        a, b = keys // n, keys % n
+        m = len(keys)
+        loop = a == b
+        arc_src = np.concatenate([a, b[~loop]])
+        arc_dst = np.concatenate([b, a[~loop]])
+        arc_edge = np.concatenate([np.arange(m), np.flatnonzero(~loop)])
+        arc_order = np.argsort(arc_src * n + arc_dst, kind="stable")
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(arc_src, minlength=n), out=indptr[1:])
+        return cls(node_ids, indptr, arc_dst[arc_order].astype(np.int32), arc_edge[arc_order].astype(np.int32),
+                   nodes, edges, graph, n_edges=m)
+
+    @classmethod
+    def from_networkx(cls, G, dtype="float32", node_attrs=tuple(NODE_COLUMNS.values()),
+                      edge_attrs=tuple(EDGE_COLUMNS.values())):
+        nodes = list(G.nodes())
+        edges = list(G.edges(data=True))
+        return cls.from_arrays(
+            nodes, [e[0] for e in edges], [e[1] for e in edges],
+            {name: [G.nodes[n][name] for n in nodes] for name in node_attrs},
+            {name: [e[2][name] for e in edges] for name in edge_attrs},
+            dtype, graph=G.graph)
+
+    # Ag_olusturma ile aynı CSV'lerden networkx grafı kurmadan
+    @classmethod
+    def from_csv(cls, node_csv=NODE_CSV, edge_csv=EDGE_CSV, dtype="float32"):
+        import pandas as pd
+
+        node_df = pd.read_csv(node_csv, sep=";", encoding="utf-8-sig", decimal=",")
+        edge_df = pd.read_csv(edge_csv, sep=";", encoding="utf-8-sig", decimal=",")
+        return cls.from_arrays(
+            node_df["node_id"].to_numpy(), edge_df["src"].to_numpy(), edge_df["dst"].to_numpy(),
+            {name: node_df[col].to_numpy(dtype=np.float64) for col, name in NODE_COLUMNS.items()},
+            {name: edge_df[col].to_numpy(dtype=np.float64) for col, name in EDGE_COLUMNS.items()},
+            dtype, graph={"version": 0})
+
+    # ---------------- networkx API alt kümesi ----------------
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = self.node_ids.tolist()
+        return self._ids
+
+    def _index(self, n):
+        if self._pos is None:
+            self._pos = {n: i for i, n in enumerate(self.ids)}
+        try:
+            return self._pos.get(n, -1)
+        except TypeError:
+            return -1
+
+    # (u, v) yayının konumu; yay yoksa -1
+    def _arc(self, u, v):
+        i, j = self._index(u), self._index(v)
+        if i < 0 or j < 0:
+            return -1
+        if self._ptr is None:
+            self._ptr = self.indptr.tolist()
+        lo, hi = self._ptr[i], self._ptr[i + 1]
+        pos = lo + int(self.indices[lo:hi].searchsorted(j))
+        return pos if pos < hi and self.indices[pos] == j else -1
+
+    def _node_data(self, i):
+        return {name: col[i] for name, col in self.node_attrs.items()}
+
+    def _edge_data(self, e):
+        return {name: col[e] for name, col in self.edge_attrs.items()}
+
+    def _edge_rows(self, edge_idx):
+        return [(name, col.values(edge_idx).tolist()) for name, col in self.edge_attrs.items()]
+
+    def neighbors(self, n):
+        i = self._index(n)
+        if i < 0:
+            raise KeyError(n)
+        ids = self.ids
+        return iter([ids[j] for j in self.indices[self.indptr[i]:self.indptr[i + 1]].tolist()])
+
+    def has_edge(self, u, v):
+        return self._arc(u, v) >= 0
+
+    def has_node(self, n):
+        return self._index(n) >= 0
+
+    def number_of_nodes(self):
+        return self.n
+
+    def number_of_edges(self):
+        return self._n_edges
+
+    def degree_of(self, n):
+        i = self._index(n)
+        return int(self.indptr[i + 1] - self.indptr[i]) if i >= 0 else 0
+
+    def is_directed(self):
+        return False
+
+    def is_multigraph(self):
+        return False
+
+    # Diziler salt okunur olduğundan paylaşılır; yalnızca G.graph kopyalanır
+    def copy(self):
+        return self._derive(self.indptr, self.indices, self.arc_edge, self.graph, self._n_edges)
+
+    # Aynı düğümler ve öznitelikler üzerinde başka bir CSR (düğüm tabloları da paylaşılır)
+    def _derive(self, indptr, indices, arc_edge, graph, n_edges=None):
+        H = CompactGraph(self.node_ids, indptr, indices, arc_edge, self.node_attrs, self.edge_attrs,
+                         graph, n_edges)
+        H._ids, H._pos = self._ids, self._pos
+        return H
+
+    def __contains__(self, n):
+        return self._index(n) >= 0
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return self.n
+
+    # ---------------- vektörel erişim ----------------
+    # Yaylar (kaynak index, hedef index, kenar numarası) CSR sırasıyla
+    def arc_arrays(self):
+        src = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(self.indptr))
+        return src, self.indices.astype(np.int64), self.arc_edge.astype(np.int64)
+
+    # bandwidth < min_bandwidth kenarları çıkarılmış graf (Ag_olusturma.filter_graph_by_bandwidth)
+    def filter_bandwidth(self, min_bandwidth):
+        keep = (self.edge_attrs["bandwidth"].values() >= min_bandwidth)[self.arc_edge]
+        kept = np.zeros(len(keep) + 1, dtype=np.int64)
+        np.cumsum(keep, out=kept[1:])
+        return self._derive(kept[self.indptr], self.indices[keep], self.arc_edge[keep],
+                            dict(self.graph, min_bandwidth=min_bandwidth))
+
+    def nbytes(self):
+        arrays = [self.node_ids, self.indptr, self.indices, self.arc_edge]
+        arrays += [c.data for c in self.node_attrs.values()] + [c.data for c in self.edge_attrs.values()]
+        return sum(a.nbytes for a in arrays)
+
+    # ---------------- disk ----------------
+    # Biçim: MAGIC, başlık uzunluğu (uint64), JSON başlık, sonra ALIGN
+    # sınırlarına hizalı ham diziler (konumlar veri başlangıcına göre)
+    def save(self, path):
+        arrays = {"node_ids": self.node_ids, "indptr": self.indptr, "indices": self.indices,
+                  "arc_edge": self.arc_edge}
+        columns = {}
+        for kind, attrs in (("node", self.node_attrs), ("edge", self.edge_attrs)):
+            for name, col in attrs.items():
+                arrays[f"{kind}:{name}"] = col.data
+                columns[f"{kind}:{name}"] = [col.scale, col.offset]
+
+        layout, offset = {}, 0
+        for name, arr in arrays.items():
+            layout[name] = [np.dtype(arr.dtype).newbyteorder("<").str, len(arr), offset]
+            offset = _align(offset + arr.nbytes)
+        header = json.dumps({"n_edges": self._n_edges, "graph": self.graph, "columns": columns,
+                             "arrays": layout}).encode("utf-8")
+        start = _align(len(MAGIC) + 8 + len(header))
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for name, arr in arrays.items():
+                f.seek(start + layout[name][2])
+                np.ascontiguousarray(arr, dtype=layout[name][0]).tofile(f)
+            f.truncate(start + offset)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"CompactGraph dosyası değil: {path}")
+            size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(size))
+            start = _align(len(MAGIC) + 8 + size)
+
+            arrays = {}
+            for name, (dtype, length, offset) in header["arrays"].items():
+                if not length:
+                    arrays[name] = np.empty(0, dtype=dtype)
+                elif mmap:
+                    # ndarray görünümü: memmap alt sınıfının tekil erişim yükü olmasın (eşleme base'te yaşar)
+                    arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=start + offset,
+                                             shape=(length,)).view(np.ndarray)
+                else:
+                    f.seek(start + offset)
+                    arrays[name] = np.fromfile(f, dtype=dtype, count=length)
+
+        attrs = {"node": {}, "edge": {}}
+        for key, (scale, offset) in header["columns"].items():
+            kind, name = key.split(":", 1)
+            attrs[kind][name] = Column(arrays[key], scale, offset)
+        return cls(arrays["node_ids"], arrays["indptr"], arrays["indices"], arrays["arc_edge"],
+                   attrs["node"], attrs["edge"], header["graph"], header["n_edges"])
+
+
+# Düğüm kimlikleri → index (sıralı node_ids üzerinde); bulunmayanlar -1
+def _index_of(node_ids, ids):
+    ids = np.asarray(ids, dtype=np.int64)
+    if not len(node_ids):
+        return np.full(len(ids), -1, dtype=np.int64)
+    pos = np.minimum(np.searchsorted(node_ids, ids), len(node_ids) - 1)
+    return np.where(node_ids[pos] == ids, pos, -1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sıkıştırılmış graf dosyası")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="CSV'lerden graf dosyası yazar")
+    p.add_argument("out")
+    p.add_argument("--dtype", choices=DTYPES, default="float32")
+    p.add_argument("--nodes", default=NODE_CSV)
+    p.add_argument("--edges", default=EDGE_CSV)
+    p = sub.add_parser("info", help="graf dosyasının özeti")
+    p.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        G = CompactGraph.from_csv(args.nodes, args.edges, args.dtype)
+        G.save(args.out)
+    else:
+        G = CompactGraph.load(args.path)
+    print(json.dumps({
+        "nodes": G.number_of_nodes(),
+        "edges": G.number_of_edges(),
+        "attrs": {name: col.dtype for name, col in {**G.node_attrs, **G.edge_attrs}.items()},
+        "bytes": G.nbytes(),
+        "bytes_per_edge": round(G.nbytes() / max(1, G.number_of_edges()), 1),
+        "graph": G.graph,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
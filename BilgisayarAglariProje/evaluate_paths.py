@@ -0,0 +1,339 @@
+import argparse
+import contextlib
+import itertools
+import json
+import sys
+import time
+
+import numpy as np
+
+from graph_arrays import get_compiled
+
+# ---------------------------------------------------------------
+# TOPLU YOL DEĞERLENDİRME (vektörel)
+#
+# Denetleyicilerden dışa aktarılan binlerce yolu tek tek
+# total_delay / total_reliability ile hesaplamak yerine yollar
+# parçalar (chunk) hâlinde bir matrise doldurulur ve tüm metrikler
+# NumPy dizi işlemleriyle tek seferde çıkarılır:
+#   geçerlilik, delay, reliability, reliability_cost, resource_cost,
+#   ağırlıklı maliyet, darboğaz (bottleneck) ve en yüksek bandwidth.
+#
+# Sonuçlar Ag_olusturma'daki fonksiyonlarla birebir aynıdır
+# (geçerlilik is_valid_path ile aynı kurallara göre belirlenir).
+# ---------------------------------------------------------------
+
+DEFAULT_CHUNK = 8192
+
+
+# ---------------------------------------------------------------
+# Bir parça yolu (-1 ile doldurulmuş) index matrisine çevirir
+# ---------------------------------------------------------------
+def _pad(cg, paths):
+    lengths = np.fromiter((len(p) for p in paths), dtype=np.int64, count=len(paths))
+    width = max(int(lengths.max()) if len(paths) else 0, 2)
+
+    # float64 üzerinden okunur ki 2.5 gibi tam sayı olmayan düğümler sessizce kesilmesin
+    flat_f = np.fromiter(itertools.chain.from_iterable(paths), dtype=np.float64, count=int(lengths.sum()))
+    integral = np.isfinite(flat_f) & (flat_f == np.floor(flat_f))
+    flat = np.where(integral, flat_f, -1).astype(np.int64)
+    rows = np.repeat(np.arange(len(paths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    cols = np.arange(len(flat)) - np.repeat(starts, lengths)
+
+    # Grafikte olmayan düğüm → -2 (boşluk doldurma -1'den ayırmak için)
+    idx = np.where(integral, cg.index_of(flat), -1)
+    ids = np.full((len(paths), width), -1, dtype=np.int64)
+    ids[rows, cols] = np.where(idx < 0, -2, idx)
+    return ids, lengths
+
+
+# ---------------------------------------------------------------
+# Bir parça yol için tüm metrikleri hesaplar; sözlük içinde diziler döner
+# ---------------------------------------------------------------
+def evaluate_batch(cg, paths, w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+    n = len(paths)
+    if n == 0:
+        return {}
+
+    ids, lengths = _pad(cg, paths)
+    width = ids.shape[1]
+    col = np.arange(width)
+
+    node_mask = col[None, :] < lengths[:, None]
+    edge_mask = col[None, :-1] < (lengths[:, None] - 1)
+    inner_mask = (col[None, :] >= 1) & (col[None, :] < lengths[:, None] - 1)
+
+    nodes_ok = ~((ids == -2) & node_mask).any(axis=1)
+    safe_ids = np.where(ids >= 0, ids, 0)
+
+    arcs = cg.arc_index(np.where(edge_mask, ids[:, :-1], -1), np.where(edge_mask, ids[:, 1:], -1))
+    edges_ok = ~((arcs < 0) & edge_mask).any(axis=1)
+    safe_arcs = np.where(arcs >= 0, arcs, 0)
+
+    bw = np.where(edge_mask, cg.bandwidth[safe_arcs], np.nan)
+    with np.errstate(all="ignore"):
+        bottleneck = np.nanmin(np.where(edge_mask, bw, np.inf), axis=1)
+        max_bw = np.nanmax(np.where(edge_mask, bw, -np.inf), axis=1)
+
+    valid = (lengths >= 2) & nodes_ok & edges_ok
+    if min_bandwidth is not None:
+        valid &= bottleneck >= min_bandwidth
+
+    link_delay = np.where(edge_mask, cg.link_delay[safe_arcs], 0.0).sum(axis=1)
+    proc = np.where(inner_mask, cg.proc[safe_ids], 0.0).sum(axis=1)
+    delay = link_delay + proc
+
+    link_rel = np.where(edge_mask, cg.neg_log_r_link[safe_arcs], 0.0).sum(axis=1)
+    node_rel = np.where(node_mask, cg.neg_log_r_node[safe_ids], 0.0).sum(axis=1)
+    rel_cost = link_rel + node_rel
+
+    res_cost = np.where(edge_mask, cg.inv_bandwidth[safe_arcs], 0.0).sum(axis=1)
+
+    cost = w_delay * delay + w_reliability * rel_cost + w_resource * res_cost
+
+    return {
+        "valid": valid,
+        "hops": lengths - 1,
+        "delay": delay,
+        "reliability": np.exp(-rel_cost),
+        "reliability_cost": rel_cost,
+        "resource_cost": res_cost,
+        "cost": cost,
+        "bottleneck": bottleneck,
+        "max_bandwidth": max_bw,
+    }
+
+
+# ---------------------------------------------------------------
+# Sonuç satırları (NDJSON). Geçersiz yolların metrikleri null yazılır.
+#
+# Satır başına json.dumps / str.format, hesaplamanın kendisinden çok
+# daha pahalıdır (float biçimleme ~1 µs). Bu yüzden satırlar sabit
+# genişlikli bayt matrisi olarak NumPy ile üretilir: sayılar basamak
+# basamak yazılır, baştaki sıfırlar boşluk olur (JSON'da geçerli).
+# Ondalıklı alanlar 6 basamak hassasiyetle yazılır.
+# ---------------------------------------------------------------
+FLOAT_FIELDS = ("delay", "reliability", "reliability_cost", "resource_cost",
+                "cost", "bottleneck", "max_bandwidth")
+DECIMALS = 6
+
+_SPACE, _ZERO = 32, 48
+
+
+def _literal(text, n):
+    return np.broadcast_to(np.frombuffer(text.encode("ascii"), dtype=np.uint8), (n, len(text)))
+
+
+def _digits(values, width, pad=_SPACE):
+    # Negatif olmayan tam sayıları sağa yaslı basamak matrisine çevirir
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    out = (values[:, None] // powers[None, :]) % 10 + _ZERO
+    if pad != _ZERO and width > 1:
+        leading = values[:, None] < powers[None, :-1]
+        out[:, :-1][leading] = pad
+    return out.astype(np.uint8)
+
+
+def _width(values):
+    top = int(values.max()) if len(values) else 0
+    return max(len(str(top)), 1)
+
+
+def _render_float(x, invalid):
+    scale = 10 ** DECIMALS
+    q = np.rint(np.where(invalid, 0.0, x) * scale).astype(np.int64)
+    ip, fp = q // scale, q % scale
+    width = _width(ip)
+    block = np.concatenate([_digits(ip, width), _literal(".", len(x)), _digits(fp, DECIMALS, pad=_ZERO)], axis=1)
+    if invalid.any():
+        null = np.full(block.shape[1], _SPACE, dtype=np.uint8)
+        null[:4] = np.frombuffer(b"null", dtype=np.uint8)
+        block[invalid] = null
+    return block
+
+
+def _render_ids(ids):
+    n = len(ids)
+    if all(type(i) is int and i >= 0 for i in ids):
+        arr = np.array(ids, dtype=np.int64)
+        return _digits(arr, _width(arr))
+    texts = [json.dumps(i) for i in ids]
+    width = max(len(t) for t in texts)
+    raw = "".join(t.ljust(width) for t in texts).encode("utf-8")
+    if len(raw) != n * width:  # ASCII dışı karakterler: satır satır
+        return None
+    return np.frombuffer(raw, dtype=np.uint8).reshape(n, width)
+
+
+def format_rows(ids, metrics):
+    n = len(ids)
+    valid = metrics["valid"]
+    invalid = ~valid
+    id_block = _render_ids(ids)
+    if id_block is None:
+        return _format_rows_slow(ids, metrics)
+
+    blocks = [_literal('{"id":', n), id_block,
+              _literal(',"valid":', n),
+              np.where(valid[:, None], _literal("true ", n), _literal("false", n)),
+              _literal(',"hops":', n), _digits(np.maximum(metrics["hops"], 0), _width(np.maximum(metrics["hops"], 0)))]
+    for name in FLOAT_FIELDS:
+        blocks.append(_literal(f',"{name}":', n))
+        blocks.append(_render_float(metrics[name], invalid))
+    blocks.append(_literal("}\n", n))
+
+    return np.ascontiguousarray(np.concatenate(blocks, axis=1)).tobytes()
+
+
+def _format_rows_slow(ids, metrics):
+    cols = [metrics[k].tolist() for k in ("valid", "hops") + FLOAT_FIELDS]
+    lines = []
+    for pid, (ok, hops, *vals) in zip(ids, zip(*cols)):
+        row = {"id": pid, "valid": ok, "hops": max(hops, 0)}
+        row.update(zip(FLOAT_FIELDS, (round(v, DECIMALS) if ok else None for v in vals)))
+        lines.append(json.dumps(row, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# ---------------------------------------------------------------
+# Girdi ayrıştırma
+# Her kayıt ya doğrudan bir düğüm listesi [0, 2, 5] ya da
+# {"id": ..., "path": [...]} nesnesidir. id yoksa sıra numarası kullanılır.
+# ---------------------------------------------------------------
+def _record(obj, counter):
+    if type(obj) is list:
+        return next(counter), obj  # düğüm tipleri parça hâlinde kontrol edilir
+    if isinstance(obj, dict):
+        return obj.get("id", next(counter)), obj.get("path") or []
+    return next(counter), []
+
+
+# Parçada tam sayıya çevrilemeyen düğüm varsa sadece o yollar boşaltılır
+# (boş yol geçersiz sayılır)
+def _sanitize(paths):
+    clean = []
+    for path in paths:
+        ok = all(isinstance(n, (int, float)) and not isinstance(n, bool) for n in path)
+        clean.append(path if ok else [])
+    return clean
+
+
+# Ayrıştırılamayan satır akışı kesmez: sıra numarasıyla geçersiz
+# ("valid": false) bir satır olarak raporlanır
+def iter_ndjson(lines):
+    counter = itertools.count()
+    for line in lines:
+        try:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            line = line.strip()
+            if line:
+                yield _record(json.loads(line), counter)
+        except (UnicodeDecodeError, ValueError):
+            yield next(counter), []
+
+
+def iter_json(obj):
+    counter = itertools.count()
+    if isinstance(obj, dict):
+        obj = obj.get("paths", [])
+    for item in obj:
+        yield _record(item, counter)
+
+
+# ---------------------------------------------------------------
+# Akış: kayıtları chunk_size'lık parçalar hâlinde değerlendirir ve
+# her parça için NDJSON baytları üretir (bellek kullanımı sabit kalır)
+# ---------------------------------------------------------------
+def evaluate_stream(G, records, chunk_size=DEFAULT_CHUNK,
+                    w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+    cg = get_compiled(G)
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        ids = [pid for pid, _ in chunk]
+        paths = [path for _, path in chunk]
+        try:
+            metrics = evaluate_batch(cg, paths, w_delay, w_reliability, w_resource, min_bandwidth)
+        except (TypeError, ValueError, OverflowError):
+            metrics = evaluate_batch(cg, _sanitize(paths), w_delay, w_reliability, w_resource, min_bandwidth)
+        yield format_rows(ids, metrics)
+
+
+# ---------------------------------------------------------------
+# Hız testi için rastgele yürüyüş yolları (1..max_hops kenar)
+# ---------------------------------------------------------------
+def random_paths(G, count, max_hops=8, seed=42):
+    cg = get_compiled(G)
+    rng = np.random.default_rng(seed)
+    hops = rng.integers(1, max_hops + 1, size=count)
+    current = rng.integers(0, cg.n, size=count)
+    steps = [current]
+    for _ in range(max_hops):
+        deg = cg.indptr[current + 1] - cg.indptr[current]
+        pick = cg.indptr[current] + (rng.random(count) * deg).astype(np.int64)
+        current = cg.indices[pick]
+        steps.append(current)
+    walks = cg.node_ids[np.stack(steps, axis=1)].tolist()
+    return [w[:h + 1] for w, h in zip(walks, hops.tolist())]
+
+
+# ---------------------------------------------------------------
+# KOMUT SATIRI
+#   python evaluate_paths.py yollar.ndjson -o sonuc.ndjson
+#   cat yollar.json | python evaluate_paths.py - --json
+#   python evaluate_paths.py --bench 200000
+# ---------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Toplu yol metrik raporu (NDJSON çıktı)")
+    parser.add_argument("input", nargs="?", default="-", help="NDJSON/JSON dosyası ('-' → stdin)")
+    parser.add_argument("-o", "--output", default="-", help="çıktı dosyası ('-' → stdout)")
+    parser.add_argument("--json", action="store_true", help="girdi tek bir JSON dizisi/nesnesi")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--w-delay", type=float, default=0.33)
+    parser.add_argument("--w-rel", type=float, default=0.33)
+    parser.add_argument("--w-res", type=float, default=0.34)
+    parser.add_argument("--min-bandwidth", type=float, default=None)
+    parser.add_argument("--bench", type=int, default=None, help="N rastgele yol ile hız testi")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size en az 1 olmalıdır.")
+
+    # Graf yükleme mesajları NDJSON çıktısına karışmasın
+    with contextlib.redirect_stdout(sys.stderr):
+        import Ag_olusturma as ag
+    G = ag.G
+
+    weights = dict(w_delay=args.w_delay, w_reliability=args.w_rel, w_resource=args.w_res,
+                   min_bandwidth=args.min_bandwidth)
+
+    if args.bench:
+        paths = random_paths(G, args.bench)
+        get_compiled(G)
+        t0 = time.perf_counter()
+        total = sum(len(chunk) for chunk in evaluate_stream(G, iter_json(paths), args.chunk_size, **weights))
+        dt = time.perf_counter() - t0
+        print(f"{args.bench} yol, {dt:.3f} s → {args.bench / dt:,.0f} yol/s ({total / 1e6:.1f} MB çıktı)",
+              file=sys.stderr)
+        return
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        records = iter_json(json.load(src)) if args.json else iter_ndjson(src)
+        for chunk in evaluate_stream(G, records, args.chunk_size, **weights):
+            out.write(chunk)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+
+
+if __name__ == "__main__":
+    main()
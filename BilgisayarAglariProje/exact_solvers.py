@@ -0,0 +1,184 @@
+import numpy as np
+
+import Ag_olusturma as ag
+from graph_arrays import get_compiled
+
+# ---------------------------------------------------------------
+# HOP SINIRLI KESİN ÇÖZÜCÜ (Bellman-Ford DP)
+#
+# GA max_hops=6 ile, find_all_paths max_hops=10 ile çalışır; hop sınırlı
+# en iyi yolu bulmanın tek kesin yolu tüm basit yolları saymaktı (üstel).
+#
+# dist[k][v] = kaynaktan v'ye en fazla k yay kullanan en düşük maliyet
+#   dist[0]    : kaynakta 0, diğerlerinde ∞
+#   dist[k][v] = min(dist[k-1][v], min_u dist[k-1][u] + c(u, v))
+#
+# Her hop tek bir NumPy gevşetmesidir: yay adayları dist[k-1][src] + c
+# hedef düğüme göre gruplanıp minimum.reduceat ile indirgenir. Maliyetler
+# pozitif olduğundan en iyi yürüyüş döngü içermez (basit yoldur).
+#
+# Tek solve(source, H) çağrısı tüm hedefler ve tüm 1..H sınırları için
+# en iyi yolu verir; bandwidth eşiğinin altındaki yaylar ∞ maliyetlidir.
+# Yol maliyeti weighted_sum_method ile aynıdır (yay maliyetleri toplamı +
+# kaynak/hedefe bağlı sabit, bkz. path_cost_offset).
+# ---------------------------------------------------------------
+
+DEFAULT_MAX_HOPS = 6
+
+
+class HopLimitedSolver:
+    def __init__(self, G, w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+        self.G = G
+        self.weights = (w_delay, w_reliability, w_resource)
+        self.cg = cg = get_compiled(G)
+
+        self.arc_cost = cg.arc_costs(w_delay, w_reliability, w_resource)
+        if min_bandwidth:
+            self.arc_cost = np.where(cg.bandwidth >= min_bandwidth, self.arc_cost, np.inf)
+
+        # Yaylar hedef düğüme göre gruplanır (reduceat için)
+        self._by_dst = np.argsort(cg.dst, kind="stable")
+        dst_sorted = cg.dst[self._by_dst]
+        self._has_in = np.bincount(cg.dst, minlength=cg.n) > 0
+        self._starts = np.flatnonzero(np.r_[True, dst_sorted[1:] != dst_sorted[:-1]]) if cg.m else np.array([], dtype=np.int64)
+        self._dst_sorted = dst_sorted
+
+        self.source = None
+        self.dist = None   # (H + 1, N)
+        self.pred = None   # (H + 1, N): k. seviyede v'nin öncülü (index, -1: yok)
+
+    def solve(self, source, max_hops=DEFAULT_MAX_HOPS):
+        cg = self.cg
+        s = int(cg.index_of([source])[0])
+        if s < 0:
+            raise KeyError(f"Düğüm yok: {source}")
+
+        dist = np.full((max_hops + 1, cg.n), np.inf)
+        pred = np.full((max_hops + 1, cg.n), -1, dtype=np.int64)
+        dist[0][s] = 0.0
+
+        src_sorted = cg.src[self._by_dst]
+        cost_sorted = self.arc_cost[self._by_dst]
+        pos = np.arange(cg.m)
+
+        for k in range(1, max_hops + 1):
+            prev = dist[k - 1]
+            cand = prev[src_sorted] + cost_sorted
+
+            best = np.full(cg.n, np.inf)
+            best[self._has_in] = np.minimum.reduceat(cand, self._starts)
+            # Her düğüm için en iyi gelen yayın konumu (eşitlikte ilk yay)
+            first = np.minimum.reduceat(np.where(cand == best[self._dst_sorted], pos, cg.m), self._starts)
+
+            improved = best < prev
+            dist[k] = np.where(improved, best, prev)
+            pred[k] = pred[k - 1]
+            arrive = np.zeros(cg.n, dtype=np.int64)
+            arrive[self._has_in] = src_sorted[np.minimum(first, cg.m - 1)]
+            pred[k][improved] = arrive[improved]
+
+            # Bu hop'ta hiçbir düğüm iyileşmediyse sonraki hop'lar da aynıdır
+            if not improved.any():
+                dist[k + 1:] = dist[k]
+                pred[k + 1:] = pred[k]
+                break
+
+        self.source = source
+        self.source_idx = s
+        self.dist = dist
+        self.pred = pred
+        return self
+
+    @property
+    def max_hops(self):
+        return 0 if self.dist is None else len(self.dist) - 1
+
+    def get_best_path(self, target, max_hops=None):
+        k = self.max_hops if max_hops is None else min(max_hops, self.max_hops)
+        t = int(self.cg.index_of([target])[0])
+        if t < 0 or not np.isfinite(self.dist[k][t]):
+            return None
+
+        path = [t]
+        v = t
+        while v != self.source_idx:
+            v = int(self.pred[k][v])
+            k -= 1
+            if v < 0 or k < 0 or v in path:
+                return None
+            path.append(v)
+        path.reverse()
+        return [int(n) for n in self.cg.node_ids[path]]
+
+    def path_cost(self, target, max_hops=None):
+        k = self.max_hops if max_hops is None else min(max_hops, self.max_hops)
+        t = int(self.cg.index_of([target])[0])
+        if t < 0 or not np.isfinite(self.dist[k][t]):
+            return None
+        return float(self.dist[k][t]) + ag.path_cost_offset(self.G, self.source, target, *self.weights)
+
+    # 1..H her hop sınırı için en iyi yol; sınır arttıkça maliyet düşmüyorsa
+    # yol aynıdır (None: o sınırla hedefe ulaşılamıyor)
+    def paths_by_hops(self, target):
+        return [(k, self.get_best_path(target, k)) for k in range(1, self.max_hops + 1)]
+
+
+def hop_limited_path(G, source, target, max_hops=DEFAULT_MAX_HOPS,
+                     w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+    solver = HopLimitedSolver(G, w_delay, w_reliability, w_resource, min_bandwidth).solve(source, max_hops)
+    return solver.get_best_path(target)
+
+
+# ---------------------------------------------------------------
+# Derlenmiş graf üzerinde, verilen yay maliyetleriyle (inf: yay yok) tek
+# kökten en kısa yollar. Hop sınırı yoktur; gevşetmeler değişiklik
+# kalmayınca (en fazla N - 1 turda) durur.
+#   toward_root=False → kökten tüm düğümlere: dist, pred (öncül index)
+#   toward_root=True  → tüm düğümlerden köke: dist, next (sonraki index)
+# Maliyetler pozitif olmalıdır.
+# ---------------------------------------------------------------
+def vector_shortest_paths(cg, arc_cost, root_idx, toward_root=False):
+    if toward_root:
+        # Yaylar zaten kuyruk (src) sırasında: CSR doğrudan kullanılır
+        order = np.arange(cg.m)
+        head, tail = cg.src, cg.dst
+    else:
+        order = np.argsort(cg.dst, kind="stable")
+        head, tail = cg.dst[order], cg.src[order]
+    cost = arc_cost[order]
+
+    has_arcs = np.bincount(head, minlength=cg.n) > 0
+    starts = np.flatnonzero(np.r_[True, head[1:] != head[:-1]])
+    pos = np.arange(cg.m)
+
+    dist = np.full(cg.n, np.inf)
+    link = np.full(cg.n, -1, dtype=np.int64)
+    dist[root_idx] = 0.0
+
+    for _ in range(max(1, cg.n - 1)):
+        cand = dist[tail] + cost
+        best = np.full(cg.n, np.inf)
+        best[has_arcs] = np.minimum.reduceat(cand, starts)
+        improved = best < dist
+        if not improved.any():
+            break
+        first = np.minimum.reduceat(np.where(cand == best[head], pos, cg.m), starts)
+        via = np.full(cg.n, -1, dtype=np.int64)
+        via[has_arcs] = tail[np.minimum(first, cg.m - 1)]
+        dist = np.where(improved, best, dist)
+        link = np.where(improved, via, link)
+
+    return dist, link
+
+
+# dist / link dizilerinden kök ile node arasındaki yolu index listesi olarak çıkarır
+def trace_path(link, root_idx, node_idx, toward_root=False):
+    path = [node_idx]
+    while path[-1] != root_idx:
+        nxt = int(link[path[-1]])
+        if nxt < 0 or nxt in path:
+            return None
+        path.append(nxt)
+    if not toward_root:
+        path.reverse()
+    return path
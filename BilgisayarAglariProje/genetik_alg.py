@@ -1,11 +1,21 @@
+import math
 import random
+
+import numpy as np
+
+import kernels
 from Ag_olusturma import (
     G,
     is_valid_path,
     total_delay,
     total_reliability,
-    weighted_sum_method
+    weighted_sum_method,
+    make_deadline,
+    time_is_up,
+    is_significant_improvement
 )
+from lower_bounds import get_goal_bounds
+from qos_routing import make_guard
 
 # ------------------------------------------------
 # Yolun darboğaz (minimum) bandwidth'ini hesaplar
@@ -62,11 +72,21 @@ def cost_with_weights(path, G, w_delay, w_reliability, w_resource):
 # ---------------------------------------------
 # Rastgele yol üretme
 # (Basit random walk; hedefe ulaşırsa döner)
+# bounds (lower_bounds.GoalBounds) verilirse yürüyüş hedefe yönlüdür:
+# sadece bandwidth'i yeten, ziyaret edilmemiş ve kalan hop içinde hedefe
+# ulaşabilen komşulara gidilir; seçim 1 / (kenar + hedefe alt sınır)
+# ağırlıklıdır.
+# guard (qos_routing.QoSGuard) verilirse gecikme / güvenilirlik kısıtını
+# artık sağlayamayacak adımlar yol tamamlanmadan reddedilir.
 # ---------------------------------------------
-def random_path(source, target, G, max_hops=6):
+def random_path(source, target, G, max_hops=6, bounds=None, guard=None):
+    if bounds is not None:
+        return guided_random_path(source, target, max_hops, bounds, guard)
+
     for _ in range(30):  # 30 deneme hakkı
         path = [source]
         current = source
+        state = guard.start() if guard is not None else None
 
         for _ in range(max_hops):
             neighbors = list(G.neighbors(current))
@@ -74,6 +94,10 @@ def random_path(source, target, G, max_hops=6):
                 break
 
             next_node = random.choice(neighbors)
+            if guard is not None:
+                state = guard.step(state, current, next_node)
+                if state is None:
+                    break  # QoS kısıtı artık sağlanamaz: bu deneme bırakılır
             path.append(next_node)
             current = next_node
 
@@ -83,24 +107,91 @@ def random_path(source, target, G, max_hops=6):
     return None
 
 
+def guided_random_path(source, target, max_hops, bounds, guard=None):
+    if not bounds.can_reach(source, max_hops):
+        return None
+
+    path = [source]
+    visited = {source}
+    current = source
+    state = guard.start() if guard is not None else None
+    while current != target:
+        hops_left = max_hops - (len(path) - 1) - 1
+        neighbors, weights = bounds.guide(current)
+        options = [(v, w) for v, w in zip(neighbors, weights)
+                   if v not in visited and bounds.can_reach(v, hops_left)]
+        if guard is not None:
+            options = [(v, w) for v, w in options if guard.step(state, current, v) is not None]
+        # Hedefe her zaman en az bir kısa komşu kalır; bu sadece döngüsüz
+        # kalma şartı (ya da QoS kısıtı) yüzünden tükenirse olur
+        if not options:
+            return None
+        nxt = random.choices([v for v, _ in options], weights=[w for _, w in options], k=1)[0]
+        if guard is not None:
+            state = guard.step(state, current, nxt)
+        current = nxt
+        path.append(current)
+        visited.add(current)
+    return path
+
+
+def qos_ok(path, guard):
+    return guard is None or guard.path_ok(path)
+
+
 # ---------------------------------------------
 # Popülasyon oluşturma (bandwidth kısıtı dahil)
 # ---------------------------------------------
-def create_population(size, source, target, G, demand_bw, max_hops=6):
+def create_population(size, source, target, G, demand_bw, max_hops=6, deadline=None, bounds=None, guard=None):
+    if guard is None and kernels.enabled():
+        population = _population_kernel(size, source, target, G, demand_bw, max_hops, bounds)
+        if population is not None:
+            return population
+
     population = []
     tries = 0
     max_tries = size * 200  # güvenlik: sonsuz döngü olmasın
 
     while len(population) < size and tries < max_tries:
+        # Süre dolduysa o ana kadar bulunan bireylerle devam edilir
+        # (hiç birey yoksa genetic_algorithm None döner)
+        if time_is_up(deadline):
+            break
         tries += 1
-        p = random_path(source, target, G, max_hops=max_hops)
+        p = random_path(source, target, G, max_hops=max_hops, bounds=bounds, guard=guard)
 
-        if p is not None and is_valid_path(p, G, min_bandwidth=demand_bw):
+        if p is not None and is_valid_path(p, G, min_bandwidth=demand_bw) and qos_ok(p, guard):
             population.append(p)
 
     return population
 
 
+# Derlenmiş çekirdekle popülasyon (kernels.ga_population): random_path /
+# guided_random_path + is_valid_path aynı sırayla; aynı seed ile Python
+# döngüsüyle birebir aynı bireyler. Çekirdek süre bütçesine bakmaz
+# (tüm popülasyon milisaniyeler içinde kurulur).
+def _population_kernel(size, source, target, G, demand_bw, max_hops, bounds):
+    if source not in G or target not in G:
+        return None
+    kg = kernels.kernel_graph(G)
+    if bounds is not None:
+        guide = kernels.guide_tables(kg, bounds)
+        if guide is None:
+            return None
+    else:
+        empty = np.zeros(0, dtype=np.int64)
+        guide = (np.zeros(kg.n + 1, dtype=np.int64), empty, np.zeros(0), empty, np.zeros(kg.n))
+
+    paths = np.empty((size, max_hops + 1), dtype=np.int64)
+    lengths = np.empty(size, dtype=np.int64)
+    with kernels.python_rng() as mt:
+        count, _ = kernels.ga_population(
+            mt, size, size * 200, kg.index[source], kg.index[target], max_hops, bounds is not None,
+            kg.ptr, kg.nbr, guide[0], guide[1], guide[2], guide[3], guide[4], kg.bandwidth,
+            -math.inf if demand_bw is None else float(demand_bw), paths, lengths)
+    return [kg.ids(paths[i, :lengths[i]].tolist()) for i in range(count)]
+
+
 # ---------------------------------------------
 # Fitness (bandwidth kısıtı + kullanıcı ağırlıkları dahil)
 # ---------------------------------------------
@@ -166,15 +257,24 @@ def mutate(path, G, rate=0.2):
 
 # ---------------------------------------------
 # GENETİK ALGORİTMA (demand_bw + ağırlıklar eklendi)
+# deadline: süre dolunca (nesil ortasında da) o ana kadarki en iyi yol döner
+# tol / max_no_improve: en iyi maliyet max_no_improve nesil boyunca
+#   tol oranından fazla iyileşmezse erken durulur (None → kapalı)
 # ---------------------------------------------
 def genetic_algorithm(source, target, G, demand_bw,
                       w_delay, w_reliability, w_resource,
                       pop_size=40,
                       generations=100,
                       mutation_rate=0.2,
-                      max_hops=6):
+                      max_hops=6,
+                      deadline=None,
+                      tol=0.0,
+                      max_no_improve=None,
+                      bounds=None,
+                      guard=None):
 
-    population = create_population(pop_size, source, target, G, demand_bw, max_hops=max_hops)
+    population = create_population(pop_size, source, target, G, demand_bw, max_hops=max_hops, deadline=deadline,
+                                   bounds=bounds, guard=guard)
 
     # Hiç uygun yol üretilmediyse
     if not population:
@@ -183,12 +283,27 @@ def genetic_algorithm(source, target, G, demand_bw,
     best_path = None
     best_fit = 0
 
+    # Başlangıç popülasyonundaki en iyi birey (süre hemen biterse bile bir cevap olsun)
+    for path in population:
+        f = fitness(path, G, demand_bw, w_delay, w_reliability, w_resource)
+        if f > best_fit:
+            best_fit = f
+            best_path = path
+
+    no_improve_count = 0
+
     for gen in range(generations):
+        if time_is_up(deadline):
+            print(f"Deadline reached at generation {gen}")
+            break
+
         new_pop = []
         tries = 0
         max_tries = pop_size * 200  # güvenlik
 
         while len(new_pop) < pop_size and tries < max_tries:
+            if time_is_up(deadline):
+                break
             tries += 1
 
             p1 = tournament_selection(population, G, demand_bw, w_delay, w_reliability, w_resource)
@@ -197,7 +312,8 @@ def genetic_algorithm(source, target, G, demand_bw,
             child = crossover(p1, p2, G)
             child = mutate(child, G, mutation_rate)
 
-            if is_valid_path(child, G, min_bandwidth=demand_bw):
+            # QoS kısıtını ihlal eden çocuk fitness hesaplanmadan elenir
+            if is_valid_path(child, G, min_bandwidth=demand_bw) and qos_ok(child, guard):
                 new_pop.append(child)
 
         if not new_pop:
@@ -205,6 +321,8 @@ def genetic_algorithm(source, target, G, demand_bw,
 
         population = new_pop
 
+        prev_cost = 1 / best_fit - 1 if best_fit > 0 else float("inf")
+
         for path in population:
             f = fitness(path, G, demand_bw, w_delay, w_reliability, w_resource)
             if f > best_fit:
@@ -213,12 +331,24 @@ def genetic_algorithm(source, target, G, demand_bw,
 
         print(f"Generation {gen + 1}: Best fitness = {best_fit}")
 
+        # Yakınsama kontrolü (fitness = 1 / (1 + cost))
+        if max_no_improve is not None:
+            new_cost = 1 / best_fit - 1 if best_fit > 0 else float("inf")
+            if is_significant_improvement(new_cost, prev_cost, tol):
+                no_improve_count = 0
+            else:
+                no_improve_count += 1
+                if no_improve_count >= max_no_improve:
+                    print(f"Early stop at generation {gen + 1}")
+                    break
+
     return best_path, best_fit
 
 
 # ---------------------------------------------
 # ARAYÜZCÜNÜN KULLANACAĞI FONKSİYON
 # Kullanıcı ağırlıkları buradan verilir
+# graph: üzerinde çalışılacak graf (None → Ag_olusturma.G)
 # ---------------------------------------------
 def run_ga(source, target, demand_bw,
            w_delay=0.33, w_reliability=0.33, w_resource=0.34,
@@ -226,7 +356,18 @@ def run_ga(source, target, demand_bw,
            pop_size=40,
            generations=100,
            mutation_rate=0.2,
-           max_hops=6):
+           max_hops=6,
+           deadline_ms=None,
+           tol=0.0,
+           max_no_improve=None,
+           goal_directed=True,
+           max_delay=None,
+           min_reliability=None,
+           graph=None):
+
+    deadline = make_deadline(deadline_ms)
+    if graph is None:
+        graph = G
 
     # Demand doğrulama
     try:
@@ -257,30 +398,50 @@ def run_ga(source, target, demand_bw,
             "weights": {"w_delay": w_delay, "w_reliability": w_reliability, "w_resource": w_resource}
         }
 
+    # Hedefe yönlü başlangıç popülasyonu (demand'i karşılamayan kenarlar hariç)
+    bounds = get_goal_bounds(graph, target, w_delay, w_reliability, w_resource, min_bandwidth=demand_bw) \
+        if goal_directed else None
+
+    # Gecikme / güvenilirlik kısıtları (verilmediyse None)
+    guard = make_guard(graph, source, target, max_delay, min_reliability, min_bandwidth=demand_bw)
+    if guard is not None and not guard.can_start(source):
+        return {
+            "best_path": None,
+            "fitness": 0,
+            "error": "QoS kısıtlarını (max_delay / min_reliability) sağlayan yol yok.",
+            "weights": {"w_delay": w_delay, "w_reliability": w_reliability, "w_resource": w_resource}
+        }
+
     best_path, best_fit = genetic_algorithm(
         source,
         target,
-        G,
+        graph,
         demand_bw,
         w_delay, w_reliability, w_resource,
         pop_size,
         generations,
         mutation_rate,
-        max_hops
+        max_hops,
+        deadline=deadline,
+        tol=tol,
+        max_no_improve=max_no_improve,
+        bounds=bounds,
+        guard=guard
     )
 
     if best_path is None:
         return {
             "best_path": None,
             "fitness": 0,
-            "error": f"Uygun bandwidth sağlayan yol bulunamadı (demand={demand_bw} Mbps).",
+            "error": f"Uygun bandwidth sağlayan yol bulunamadı (demand={demand_bw} Mbps); "
+                     f"demand birden çok yola bölünebilir (algorithm=Multipath).",
             "weights": {"w_delay": w_delay, "w_reliability": w_reliability, "w_resource": w_resource}
         }
 
-    delay = total_delay(best_path, G)
-    reliability = total_reliability(best_path, G)
-    cost = cost_with_weights(best_path, G, w_delay, w_reliability, w_resource)
-    min_bw = path_min_bandwidth(best_path, G)
+    delay = total_delay(best_path, graph)
+    reliability = total_reliability(best_path, graph)
+    cost = cost_with_weights(best_path, graph, w_delay, w_reliability, w_resource)
+    min_bw = path_min_bandwidth(best_path, graph)
 
     return {
         "best_path": best_path,
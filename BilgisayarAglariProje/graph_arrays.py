@@ -0,0 +1,162 @@
+import threading
+
+import numpy as np
+
+from compact_graph import CompactGraph
+
+# ---------------------------------------------------------------
+# DERLENMİŞ GRAF (NumPy dizileri)
+#
+# networkx grafı her kenar için ayrı Python sözlüğü tutar; toplu
+# hesaplarda (binlerce yol, vektörel Bellman sweep'leri vb.) bu yavaştır.
+# CompiledGraph aynı bilgiyi tipli dizilere çevirir:
+#
+#   node_ids      : sıralı düğüm kimlikleri (index → id)
+#   proc, r_node  : düğüm işlem gecikmesi ve güvenilirliği
+#   indptr/indices: CSR komşuluk (her yönsüz kenar iki yönlü yay olarak)
+#   edge_keys     : u_idx * N + v_idx (sıralı) → yay araması searchsorted ile
+#   bandwidth, link_delay, r_link : yay öznitelikleri (edge_keys sırasıyla)
+#
+# Küçük/orta graflarda (N² ≤ DENSE_LIMIT) id → index ve (u, v) → yay
+# aramaları için ayrıca doğrudan erişim tabloları tutulur; rastgele
+# searchsorted yerine tek bir dizi okuması yapılır.
+#
+# get_compiled(G) sonucu graf sürümüne göre önbelleğe alır; canlı
+# güncellemeden sonra (G.graph["version"] değişince) yeniden derlenir.
+# ---------------------------------------------------------------
+
+
+DENSE_LIMIT = 1 << 22
+
+
+class CompiledGraph:
+    def __init__(self, G):
+        self.version = G.graph.get("version", 0)
+
+        if isinstance(G, CompactGraph):
+            self._init_compact(G)
+            return
+
+        self.node_ids = np.array(sorted(G.nodes()), dtype=np.int64)
+        self.n = len(self.node_ids)
+        self.proc = np.array([G.nodes[n]["processing_delay"] for n in self.node_ids], dtype=np.float64)
+        self.r_node = np.array([G.nodes[n]["node_reliability"] for n in self.node_ids], dtype=np.float64)
+        self._init_node_table()
+
+        src, dst, bw, delay, rel = [], [], [], [], []
+        for u, v, data in G.edges(data=True):
+            for a, b in ((u, v), (v, u)):
+                src.append(a)
+                dst.append(b)
+                bw.append(data["bandwidth"])
+                delay.append(data["link_delay"])
+                rel.append(data["link_reliability"])
+
+        src_idx = self.index_of(np.array(src, dtype=np.int64))
+        dst_idx = self.index_of(np.array(dst, dtype=np.int64))
+        keys = src_idx * self.n + dst_idx
+        order = np.argsort(keys, kind="stable")
+
+        self.edge_keys = keys[order]
+        self.src = src_idx[order]
+        self.dst = dst_idx[order]
+        self.bandwidth = np.array(bw, dtype=np.float64)[order]
+        self.link_delay = np.array(delay, dtype=np.float64)[order]
+        self.r_link = np.array(rel, dtype=np.float64)[order]
+        self._init_arrays()
+
+    # CompactGraph zaten CSR: yaylar (kaynak, hedef) sırasıyla, Python döngüsü olmadan alınır
+    def _init_compact(self, G):
+        self.node_ids = np.asarray(G.node_ids, dtype=np.int64)
+        self.n = len(self.node_ids)
+        self.proc = G.node_attrs["processing_delay"].values()
+        self.r_node = G.node_attrs["node_reliability"].values()
+        self._init_node_table()
+
+        self.src, self.dst, edge = G.arc_arrays()
+        self.edge_keys = self.src * self.n + self.dst
+        self.bandwidth = G.edge_attrs["bandwidth"].values(edge)
+        self.link_delay = G.edge_attrs["link_delay"].values(edge)
+        self.r_link = G.edge_attrs["link_reliability"].values(edge)
+        self._init_arrays()
+
+    def _init_node_table(self):
+        # id → index doğrudan erişim tablosu (kimlikler yeterince sıkışıksa)
+        self._node_table = None
+        max_id = int(self.node_ids.max()) if self.n else -1
+        if 0 <= self.node_ids.min(initial=0) and max_id < 4 * self.n + 1024:
+            self._node_table = np.full(max_id + 1, -1, dtype=np.int64)
+            self._node_table[self.node_ids] = np.arange(self.n)
+
+    def _init_arrays(self):
+        # CSR: yaylar kaynak düğüme göre sıralı olduğundan indptr doğrudan çıkar
+        self.indptr = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.src, minlength=self.n), out=self.indptr[1:])
+        self.indices = self.dst
+
+        # Metriklerde tekrar tekrar kullanılan türetilmiş diziler
+        self.neg_log_r_node = -np.log(self.r_node)
+        self.neg_log_r_link = -np.log(self.r_link)
+        self.inv_bandwidth = 1000.0 / self.bandwidth
+
+        # (u, v) → yay doğrudan erişim tablosu (yeterince küçükse)
+        self._arc_table = None
+        if self.n * self.n <= DENSE_LIMIT:
+            self._arc_table = np.full(self.n * self.n, -1, dtype=np.int64)
+            self._arc_table[self.edge_keys] = np.arange(self.m)
+
+    @property
+    def m(self):
+        return len(self.edge_keys)
+
+    # Düğüm kimliklerini index'e çevirir; grafikte olmayanlar -1 olur
+    def index_of(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        if self._node_table is not None:
+            inside = (ids >= 0) & (ids < len(self._node_table))
+            return np.where(inside, self._node_table[np.where(inside, ids, 0)], -1)
+        pos = np.searchsorted(self.node_ids, ids)
+        pos = np.minimum(pos, self.n - 1)
+        found = self.node_ids[pos] == ids
+        return np.where(found, pos, -1)
+
+    # (u_idx, v_idx) yaylarının dizi konumları; yay yoksa -1
+    def arc_index(self, u_idx, v_idx):
+        u_idx = np.asarray(u_idx, dtype=np.int64)
+        v_idx = np.asarray(v_idx, dtype=np.int64)
+        keys = u_idx * self.n + v_idx
+        if self._arc_table is not None:
+            inside = (u_idx >= 0) & (v_idx >= 0)
+            return np.where(inside, self._arc_table[np.where(inside, keys, 0)], -1)
+        pos = np.searchsorted(self.edge_keys, keys)
+        pos = np.minimum(pos, self.m - 1)
+        found = (self.edge_keys[pos] == keys) & (u_idx >= 0) & (v_idx >= 0)
+        return np.where(found, pos, -1)
+
+    # Yönlü yay maliyetleri (Ag_olusturma.directed_edge_cost'un vektörel hâli)
+    def arc_costs(self, w_delay=0.33, w_reliability=0.33, w_resource=0.34):
+        v = self.dst
+        delay = self.link_delay + self.proc[v]
+        rel = self.neg_log_r_link + self.neg_log_r_node[v]
+        return w_delay * delay + w_reliability * rel + w_resource * self.inv_bandwidth
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_compiled(G):
+    version = G.graph.get("version", 0)
+    key = id(G)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] is G and entry[1].version == version:
+            return entry[1]
+
+    compiled = CompiledGraph(G)
+    with _cache_lock:
+        # Kısa ömürlü filtre kopyaları birikmesin: sadece son birkaç graf tutulur
+        if len(_cache) >= 8:
+            _cache.pop(next(iter(_cache)))
+        _cache[key] = (G, compiled)
+    return compiled
@@ -0,0 +1,26 @@
+import os
+
+# ---------------------------------------------------------------
+# gunicorn -c gunicorn.conf.py wsgi:application
+#
+# Tek web süreci + thread'ler: canlı ağ güncellemeleri (PATCH/DELETE
+# /network/...), rota önbelleği ve routing table'lar süreç belleğinde
+# tutulur. Birden fazla web süreci açılırsa (WEB_WORKERS > 1) her süreç
+# kendi kopyasını tutar ve bir güncelleme yalnızca isteği alan süreçte
+# görünür. CPU paralelliği web süreçlerinden değil, wsgi.py'nin açtığı
+# çözücü süreç havuzundan (ROUTE_WORKERS) gelir.
+# ---------------------------------------------------------------
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# Graf master süreçte bir kez yüklenir, web süreçleri fork ile paylaşır
+preload_app = True
+
+workers = int(os.environ.get("WEB_WORKERS", "1"))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", "16"))
+
+# Uzun süre bütçeli (deadline_ms) istekler için
+timeout = int(os.environ.get("WEB_TIMEOUT", "120"))
+graceful_timeout = 30
@@ -0,0 +1,338 @@
+import hashlib
+import heapq
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from graph_arrays import get_compiled
+
+# ---------------------------------------------------------------
+# HUB LABEL İNDEKSİ (Pruned Landmark Labeling, yönlü)
+#
+# Büyük topolojilerde istek başına Dijkstra bile etkileşimli kullanım
+# için yavaştır. Bir ağırlık profili ve bandwidth eşiği için bir kez
+# ön işlem yapılır, sonra her nokta-nokta sorgu iki küçük etiketin
+# kesişimidir (mikrosaniyeler):
+#
+#   out[u] = {hub: dist(u → hub)},  in[v] = {hub: dist(hub → v)}
+#   dist(u → v) = min_h out[u][h] + in[v][h]
+#
+# Etiketler düğümler dereceye göre (büyükten küçüğe) sırayla hub
+# seçilerek kurulur: her hub'dan ileri ve geri Dijkstra yapılır, o ana
+# kadarki etiketlerle zaten aynı ya da daha kısa mesafe bulunan
+# düğümlerde arama budanır (pruning). Bu graf gibi yoğun, küçük çaplı
+# ağlarda etiketler kısa kalır. (Contraction hierarchy'de her düğüm
+# ~100 komşu çiftiyle kısayol üretirdi; sorgu da iki Dijkstra olurdu.)
+#
+# Yol çıkarma: her etiket girdisi hub'a doğru bir sonraki düğümü
+# (out) / hub'dan önceki düğümü (in) de tutar; budanmamış bir düğümün
+# arama ağacındaki ebeveyni de aynı hub'ı etiketinde taşır.
+#
+# Maliyetler directed_edge_cost'tur (graph_arrays.arc_costs); yol
+# maliyeti = mesafe + path_cost_offset (kaynak / hedef düğüm sabitleri).
+#
+# İndeks diske (HUB_INDEX_DIR, .npz) graf içeriği + ağırlık + bandwidth
+# parmak iziyle yazılır; sunucu yeniden açıldığında tekrar kurulmaz.
+# ---------------------------------------------------------------
+
+INF = float("inf")
+INDEX_DIR = os.environ.get("HUB_INDEX_DIR", "hub_index")
+
+
+# Derlenmiş graf + profil için içerik parmak izi (graf sürümü yeniden
+# başlatmada sıfırlandığından disk anahtarı olarak içerik kullanılır)
+def index_fingerprint(cg, w_delay, w_reliability, w_resource, min_bandwidth):
+    h = hashlib.sha1()
+    for arr in (cg.node_ids, cg.src, cg.dst, cg.bandwidth, cg.link_delay, cg.r_link, cg.proc, cg.r_node):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    h.update(repr((round(w_delay, 6), round(w_reliability, 6), round(w_resource, 6),
+                   round(min_bandwidth or 0, 6))).encode())
+    return h.hexdigest()[:20]
+
+
+class HubLabelIndex:
+    def __init__(self, node_ids, out_dist, out_link, in_dist, in_link, src_offset, dst_offset, meta):
+        self.node_ids = node_ids
+        self.index = {int(n): i for i, n in enumerate(node_ids)}
+        self.out_dist, self.out_link = out_dist, out_link
+        self.in_dist, self.in_link = in_dist, in_link
+        self.src_offset = src_offset
+        self.dst_offset = dst_offset
+        self.meta = meta
+        sizes = [len(d) for d in out_dist] + [len(d) for d in in_dist]
+        self.avg_label = round(sum(sizes) / max(len(sizes), 1), 2)
+        self.max_label = max(sizes, default=0)
+
+    # ---------------- kurulum ----------------
+    @classmethod
+    def build(cls, G, w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+        t0 = time.perf_counter()
+        cg = get_compiled(G)
+        cost = cg.arc_costs(w_delay, w_reliability, w_resource)
+        keep = cg.bandwidth >= min_bandwidth if min_bandwidth else np.ones(cg.m, dtype=bool)
+
+        out_adj = [[] for _ in range(cg.n)]
+        in_adj = [[] for _ in range(cg.n)]
+        for u, v, c in zip(cg.src[keep].tolist(), cg.dst[keep].tolist(), cost[keep].tolist()):
+            out_adj[u].append((v, c))
+            in_adj[v].append((u, c))
+
+        out_dist = [{} for _ in range(cg.n)]
+        out_link = [{} for _ in range(cg.n)]
+        in_dist = [{} for _ in range(cg.n)]
+        in_link = [{} for _ in range(cg.n)]
+
+        order = sorted(range(cg.n), key=lambda v: -(len(out_adj[v]) + len(in_adj[v])))
+        for hub in order:
+            # hub → v mesafeleri: in etiketleri (budama: mevcut out[hub] ∩ in[v])
+            cls._pruned_dijkstra(hub, out_adj, out_dist[hub], in_dist, in_link)
+            # v → hub mesafeleri: out etiketleri (budama: mevcut out[v] ∩ in[hub])
+            cls._pruned_dijkstra(hub, in_adj, in_dist[hub], out_dist, out_link)
+
+        meta = {
+            "fingerprint": index_fingerprint(cg, w_delay, w_reliability, w_resource, min_bandwidth),
+            "weights": [w_delay, w_reliability, w_resource],
+            "min_bandwidth": min_bandwidth or 0,
+            "build_ms": round((time.perf_counter() - t0) * 1000, 1),
+        }
+        return cls(cg.node_ids.copy(), out_dist, out_link, in_dist, in_link,
+                   w_reliability * cg.neg_log_r_node, -w_delay * cg.proc, meta)
+
+    # hub'dan adj yönünde budanmış Dijkstra. hub_label: hub'ın karşı yöndeki
+    # etiketi; bulunan düğümlerin labels[v][hub] girdisi yazılır.
+    @staticmethod
+    def _pruned_dijkstra(hub, adj, hub_label, labels, links):
+        dist = {hub: 0.0}
+        heap = [(0.0, hub, hub)]
+        done = set()
+        while heap:
+            d, v, parent = heapq.heappop(heap)
+            if v in done or d > dist.get(v, INF):
+                continue
+            done.add(v)
+            label = labels[v]
+            pruned = False
+            for h, dh in label.items():
+                other = hub_label.get(h)
+                if other is not None and other + dh <= d:
+                    pruned = True
+                    break
+            if pruned:
+                continue
+            label[hub] = d
+            links[v][hub] = parent
+            for w, c in adj[v]:
+                nd = d + c
+                if nd < dist.get(w, INF):
+                    dist[w] = nd
+                    heapq.heappush(heap, (nd, w, v))
+
+    # ---------------- sorgu ----------------
+    def _meet(self, s, t):
+        a, b = self.out_dist[s], self.in_dist[t]
+        if len(a) > len(b):
+            a, b = b, a
+        best, hub = INF, -1
+        for h, d in a.items():
+            other = b.get(h)
+            if other is not None and d + other < best:
+                best, hub = d + other, h
+        return best, hub
+
+    # Kaynaktan hedefe en düşük weighted_sum_method maliyeti (yol yoksa inf)
+    def cost(self, source, target):
+        s, t = self.index.get(source), self.index.get(target)
+        if s is None or t is None:
+            return INF
+        if s == t:
+            return 0.0
+        best, _ = self._meet(s, t)
+        return float(best + self.src_offset[s] + self.dst_offset[t])
+
+    def path(self, source, target):
+        s, t = self.index.get(source), self.index.get(target)
+        if s is None or t is None:
+            return None
+        if s == t:
+            return [source]
+        best, hub = self._meet(s, t)
+        if hub < 0:
+            return None
+
+        head = [s]
+        while head[-1] != hub:
+            head.append(self.out_link[head[-1]][hub])
+        tail = [t]
+        while tail[-1] != hub:
+            tail.append(self.in_link[tail[-1]][hub])
+        idx = head + tail[-2::-1]
+        return [int(self.node_ids[i]) for i in idx]
+
+    def stats(self):
+        return dict(self.meta, nodes=len(self.node_ids), avg_label=self.avg_label, max_label=self.max_label)
+
+    # ---------------- disk ----------------
+    def save(self, path):
+        arrays = {"node_ids": self.node_ids, "src_offset": self.src_offset, "dst_offset": self.dst_offset}
+        for name, dists, links in (("out", self.out_dist, self.out_link), ("in", self.in_dist, self.in_link)):
+            indptr = np.zeros(len(dists) + 1, dtype=np.int64)
+            np.cumsum([len(d) for d in dists], out=indptr[1:])
+            arrays[f"{name}_indptr"] = indptr
+            arrays[f"{name}_hub"] = np.array([h for d in dists for h in d], dtype=np.int32)
+            arrays[f"{name}_dist"] = np.array([x for d in dists for x in d.values()], dtype=np.float64)
+            arrays[f"{name}_link"] = np.array([links[v][h] for v, d in enumerate(dists) for h in d], dtype=np.int32)
+        arrays["meta"] = np.array(json.dumps(self.meta))
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            tables = {}
+            for name in ("out", "in"):
+                indptr = data[f"{name}_indptr"].tolist()
+                hubs = data[f"{name}_hub"].tolist()
+                dists = data[f"{name}_dist"].tolist()
+                links = data[f"{name}_link"].tolist()
+                tables[name] = (
+                    [dict(zip(hubs[a:b], dists[a:b])) for a, b in zip(indptr[:-1], indptr[1:])],
+                    [dict(zip(hubs[a:b], links[a:b])) for a, b in zip(indptr[:-1], indptr[1:])],
+                )
+            meta = json.loads(str(data["meta"]))
+            return cls(data["node_ids"], *tables["out"], *tables["in"],
+                       data["src_offset"], data["dst_offset"], meta)
+
+
+# ---------------------------------------------------------------
+# Bellek (LRU) + disk önbelleği. Diskte aynı parmak izli indeks varsa
+# yüklenir, yoksa kurulup yazılır. index_dir=None → diske yazılmaz.
+# ---------------------------------------------------------------
+INDEX_CACHE_SIZE = 8
+# Diskte tutulan en fazla indeks dosyası (eskiler silinir; graf her değiştiğinde yenisi yazılır)
+MAX_INDEX_FILES = 32
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_hub_index(G, w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None, index_dir=INDEX_DIR):
+    cg = get_compiled(G)
+    fingerprint = index_fingerprint(cg, w_delay, w_reliability, w_resource, min_bandwidth)
+    with _cache_lock:
+        index = _cache.get(fingerprint)
+        if index is not None:
+            _cache.move_to_end(fingerprint)
+            return index
+
+    path = os.path.join(index_dir, f"{fingerprint}.npz") if index_dir else None
+    index = None
+    if path and os.path.exists(path):
+        try:
+            index = HubLabelIndex.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Hub label indeksi okunamadı ({path}): {e}")
+    if index is None:
+        index = HubLabelIndex.build(G, w_delay, w_reliability, w_resource, min_bandwidth)
+        if path:
+            index.save(path)
+            prune_index_dir(index_dir)
+
+    with _cache_lock:
+        _cache[fingerprint] = index
+        while len(_cache) > INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+
+def prune_index_dir(index_dir, keep=MAX_INDEX_FILES):
+    files = [os.path.join(index_dir, f) for f in os.listdir(index_dir) if f.endswith(".npz")]
+    files.sort(key=os.path.getmtime, reverse=True)
+    for path in files[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------
+# Arka planda kurulum (API). get() hazır ve güncel (graf sürümü aynı)
+# indeksi döndürür; yoksa kurulumu kuyruğa alıp None döner, istek o
+# sırada Dijkstra ile cevaplanır. Graf değişince (graph_changed) son
+# kullanılan profiller yeni sürüm için yeniden kurulur.
+# ---------------------------------------------------------------
+class HubIndexManager:
+    def __init__(self, G, lock, index_dir=INDEX_DIR, max_profiles=INDEX_CACHE_SIZE):
+        self.G = G
+        self.lock = lock             # NetworkState.lock: graf kopyalanırken değişmesin
+        self.index_dir = index_dir
+        self.max_profiles = max_profiles
+        self.ready = OrderedDict()   # profil → (graf sürümü, indeks)
+        self.pending = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.builds = 0
+        self.last_error = None
+
+    @staticmethod
+    def profile(w_delay, w_rel, w_res, min_bandwidth):
+        return (round(w_delay, 6), round(w_rel, 6), round(w_res, 6), round(min_bandwidth or 0, 6))
+
+    def get(self, w_delay, w_rel, w_res, min_bandwidth=None):
+        key = self.profile(w_delay, w_rel, w_res, min_bandwidth)
+        with self._cond:
+            entry = self.ready.get(key)
+            if entry is not None:
+                self.ready.move_to_end(key)
+                if entry[0] == self.G.graph.get("version"):
+                    return entry[1]
+            self._schedule(key)
+        return None
+
+    def graph_changed(self):
+        with self._cond:
+            for key in self.ready:
+                self._schedule(key)
+
+    def _schedule(self, key):
+        self.pending[key] = True
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._worker, name="hub-index", daemon=True)
+            self._thread.start()
+        self._cond.notify()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                if not self.pending:
+                    return
+                key, _ = self.pending.popitem(last=False)
+                entry = self.ready.get(key)
+                # Kurulum sürerken aynı profil tekrar istendiyse ikinci kurulum gereksiz
+                if entry is not None and entry[0] == self.G.graph.get("version"):
+                    continue
+            try:
+                # Kopya kilit altında alınır, kurulum kilitsiz yapılır
+                with self.lock:
+                    snapshot = self.G.copy()
+                version = snapshot.graph.get("version")
+                index = get_hub_index(snapshot, *key[:3], min_bandwidth=key[3] or None, index_dir=self.index_dir)
+                self.builds += 1
+            except Exception as e:
+                self.last_error = str(e)
+                continue
+            with self._cond:
+                self.ready[key] = (version, index)
+                self.ready.move_to_end(key)
+                while len(self.ready) > self.max_profiles:
+                    self.ready.popitem(last=False)
+
+    def stats(self):
+        with self._cond:
+            return {"ready": len(self.ready), "pending": len(self.pending), "builds": self.builds,
+                    "last_error": self.last_error, "index_dir": self.index_dir}
@@ -0,0 +1,314 @@
+import heapq
+import itertools
+
+import Ag_olusturma as ag
+
+# ---------------------------------------------------------------
+# k-EN-KISA YOL VE AYRIK (DISJOINT) YEDEK YOL MOTORU
+#
+# Tüm maliyetler Ag_olusturma.directed_edge_cost ile hesaplanır; yani
+# yollar weighted_sum_method'a göre sıralanır. min_bandwidth verilirse
+# bu değerin altındaki kenarlar hiç kullanılmaz.
+#
+#   k_shortest_paths → Yen algoritması, tembel (lazy) generator
+#   disjoint_paths   → Suurballe/Bhandari: k adet kenar- veya düğüm-ayrık
+#                      yol (toplam maliyeti minimum olan küme)
+#   backup_paths     → verilen birincil yoldan ayrık k yedek yol
+# ---------------------------------------------------------------
+
+INF = float("inf")
+_tie = itertools.count()   # heap'te eşit maliyetli girdiler için sıra numarası
+
+
+# Komşuluk listesinden (u, v) → maliyet sözlüğü çıkarır (kök maliyetleri için)
+def _cost_lookup(adj):
+    return {(u, v): c for u, nbrs in adj.items() for v, c in nbrs}
+
+
+# ---------------------------------------------------------------
+# Heap tabanlı Dijkstra
+# banned_nodes / banned_edges: Yen'in sapma (spur) aramasında yasaklı öğeler
+# Dönüş: (maliyet, yol) ya da yol yoksa (INF, None)
+# ---------------------------------------------------------------
+def _dijkstra(adj, source, target, banned_nodes=(), banned_edges=()):
+    dist = {source: 0.0}
+    prev = {}
+    heap = [(0.0, source)]
+
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u == target:
+            break
+        if d > dist[u]:
+            continue
+
+        for v, c in adj.get(u, ()):
+            if v in banned_nodes or (u, v) in banned_edges:
+                continue
+            nd = d + c
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(heap, (nd, v))
+
+    if target not in dist:
+        return INF, None
+
+    path = [target]
+    while path[-1] != source:
+        path.append(prev[path[-1]])
+    path.reverse()
+    return dist[target], path
+
+
+# ---------------------------------------------------------------
+# Yen k-en-kısa basit yol algoritması (lazy generator)
+# Yollar artan weighted cost sırasıyla üretilir; tüketici istediği
+# kadarını alır (itertools.islice) ya da k ile sınırlar.
+# max_hops verilirse daha uzun yollar atlanır.
+# ---------------------------------------------------------------
+def k_shortest_paths(G, source, target, k=None,
+                     w_delay=0.33, w_reliability=0.33, w_resource=0.34,
+                     min_bandwidth=None, max_hops=None, adj=None):
+
+    if source not in G.nodes or target not in G.nodes:
+        return
+
+    if adj is None:
+        adj = ag.build_cost_adjacency(G, w_delay, w_reliability, w_resource, min_bandwidth)
+    cost = _cost_lookup(adj)
+
+    first_cost, first = _dijkstra(adj, source, target)
+    if first is None:
+        return
+
+    accepted = []                 # Yen'deki A listesi
+    candidates = []               # Yen'deki B listesi (heap)
+    seen = {tuple(first)}
+    counter = itertools.count()   # eşit maliyetlerde kararlı sıralama
+    heapq.heappush(candidates, (first_cost, next(counter), first))
+
+    produced = 0
+    # Hop sınırı yüzünden atlanan yollar sonsuz döngüye sokmasın
+    max_pops = None if k is None else k * 20
+
+    while candidates:
+        if max_pops is not None and len(accepted) >= max_pops:
+            return
+
+        _, _, path = heapq.heappop(candidates)
+        accepted.append(path)
+
+        if max_hops is None or len(path) - 1 <= max_hops:
+            yield path
+            produced += 1
+            if k is not None and produced >= k:
+                return
+
+        # Yeni kabul edilen yolun her düğümünden sapma yolları üret
+        root_cost = 0.0
+        for i in range(len(path) - 1):
+            spur_node = path[i]
+            root = path[:i + 1]
+
+            banned_edges = set()
+            for p in accepted:
+                if len(p) > i and p[:i + 1] == root:
+                    banned_edges.add((p[i], p[i + 1]))
+            banned_nodes = set(root[:-1])
+
+            spur_cost, spur = _dijkstra(adj, spur_node, target, banned_nodes, banned_edges)
+            if spur is not None:
+                new_path = root[:-1] + spur
+                key = tuple(new_path)
+                if key not in seen:
+                    seen.add(key)
+                    heapq.heappush(candidates, (root_cost + spur_cost, next(counter), new_path))
+
+            root_cost += cost[(path[i], path[i + 1])]
+
+
+# ---------------------------------------------------------------
+# Ayrık yollar için artık (residual) ağ
+# Birim kapasiteli yönlü yaylar; her yayın ters yayı index ^ 1'dedir.
+# mode="node" ise her ara düğüm (v,0) → (v,1) yayı ile ikiye bölünür,
+# böylece bir düğüm en fazla bir yolda kullanılabilir.
+# ---------------------------------------------------------------
+class _Residual:
+    def __init__(self):
+        self.out = {}
+        self.to = []
+        self.cost = []
+        self.cap = []
+
+    def add_arc(self, a, b, c):
+        self.out.setdefault(a, []).append(len(self.to))
+        self.to.append(b); self.cost.append(c); self.cap.append(1)
+        self.out.setdefault(b, []).append(len(self.to))
+        self.to.append(a); self.cost.append(-c); self.cap.append(0)
+
+
+def _build_residual(adj, source, target, mode, banned_nodes=(), banned_edges=()):
+    res = _Residual()
+
+    if mode == "node":
+        def tail(u):
+            return (u, 1)
+
+        def head(v):
+            return (v, 0)
+
+        for v in adj:
+            if v not in (source, target) and v not in banned_nodes:
+                res.add_arc((v, 0), (v, 1), 0.0)
+        s, t = (source, 1), (target, 0)
+    else:
+        def tail(u):
+            return u
+
+        def head(v):
+            return v
+        s, t = source, target
+
+    for u, nbrs in adj.items():
+        if u in banned_nodes:
+            continue
+        for v, c in nbrs:
+            if v in banned_nodes or (u, v) in banned_edges or (v, u) in banned_edges:
+                continue
+            res.add_arc(tail(u), head(v), c)
+
+    return res, s, t
+
+
+# Potansiyelli Dijkstra: indirgenmiş maliyetler c + pi[u] - pi[v] >= 0
+def _residual_dijkstra(res, s, t, pi):
+    dist = {s: 0.0}
+    prev_arc = {}
+    heap = [(0.0, next(_tie), s)]
+
+    while heap:
+        d, _, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        pu = pi.get(u, 0.0)
+        for a in res.out.get(u, ()):
+            if res.cap[a] <= 0:
+                continue
+            v = res.to[a]
+            nd = d + res.cost[a] + pu - pi.get(v, 0.0)
+            if nd < dist.get(v, INF) - 1e-12:
+                dist[v] = nd
+                prev_arc[v] = a
+                heapq.heappush(heap, (nd, next(_tie), v))
+
+    return dist, prev_arc
+
+
+# ---------------------------------------------------------------
+# k adet ayrık yol (Suurballe / Bhandari - ardışık en kısa artırım yolları)
+# mode: "link" → kenar-ayrık, "node" → düğüm-ayrık
+# Dönen yollar weighted_sum_method'a göre artan, eşitlikte
+# total_reliability'ye göre azalan sırada; k'dan az yol olabilir.
+# ---------------------------------------------------------------
+def disjoint_paths(G, source, target, k=2, mode="link",
+                   w_delay=0.33, w_reliability=0.33, w_resource=0.34,
+                   min_bandwidth=None, banned_nodes=(), banned_edges=(), adj=None):
+
+    if mode not in ("link", "node"):
+        raise ValueError("mode 'link' ya da 'node' olmalıdır.")
+    if source not in G.nodes or target not in G.nodes or source == target:
+        return []
+
+    if adj is None:
+        adj = ag.build_cost_adjacency(G, w_delay, w_reliability, w_resource, min_bandwidth)
+    res, s, t = _build_residual(adj, source, target, mode, banned_nodes, banned_edges)
+
+    pi = {}
+    flow_units = 0
+    for _ in range(k):
+        dist, prev_arc = _residual_dijkstra(res, s, t, pi)
+        if t not in dist:
+            break
+
+        # Artırım: yol boyunca 1 birim akış gönder
+        v = t
+        while v != s:
+            a = prev_arc[v]
+            res.cap[a] -= 1
+            res.cap[a ^ 1] += 1
+            v = res.to[a ^ 1]
+        flow_units += 1
+
+        # Potansiyelleri güncelle (ulaşılamayan düğümler en büyük mesafeyi alır)
+        far = max(dist.values())
+        for node in res.out:
+            pi[node] = pi.get(node, 0.0) + dist.get(node, far)
+
+    paths = _decompose(res, s, t, flow_units, mode)
+    paths.sort(key=lambda p: (ag.weighted_sum_method(p, G, w_delay, w_reliability, w_resource),
+                              -ag.total_reliability(p, G)))
+    return paths
+
+
+# Akışı ayrı yollara böler (yalnızca ileri yaylar, yani çift index'liler)
+def _decompose(res, s, t, flow_units, mode):
+    used = set()
+    paths = []
+
+    for _ in range(flow_units):
+        walk = [s]
+        u = s
+        while u != t:
+            for a in res.out.get(u, ()):
+                if a % 2 == 0 and res.cap[a] == 0 and a not in used:
+                    used.add(a)
+                    u = res.to[a]
+                    walk.append(u)
+                    break
+            else:
+                return paths  # olmaması gerekir; güvenlik
+
+        if mode == "node":
+            nodes = []
+            for n, _ in walk:
+                if not nodes or nodes[-1] != n:
+                    nodes.append(n)
+            walk = nodes
+        paths.append(walk)
+
+    return paths
+
+
+# ---------------------------------------------------------------
+# Verilen birincil yoldan ayrık k yedek yol
+# (birincil yolu ACO/GA/QL gibi başka bir algoritma bulmuş olabilir)
+# ---------------------------------------------------------------
+def backup_paths(G, primary, k=1, mode="link",
+                 w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+
+    if primary is None or len(primary) < 2:
+        return []
+
+    source, target = primary[0], primary[-1]
+    banned_edges = set(zip(primary[:-1], primary[1:]))
+    banned_nodes = set(primary[1:-1]) if mode == "node" else set()
+
+    return disjoint_paths(G, source, target, k=k, mode=mode,
+                          w_delay=w_delay, w_reliability=w_reliability, w_resource=w_resource,
+                          min_bandwidth=min_bandwidth,
+                          banned_nodes=banned_nodes, banned_edges=banned_edges)
+
+
+# ---------------------------------------------------------------
+# ÖRNEK ÇALIŞTIRMA
+# ---------------------------------------------------------------
+if __name__ == "__main__":
+    S, D = 8, 44
+
+    print("İlk 5 yol:")
+    for p in k_shortest_paths(ag.G, S, D, k=5):
+        print(p, round(ag.weighted_sum_method(p, ag.G), 4))
+
+    print("Kenar-ayrık 3 yol:", disjoint_paths(ag.G, S, D, k=3, mode="link"))
+    print("Düğüm-ayrık 3 yol:", disjoint_paths(ag.G, S, D, k=3, mode="node"))
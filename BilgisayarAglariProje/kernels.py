@@ -0,0 +1,778 @@
+import math
+import os
+import random
+import sys
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from compact_graph import CompactGraph
+
+# ---------------------------------------------------------------
+# DERLENMİŞ ÇEKİRDEKLER (isteğe bağlı Numba)
+#
+# ACO karınca yürüyüşü, Q-learning bölüm döngüsü, GA başlangıç
+# popülasyonu ve paket simülatörünün olay döngüsü (simulation.py) küçük
+# sayısal işler üzerinde saf Python döngüleridir.
+# Buradaki çekirdekler aynı döngüleri düğüm / yay dizileri (KernelGraph)
+# üzerinde çalıştırır; Numba kuruluysa derlenir, değilse algoritmalar
+# mevcut Python yolunu kullanır.
+#
+# Sonuçlar Python yoluyla BİREBİR aynıdır (aynı seed → aynı yol):
+#   - Rastgelelik Python'un random modülünden gelir: çekirdek
+#     random.getstate() ile alınan Mersenne Twister durumunu kendisi
+#     ilerletir (random(), _randbelow, choice, choices ile aynı sayı
+#     tüketimi), bitince durum random.setstate ile geri yazılır
+#     (python_rng: eşzamanlı istekler için kilit altında).
+#   - Komşular G.neighbors sırasıyla, maliyetler Python ile aynı işlem
+#     sırasıyla (aynı float yuvarlamaları) hesaplanır; log için
+#     math.log kullanılır.
+#
+# ROUTE_JIT ortam değişkeni:
+#   auto   (varsayılan) Numba varsa derlenmiş çekirdekler, yoksa Python yolu
+#   off    her zaman Python yolu
+#   python çekirdekler derlenmeden çalışır (Numba'sız ortamda eşdeğerlik
+#          kontrolü için; yavaştır)
+#
+# Süre bütçesi çekirdek çağrıları arasında kontrol edilir (ACO: iterasyon,
+# Q-learning: bölüm grubu); QoS kısıtı (guard), planlama ve uygunluk izi
+# modları çekirdekte yoktur, bu durumlarda Python yolu çalışır.
+# ---------------------------------------------------------------
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+JIT_MODE = os.environ.get("ROUTE_JIT", "auto").lower()
+if JIT_MODE not in ("auto", "off", "python"):
+    raise ValueError(f"Geçersiz ROUTE_JIT: {JIT_MODE} (auto / off / python)")
+
+if JIT_MODE == "auto":
+    BACKEND = "numba" if numba is not None else None
+else:
+    BACKEND = "python" if JIT_MODE == "python" else None
+
+_enabled = BACKEND is not None
+
+# Python 3.12+ sum() float toplamında Neumaier düzeltmesi yapar
+NEUMAIER_SUM = sys.version_info >= (3, 12)
+
+
+def kernel(fn):
+    if BACKEND == "numba":
+        return numba.njit(cache=True, nogil=True)(fn)
+    return fn
+
+
+def enabled():
+    return _enabled
+
+
+# Benchmark: aynı süreçte Python yolu ile karşılaştırma; önceki değeri döner
+def set_enabled(flag):
+    global _enabled
+    previous = _enabled
+    _enabled = bool(flag) and BACKEND is not None
+    return previous
+
+
+# ---------------------------------------------------------------
+# Python random modülü durumu (MT19937: 624 kelime + konum)
+# ---------------------------------------------------------------
+def rng_export(rng=random):
+    version, words, gauss = rng.getstate()
+    return np.array(words, dtype=np.int64), (version, gauss)
+
+
+def rng_import(mt, extra):
+    version, gauss = extra
+    random.setstate((version, tuple(mt.tolist()), gauss))
+
+
+# Modül düzeyi random durumu çekirdeğe verilir ve çekirdek bitince geri
+# yazılır. Çekirdekler nogil çalıştığından kilit olmadan eşzamanlı istekler
+# aynı durumu alıp (aynı sayı akışı) birbirinin yazdığını ezerdi; kilit
+# dışa aktarma → çekirdek → geri yazma boyunca tutulur.
+_rng_lock = threading.Lock()
+
+
+@contextmanager
+def python_rng():
+    with _rng_lock:
+        mt, extra = rng_export()
+        yield mt
+        rng_import(mt, extra)
+
+
+@kernel
+def _mt_twist(mt):
+    for kk in range(624):
+        y = (mt[kk] & 0x80000000) | (mt[(kk + 1) % 624] & 0x7FFFFFFF)
+        mag = 0x9908B0DF if y & 1 else 0
+        mt[kk] = mt[(kk + 397) % 624] ^ (y >> 1) ^ mag
+
+
+@kernel
+def _mt_uint32(mt):
+    i = mt[624]
+    if i >= 624:
+        _mt_twist(mt)
+        i = 0
+    y = mt[i]
+    mt[624] = i + 1
+    y ^= y >> 11
+    y ^= (y << 7) & 0x9D2C5680
+    y ^= (y << 15) & 0xEFC60000
+    y ^= y >> 18
+    return y
+
+
+# random.random()
+@kernel
+def rand_float(mt):
+    a = _mt_uint32(mt) >> 5
+    b = _mt_uint32(mt) >> 6
+    return (a * 67108864.0 + b) * (1.0 / 9007199254740992.0)
+
+
+# random._randbelow(n) (n < 2**32): getrandbits(k) reddetmeli örnekleme
+@kernel
+def randbelow(mt, n):
+    k = 0
+    while (n >> k) > 0:
+        k += 1
+    r = _mt_uint32(mt) >> (32 - k)
+    while r >= n:
+        r = _mt_uint32(mt) >> (32 - k)
+    return r
+
+
+# random.choices(population, weights, k=1) → seçilen konum
+# (birikimli ağırlıklar + bisect_right, hi = n - 1)
+@kernel
+def choices_index(mt, weights, n, cum):
+    acc = 0.0
+    for i in range(n):
+        acc = weights[i] if i == 0 else acc + weights[i]
+        cum[i] = acc
+    x = rand_float(mt) * (cum[n - 1] + 0.0)
+    lo = 0
+    hi = n - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if x < cum[mid]:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+# sum(list_of_floats)
+@kernel
+def py_sum(values, n, neumaier):
+    total = 0.0
+    c = 0.0
+    for i in range(n):
+        x = values[i]
+        if neumaier:
+            t = total + x
+            if abs(total) >= abs(x):
+                c += (total - t) + x
+            else:
+                c += (x - t) + total
+            total = t
+        else:
+            total += x
+    if neumaier and c != 0.0 and math.isfinite(c):
+        total += c
+    return total
+
+
+# -math.log(x) eleman bazında (np.log son bitte farklı olabilir); değer
+# sayısı az olduğundan yalnızca farklı değerler için hesaplanır
+def neg_log(values):
+    unique, inverse = np.unique(values, return_inverse=True)
+    return np.array([-math.log(x) for x in unique.tolist()], dtype=np.float64)[inverse]
+
+
+# ---------------------------------------------------------------
+# Graf dizileri. Yaylar G.neighbors sırasıyla numaralanır (yay = konum):
+#   ptr[u]..ptr[u+1]  u'nun komşuları, nbr: komşu düğüm index'i
+#   rev[a]            ters yön (v → u) yayı
+# Düğüm index'i G.nodes() sırasıdır.
+# ---------------------------------------------------------------
+class KernelGraph:
+    def __init__(self, G):
+        self.version = G.graph.get("version")
+        self.edges = G.number_of_edges()
+        self.node_ids = list(G.nodes())
+        self.index = {n: i for i, n in enumerate(self.node_ids)}
+        self.n = len(self.node_ids)
+
+        if isinstance(G, CompactGraph):
+            # CSR ve öznitelik dizileri doğrudan (G.nodes() sıralı kimliklerdir)
+            self.ptr = np.asarray(G.indptr, dtype=np.int64)
+            self.src, self.nbr, edge = G.arc_arrays()
+            self.link_delay = G.edge_attrs["link_delay"].values(edge)
+            self.bandwidth = G.edge_attrs["bandwidth"].values(edge)
+            self.r_link = G.edge_attrs["link_reliability"].values(edge)
+            self.proc = G.node_attrs["processing_delay"].values()
+            self.r_node = G.node_attrs["node_reliability"].values()
+        else:
+            ptr = [0]
+            nbr, delay, bw, rel = [], [], [], []
+            index = self.index.__getitem__
+            for u in self.node_ids:
+                adj = G.adj[u]
+                nbr.extend(map(index, adj))
+                for data in adj.values():
+                    delay.append(data["link_delay"])
+                    bw.append(data["bandwidth"])
+                    rel.append(data["link_reliability"])
+                ptr.append(len(nbr))
+
+            self.ptr = np.array(ptr, dtype=np.int64)
+            self.nbr = np.array(nbr, dtype=np.int64)
+            self.src = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(self.ptr))
+            self.link_delay = np.array(delay, dtype=np.float64)
+            self.bandwidth = np.array(bw, dtype=np.float64)
+            self.r_link = np.array(rel, dtype=np.float64)
+            self.proc = np.array([float(G.nodes[n]["processing_delay"]) for n in self.node_ids], dtype=np.float64)
+            self.r_node = np.array([G.nodes[n]["node_reliability"] for n in self.node_ids], dtype=np.float64)
+        self.neglog_rlink = neg_log(self.r_link)
+        self.inv_bandwidth = 1000 / self.bandwidth
+        self.neglog_rnode = neg_log(self.r_node)
+
+        # (u, v) → yay araması: sıralı anahtarlar + searchsorted
+        keys = self.src * self.n + self.nbr
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+        self.rev = self.arcs(self.nbr, self.src)
+
+    @property
+    def m(self):
+        return len(self.nbr)
+
+    def arcs(self, u_idx, v_idx):
+        keys = np.asarray(u_idx, dtype=np.int64) * self.n + np.asarray(v_idx, dtype=np.int64)
+        if not len(self._keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        return np.where(self._keys[pos] == keys, self._order[pos], -1)
+
+    def indices(self, ids):
+        return np.array([self.index.get(n, -1) for n in ids], dtype=np.int64)
+
+    def ids(self, idx):
+        return [self.node_ids[i] for i in idx]
+
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+# Graf başına önbellek (graph_arrays.get_compiled gibi); sürüm ya da kenar
+# sayısı değişince yeniden kurulur
+def kernel_graph(G):
+    key = id(G)
+    with _graphs_lock:
+        entry = _graphs.get(key)
+        if entry is not None and entry[0] is G and entry[1].version == G.graph.get("version") \
+                and entry[1].edges == G.number_of_edges():
+            return entry[1]
+    kg = KernelGraph(G)
+    with _graphs_lock:
+        if len(_graphs) >= 8:
+            _graphs.pop(next(iter(_graphs)))
+        _graphs[key] = (G, kg)
+    return kg
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+# Türetilmiş tablo önbelleği: sahip nesneler (heuristic_map, bounds, ...)
+# canlı kaldıkça aynı tablo kullanılır
+def _memo(name, owners, build):
+    key = (name,) + tuple(id(o) for o in owners)
+    with _tables_lock:
+        entry = _tables.get(key)
+        if entry is not None and all(a is b for a, b in zip(entry[0], owners)):
+            return entry[1]
+    table = build()
+    with _tables_lock:
+        if len(_tables) >= 32:
+            _tables.pop(next(iter(_tables)))
+        _tables[key] = (owners, table)
+    return table
+
+
+# lower_bounds.GoalBounds.guide(node, temperature) listeleri, tüm düğümler için
+# CSR: (ptr, nbr, weight, arc). Grafta olmayan bir yay varsa None.
+def guide_tables(kg, bounds, temperature=0.1):
+    def build():
+        ptr = [0]
+        nbr, weight = [], []
+        for node in kg.node_ids:
+            neighbors, weights = bounds.guide(node, temperature)
+            nbr.extend(neighbors)
+            weight.extend(weights)
+            ptr.append(len(nbr))
+        ptr = np.array(ptr, dtype=np.int64)
+        nbr = kg.indices(nbr)
+        arc = kg.arcs(np.repeat(np.arange(kg.n, dtype=np.int64), np.diff(ptr)), nbr)
+        if (arc < 0).any():
+            return None
+        hops = np.array([bounds.hops.get(n, math.inf) for n in kg.node_ids], dtype=np.float64)
+        return ptr, nbr, np.array(weight, dtype=np.float64), arc, hops
+
+    return _memo(("guide", temperature), (kg, bounds), build)
+
+
+# ACO sezgisel tabloları: eta (yay başına heuristic ** beta) ve aday
+# listeleri CSR olarak (cand_ptr, cand_nbr, cand_arc)
+def aco_tables(kg, heuristic_map, candidate_map):
+    def build():
+        eta = np.array([heuristic_map[(kg.node_ids[u], kg.node_ids[v])]
+                        for u, v in zip(kg.src.tolist(), kg.nbr.tolist())], dtype=np.float64)
+        ptr = [0]
+        nbr = []
+        for node in kg.node_ids:
+            nbr.extend(candidate_map.get(node, []))
+            ptr.append(len(nbr))
+        ptr = np.array(ptr, dtype=np.int64)
+        nbr = kg.indices(nbr)
+        arc = kg.arcs(np.repeat(np.arange(kg.n, dtype=np.int64), np.diff(ptr)), nbr)
+        return eta, ptr, nbr, arc
+
+    return _memo("aco", (kg, heuristic_map, candidate_map), build)
+
+
+# ---------------------------------------------------------------
+# Ortak yardımcılar
+# ---------------------------------------------------------------
+# Ag_olusturma.total_delay / reliability_cost / resource_cost ile aynı sıra
+@kernel
+def path_cost(path, arcs, length, link_delay, proc, neglog_rlink, neglog_rnode, inv_bw,
+              w_delay, w_rel, w_res):
+    td = 0.0
+    for i in range(length - 1):
+        td += link_delay[arcs[i]]
+    for i in range(1, length - 1):
+        td += proc[path[i]]
+    rc = 0.0
+    for i in range(length - 1):
+        rc += neglog_rlink[arcs[i]]
+    for i in range(length):
+        rc += neglog_rnode[path[i]]
+    rs = 0.0
+    for i in range(length - 1):
+        rs += inv_bw[arcs[i]]
+    return w_delay * td + w_rel * rc + w_res * rs
+
+
+# ---------------------------------------------------------------
+# ACO: bir iterasyonun karıncaları (ACO_algorithm.build_path +
+# evaluate_path + deposit_pheromone). Yol bulamayan karıncanın uzunluğu 0.
+# ---------------------------------------------------------------
+@kernel
+def _aco_score(current, ptr, nbr, arc, visited, tau, eta, alpha, nodes, arcs, weights):
+    k = 0
+    for p in range(ptr[current], ptr[current + 1]):
+        v = nbr[p]
+        if visited[v]:
+            continue
+        a = arc[p]
+        if alpha == 1.0:
+            w = tau[a] * eta[a]
+        else:
+            w = (tau[a] ** alpha) * eta[a]
+        nodes[k] = v
+        arcs[k] = a
+        weights[k] = w
+        k += 1
+    return k
+
+
+@kernel
+def aco_ants(mt, n_ants, s, d, cand_ptr, cand_nbr, cand_arc, adj_ptr, adj_nbr, rev, tau, eta, alpha,
+             link_delay, proc, neglog_rlink, neglog_rnode, inv_bw, w_delay, w_rel, w_res, neumaier,
+             paths, lengths, costs):
+    n = len(proc)
+    visited = np.zeros(n, np.bool_)
+    adj_arc = np.arange(len(adj_nbr))
+    nodes = np.empty(n, np.int64)
+    arcs = np.empty(n, np.int64)
+    weights = np.empty(n, np.float64)
+    cum = np.empty(n, np.float64)
+    path_arcs = np.empty(n, np.int64)
+
+    for ant in range(n_ants):
+        current = s
+        visited[s] = True
+        paths[ant, 0] = s
+        length = 1
+        dead = False
+        while current != d:
+            k = _aco_score(current, cand_ptr, cand_nbr, cand_arc, visited, tau, eta, alpha, nodes, arcs, weights)
+            if k == 0:
+                k = _aco_score(current, adj_ptr, adj_nbr, adj_arc, visited, tau, eta, alpha, nodes, arcs, weights)
+            if k == 0:
+                dead = True
+                break
+            total = py_sum(weights, k, neumaier)
+            if total == 0:
+                j = randbelow(mt, k)
+            else:
+                for i in range(k):
+                    weights[i] = weights[i] / total
+                j = choices_index(mt, weights, k, cum)
+            current = nodes[j]
+            visited[current] = True
+            path_arcs[length - 1] = arcs[j]
+            paths[ant, length] = current
+            length += 1
+
+        for i in range(length):
+            visited[paths[ant, i]] = False
+        if dead:
+            length = 0
+
+        lengths[ant] = length
+        if length == 0:
+            costs[ant] = math.inf
+            continue
+        cost = path_cost(paths[ant], path_arcs, length, link_delay, proc, neglog_rlink, neglog_rnode, inv_bw,
+                         w_delay, w_rel, w_res)
+        costs[ant] = cost
+        amount = 1.0 / cost
+        for i in range(length - 1):
+            tau[path_arcs[i]] += amount
+            tau[rev[path_arcs[i]]] += amount
+
+
+# ---------------------------------------------------------------
+# Q-learning: tek adımlık bölümler (QLearningAgent._one_step_episode +
+# choose_action + keşif oranı azaltma). Q, reward ve heur yay başınadır;
+# hedefe ulaşan bölümlerin yolları goal_paths'e yazılır.
+# ---------------------------------------------------------------
+@kernel
+def _ql_action(mt, state, ptr, nbr, q, heur, g_ptr, g_nbr, g_w, g_arc, use_guide, eps, buf, cum, best):
+    lo = ptr[state]
+    deg = ptr[state + 1] - lo
+    if deg == 0:
+        return -1
+    if rand_float(mt) < eps:
+        if use_guide and g_ptr[state + 1] > g_ptr[state]:
+            g0 = g_ptr[state]
+            k = g_ptr[state + 1] - g0
+            for i in range(k):
+                buf[i] = g_w[g0 + i]
+            return g_arc[g0 + choices_index(mt, buf, k, cum)]
+        for i in range(deg):
+            buf[i] = heur[lo + i]
+        if py_sum(buf, deg, False) <= 0:
+            return lo + randbelow(mt, deg)
+        return lo + choices_index(mt, buf, deg, cum)
+    max_q = q[lo]
+    for p in range(lo + 1, lo + deg):
+        if q[p] > max_q:
+            max_q = q[p]
+    k = 0
+    for p in range(lo, lo + deg):
+        if q[p] == max_q:
+            best[k] = p
+            k += 1
+    return best[randbelow(mt, k)]
+
+
+@kernel
+def ql_episodes(mt, n_episodes, start, goal, ptr, nbr, node_ids, q, reward, heur,
+                g_ptr, g_nbr, g_w, g_arc, use_guide, eps, eps_decay, lr, gamma, max_steps, step_penalty,
+                goal_bonus, touched, goal_paths, goal_lengths):
+    n = len(ptr) - 1
+    visited = np.zeros(n, np.bool_)
+    path = np.empty(max_steps + 1, np.int64)
+    deg_max = 1
+    for u in range(n):
+        deg_max = max(deg_max, ptr[u + 1] - ptr[u])
+    buf = np.empty(deg_max, np.float64)
+    cum = np.empty(deg_max, np.float64)
+    best = np.empty(deg_max, np.int64)
+    n_goal = 0
+
+    for _ in range(n_episodes):
+        state = start
+        steps = 0
+        visited[start] = True
+        path[0] = start
+        while state != goal and steps < max_steps:
+            a = _ql_action(mt, state, ptr, nbr, q, heur, g_ptr, g_nbr, g_w, g_arc, use_guide, eps, buf, cum, best)
+            if a < 0:
+                break
+            action = nbr[a]
+            if visited[action]:
+                # Python: "if action:" → kimliği 0 olan düğüme ceza yazılmaz
+                if node_ids[action] != 0:
+                    q[a] -= 10
+                    touched[a] = True
+                break
+
+            r = reward[a]
+            r -= steps * step_penalty
+            if action == goal:
+                r += goal_bonus
+
+            lo = ptr[action]
+            hi = ptr[action + 1]
+            max_next_q = 0.0
+            if hi > lo:
+                max_next_q = q[lo]
+                for p in range(lo + 1, hi):
+                    if q[p] > max_next_q:
+                        max_next_q = q[p]
+            q[a] += lr * (r + gamma * max_next_q - q[a])
+            touched[a] = True
+
+            visited[action] = True
+            steps += 1
+            path[steps] = action
+            state = action
+
+        for i in range(steps + 1):
+            visited[path[i]] = False
+        if state == goal:
+            for i in range(steps + 1):
+                goal_paths[n_goal, i] = path[i]
+            goal_lengths[n_goal] = steps + 1
+            n_goal += 1
+
+        eps = eps * eps_decay
+        if not eps > 0.01:
+            eps = 0.01
+    return n_goal, eps
+
+
+# ---------------------------------------------------------------
+# GA başlangıç popülasyonu (genetik_alg.create_population +
+# random_path / guided_random_path + is_valid_path)
+# ---------------------------------------------------------------
+@kernel
+def ga_population(mt, size, max_tries, s, t, max_hops, guided, ptr, nbr, g_ptr, g_nbr, g_w, g_arc, hops,
+                  bandwidth, min_bw, paths, lengths):
+    n = len(ptr) - 1
+    visited = np.zeros(n, np.bool_)
+    path = np.empty(max_hops + 1, np.int64)
+    arcs = np.empty(max_hops + 1, np.int64)
+    deg_max = 1
+    for u in range(n):
+        deg_max = max(deg_max, g_ptr[u + 1] - g_ptr[u])
+    buf = np.empty(deg_max, np.float64)
+    cum = np.empty(deg_max, np.float64)
+    opt_nbr = np.empty(deg_max, np.int64)
+    opt_arc = np.empty(deg_max, np.int64)
+
+    count = 0
+    tries = 0
+    while count < size and tries < max_tries:
+        tries += 1
+        length = 0
+        if guided:
+            if hops[s] <= max_hops:
+                path[0] = s
+                visited[s] = True
+                length = 1
+                current = s
+                while current != t:
+                    hops_left = max_hops - (length - 1) - 1
+                    k = 0
+                    for p in range(g_ptr[current], g_ptr[current + 1]):
+                        v = g_nbr[p]
+                        if not visited[v] and hops[v] <= hops_left:
+                            opt_nbr[k] = v
+                            opt_arc[k] = g_arc[p]
+                            buf[k] = g_w[p]
+                            k += 1
+                    if k == 0:
+                        break
+                    j = choices_index(mt, buf, k, cum)
+                    current = opt_nbr[j]
+                    arcs[length - 1] = opt_arc[j]
+                    path[length] = current
+                    visited[current] = True
+                    length += 1
+                for i in range(length):
+                    visited[path[i]] = False
+                if current != t:
+                    length = 0
+        else:
+            for _ in range(30):
+                path[0] = s
+                length = 1
+                current = s
+                found = False
+                for _ in range(max_hops):
+                    deg = ptr[current + 1] - ptr[current]
+                    if deg == 0:
+                        break
+                    a = ptr[current] + randbelow(mt, deg)
+                    current = nbr[a]
+                    arcs[length - 1] = a
+                    path[length] = current
+                    length += 1
+                    if current == t:
+                        found = True
+                        break
+                if found:
+                    break
+                length = 0
+
+        # is_valid_path(p, G, min_bandwidth)
+        if length < 2:
+            continue
+        ok = True
+        for i in range(length - 1):
+            if bandwidth[arcs[i]] < min_bw:
+                ok = False
+                break
+        if ok:
+            for i in range(length):
+                paths[count, i] = path[i]
+            lengths[count] = length
+            count += 1
+    return count, tries
+
+
+# ---------------------------------------------------------------
+# Paket simülatörü olay döngüsü (simulation.TrafficSimulator._run_python)
+# Heap (zaman, paket, hop) sıralıdır; bir paketin aynı anda tek olayı
+# olduğundan anahtar (zaman, paket << 16 | hop) ile aynı sıra elde edilir.
+# 4'lü heap, kaydırmalar takas yerine boşluk taşıyarak yapılır. Link
+# kuyrukları buffer_packets boyutlu halka tampon; kayıp olasılığı mt
+# akışından (random.Random(seed) ile aynı sayılar).
+# ---------------------------------------------------------------
+@kernel
+def _heap_push(ht, hk, size, t, k):
+    i = size
+    while i > 0:
+        parent = (i - 1) >> 2
+        pt = ht[parent]
+        if pt < t or (pt == t and hk[parent] < k):
+            break
+        ht[i] = pt
+        hk[i] = hk[parent]
+        i = parent
+    ht[i] = t
+    hk[i] = k
+
+
+# Kökü çıkarır (size: çıkarmadan önceki eleman sayısı)
+@kernel
+def _heap_pop(ht, hk, size):
+    size -= 1
+    t = ht[size]
+    k = hk[size]
+    i = 0
+    while True:
+        c = 4 * i + 1
+        if c >= size:
+            break
+        best = c
+        end = min(c + 4, size)
+        for j in range(c + 1, end):
+            if ht[j] < ht[best] or (ht[j] == ht[best] and hk[j] < hk[best]):
+                best = j
+        if t < ht[best] or (t == ht[best] and k < hk[best]):
+            break
+        ht[i] = ht[best]
+        hk[i] = hk[best]
+        i = best
+    ht[i] = t
+    hk[i] = k
+
+
+@kernel
+def sim_events(mt, sent, owner, flow_ptr, flow_links, tx, prop, p_loss, proc_after, buffer_packets,
+               busy, wait_sum, wait_max, counts, delivered, delays):
+    n_links = len(tx)
+    n_packets = len(sent)
+    free = np.zeros(n_links)
+    q_buf = np.empty((n_links, buffer_packets))
+    q_head = np.zeros(n_links, np.int64)
+    q_len = np.zeros(n_links, np.int64)
+
+    cap = 1024
+    ht = np.empty(cap)
+    hk = np.empty(cap, np.int64)
+    size = 0
+    next_pid = 0
+    events = 0
+    n_delivered = 0
+
+    while size > 0 or next_pid < n_packets:
+        if size > 0 and (next_pid == n_packets or ht[0] < sent[next_pid]):
+            t = ht[0]
+            pid = hk[0] >> 16
+            hop = hk[0] & 0xFFFF
+            _heap_pop(ht, hk, size)
+            size -= 1
+        else:
+            t = sent[next_pid]
+            pid = next_pid
+            hop = 0
+            next_pid += 1
+        events += 1
+        f = owner[pid]
+        link = flow_links[flow_ptr[f] + hop]
+
+        head = q_head[link]
+        n = q_len[link]
+        while n > 0 and q_buf[link, head] <= t:
+            head += 1
+            if head == buffer_packets:
+                head = 0
+            n -= 1
+        q_head[link] = head
+        q_len[link] = n
+        if n >= buffer_packets:
+            counts[1, link] += 1
+            continue
+
+        start = free[link] if free[link] > t else t
+        w = start - t
+        done = start + tx[link]
+        free[link] = done
+        tail = head + n
+        if tail >= buffer_packets:
+            tail -= buffer_packets
+        q_buf[link, tail] = done
+        q_len[link] = n + 1
+        busy[link] += tx[link]
+        counts[0, link] += 1
+        wait_sum[link] += w
+        if w > wait_max[link]:
+            wait_max[link] = w
+
+        if p_loss[link] != 0.0 and rand_float(mt) < p_loss[link]:
+            counts[2, link] += 1
+            continue
+
+        arrive = done + prop[link]
+        if flow_ptr[f] + hop + 1 == flow_ptr[f + 1]:
+            delivered[n_delivered] = pid
+            delays[n_delivered] = arrive - sent[pid]
+            n_delivered += 1
+        else:
+            if size == cap:
+                cap *= 2
+                ht2 = np.empty(cap)
+                hk2 = np.empty(cap, np.int64)
+                ht2[:size] = ht[:size]
+                hk2[:size] = hk[:size]
+                ht, hk = ht2, hk2
+            _heap_push(ht, hk, size, arrive + proc_after[link], (pid << 16) | (hop + 1))
+            size += 1
+    return events, n_delivered
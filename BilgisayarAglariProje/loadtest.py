@@ -0,0 +1,182 @@
+import argparse
+import csv
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------------------------------------------------
+# YÜK TESTİ
+#
+#   python loadtest.py --url http://127.0.0.1:8000 -c 8 -n 40 --deadline-ms 500
+#
+# Demand dosyasındaki (S, D, demand_mbps) talepleri sırayla /calculate_route'a
+# eşzamanlı gönderir ve algoritma başına şunları raporlar:
+#   istek/s, p50 / p99 gecikme (ms), başarılı, yol bulunamadı (400),
+#   429 (meşgul) ve diğer hata sayısı
+#
+#   python loadtest.py --coalesce 8 --algorithms Q-Learning
+#
+# İstek birleştirme testi: aynı çift için N özdeş isteği aynı anda
+# /calculate_route ve /api/compare_all'a gönderir; /network sayaçlarından
+# kaç hesaplama yapıldığını / kaç isteğin birleştirildiğini ve tüm
+# cevapların aynı olup olmadığını raporlar.
+# ---------------------------------------------------------------
+
+DEMAND_FILE = "BSM307_317_Guz2025_TermProject_DemandData.csv"
+
+
+def load_demands(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return [(int(r["src"]), int(r["dst"]), float(r["demand_mbps"].replace(",", ".")))
+                for r in csv.DictReader(f, delimiter=";")]
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, int(round(q / 100 * (len(values) - 1)))))
+    return values[idx]
+
+
+def send(url, payload, timeout, with_body=False):
+    body = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    data = None
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            data = resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        data = e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    ms = (time.perf_counter() - t0) * 1000
+    return (status, ms, data) if with_body else (status, ms)
+
+
+def coalescing_stats(args):
+    with urllib.request.urlopen(args.url.rstrip("/") + "/network", timeout=args.timeout) as resp:
+        return json.loads(resp.read())["coalescing"]
+
+
+def run_algorithm(args, algorithm, demands):
+    payloads = []
+    for i in range(args.requests):
+        source, target, bw = demands[i % len(demands)]
+        payload = {
+            "algorithm": algorithm,
+            "source": source,
+            "target": target,
+            "min_bandwidth": bw,
+            "include_image": args.image,
+            # Önbellekten dönen cevaplar ölçümü bozmasın
+            "no_cache": True,
+        }
+        if args.deadline_ms is not None:
+            payload["deadline_ms"] = args.deadline_ms
+        payloads.append(payload)
+
+    url = args.url.rstrip("/") + "/calculate_route"
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as ex:
+        results = list(ex.map(lambda p: send(url, p, args.timeout), payloads))
+    wall = time.perf_counter() - t0
+
+    ok = [ms for status, ms in results if status == 200]
+    return {
+        "algorithm": algorithm,
+        "requests": len(results),
+        "ok": len(ok),
+        "no_path_400": sum(1 for status, _ in results if status == 400),
+        "busy_429": sum(1 for status, _ in results if status == 429),
+        "errors": sum(1 for status, _ in results if status not in (200, 400, 429)),
+        "rps": len(ok) / wall if wall > 0 else 0.0,
+        "p50_ms": percentile(ok, 50),
+        "p99_ms": percentile(ok, 99),
+    }
+
+
+def run_coalescing(args, algorithm, demand):
+    source, target, bw = demand
+    route = {"algorithm": algorithm, "source": source, "target": target, "min_bandwidth": bw,
+             "include_image": args.image, "no_cache": True}
+    compare = {"source": source, "target": target, "min_bandwidth": bw}
+    if args.deadline_ms is not None:
+        route["deadline_ms"] = compare["deadline_ms"] = args.deadline_ms
+
+    rows = []
+    for name, endpoint, payload in (("calculate_route", "/calculate_route", route),
+                                    ("compare_all", "/api/compare_all", compare)):
+        url = args.url.rstrip("/") + endpoint
+        before = coalescing_stats(args)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.coalesce) as ex:
+            results = list(ex.map(lambda p: send(url, p, args.timeout, with_body=True), [payload] * args.coalesce))
+        wall = time.perf_counter() - t0
+        after = coalescing_stats(args)
+        rows.append({
+            "endpoint": endpoint,
+            "requests": len(results),
+            "ok": sum(1 for status, _, _ in results if status == 200),
+            "executed": after["executed"].get(name, 0) - before["executed"].get(name, 0),
+            "coalesced": after["coalesced"].get(name, 0) - before["coalesced"].get(name, 0),
+            "identical": len({body for _, _, body in results}) == 1,
+            "wall_ms": wall * 1000,
+            "p50_ms": percentile([ms for _, ms, _ in results], 50),
+        })
+    return rows
+
+
+def fmt(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/calculate_route yük testi")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--algorithms", default="Dijkstra,Hop-Limited,Value-Iteration,ACO,MMAS,GA,Q-Learning")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-n", "--requests", type=int, default=40, help="algoritma başına istek sayısı")
+    parser.add_argument("--deadline-ms", type=float, default=None)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--image", action="store_true", help="graf görselini de çizdir")
+    parser.add_argument("--demands", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), DEMAND_FILE))
+    parser.add_argument("--json", action="store_true", help="sonucu JSON olarak yazdır")
+    parser.add_argument("--coalesce", type=int, default=0,
+                        help="N özdeş eşzamanlı istekle birleştirme testi (ilk algoritma ve ilk demand)")
+    args = parser.parse_args()
+
+    demands = load_demands(args.demands)
+
+    if args.coalesce:
+        algorithm = args.algorithms.split(",")[0].strip()
+        rows = run_coalescing(args, algorithm, demands[0])
+        if args.json:
+            print(json.dumps(rows, indent=2))
+            return
+        print(f"{'uç nokta':<20}{'istek':>7}{'ok':>6}{'hesaplama':>11}{'birleşen':>10}{'aynı':>7}{'süre ms':>10}")
+        for r in rows:
+            print(f"{r['endpoint']:<20}{r['requests']:>7}{r['ok']:>6}{r['executed']:>11}{r['coalesced']:>10}"
+                  f"{'evet' if r['identical'] else 'hayır':>7}{r['wall_ms']:>10.1f}")
+        return
+
+    rows = [run_algorithm(args, alg.strip(), demands) for alg in args.algorithms.split(",") if alg.strip()]
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'algoritma':<12}{'istek':>7}{'ok':>6}{'400':>6}{'429':>6}{'hata':>6}{'istek/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in rows:
+        print(f"{r['algorithm']:<12}{r['requests']:>7}{r['ok']:>6}{r['no_path_400']:>6}{r['busy_429']:>6}{r['errors']:>6}"
+              f"{r['rps']:>10.2f}{fmt(r['p50_ms']):>10}{fmt(r['p99_ms']):>10}")
+
+
+if __name__ == "__main__":
+    main()
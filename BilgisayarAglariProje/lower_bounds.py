@@ -0,0 +1,126 @@
+import heapq
+import math
+import threading
+from collections import OrderedDict, deque
+
+import Ag_olusturma as ag
+
+# ---------------------------------------------------------------
+# HEDEFE KALAN MALİYET ALT SINIRLARI
+#
+# ACO sezgiseli, Q-Learning keşfi ve GA rastgele yolları sadece yerel
+# kenar maliyetine bakar; derecesi ~100 olan grafta hedefin hangi yönde
+# olduğunu bilmedikleri için karıncalar / bölümler ölür ya da dolanır.
+#
+# GoalBounds bir hedef için tüm düğümlerden hedefe:
+#   cost[u] : en düşük yön maliyeti toplamı (directed_edge_cost, ters Dijkstra)
+#   hops[u] : en az hop sayısı (ters BFS)
+# tutar. cost[u] kesin en kısa yol maliyetidir, dolayısıyla her yol için
+# geçerli bir alt sınırdır; hedefe ulaşamayan düğümler sözlükte yoktur.
+#
+# Hedef başına bir ters Dijkstra (~12k kenar) birkaç on ms sürer ve
+# sonuç (graf sürümü, bandwidth, ağırlıklar, hedef) anahtarıyla LRU
+# önbellekte tutulur; aynı hedefe giden sonraki istekler bedava alır.
+# ---------------------------------------------------------------
+
+INF = float("inf")
+
+
+class GoalBounds:
+    def __init__(self, G, target, w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+        self.target = target
+        # İleri yön maliyet komşuluğu: GA rastgele yürüyüşü de kullanır
+        self.adj = ag.build_cost_adjacency(G, w_delay, w_reliability, w_resource, min_bandwidth)
+
+        reverse = {n: [] for n in self.adj}
+        for u, arcs in self.adj.items():
+            for v, c in arcs:
+                reverse[v].append((u, c))
+
+        self.cost = {}
+        self.hops = {}
+        self._guide = {}
+        if target in reverse:
+            self.cost = self._reverse_dijkstra(reverse, target)
+            self.hops = self._reverse_bfs(reverse, target)
+
+    @staticmethod
+    def _reverse_dijkstra(reverse, target):
+        dist = {target: 0.0}
+        heap = [(0.0, target)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            for u, c in reverse[v]:
+                nd = d + c
+                if nd < dist.get(u, INF):
+                    dist[u] = nd
+                    heapq.heappush(heap, (nd, u))
+        return dist
+
+    @staticmethod
+    def _reverse_bfs(reverse, target):
+        hops = {target: 0}
+        queue = deque([target])
+        while queue:
+            v = queue.popleft()
+            for u, _ in reverse[v]:
+                if u not in hops:
+                    hops[u] = hops[v] + 1
+                    queue.append(u)
+        return hops
+
+    def cost_to_target(self, node):
+        return self.cost.get(node, INF)
+
+    # node'dan hedefe hops_left hop içinde ulaşılabilir mi?
+    def can_reach(self, node, hops_left):
+        return self.hops.get(node, INF) <= hops_left
+
+    # Hedefe yönlü keşif için node'un komşuları ve seçim ağırlıkları.
+    # İndirgenmiş maliyet red(u, v) = c(u, v) + h(v) - h(u) ≥ 0 olup en kısa
+    # yol kenarlarında 0'dır; ağırlık exp(-red / (temperature * h(u))).
+    # temperature küçüldükçe yürüyüş en kısa yola yapışır, büyüdükçe
+    # çeşitlenir. Hedefe ulaşamayan komşular listede yoktur.
+    def guide(self, node, temperature=0.1):
+        key = (node, temperature)
+        entry = self._guide.get(key)
+        if entry is None:
+            neighbors, weights = [], []
+            h_u = self.cost.get(node)
+            if h_u is not None:
+                scale = temperature * max(h_u, 1e-6)
+                for v, c in self.adj.get(node, ()):
+                    h_v = self.cost.get(v)
+                    if h_v is not None:
+                        neighbors.append(v)
+                        weights.append(math.exp(-max(0.0, c + h_v - h_u) / scale))
+            entry = self._guide[key] = (neighbors, weights)
+        return entry
+
+
+BOUNDS_CACHE_SIZE = 64
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_goal_bounds(G, target, w_delay=0.33, w_reliability=0.33, w_resource=0.34, min_bandwidth=None):
+    version = G.graph.get("version")
+    if version is None:
+        return GoalBounds(G, target, w_delay, w_reliability, w_resource, min_bandwidth)
+
+    key = (version, G.graph.get("min_bandwidth"), G.number_of_edges(), min_bandwidth, target,
+           round(w_delay, 6), round(w_reliability, 6), round(w_resource, 6))
+    with _cache_lock:
+        bounds = _cache.get(key)
+        if bounds is not None:
+            _cache.move_to_end(key)
+            return bounds
+
+    bounds = GoalBounds(G, target, w_delay, w_reliability, w_resource, min_bandwidth)
+    with _cache_lock:
+        _cache[key] = bounds
+        while len(_cache) > BOUNDS_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return bounds
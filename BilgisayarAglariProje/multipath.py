@@ -0,0 +1,300 @@
+import heapq
+import time
+
+import numpy as np
+
+import Ag_olusturma as ag
+from graph_arrays import get_compiled
+
+# ---------------------------------------------------------------
+# ÇOK YOLLU YÖNLENDİRME (MIN-COST FLOW)
+#
+# Tek bir yolun darboğazı demand_mbps'i taşıyamıyorsa (GA: "Uygun
+# bandwidth sağlayan yol bulunamadı") demand birkaç yola bölünerek yine
+# taşınabilir. Her yönlü yay (u → v) capacity_mbps kapasiteli, birim
+# (Mbps başına) maliyeti directed_edge_cost olan bir akış ağı kurulur ve
+# kaynaktan hedefe demand_mbps kadar en düşük maliyetli akış bulunur:
+#
+#   - Ardışık en kısa yollar (successive shortest paths): artık (residual)
+#     grafta düğüm potansiyelleriyle indirgenmiş maliyetler üzerinde
+#     Dijkstra, bulunan yol boyunca darboğaz kadar akış itilir. Maliyetler
+#     pozitif olduğundan potansiyeller 0'dan başlar. Düğüm başına komşu
+#     gevşetmeleri CSR dilimleri üzerinde vektörel yapılır.
+#   - Akış yollara ayrıştırılır (her adımda en çok akış taşıyan yay
+#     izlenir); en fazla k yol tutulur, kalan yolların akışı tutulan
+#     yollara boş kapasiteleri ölçüsünde (en ucuzdan başlayarak) eklenir.
+#     Bu yine sığmazsa açgözlü k yollu bölme denenir (her adımda kalanın
+#     eşit payını taşıyabilen en ucuz yol, yoksa en geniş yol); sığmayan
+#     kısım unrouted_mbps olarak bildirilir.
+#
+# Bir yolun birim maliyeti weighted_sum_method ile aynıdır; toplam maliyet
+# Σ yol maliyeti × Mbps'tir.
+# ---------------------------------------------------------------
+
+DEFAULT_MAX_PATHS = 4
+FLOW_EPS = 1e-9
+
+
+class FlowNetwork:
+    def __init__(self, G, w_delay=0.33, w_rel=0.33, w_res=0.34):
+        self.G = G
+        self.cg = cg = get_compiled(G)
+        self.cost = cg.arc_costs(w_delay, w_rel, w_res)
+        self.capacity = cg.bandwidth
+        # Ters artık yaylar için: v'ye giren yaylar (dst'ye göre CSR)
+        self.in_arcs = np.argsort(cg.dst, kind="stable")
+        self.in_ptr = np.zeros(cg.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cg.dst, minlength=cg.n), out=self.in_ptr[1:])
+
+    # s → t'ye en fazla demand kadar en ucuz akış; (yay akışları, itilen, artırım sayısı)
+    def min_cost_flow(self, s, t, demand):
+        cg = self.cg
+        n, indptr, dst, src = cg.n, cg.indptr, cg.dst, cg.src
+        cost, capacity = self.cost, self.capacity
+        in_arcs, in_ptr = self.in_arcs, self.in_ptr
+
+        flow = np.zeros(cg.m, dtype=np.float64)
+        potential = np.zeros(n, dtype=np.float64)
+        sent = 0.0
+        augmentations = 0
+
+        while demand - sent > FLOW_EPS:
+            dist = np.full(n, np.inf)
+            pred = np.full(n, -1, dtype=np.int64)        # önceki yay
+            pred_fwd = np.zeros(n, dtype=bool)           # True → ileri yay, False → ters artık yay
+            done = np.zeros(n, dtype=bool)
+            dist[s] = 0.0
+            heap = [(0.0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if done[u]:
+                    continue
+                done[u] = True
+                if u == t:
+                    break
+
+                # İleri yaylar: u → v, boş kapasite > 0
+                lo, hi = indptr[u], indptr[u + 1]
+                v = dst[lo:hi]
+                nd = d + cost[lo:hi] + potential[u] - potential[v]
+                ok = (capacity[lo:hi] - flow[lo:hi] > FLOW_EPS) & (nd < dist[v]) & ~done[v]
+                if ok.any():
+                    idx = np.nonzero(ok)[0]
+                    dist[v[idx]] = nd[idx]
+                    pred[v[idx]] = lo + idx
+                    pred_fwd[v[idx]] = True
+                    for node, dn in zip(v[idx].tolist(), nd[idx].tolist()):
+                        heapq.heappush(heap, (dn, node))
+
+                # Ters artık yaylar: a = (v → u) üzerinde akış varsa u → v, maliyet -cost[a]
+                arcs = in_arcs[in_ptr[u]:in_ptr[u + 1]]
+                arcs = arcs[flow[arcs] > FLOW_EPS]
+                if len(arcs):
+                    v = src[arcs]
+                    nd = d - cost[arcs] + potential[u] - potential[v]
+                    ok = (nd < dist[v]) & ~done[v]
+                    if ok.any():
+                        dist[v[ok]] = nd[ok]
+                        pred[v[ok]] = arcs[ok]
+                        pred_fwd[v[ok]] = False
+                        for node, dn in zip(v[ok].tolist(), nd[ok].tolist()):
+                            heapq.heappush(heap, (dn, node))
+
+            if not np.isfinite(dist[t]):
+                break
+
+            # Potansiyeller: erken durdurulan Dijkstra için min(dist, dist[t])
+            potential += np.minimum(dist, dist[t])
+
+            # Yol boyunca darboğaz
+            steps = []
+            node = t
+            while node != s:
+                a = pred[node]
+                steps.append((a, pred_fwd[node]))
+                node = src[a] if pred_fwd[node] else dst[a]
+            delta = demand - sent
+            for a, fwd in steps:
+                delta = min(delta, capacity[a] - flow[a] if fwd else flow[a])
+            for a, fwd in steps:
+                flow[a] += delta if fwd else -delta
+            sent += delta
+            augmentations += 1
+
+        return flow, sent, augmentations
+
+    # Akışı (yol, Mbps) listesine ayrıştırır; en çok akış taşıyan yay izlenir
+    def decompose(self, flow, s, t):
+        cg = self.cg
+        flow = flow.copy()
+        paths = []
+        while True:
+            node, arcs, seen = s, [], {s: 0}
+            while node != t:
+                lo, hi = cg.indptr[node], cg.indptr[node + 1]
+                if hi == lo:
+                    break
+                a = lo + int(np.argmax(flow[lo:hi]))
+                if flow[a] <= FLOW_EPS:
+                    break
+                node = int(cg.dst[a])
+                if node in seen:
+                    # Döngü (pozitif maliyetlerde beklenmez): akışı iptal edilip baştan izlenir
+                    cycle = arcs[seen[node]:] + [a]
+                    flow[cycle] -= flow[cycle].min()
+                    node, arcs, seen = s, [], {s: 0}
+                    continue
+                seen[node] = len(arcs) + 1
+                arcs.append(a)
+            if node != t or not arcs:
+                break
+            amount = float(flow[arcs].min())
+            flow[arcs] -= amount
+            paths.append((arcs, amount))
+        return paths
+
+    # Sadece spare ≥ need olan yaylarla en ucuz (need=None → en geniş darboğazlı) s → t yayları
+    def _path(self, s, t, spare, need=None):
+        cg = self.cg
+        widest = need is None
+        best = np.full(cg.n, -np.inf if widest else np.inf)
+        pred = np.full(cg.n, -1, dtype=np.int64)
+        done = np.zeros(cg.n, dtype=bool)
+        best[s] = np.inf if widest else 0.0
+        heap = [(-best[s] if widest else 0.0, s)]
+        while heap:
+            key, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            if u == t:
+                break
+            lo, hi = cg.indptr[u], cg.indptr[u + 1]
+            v = cg.dst[lo:hi]
+            if widest:
+                value = np.minimum(best[u], spare[lo:hi])
+                ok = (spare[lo:hi] > FLOW_EPS) & (value > best[v]) & ~done[v]
+            else:
+                value = best[u] + self.cost[lo:hi]
+                ok = (spare[lo:hi] >= need) & (value < best[v]) & ~done[v]
+            idx = np.nonzero(ok)[0]
+            best[v[idx]] = value[idx]
+            pred[v[idx]] = lo + idx
+            for node, val in zip(v[idx].tolist(), value[idx].tolist()):
+                heapq.heappush(heap, (-val if widest else val, node))
+        if not done[t]:
+            return None
+        arcs = []
+        node = t
+        while node != s:
+            arcs.append(int(pred[node]))
+            node = int(self.cg.src[pred[node]])
+        return arcs[::-1]
+
+    # k sınırlı açgözlü bölme: her adımda kalanın eşit payını (kalan / kalan yol
+    # sayısı) taşıyabilen en ucuz yol, yoksa en geniş yol
+    def greedy_split(self, s, t, demand, k):
+        spare = self.capacity.copy()
+        parts = []
+        remaining = demand
+        for i in range(k):
+            arcs = self._path(s, t, spare, need=remaining / (k - i)) or self._path(s, t, spare)
+            if arcs is None:
+                break
+            amount = min(remaining, float(spare[arcs].min()))
+            if amount <= FLOW_EPS:
+                break
+            spare[arcs] -= amount
+            parts.append((arcs, amount))
+            remaining -= amount
+            if remaining <= FLOW_EPS:
+                break
+        return parts
+
+    def arcs_to_path(self, s, arcs):
+        ids = self.cg.node_ids
+        return [int(ids[s])] + [int(ids[self.cg.dst[a]]) for a in arcs]
+
+
+# Demand'i en fazla k yola böler
+def split_demand(G, source, target, demand_mbps, w_delay=0.33, w_rel=0.33, w_res=0.34, k=DEFAULT_MAX_PATHS):
+    if k < 1:
+        raise ValueError("k en az 1 olmalıdır.")
+    if demand_mbps <= 0:
+        raise ValueError("demand_mbps pozitif olmalıdır.")
+    t0 = time.perf_counter()
+    net = FlowNetwork(G, w_delay, w_rel, w_res)
+    s, t = (int(i) for i in net.cg.index_of([source, target]))
+    if s < 0 or t < 0:
+        raise KeyError("Kaynak veya hedef düğüm grafikte yok.")
+    if s == t:
+        raise ValueError("Kaynak ve hedef aynı olamaz.")
+
+    # Kaynaktan çıkan / hedefe giren toplam kapasite akışın üst sınırıdır
+    cg = net.cg
+    cut = min(net.capacity[cg.indptr[s]:cg.indptr[s + 1]].sum(), net.capacity[cg.dst == t].sum())
+    if demand_mbps > cut:
+        raise ValueError(f"Ağın kapasitesi yetersiz: kaynak/hedef kesiti en fazla {cut:.1f} Mbps "
+                         f"(demand={demand_mbps} Mbps).")
+
+    flow, sent, augmentations = net.min_cost_flow(s, t, demand_mbps)
+    parts = net.decompose(flow, s, t)
+    parts.sort(key=lambda p: -p[1])
+
+    # k sınırı: fazla yolların akışı tutulan yolların boş kapasitesine taşınır
+    kept, dropped = parts[:k], sum(amount for _, amount in parts[k:])
+    if dropped > FLOW_EPS:
+        load = np.zeros(net.cg.m)
+        for arcs, amount in kept:
+            load[arcs] += amount
+        unit = [float(net.cost[arcs].sum()) for arcs, _ in kept]
+        for i in sorted(range(len(kept)), key=lambda i: unit[i]):
+            arcs, amount = kept[i]
+            extra = min(dropped, float((net.capacity[arcs] - load[arcs]).min()))
+            if extra > FLOW_EPS:
+                load[arcs] += extra
+                kept[i] = (arcs, amount + extra)
+                dropped -= extra
+        kept.sort(key=lambda p: -p[1])
+
+        # Bölüşüm k yola sığmadıysa açgözlü k yollu bölme denenir (daha çok taşıyorsa o kullanılır)
+        if dropped > FLOW_EPS:
+            greedy = net.greedy_split(s, t, demand_mbps, k)
+            if sum(amount for _, amount in greedy) > sum(amount for _, amount in kept) + FLOW_EPS:
+                kept = sorted(greedy, key=lambda p: -p[1])
+
+    routed = sum(amount for _, amount in kept)
+    paths = []
+    total_cost = 0.0
+    for arcs, amount in kept:
+        path = net.arcs_to_path(s, arcs)
+        unit_cost = float(ag.weighted_sum_method(path, G, w_delay, w_rel, w_res))
+        total_cost += unit_cost * amount
+        paths.append({
+            "path": path,
+            "mbps": round(amount, 3),
+            "fraction": round(amount / demand_mbps, 4),
+            "unit_cost": round(unit_cost, 4),
+            "delay": round(ag.total_delay(path, G), 2),
+            "reliability": round(float(ag.total_reliability(path, G)) * 100, 2),
+            "bottleneck": float(net.capacity[arcs].min()),
+        })
+
+    result = {
+        "source": source,
+        "target": target,
+        "demand_mbps": demand_mbps,
+        "routed_mbps": round(routed, 3),
+        "unrouted_mbps": round(max(0.0, demand_mbps - routed), 3),
+        "feasible": demand_mbps - routed <= 1e-6 * max(1.0, demand_mbps),
+        "k": k,
+        "paths": paths,
+        "total_cost": round(total_cost, 4),
+        "augmentations": augmentations,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+    if sent < demand_mbps - FLOW_EPS:
+        result["error"] = f"Ağın kapasitesi yetersiz: en fazla {sent:.1f} Mbps taşınabilir (demand={demand_mbps} Mbps)."
+    elif not result["feasible"]:
+        result["error"] = f"Demand {k} yola sığmıyor: {result['unrouted_mbps']} Mbps yerleştirilemedi (k'yı artırın)."
+    return result
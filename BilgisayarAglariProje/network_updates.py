@@ -0,0 +1,503 @@
+import heapq
+import threading
+from collections import OrderedDict
+
+import Ag_olusturma as ag
+
+# ---------------------------------------------------------------
+# CANLI AĞ GÜNCELLEMELERİ VE ARTIMSAL ONARIM
+#
+# Çalışma sırasında linkler düşer, delay_ms / r_link / capacity_mbps
+# değişir. NetworkState derlenmiş grafı (ag.G) yerinde değiştirir,
+# G.graph["version"] numarasını artırır ve yalnızca değişen kenar /
+# düğüme dokunan önbellek girdilerini geçersiz kılar veya onarır:
+#
+#   RouteCache       → kötüleşmede sadece değişen öğeyi içeren rotalar
+#                      silinir; iyileşme (ucuzlayan / eklenen link) başka
+#                      yolları en iyi yapabileceği için önbellek boşaltılır
+#   ShortestPathTree → hedefe doğru en kısa yol ağacı (routing table),
+#                      dinamik en kısa yol güncellemesiyle onarılır
+#   Q-Learning       → önbellekteki ajanların yalnızca ilgili
+#                      Q-değerleri sıfırlanır (sıcak kalır)
+# ---------------------------------------------------------------
+
+INF = float("inf")
+
+# Değeri artınca yolu iyileştiren öznitelikler (diğerleri azalınca iyileştirir)
+HIGHER_IS_BETTER = {"bandwidth", "link_reliability", "node_reliability"}
+
+
+# Güncelleme herhangi bir yolu ucuzlatabilir mi? (eski → yeni öznitelikler)
+def is_improvement(old, updates):
+    for name, value in updates.items():
+        before = old.get(name)
+        if before is None:
+            return True
+        if (value > before) if name in HIGHER_IS_BETTER else (value < before):
+            return True
+    return False
+
+
+# Ağırlık / bandwidth eşiği anahtarı: önbelleklerde ortak kullanılır
+def weights_key(w_delay, w_rel, w_res, min_bandwidth):
+    return (round(w_delay, 6), round(w_rel, 6), round(w_res, 6), round(min_bandwidth or 0, 6))
+
+
+# Yollar üzerindeki yönsüz kenarlar (frozenset) ve düğümler
+def path_elements(paths):
+    edges, nodes = set(), set()
+    for path in paths:
+        edges.update(frozenset(e) for e in zip(path[:-1], path[1:]))
+        nodes.update(path)
+    return edges, nodes
+
+
+# ---------------------------------------------------------------
+# Rota önbelleği (LRU)
+# Her girdi yollarının (birincil + yedekler) kenar/düğüm kümesiyle
+# indekslenir; bir kenar kötüleştiğinde (ya da düştüğünde) sadece o
+# kenarı kullanan girdiler silinir. İyileşmede (improved=True) önbellekteki
+# yolları kullanmayan daha iyi bir yol doğmuş olabilir: tümü silinir.
+# ---------------------------------------------------------------
+class RouteCache:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.by_edge = {}
+        self.by_node = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, paths, value):
+        if key in self.entries:
+            self._remove(key)
+        edges, nodes = path_elements(paths)
+        self.entries[key] = (value, edges, nodes)
+        for e in edges:
+            self.by_edge.setdefault(e, set()).add(key)
+        for n in nodes:
+            self.by_node.setdefault(n, set()).add(key)
+        while len(self.entries) > self.max_size:
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        _, edges, nodes = self.entries.pop(key)
+        for e in edges:
+            self.by_edge.get(e, set()).discard(key)
+        for n in nodes:
+            self.by_node.get(n, set()).discard(key)
+
+    def invalidate(self, edges=(), nodes=(), improved=False):
+        if improved:
+            count = len(self.entries)
+            self.clear()
+            return count
+        keys = set()
+        for e in edges:
+            keys |= self.by_edge.pop(frozenset(e), set())
+        for n in nodes:
+            keys |= self.by_node.pop(n, set())
+        for key in keys:
+            if key in self.entries:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        self.entries.clear()
+        self.by_edge.clear()
+        self.by_node.clear()
+
+
+# ---------------------------------------------------------------
+# Hedefe doğru en kısa yol ağacı (routing table)
+# dist[u]     : u düğümünden target'a en düşük weighted cost
+# next_hop[u] : bu maliyeti veren komşu
+# Maliyetler ag.directed_edge_cost ile hesaplanır (weighted_sum_method
+# sıralamasıyla aynı). Kenar değiştiğinde tüm ağaç yeniden
+# hesaplanmaz; yalnızca etkilenen alt ağaç onarılır.
+# ---------------------------------------------------------------
+class ShortestPathTree:
+    def __init__(self, G, target, w_delay=0.33, w_rel=0.33, w_res=0.34, min_bandwidth=None):
+        self.G = G
+        self.target = target
+        self.weights = (w_delay, w_rel, w_res)
+        self.min_bandwidth = min_bandwidth
+        self.dist = {}
+        self.next_hop = {}
+        self.children = {}
+        self._full_build()
+
+    # u → v yayının güncel maliyeti (kenar yoksa / bandwidth yetmiyorsa INF)
+    def arc_cost(self, u, v):
+        if not self.G.has_edge(u, v):
+            return INF
+        if self.min_bandwidth is not None and self.G.edges[u, v].get("bandwidth", 0) < self.min_bandwidth:
+            return INF
+        return ag.directed_edge_cost(self.G, u, v, *self.weights)
+
+    def _set_parent(self, u, parent):
+        old = self.next_hop.get(u)
+        if old is not None:
+            self.children.get(old, set()).discard(u)
+        if parent is None:
+            self.next_hop.pop(u, None)
+        else:
+            self.next_hop[u] = parent
+            self.children.setdefault(parent, set()).add(u)
+
+    # Ters yönde Dijkstra: hedeften başlayıp u → v yaylarını geriye doğru gevşetir
+    def _propagate(self, heap):
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > self.dist.get(v, INF):
+                continue
+            for u in self.G.neighbors(v):
+                nd = d + self.arc_cost(u, v)
+                if nd < self.dist.get(u, INF):
+                    self.dist[u] = nd
+                    self._set_parent(u, v)
+                    heapq.heappush(heap, (nd, u))
+
+    def _full_build(self):
+        self.dist = {}
+        self.next_hop = {}
+        self.children = {}
+        if self.target not in self.G.nodes:
+            return
+        self.dist[self.target] = 0.0
+        self._propagate([(0.0, self.target)])
+
+    def path(self, source):
+        if source not in self.dist:
+            return None
+        path = [source]
+        while path[-1] != self.target:
+            path.append(self.next_hop[path[-1]])
+        return path
+
+    def _subtree(self, root):
+        stack = [root]
+        nodes = set()
+        while stack:
+            x = stack.pop()
+            if x in nodes:
+                continue
+            nodes.add(x)
+            stack.extend(self.children.get(x, ()))
+        return nodes
+
+    # -----------------------------------------------------------
+    # Artan maliyet / silinen yay onarımı:
+    # etkilenen alt ağacın mesafeleri silinir, etkilenmeyen
+    # komşulardan en iyi değerlerle tohumlanır ve alt ağaç
+    # içinde Dijkstra ile yeniden kurulur.
+    # -----------------------------------------------------------
+    def _repair_subtree(self, affected):
+        for x in affected:
+            self.dist.pop(x, None)
+            self._set_parent(x, None)
+
+        heap = []
+        for x in affected:
+            if x not in self.G.nodes:
+                continue
+            best, best_v = INF, None
+            for v in self.G.neighbors(x):
+                if v in affected or v not in self.dist:
+                    continue
+                c = self.dist[v] + self.arc_cost(x, v)
+                if c < best:
+                    best, best_v = c, v
+            if best_v is not None:
+                self.dist[x] = best
+                self._set_parent(x, best_v)
+                heapq.heappush(heap, (best, x))
+        self._propagate(heap)
+
+    # Azalan maliyet / yeni yay: u → v üzerinden iyileşme varsa yay
+    def _relax_arc(self, u, v):
+        if v not in self.dist or u not in self.G.nodes:
+            return
+        nd = self.dist[v] + self.arc_cost(u, v)
+        if nd < self.dist.get(u, INF):
+            self.dist[u] = nd
+            self._set_parent(u, v)
+            self._propagate([(nd, u)])
+
+    def arcs_changed(self, arcs):
+        affected = set()
+        for u, v in arcs:
+            if self.next_hop.get(u) == v:
+                affected |= self._subtree(u)
+        if affected:
+            self._repair_subtree(affected)
+        for u, v in arcs:
+            self._relax_arc(u, v)
+        return bool(affected)
+
+    def node_removed(self, node):
+        if node == self.target:
+            self._full_build()
+            return True
+        affected = self._subtree(node) if node in self.dist else set()
+        self._repair_subtree(affected)
+        self.children.pop(node, None)
+        return bool(affected)
+
+
+# ---------------------------------------------------------------
+# Graf + önbelleklerin tek sahibi
+# ---------------------------------------------------------------
+class NetworkState:
+    def __init__(self, G, route_cache_size=256, max_tables=64, max_agents=16):
+        self.G = G
+        self.lock = threading.RLock()
+        self.routes = RouteCache(route_cache_size)
+        self.tables = OrderedDict()
+        self.agents = OrderedDict()
+        self.max_tables = max_tables
+        self.max_agents = max_agents
+        # Başlangıçtan beri değişen her kenar / düğümün SON durumu (JSON
+        # uyumlu, son değişiklik sırasıyla). Değişiklik sayısıyla değil,
+        # değişen öğe sayısıyla büyür; uzak işçiler kendi CSV'den yüklenen
+        # grafına apply_snapshot ile uygular.
+        self.edits = {}
+
+    @property
+    def version(self):
+        return self.G.graph.get("version", 0)
+
+    def _record_edge(self, u, v):
+        u, v = min(u, v), max(u, v)
+        attrs = None
+        if self.G.has_edge(u, v):
+            attrs = {name: self.G.edges[u, v][name] for name in ag.EDGE_ATTRS.values()}
+        self.edits.pop(("edge", u, v), None)
+        self.edits[("edge", u, v)] = ["edge", u, v, attrs]
+
+    def _record_node(self, n):
+        attrs = None
+        if n in self.G.nodes:
+            attrs = {name: self.G.nodes[n][name] for name in ag.NODE_ATTRS.values()}
+        else:
+            # Düğümle birlikte kenarları da gider; ayrı kayıtlarına gerek kalmaz
+            for key in [k for k in self.edits if k[0] == "edge" and n in k[1:]]:
+                del self.edits[key]
+        self.edits.pop(("node", n), None)
+        self.edits[("node", n)] = ["node", n, attrs]
+
+    # Uzak işçiler için graf durumu: sürüm + değişen öğelerin son hâli
+    def snapshot(self):
+        with self.lock:
+            return {"version": self.version, "edits": list(self.edits.values())}
+
+    # --------------- routing table (SPT) ---------------
+    def routing_table(self, target, w_delay=0.33, w_rel=0.33, w_res=0.34, min_bandwidth=None):
+        key = (target,) + weights_key(w_delay, w_rel, w_res, min_bandwidth)
+        with self.lock:
+            tree = self.tables.get(key)
+            if tree is None:
+                tree = ShortestPathTree(self.G, target, w_delay, w_rel, w_res, min_bandwidth)
+                self.tables[key] = tree
+                while len(self.tables) > self.max_tables:
+                    self.tables.popitem(last=False)
+            self.tables.move_to_end(key)
+            return tree
+
+    # --------------- Q-Learning ajanları ---------------
+    # Ajanlar filtrelenmiş graf kopyası üzerinde çalışır; kopya da güncellenir.
+    # take_agent ajanı önbellekten çıkarır (aynı anda iki istek aynı
+    # Q-tablosunu eğitmesin) ve grafın o anki sürümünü döner; eğitim bitince
+    # put_agent ile geri konur. Önbellek dışındaki ajan _after_change ile
+    # eşitlenmez: bu arada graf değiştiyse (sürüm farklı) ajan atılır.
+    def take_agent(self, key):
+        with self.lock:
+            entry = self.agents.pop(key, None)
+            return (entry[0] if entry is not None else None), self.version
+
+    # version: ajanın grafının yansıttığı graf sürümü; True → önbelleğe kondu
+    def put_agent(self, key, agent, min_bandwidth=None, version=None):
+        with self.lock:
+            if version is not None and version != self.version:
+                return False
+            self.agents[key] = (agent, min_bandwidth)
+            while len(self.agents) > self.max_agents:
+                self.agents.popitem(last=False)
+            return True
+
+    def _sync_agent_edge(self, agent, min_bandwidth, u, v):
+        Gf = agent.graph
+        keep = self.G.has_edge(u, v) and self.G.edges[u, v].get("bandwidth", 0) >= (min_bandwidth or 0)
+        if keep:
+            if u in Gf.nodes and v in Gf.nodes:
+                Gf.add_edge(u, v, **self.G.edges[u, v])
+        elif Gf.has_edge(u, v):
+            Gf.remove_edge(u, v)
+        agent.refresh_edge(u, v)
+
+    # --------------- güncellemeler ---------------
+    def _bump(self):
+        self.G.graph["version"] = self.version + 1
+
+    def _after_change(self, edges=(), nodes=(), improved=False):
+        # Değişen kenar/düğüme dokunan yaylar (iki yön; düğüm değişince ona giren yaylar)
+        arcs = set()
+        for u, v in edges:
+            arcs.add((u, v))
+            arcs.add((v, u))
+        for n in nodes:
+            if n in self.G.nodes:
+                for x in self.G.neighbors(n):
+                    arcs.add((x, n))
+
+        repaired = 0
+        for tree in self.tables.values():
+            if tree.arcs_changed(arcs):
+                repaired += 1
+
+        invalidated = self.routes.invalidate(edges=edges, nodes=nodes, improved=improved)
+
+        for agent, min_bw in self.agents.values():
+            for u, v in edges:
+                self._sync_agent_edge(agent, min_bw, u, v)
+            for n in nodes:
+                if n not in agent.graph.nodes:
+                    continue
+                agent.graph.nodes[n].update(self.G.nodes[n])
+                for x in list(agent.graph.neighbors(n)):
+                    agent.refresh_edge(x, n)
+
+        return {
+            "version": self.version,
+            "invalidated_routes": invalidated,
+            "repaired_tables": repaired,
+            "refreshed_agents": len(self.agents),
+        }
+
+    def patch_edge(self, u, v, attrs):
+        with self.lock:
+            updates = {ag.EDGE_ATTRS[k]: float(val) for k, val in attrs.items() if k in ag.EDGE_ATTRS}
+            if not updates:
+                raise ValueError(f"Güncellenecek alan yok. Geçerli alanlar: {', '.join(ag.EDGE_ATTRS)}")
+            if u not in self.G.nodes or v not in self.G.nodes:
+                raise KeyError(f"Düğüm bulunamadı: {u} / {v}")
+
+            _validate_edge_attrs(updates)
+
+            if not self.G.has_edge(u, v):
+                # Link geri geldi: tüm öznitelikler verilmeli
+                if len(updates) < len(ag.EDGE_ATTRS):
+                    raise KeyError(f"Kenar yok: ({u}, {v}). Yeniden eklemek için tüm alanlar gerekli.")
+                self.G.add_edge(u, v)
+            improved = is_improvement(self.G.edges[u, v], updates)
+            self.G.edges[u, v].update(updates)
+
+            self._record_edge(u, v)
+            self._bump()
+            return self._after_change(edges=[(u, v)], improved=improved)
+
+    def fail_edge(self, u, v):
+        with self.lock:
+            if not self.G.has_edge(u, v):
+                raise KeyError(f"Kenar yok: ({u}, {v})")
+            self.G.remove_edge(u, v)
+            self._record_edge(u, v)
+            self._bump()
+            return self._after_change(edges=[(u, v)])
+
+    def patch_node(self, n, attrs):
+        with self.lock:
+            updates = {ag.NODE_ATTRS[k]: float(val) for k, val in attrs.items() if k in ag.NODE_ATTRS}
+            if not updates:
+                raise ValueError(f"Güncellenecek alan yok. Geçerli alanlar: {', '.join(ag.NODE_ATTRS)}")
+            if n not in self.G.nodes:
+                raise KeyError(f"Düğüm bulunamadı: {n}")
+            if "node_reliability" in updates and not 0 < updates["node_reliability"] <= 1:
+                raise ValueError("r_node (0, 1] aralığında olmalıdır.")
+            improved = is_improvement(self.G.nodes[n], updates)
+            self.G.nodes[n].update(updates)
+            self._record_node(n)
+            self._bump()
+            return self._after_change(nodes=[n], improved=improved)
+
+    def fail_node(self, n):
+        with self.lock:
+            if n not in self.G.nodes:
+                raise KeyError(f"Düğüm bulunamadı: {n}")
+            self.G.remove_node(n)
+            self._record_node(n)
+            self._bump()
+
+            repaired = sum(1 for tree in self.tables.values() if tree.node_removed(n))
+            invalidated = self.routes.invalidate(nodes=[n])
+            for agent, _ in self.agents.values():
+                if n in agent.graph.nodes:
+                    agent.graph.remove_node(n)
+                agent.drop_node(n)
+
+            return {
+                "version": self.version,
+                "invalidated_routes": invalidated,
+                "repaired_tables": repaired,
+                "refreshed_agents": len(self.agents),
+            }
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "nodes": self.G.number_of_nodes(),
+            "edges": self.G.number_of_edges(),
+            "cached_routes": len(self.routes.entries),
+            "route_cache_hits": self.routes.hits,
+            "route_cache_misses": self.routes.misses,
+            "routing_tables": len(self.tables),
+            "warm_agents": len(self.agents),
+        }
+
+
+# NetworkState.snapshot() çıktısını başlangıç grafı (ya da daha eski bir
+# snapshot uygulanmış graf) üzerine uygular: her kayıtlı öğe son hâline
+# getirilir (None → silinmiş). Grafın sürümü snapshot'ınkinden küçük
+# değilse bir şey yapılmaz.
+def apply_snapshot(G, snapshot):
+    if not snapshot or G.graph.get("version", 0) >= snapshot["version"]:
+        return G
+    for entry in snapshot["edits"]:
+        if entry[0] == "edge":
+            _, u, v, attrs = entry
+            if attrs is None:
+                if G.has_edge(u, v):
+                    G.remove_edge(u, v)
+            elif u in G.nodes and v in G.nodes:
+                if not G.has_edge(u, v):
+                    G.add_edge(u, v)
+                G.edges[u, v].update(attrs)
+        elif entry[0] == "node":
+            _, n, attrs = entry
+            if attrs is None:
+                if n in G.nodes:
+                    G.remove_node(n)
+            elif n in G.nodes:
+                G.nodes[n].update(attrs)
+        else:
+            raise ValueError(f"Bilinmeyen graf değişikliği: {entry[0]}")
+    G.graph["version"] = snapshot["version"]
+    return G
+
+
+def _validate_edge_attrs(updates):
+    if updates.get("bandwidth", 1) <= 0:
+        raise ValueError("capacity_mbps pozitif olmalıdır.")
+    if updates.get("link_delay", 0) < 0:
+        raise ValueError("delay_ms negatif olamaz.")
+    if not 0 < updates.get("link_reliability", 1) <= 1:
+        raise ValueError("r_link (0, 1] aralığında olmalıdır.")
@@ -0,0 +1,236 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import Ag_olusturma as ag
+from lower_bounds import get_goal_bounds
+from qos_routing import violates
+from solver_pool import PoolBusy
+from solvers import Constraints, get_solver
+
+# ---------------------------------------------------------------
+# PORTFÖY (YARIŞ) ÇÖZÜCÜ
+#
+# Etkileşimli sorgularda önemli olan en hızlı iyi cevaptır. Portföy
+# ACO, MMAS, GA, Q-Learning ve kesin bir taban çözücüyü ("Constrained":
+# qos_routing.constrained_shortest_path) ortak arayüzle (solvers.py) aynı
+# anda ayrı süreçlerde başlatır ve:
+#   - kesinliği kanıtlanmış bir cevap gelince, ya da
+#   - bir cevabın maliyeti alt sınırın (1 + tol) katı içindeyse, ya da
+#   - süre bütçesi dolunca (o ana kadarki en iyi cevapla)
+# döner; kalan süreçler sonlandırılır (terminate).
+#
+# Alt sınır: hedefe kalan kesin kısıtsız maliyet (lower_bounds.py). QoS
+# kısıtı varsa bu bir gevşetmedir, kısıtsız durumda optimumun kendisidir.
+#
+# Süreçler fork ile açılır: önceden yüklenmiş graf kopyalanmadan paylaşılır.
+# Her yarış PORTFOLIO_LOG dosyasına (NDJSON) bir satır yazar: kazanan,
+# çiftin şekli (hop mesafesi, kısıt, bandwidth) ve tüm çözücülerin süre /
+# maliyetleri. Başlatma sırası aynı şekildeki geçmiş kazanma sayılarına göre
+# belirlenir (tek çekirdekte önce başlayan önde başlar).
+#
+#   python portfolio.py portfolio_log.ndjson   → şekil başına kazanan tablosu
+# ---------------------------------------------------------------
+
+PORTFOLIO_SOLVERS = ("Constrained", "MMAS", "ACO", "GA", "Q-Learning")
+DEFAULT_BUDGET_MS = 2000.0
+DEFAULT_TOL = 0.01
+# Çözücüler bütçenin bu oranında kendi en iyi cevaplarını gönderir
+WORKER_BUDGET_SHARE = 0.9
+
+
+def pair_shape(bounds, source, qos, min_bandwidth):
+    hops = bounds.hops.get(source)
+    hop_bucket = "yok" if hops is None else str(hops) if hops < 3 else "3+"
+    return f"hops={hop_bucket} qos={int(any(v is not None for v in qos))} bw={int(bool(min_bandwidth))}"
+
+
+# ---------------------------------------------------------------
+# Çocuk süreç: tek çözücüyü çalıştırıp sonucu kuyruğa yazar
+# ---------------------------------------------------------------
+def _race_worker(name, G_filtered, job, results):
+    t0 = time.perf_counter()
+    try:
+        result = get_solver(name).solve(
+            G_filtered, job["source"], job["target"], job["weights"],
+            Constraints(job["min_bandwidth"], job["max_delay"], job["min_reliability"]),
+            budget=job["deadline_ms"])
+        path, proven, error = result.path, result.stats["proven"], result.error
+    except Exception as e:
+        path, proven, error = None, False, str(e)
+    results.put((name, path, proven, (time.perf_counter() - t0) * 1000, error))
+
+
+class Portfolio:
+    def __init__(self, solvers=PORTFOLIO_SOLVERS, max_races=None, log_path=None):
+        self.solvers = tuple(solvers)
+        self.max_races = max_races or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(self.max_races)
+        self._lock = threading.Lock()
+        self.log_path = log_path
+        self.wins = {}      # şekil → {çözücü: kazanma sayısı}
+        self.races = 0
+        self.rejected = 0
+
+    def order_for(self, shape):
+        wins = self.wins.get(shape, {})
+        return sorted(self.solvers, key=lambda s: (-wins.get(s, 0), self.solvers.index(s)))
+
+    # G_filtered: bandwidth eşiğine göre filtrelenmiş graf (çocuk süreçlere fork ile geçer)
+    # Dönüş: (en iyi yol ya da None, yarış kaydı)
+    def race(self, G_filtered, source, target, min_bandwidth=0, w_delay=0.33, w_rel=0.33, w_res=0.34,
+             deadline_ms=None, tol=DEFAULT_TOL, max_delay=None, min_reliability=None):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PoolBusy("Sunucu meşgul, lütfen daha sonra tekrar deneyin.")
+        try:
+            return self._race(G_filtered, source, target, min_bandwidth, w_delay, w_rel, w_res,
+                              deadline_ms, tol, max_delay, min_reliability)
+        finally:
+            self._slots.release()
+
+    def _race(self, G, source, target, min_bandwidth, w_delay, w_rel, w_res,
+              deadline_ms, tol, max_delay, min_reliability):
+        budget_ms = DEFAULT_BUDGET_MS if deadline_ms is None else deadline_ms
+        deadline = ag.make_deadline(budget_ms)
+        qos = (max_delay, min_reliability)
+
+        bounds = get_goal_bounds(G, target, w_delay, w_rel, w_res)
+        lower_bound = bounds.cost_to_target(source) + ag.path_cost_offset(G, source, target, w_delay, w_rel, w_res)
+        shape = pair_shape(bounds, source, qos, min_bandwidth)
+
+        job = {"source": source, "target": target, "min_bandwidth": min_bandwidth,
+               "weights": (w_delay, w_rel, w_res),
+               "max_delay": max_delay, "min_reliability": min_reliability,
+               "deadline_ms": budget_ms * WORKER_BUDGET_SHARE}
+
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+        procs = {}
+        for name in self.order_for(shape):
+            p = ctx.Process(target=_race_worker, args=(name, G, job, results), daemon=True)
+            p.start()
+            procs[name] = p
+
+        finished = {}
+        best = None   # (maliyet, çözücü, yol)
+        winner, reason = None, "deadline"
+        try:
+            while len(finished) < len(procs):
+                wait_s = ag.remaining_ms(deadline) / 1000
+                if wait_s <= 0:
+                    break
+                try:
+                    name, path, proven, elapsed_ms, error = results.get(timeout=wait_s)
+                except queue.Empty:
+                    break
+
+                cost = None
+                if path is not None and not violates(path, G, max_delay, min_reliability):
+                    cost = ag.weighted_sum_method(path, G, w_delay, w_rel, w_res)
+                    if best is None or cost < best[0]:
+                        best = (cost, name, path)
+                finished[name] = {"ms": round(elapsed_ms, 1), "cost": cost, "proven": proven, "error": error}
+
+                if cost is not None and (proven or cost <= lower_bound * (1 + tol) + 1e-9):
+                    winner, reason = name, "proven" if proven else "bound"
+                    break
+            else:
+                reason = "all-finished"
+        finally:
+            for p in procs.values():
+                if p.is_alive():
+                    p.terminate()
+            for p in procs.values():
+                p.join(timeout=1)
+            results.close()
+
+        if winner is None and best is not None:
+            winner = best[1]
+        # Dönen yol her zaman gelen en iyi cevaptır (kazanan sınırı ilk geçendir)
+        path = best[2] if best is not None else None
+
+        record = {
+            "time": time.time(),
+            "source": source,
+            "target": target,
+            "shape": shape,
+            "winner": winner,
+            "reason": reason,
+            "elapsed_ms": round(budget_ms - ag.remaining_ms(deadline), 1),
+            "lower_bound": lower_bound if math.isfinite(lower_bound) else None,
+            "cost": best[0] if best is not None else None,
+            "gap": max(0.0, best[0] / lower_bound - 1) if best is not None and lower_bound > 0 else None,
+            "solvers": finished,
+            "cancelled": [n for n in procs if n not in finished],
+        }
+        self._record(record)
+        return path, record
+
+    def _record(self, record):
+        with self._lock:
+            self.races += 1
+            if record["winner"] is not None:
+                wins = self.wins.setdefault(record["shape"], {})
+                wins[record["winner"]] = wins.get(record["winner"], 0) + 1
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    # Geçmiş log'dan kazanma sayılarını yükler (başlatma sırası için)
+    def load_log(self, path=None):
+        path = path or self.log_path
+        if not path or not os.path.exists(path):
+            return
+        for record in read_log(path):
+            if record.get("winner"):
+                wins = self.wins.setdefault(record["shape"], {})
+                wins[record["winner"]] = wins.get(record["winner"], 0) + 1
+
+    def stats(self):
+        return {"races": self.races, "rejected": self.rejected, "max_races": self.max_races, "wins": self.wins}
+
+
+def read_log(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+# Ortam değişkenlerinden portföy: PORTFOLIO_RACES (eşzamanlı yarış), PORTFOLIO_LOG
+def portfolio_from_env():
+    races = os.environ.get("PORTFOLIO_RACES")
+    portfolio = Portfolio(max_races=int(races) if races else None,
+                          log_path=os.environ.get("PORTFOLIO_LOG", "portfolio_log.ndjson"))
+    portfolio.load_log()
+    return portfolio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portföy yarış log'u özeti (şekil başına kazananlar)")
+    parser.add_argument("log", nargs="?", default="portfolio_log.ndjson")
+    args = parser.parse_args()
+
+    table = {}
+    for record in read_log(args.log):
+        row = table.setdefault(record["shape"], {"races": 0, "wins": {}, "ms": []})
+        row["races"] += 1
+        row["ms"].append(record["elapsed_ms"])
+        if record.get("winner"):
+            row["wins"][record["winner"]] = row["wins"].get(record["winner"], 0) + 1
+
+    print(f"{'şekil':<24}{'yarış':>7}{'ort. ms':>10}  kazananlar")
+    for shape, row in sorted(table.items()):
+        wins = ", ".join(f"{n}={c}" for n, c in sorted(row["wins"].items(), key=lambda x: -x[1]))
+        print(f"{shape:<24}{row['races']:>7}{sum(row['ms']) / len(row['ms']):>10.1f}  {wins}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import copy
+import json
+import math
+import os
+
+# ---------------------------------------------------------------
+# ÇÖZÜCÜ PARAMETRE PRESETLERİ
+#
+# ACO / MMAS / GA / Q-Learning parametreleri eskiden run_algorithm içinde
+# elle seçilmiş sabitlerdi ("Hız için azaltıldı"). Artık:
+#   - DEFAULT_PRESETS bu elle seçilmiş değerlerdir (dosya yoksa kullanılır)
+#   - tuning.py bir demand kümesi üzerinde arama yapıp graf boyutu başına
+#     en iyi değerleri SOLVER_PRESETS dosyasına (JSON) yazar
+#   - Dosya modül yüklenirken (sunucu açılışında) bir kez okunur; havuz
+#     süreçleri fork ile aynı presetleri devralır
+#
+# Dosya biçimi:
+#   {"presets": {"<düğüm sayısı>": {"ACO": {...}, "GA": {...}, ...}},
+#    "tuning":  {"<düğüm sayısı>": {"ACO": {amaç, fark, süre, ...}}}}
+# Bir graf için düğüm sayısı (log ölçeğinde) en yakın girdi kullanılır;
+# girdide olmayan parametreler varsayılandan gelir.
+# ---------------------------------------------------------------
+
+PRESETS_PATH = os.environ.get("SOLVER_PRESETS", "solver_presets.json")
+
+DEFAULT_PRESETS = {
+    "ACO": {"n_ants": 25, "n_iter": 20, "alpha": 1.0, "beta": 3.0, "rho": 0.1},
+    "MMAS": {"n_ants": 25, "n_iter": 40, "alpha": 1.0, "beta": 3.0, "rho": 0.05, "p_best": 0.05},
+    "GA": {"pop_size": 30, "generations": 40, "mutation_rate": 0.2, "max_hops": 6},
+    "Q-Learning": {"episodes": 3000, "learning_rate": 0.1, "discount_factor": 0.9,
+                   "exploration_decay": 0.9992},
+}
+
+_presets = {}      # düğüm sayısı → {algoritma: parametreler}
+_loaded_from = None
+
+
+def read_presets_file(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_presets(path=None):
+    global _presets, _loaded_from
+    path = path or PRESETS_PATH
+    if not os.path.exists(path):
+        _presets, _loaded_from = {}, None
+        return _presets
+    try:
+        data = read_presets_file(path)
+        _presets = {int(n): entry for n, entry in data.get("presets", {}).items()}
+        _loaded_from = path
+    except (OSError, ValueError) as e:
+        print(f"Preset dosyası okunamadı ({path}): {e}")
+        _presets, _loaded_from = {}, None
+    return _presets
+
+
+# Algoritmanın n_nodes düğümlü graf için parametreleri (kopya döner)
+def preset_for(algorithm, n_nodes):
+    params = copy.deepcopy(DEFAULT_PRESETS.get(algorithm, {}))
+    if _presets and n_nodes:
+        size = min(_presets, key=lambda n: abs(math.log(n / n_nodes)))
+        params.update(_presets[size].get(algorithm, {}))
+    return params
+
+
+def presets_info():
+    return {"path": _loaded_from, "graph_sizes": sorted(_presets)}
+
+
+load_presets()
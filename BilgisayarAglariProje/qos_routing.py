@@ -0,0 +1,320 @@
+import heapq
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import Ag_olusturma as ag
+from graph_arrays import get_compiled
+from exact_solvers import vector_shortest_paths, trace_path
+
+# ---------------------------------------------------------------
+# QoS KISITLI YÖNLENDİRME (gecikme bütçesi, en düşük güvenilirlik)
+#
+# Ağırlıklı toplam maliyet en aza indirilirken SLA kısıtları kesin
+# (hard) olarak uygulanır:
+#   total_delay(P)       ≤ max_delay
+#   total_reliability(P) ≥ min_reliability
+#
+# Hepsi yay toplamına çevrilir (sabitler kaynak düğüme bağlıdır):
+#   maliyet c(u, v) = directed_edge_cost
+#   gecikme d(u, v) = link_delay + processing_delay(u)   (- proc(kaynak))
+#   güvensizlik l(u, v) = -log r_link - log r_node(v)    (- log r_node(kaynak))
+#
+# constrained_shortest_path:
+#   1. Hedefe kalan alt sınırlar (c, d, l için ters en kısa yollar).
+#      Kaynaktan en az gecikme / güvensizlik bile bütçeyi aşıyorsa yol yok.
+#   2. Kısıtsız en iyi yol kısıtları sağlıyorsa o döner (en sık durum).
+#   3. Lagrange gevşetmesi (LARAC'ın iki kısıtlı hali): c + λd·d + λl·l
+#      üzerinde en kısa yol, λ alt-gradyan (Polyak adımı) ile güncellenir.
+#      Her çözüm bir alt sınır, uygun çıkan her yol bir üst sınır verir.
+#   4. Fark kapanmadıysa etiket düzeltme (label setting): A* sırasıyla
+#      (c + h_c) genişletilir; alt sınırlarla bütçeyi aşan, üst sınırı
+#      geçemeyecek ve baskın (dominated) etiketler budanır. Hedef ilk
+#      çekildiğinde yol kesin en iyidir.
+#
+# QoSGuard aynı alt sınırlarla ACO / GA / Q-Learning'in yol kurarken
+# kısıtı ihlal edecek adımları daha yol tamamlanmadan reddetmesini sağlar.
+# ---------------------------------------------------------------
+
+LAGRANGE_ITERATIONS = 30
+MAX_LABELS = 200000
+EPS = 1e-9
+
+
+def reliability_budget(min_reliability):
+    if min_reliability is None or min_reliability <= 0:
+        return math.inf
+    if min_reliability > 1:
+        return -math.inf
+    return -math.log(min_reliability)
+
+
+def violates(path, G, max_delay=None, min_reliability=None):
+    if max_delay is not None and ag.total_delay(path, G) > max_delay + EPS:
+        return True
+    if min_reliability is not None and ag.total_reliability(path, G) < min_reliability - EPS:
+        return True
+    return False
+
+
+# ---------------------------------------------------------------
+# Hedefe kalan gecikme / güvensizlik alt sınırları (ağırlıklardan bağımsız)
+# Yay değerleri ve kaynak sabitleri düğüm kimlikleriyle sözlüklerde tutulur.
+# ---------------------------------------------------------------
+class QoSBounds:
+    def __init__(self, G, target, min_bandwidth=None):
+        cg = get_compiled(G)
+        self.cg = cg
+        self.target = target
+        self.mask = np.ones(cg.m, dtype=bool) if not min_bandwidth else cg.bandwidth >= min_bandwidth
+
+        self.arc_delay = cg.link_delay + cg.proc[cg.src]
+        self.arc_unrel = cg.neg_log_r_link + cg.neg_log_r_node[cg.dst]
+
+        t = int(cg.index_of([target])[0])
+        self.target_idx = t
+        self.delay_to_go = np.full(cg.n, np.inf)
+        self.unrel_to_go = np.full(cg.n, np.inf)
+        if t >= 0:
+            self.delay_to_go = vector_shortest_paths(cg, np.where(self.mask, self.arc_delay, np.inf), t, True)[0]
+            self.unrel_to_go = vector_shortest_paths(cg, np.where(self.mask, self.arc_unrel, np.inf), t, True)[0]
+
+        ids = cg.node_ids.tolist()
+        self.delay_to_go_of = dict(zip(ids, self.delay_to_go.tolist()))
+        self.unrel_to_go_of = dict(zip(ids, self.unrel_to_go.tolist()))
+        self.proc_of = dict(zip(ids, cg.proc.tolist()))
+        self.unrel_node_of = dict(zip(ids, cg.neg_log_r_node.tolist()))
+
+        src, dst = cg.node_ids[cg.src].tolist(), cg.node_ids[cg.dst].tolist()
+        self.arc_of = {(u, v): (d, l) for u, v, d, l, ok in
+                       zip(src, dst, self.arc_delay.tolist(), self.arc_unrel.tolist(), self.mask.tolist()) if ok}
+
+
+QOS_CACHE_SIZE = 32
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_qos_bounds(G, target, min_bandwidth=None):
+    version = G.graph.get("version")
+    if version is None:
+        return QoSBounds(G, target, min_bandwidth)
+
+    key = (version, G.graph.get("min_bandwidth"), G.number_of_edges(), min_bandwidth, target)
+    with _cache_lock:
+        bounds = _cache.get(key)
+        if bounds is not None:
+            _cache.move_to_end(key)
+            return bounds
+
+    bounds = QoSBounds(G, target, min_bandwidth)
+    with _cache_lock:
+        _cache[key] = bounds
+        while len(_cache) > QOS_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return bounds
+
+
+# ---------------------------------------------------------------
+# Yol kurarken erken ret
+#   state = guard.start()              → (gecikme, güvensizlik) yay toplamları
+#   state = guard.step(state, u, v)    → None: bu adımla kısıt sağlanamaz
+# Kontrol: birikmiş değer + v'den hedefe alt sınır ≤ bütçe. Tamamlanmış
+# yolların kesin kontrolü path_ok ile yapılır.
+# ---------------------------------------------------------------
+class QoSGuard:
+    def __init__(self, G, source, target, max_delay=None, min_reliability=None, min_bandwidth=None):
+        self.G = G
+        self.max_delay = max_delay
+        self.min_reliability = min_reliability
+        self.bounds = get_qos_bounds(G, target, min_bandwidth)
+
+        b = self.bounds
+        self.delay_budget = math.inf if max_delay is None else max_delay + b.proc_of.get(source, 0.0) + EPS
+        self.unrel_budget = reliability_budget(min_reliability) - b.unrel_node_of.get(source, 0.0) + EPS
+
+    def start(self):
+        return (0.0, 0.0)
+
+    def can_start(self, source):
+        return self.feasible(self.start(), source)
+
+    def feasible(self, state, v):
+        b = self.bounds
+        return (state[0] + b.delay_to_go_of.get(v, math.inf) <= self.delay_budget and
+                state[1] + b.unrel_to_go_of.get(v, math.inf) <= self.unrel_budget)
+
+    def step(self, state, u, v):
+        arc = self.bounds.arc_of.get((u, v))
+        if arc is None:
+            return None
+        nxt = (state[0] + arc[0], state[1] + arc[1])
+        return nxt if self.feasible(nxt, v) else None
+
+    def path_ok(self, path):
+        return not violates(path, self.G, self.max_delay, self.min_reliability)
+
+
+def make_guard(G, source, target, max_delay=None, min_reliability=None, min_bandwidth=None):
+    if max_delay is None and min_reliability is None:
+        return None
+    return QoSGuard(G, source, target, max_delay, min_reliability, min_bandwidth)
+
+
+# ---------------------------------------------------------------
+# Kısıtlı en kısa yol motoru
+# Döner: (yol | None, bilgi sözlüğü)
+#   bilgi["method"]: "unconstrained" | "lagrangian" | "label" | "infeasible"
+#   bilgi["lower_bound"], bilgi["labels"]
+# ---------------------------------------------------------------
+def constrained_shortest_path(G, source, target, w_delay=0.33, w_reliability=0.33, w_resource=0.34,
+                              max_delay=None, min_reliability=None, min_bandwidth=None,
+                              deadline_ms=None, max_labels=MAX_LABELS):
+    deadline = ag.make_deadline(deadline_ms)
+    cg = get_compiled(G)
+    s, t = (int(i) for i in cg.index_of([source, target]))
+    if s < 0 or t < 0:
+        raise KeyError("Kaynak veya hedef düğüm grafikte yok.")
+
+    info = {"method": "infeasible", "lower_bound": None, "labels": 0}
+    offset = ag.path_cost_offset(G, source, target, w_delay, w_reliability, w_resource)
+    if s == t:
+        info["method"] = "unconstrained"
+        return [source], info
+
+    guard = QoSGuard(G, source, target, max_delay, min_reliability, min_bandwidth)
+    bounds = guard.bounds
+    D, L = guard.delay_budget, guard.unrel_budget
+
+    inf_mask = np.where(bounds.mask, 0.0, np.inf)
+    # delay / unrel sonlu tutulur (λ = 0 iken 0 * inf = nan olmasın); yasak yaylar cost'ta inf
+    cost = cg.arc_costs(w_delay, w_reliability, w_resource) + inf_mask
+    delay = bounds.arc_delay
+    unrel = bounds.arc_unrel
+
+    # 1. Alt sınırlar ve erken ret
+    if bounds.delay_to_go[s] > D or bounds.unrel_to_go[s] > L:
+        return None, info
+    cost_to_go, _ = vector_shortest_paths(cg, cost, t, toward_root=True)
+    if not np.isfinite(cost_to_go[s]):
+        return None, info
+
+    def path_metrics(idx_path):
+        arcs = cg.arc_index(idx_path[:-1], idx_path[1:])
+        return float(cost[arcs].sum()), float(delay[arcs].sum()), float(unrel[arcs].sum())
+
+    def lagrange_path(lam_d, lam_l):
+        dist, nxt = vector_shortest_paths(cg, cost + lam_d * delay + lam_l * unrel, t, toward_root=True)
+        return trace_path(nxt, t, s, toward_root=True), float(dist[s])
+
+    # 2. Kısıtsız en iyi yol
+    best_path, upper = None, math.inf
+    path, lower = lagrange_path(0.0, 0.0)
+    c, d, l = path_metrics(path)
+    if d <= D and l <= L:
+        info.update(method="unconstrained", lower_bound=float(c + offset))
+        return [int(n) for n in cg.node_ids[path]], info
+
+    # 3. Lagrange gevşetmesi (alt-gradyan, Polyak adımı)
+    # Başlangıç üst sınırı için gecikme ve güvensizliğe göre en iyi yollar denenir
+    for arc_values in (delay, unrel):
+        _, nxt = vector_shortest_paths(cg, arc_values + inf_mask, t, toward_root=True)
+        candidate = trace_path(nxt, t, s, toward_root=True)
+        if candidate is not None:
+            cc, cd, cl = path_metrics(candidate)
+            if cd <= D and cl <= L and cc < upper:
+                best_path, upper = candidate, cc
+
+    lam_d = lam_l = 0.0
+    theta = 2.0
+    for _ in range(LAGRANGE_ITERATIONS):
+        if ag.time_is_up(deadline):
+            break
+        g_d = d - D if math.isfinite(D) else 0.0
+        g_l = l - L if math.isfinite(L) else 0.0
+        norm = g_d * g_d + g_l * g_l
+        if norm <= 0 or (math.isfinite(upper) and upper - lower <= EPS * max(1.0, upper)):
+            break
+
+        target_value = upper if math.isfinite(upper) else c + abs(c) + 1.0
+        step = theta * max(target_value - lower, EPS) / norm
+        lam_d = max(0.0, lam_d + step * g_d)
+        lam_l = max(0.0, lam_l + step * g_l)
+
+        path, value = lagrange_path(lam_d, lam_l)
+        if path is None:
+            break
+        c, d, l = path_metrics(path)
+        # Lagrange dual değeri: L(λ) = c + λd (d - D) + λl (l - L)
+        dual = value - (lam_d * D if math.isfinite(D) else 0.0) - (lam_l * L if math.isfinite(L) else 0.0)
+        if dual > lower:
+            lower = dual
+        else:
+            theta *= 0.5
+        if d <= D and l <= L and c < upper:
+            best_path, upper = path, c
+
+    info["lower_bound"] = float(lower + offset)
+    if best_path is not None and upper - lower <= EPS * max(1.0, upper):
+        info["method"] = "lagrangian"
+        return [int(n) for n in cg.node_ids[best_path]], info
+
+    # 4. Etiket düzeltme (kesin)
+    indptr = cg.indptr.tolist()
+    heads = cg.dst.tolist()
+    arc_c, arc_d, arc_l = cost.tolist(), (delay + inf_mask).tolist(), (unrel + inf_mask).tolist()
+    h_c, h_d, h_l = cost_to_go.tolist(), bounds.delay_to_go.tolist(), bounds.unrel_to_go.tolist()
+
+    labels = {s: [(0.0, 0.0, 0.0)]}
+    heap = [(h_c[s], 0, 0.0, 0.0, 0.0, s, None)]
+    counter = 0
+    found = None
+    complete = True
+    while heap:
+        f, _, c, d, l, v, parent = heapq.heappop(heap)
+        if f >= upper - EPS:
+            break
+        if v == t:
+            found = (v, parent)
+            upper = c
+            break
+        counter += 1
+        if counter > max_labels or (counter % 1000 == 0 and ag.time_is_up(deadline)):
+            complete = False
+            break
+
+        node = (v, parent)
+        for a in range(indptr[v], indptr[v + 1]):
+            w = heads[a]
+            nc, nd, nl = c + arc_c[a], d + arc_d[a], l + arc_l[a]
+            if nc + h_c[w] >= upper - EPS or nd + h_d[w] > D or nl + h_l[w] > L:
+                continue
+            existing = labels.setdefault(w, [])
+            if any(ec <= nc and ed <= nd and el <= nl for ec, ed, el in existing):
+                continue
+            existing[:] = [e for e in existing if not (nc <= e[0] and nd <= e[1] and nl <= e[2])]
+            existing.append((nc, nd, nl))
+            heapq.heappush(heap, (nc + h_c[w], counter, nc, nd, nl, w, node))
+
+    info["labels"] = counter
+    if found is not None:
+        path = []
+        node = found
+        while node is not None:
+            path.append(node[0])
+            node = node[1]
+        path.reverse()
+        info.update(method="label", lower_bound=float(upper + offset))
+        return [int(n) for n in cg.node_ids[path]], info
+
+    if best_path is not None:
+        # Arama tamamlandıysa daha iyi uygun yol yoktur: Lagrange yolu kesin en iyidir.
+        # Limit / süre yüzünden kesildiyse en iyi bilinen uygun yol döner.
+        if complete:
+            info.update(method="label", lower_bound=float(upper + offset))
+        else:
+            info["method"] = "label-limit"
+        return [int(n) for n in cg.node_ids[best_path]], info
+    return None, info
@@ -0,0 +1,378 @@
+import heapq
+import random
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+import kernels
+
+# ---------------------------------------------------------------
+# AYRIK OLAY TRAFİK SİMÜLATÖRÜ (paket seviyesi)
+#
+# Seçilen yollar üzerinden akışların paketleri gerçek link kapasitesi,
+# link gecikmesi ve düğüm işlem gecikmesi (s_ms) ile simüle edilir:
+#
+#   - Her yönlü link (u → v) tek sunuculu FIFO kuyruktur; iletim süresi
+#     paket_bit / kapasite, kuyruk en fazla buffer_packets paket tutar
+#     (dolu kuyruğa gelen paket düşer: drop-tail).
+#   - Paket linkten çıkınca link gecikmesi (yayılım) kadar sonra sonraki
+#     düğüme varır; ara düğümde işlem gecikmesi eklenip sonraki linke geçer.
+#   - random_loss=True → paket linkten 1 - r_link olasılıkla kaybolur.
+#   - Akış paketleri Poisson (ya da sabit aralıklı, cbr) gelir; oran
+#     demand_mbps / paket_bit.
+#
+# Olay kuyruğu tek bir heap'tir; olay = (zaman, paket, hop): paketin
+# hop'uncu linkine varışı. Olaylar zaman sırasıyla işlendiğinden her
+# linke varışlar da FIFO sırasındadır; bu yüzden linkin "boşalma zamanı"
+# (free) ve kuyruktaki paketlerin çıkış zamanları (deque) yeterlidir,
+# ayrı "iletim bitti" olayı gerekmez: paket-hop başına tek olay.
+#
+# Rapor: link başına kullanım (utilization), sunulan yük, ortalama / en
+# büyük kuyruk bekleme süresi, düşen ve kaybolan paketler; akış başına
+# teslim oranı, uçtan uca gecikme (ort. / p99) ve verim.
+#
+# Numba kuruluysa olay döngüsü kernels.sim_events ile derlenmiş çalışır
+# (aynı olay sırası ve aynı random akışı → Python döngüsüyle birebir aynı
+# rapor); kuyruklar link başına halka tampondur.
+#
+# Link öznitelikleri run başında okunur; snapshot() bunları önceden (ör.
+# graf kilidi altında) alır, simülasyon kilit bırakıldıktan sonra koşar.
+# ---------------------------------------------------------------
+
+DEFAULT_SIM_MS = 100.0
+DEFAULT_PACKET_BYTES = 1500
+DEFAULT_BUFFER_PACKETS = 64
+
+# İstek içinde çalışan simülasyonlar için üst sınır (beklenen paket sayısı)
+MAX_SIM_PACKETS = 5_000_000
+
+
+class TrafficSimulator:
+    def __init__(self, G, packet_bytes=DEFAULT_PACKET_BYTES, buffer_packets=DEFAULT_BUFFER_PACKETS,
+                 random_loss=True, arrivals="poisson", seed=None):
+        if arrivals not in ("poisson", "cbr"):
+            raise ValueError(f"Geçersiz geliş modeli: {arrivals} (poisson / cbr)")
+        if packet_bytes <= 0 or buffer_packets < 1:
+            raise ValueError("packet_bytes pozitif, buffer_packets en az 1 olmalıdır.")
+        self.G = G
+        self.packet_bits = packet_bytes * 8
+        self.buffer_packets = buffer_packets
+        self.random_loss = random_loss
+        self.arrivals = arrivals
+        self.seed = seed
+
+        self.links = {}      # (u, v) → link no
+        self.link_ends = []
+        self.flows = []      # (yol, link listesi, demand_mbps, başlangıç, bitiş)
+        self._params = None
+
+    def _link(self, u, v):
+        link = self.links.get((u, v))
+        if link is None:
+            if not self.G.has_edge(u, v):
+                raise KeyError(f"Kenar yok: ({u}, {v})")
+            link = self.links[(u, v)] = len(self.link_ends)
+            self.link_ends.append((u, v))
+        return link
+
+    # Akış ekler; start_ms / end_ms verilmezse tüm simülasyon süresince
+    def add_flow(self, path, demand_mbps, start_ms=0.0, end_ms=None):
+        if path is None or len(path) < 2:
+            raise ValueError("Akış yolu en az iki düğüm içermelidir.")
+        if demand_mbps < 0:
+            raise ValueError("Demand negatif olamaz.")
+        links = [self._link(u, v) for u, v in zip(path[:-1], path[1:])]
+        self.flows.append((list(path), links, float(demand_mbps), float(start_ms), end_ms))
+        return len(self.flows) - 1
+
+    def _generate(self, duration_ms, rng):
+        # Paket gönderim zamanları ve akış numaraları (zaman sırasız)
+        times, owners = [], []
+        for f, (_, _, demand, start, end) in enumerate(self.flows):
+            end = duration_ms if end is None else min(end, duration_ms)
+            rate = demand * 1000.0 / self.packet_bits   # paket / ms
+            if rate <= 0 or end <= start:
+                continue
+            n = int((end - start) * rate * 1.2) + 16
+            if self.arrivals == "cbr":
+                t = start + np.arange(n) / rate
+            else:
+                t = start + np.cumsum(rng.exponential(1.0 / rate, n))
+            t = t[t < end]
+            times.append(t)
+            owners.append(np.full(len(t), f, dtype=np.int64))
+        if not times:
+            return np.array([]), np.array([], dtype=np.int64)
+        return np.concatenate(times), np.concatenate(owners)
+
+    def expected_packets(self, duration_ms):
+        total = 0.0
+        for _, _, demand, start, end in self.flows:
+            end = duration_ms if end is None else min(end, duration_ms)
+            total += max(0.0, end - start) * demand * 1000.0 / self.packet_bits
+        return int(total)
+
+    # Link öznitelikleri: kapasite, iletim süresi, yayılım, kayıp olasılığı,
+    # link sonrası düğümün işlem gecikmesi (son linkte hedefe varılır, eklenmez)
+    def _link_params(self):
+        G = self.G
+        edges = [G.edges[u, v] for u, v in self.link_ends]
+        cap = [float(e["bandwidth"]) for e in edges]
+        tx = [self.packet_bits / (c * 1000.0) for c in cap]                     # ms
+        prop = [float(e["link_delay"]) for e in edges]
+        p_loss = [1.0 - float(e["link_reliability"]) if self.random_loss else 0.0 for e in edges]
+        proc_after = [float(G.nodes[v]["processing_delay"]) for _, v in self.link_ends]
+        return cap, tx, prop, p_loss, proc_after
+
+    def snapshot(self):
+        self._params = self._link_params()
+
+    def run(self, duration_ms=DEFAULT_SIM_MS):
+        if duration_ms <= 0:
+            raise ValueError("Simülasyon süresi pozitif olmalıdır.")
+        expected = self.expected_packets(duration_ms)
+        if expected > MAX_SIM_PACKETS:
+            raise ValueError(f"Simülasyon çok büyük: ~{expected} paket (en fazla {MAX_SIM_PACKETS}); "
+                             f"süreyi ya da demand sayısını azaltın.")
+        wall = time.perf_counter()
+        np_rng = np.random.default_rng(self.seed)
+
+        n_links = len(self.link_ends)
+        params = self._params
+        if params is None or len(params[0]) != n_links:
+            params = self._link_params()
+        cap, tx, prop, p_loss, proc_after = params
+
+        sent_at, owner = self._generate(duration_ms, np_rng)
+        order = np.argsort(sent_at, kind="stable")
+        sent_at, owner = sent_at[order], owner[order]
+
+        if kernels.enabled():
+            stats = self._run_kernel(sent_at, owner, tx, prop, p_loss, proc_after)
+        else:
+            stats = self._run_python(sent_at, owner, tx, prop, p_loss, proc_after)
+
+        wall_s = time.perf_counter() - wall
+        return self._report(duration_ms, len(sent_at), stats[0], wall_s, cap, *stats[1:], owner)
+
+    # Derlenmiş olay döngüsü; teslim edilen paketlerin gecikmeleri akış başına,
+    # teslim sırasıyla (Python döngüsüyle aynı toplama sırası)
+    def _run_kernel(self, sent_at, owner, tx, prop, p_loss, proc_after):
+        n_links = len(self.link_ends)
+        flow_ptr = np.zeros(len(self.flows) + 1, dtype=np.int64)
+        flow_ptr[1:] = np.cumsum([len(f[1]) for f in self.flows])
+        flow_links = np.array([link for f in self.flows for link in f[1]], dtype=np.int64)
+
+        mt, _ = kernels.rng_export(random.Random(self.seed))
+        busy = np.zeros(n_links)
+        wait_sum = np.zeros(n_links)
+        wait_max = np.zeros(n_links)
+        counts = np.zeros((3, n_links), dtype=np.int64)   # geçen, düşen, kaybolan
+        delivered = np.empty(len(sent_at), dtype=np.int64)
+        delays = np.empty(len(sent_at))
+        events, n_delivered = kernels.sim_events(
+            mt, sent_at, owner, flow_ptr, flow_links, np.array(tx, dtype=np.float64),
+            np.array(prop, dtype=np.float64), np.array(p_loss, dtype=np.float64),
+            np.array(proc_after, dtype=np.float64), self.buffer_packets,
+            busy, wait_sum, wait_max, counts, delivered, delays)
+
+        flows = owner[delivered[:n_delivered]]
+        order = np.argsort(flows, kind="stable")
+        bounds = np.searchsorted(flows[order], np.arange(len(self.flows) + 1))
+        delays = delays[:n_delivered][order]
+        delivered_delay = [delays[bounds[f]:bounds[f + 1]].tolist() for f in range(len(self.flows))]
+        passed, dropped, lost = (c.tolist() for c in counts)
+        return (events, busy.tolist(), passed, dropped, lost, wait_sum.tolist(), wait_max.tolist(),
+                delivered_delay)
+
+    def _run_python(self, sent_at, owner, tx, prop, p_loss, proc_after):
+        n_links = len(self.link_ends)
+        rnd = random.Random(self.seed).random
+
+        free = [0.0] * n_links
+        queues = [deque() for _ in range(n_links)]
+        busy = [0.0] * n_links
+        passed = [0] * n_links
+        dropped = [0] * n_links
+        lost = [0] * n_links
+        wait_sum = [0.0] * n_links
+        wait_max = [0.0] * n_links
+
+        flow_links = [f[1] for f in self.flows]
+        n_packets = len(sent_at)
+        sent_list = sent_at.tolist() + [float("inf")]
+        owner_list = owner.tolist()
+        delivered_delay = [[] for _ in self.flows]
+
+        # Gönderim zamanları sıralı dizidir; heap'te yalnız yoldaki (hop ≥ 1)
+        # paketler durur, ikisi zaman sırasıyla birleştirilir (küçük heap)
+        heap = []
+        pop, push = heapq.heappop, heapq.heappush
+        buffer_packets = self.buffer_packets
+        next_pid = 0
+        events = 0
+
+        while heap or next_pid < n_packets:
+            if heap and heap[0][0] < sent_list[next_pid]:
+                t, pid, hop = pop(heap)
+            else:
+                t, pid, hop = sent_list[next_pid], next_pid, 0
+                next_pid += 1
+            events += 1
+            links = flow_links[owner_list[pid]]
+            link = links[hop]
+
+            q = queues[link]
+            while q and q[0] <= t:
+                q.popleft()
+            if len(q) >= buffer_packets:
+                dropped[link] += 1
+                continue
+
+            start = free[link] if free[link] > t else t
+            w = start - t
+            done = start + tx[link]
+            free[link] = done
+            q.append(done)
+            busy[link] += tx[link]
+            passed[link] += 1
+            wait_sum[link] += w
+            if w > wait_max[link]:
+                wait_max[link] = w
+
+            if p_loss[link] and rnd() < p_loss[link]:
+                lost[link] += 1
+                continue
+
+            arrive = done + prop[link]
+            if hop + 1 == len(links):
+                delivered_delay[owner_list[pid]].append(arrive - sent_list[pid])
+            else:
+                push(heap, (arrive + proc_after[link], pid, hop + 1))
+
+        return events, busy, passed, dropped, lost, wait_sum, wait_max, delivered_delay
+
+    def _report(self, duration_ms, n_packets, events, wall_s, cap, busy, passed, dropped, lost,
+                wait_sum, wait_max, delivered_delay, owner):
+        offered = [0.0] * len(self.link_ends)
+        for _, links, demand, _, _ in self.flows:
+            for link in links:
+                offered[link] += demand
+
+        links = []
+        for i, (u, v) in enumerate(self.link_ends):
+            links.append({
+                "u": u,
+                "v": v,
+                "capacity_mbps": cap[i],
+                "offered_load": round(offered[i] / cap[i], 4),
+                "utilization": round(min(1.0, busy[i] / duration_ms), 4),
+                "packets": passed[i],
+                "queue_drops": dropped[i],
+                "link_losses": lost[i],
+                "avg_queue_ms": round(wait_sum[i] / passed[i], 4) if passed[i] else 0.0,
+                "max_queue_ms": round(wait_max[i], 4),
+            })
+        links.sort(key=lambda x: -x["utilization"])
+
+        sent_per_flow = np.bincount(owner, minlength=len(self.flows)) if len(owner) else [0] * len(self.flows)
+        flows = []
+        for f, (path, _, demand, start, end) in enumerate(self.flows):
+            delays = delivered_delay[f]
+            sent = int(sent_per_flow[f])
+            active_ms = (duration_ms if end is None else min(end, duration_ms)) - start
+            flows.append({
+                "source": path[0],
+                "target": path[-1],
+                "path": path,
+                "demand_mbps": demand,
+                "sent": sent,
+                "delivered": len(delays),
+                "loss": round(1 - len(delays) / sent, 4) if sent else 0.0,
+                "avg_delay_ms": round(float(sum(delays)) / len(delays), 4) if delays else None,
+                "p99_delay_ms": round(float(np.percentile(delays, 99)), 4) if delays else None,
+                "throughput_mbps": round(len(delays) * self.packet_bits / (active_ms * 1000.0), 3)
+                if active_ms > 0 else 0.0,
+            })
+
+        delivered = sum(f["delivered"] for f in flows)
+        return {
+            "duration_ms": duration_ms,
+            "packet_bytes": self.packet_bits // 8,
+            "buffer_packets": self.buffer_packets,
+            "events": events,
+            "wall_ms": round(wall_s * 1000, 1),
+            "events_per_s": round(events / wall_s) if wall_s > 0 else None,
+            "packets": {
+                "sent": n_packets,
+                "delivered": delivered,
+                "queue_drops": sum(dropped),
+                "link_losses": sum(lost),
+                "loss": round(1 - delivered / n_packets, 4) if n_packets else 0.0,
+            },
+            "links": links,
+            "flows": flows,
+        }
+
+
+# Tek yol + demand için kısa özet (calculate_route): yol üzerindeki linkler
+def simulate_path(G, path, demand_mbps, duration_ms=DEFAULT_SIM_MS, seed=0, **options):
+    return simulate_paths(G, [(path, demand_mbps)], duration_ms, seed, **options)
+
+
+# Birden çok (yol, Mbps) akışı (ör. çok yollu bölme); rapor yalnız bu yolların linklerini içerir
+def simulate_paths(G, flows, duration_ms=DEFAULT_SIM_MS, seed=0, **options):
+    sim = TrafficSimulator(G, seed=seed, **options)
+    for path, demand_mbps in flows:
+        sim.add_flow(path, demand_mbps)
+    report = sim.run(duration_ms)
+    by_link = {(l["u"], l["v"]): l for l in report["links"]}
+    links = dict.fromkeys((u, v) for path, _ in flows for u, v in zip(path[:-1], path[1:]))
+    report["links"] = [by_link[link] for link in links]
+    return report
+
+
+# Demand kümesini verilen yönlendirme fonksiyonuyla (route(s, t, demand) → yol)
+# yönlendirip simüle eder; yolu bulunamayanlar "unrouted" listesine girer.
+# lock verilirse yalnızca yönlendirme ve link öznitelikleri onun altında
+# alınır; simülasyon kilit dışında koşar.
+def simulate_demands(G, demands, route, duration_ms=DEFAULT_SIM_MS, top_links=20, seed=0, lock=None, **options):
+    sim = TrafficSimulator(G, seed=seed, **options)
+    unrouted = []
+    t0 = time.perf_counter()
+    with lock if lock is not None else nullcontext():
+        for source, target, demand in demands:
+            path = route(source, target, demand)
+            if path is None or len(path) < 2:
+                unrouted.append({"source": source, "target": target, "demand_mbps": demand})
+                continue
+            sim.add_flow(path, demand)
+        sim.snapshot()
+        version = G.graph.get("version")
+    routing_ms = (time.perf_counter() - t0) * 1000
+
+    report = sim.run(duration_ms)
+    report["graph_version"] = version
+    report["routing_ms"] = round(routing_ms, 1)
+    report["unrouted"] = unrouted
+    report["links_total"] = len(report["links"])
+    report["congested_links"] = sum(1 for l in report["links"] if l["offered_load"] > 1)
+    if top_links is not None:
+        report["links"] = report["links"][:top_links]
+    return report
+
+
+# Demand dosyasındaki dağılıma benzer rastgele demand'ler (kaynak ≠ hedef)
+def synthetic_demands(G, n, base_demands=None, seed=0):
+    rng = random.Random(seed)
+    nodes = sorted(G.nodes)
+    sizes = [d for _, _, d in base_demands] if base_demands else [100.0]
+    demands = []
+    while len(demands) < n:
+        s, t = rng.choice(nodes), rng.choice(nodes)
+        if s != t:
+            demands.append((s, t, rng.choice(sizes)))
+    return demands
+
@@ -0,0 +1,101 @@
+import threading
+
+# ---------------------------------------------------------------
+# TEK UÇUŞ (SINGLE-FLIGHT) İSTEK BİRLEŞTİRME
+#
+# Aynı çift için aynı anda gelen özdeş istekler (demo, dashboard
+# yenilemesi) her biri kendi çözücüsünü (ör. 10.000 bölümlük Q-Learning
+# eğitimi) başlatmak yerine zaten çalışan hesaplamaya bağlanır:
+#
+#   - İlk gelen istek (lider) hesaplamayı yapar; hesaplama sürerken aynı
+#     anahtarla gelenler (takipçi) bekler ve liderin sonucunu alır.
+#   - Lider hata fırlatırsa aynı hata takipçilerde de fırlatılır.
+#   - Hesaplama bitince anahtar silinir: sonraki istekler yeni hesaplama
+#     başlatır (bu bir önbellek değildir; önbellek RouteCache'tir).
+#
+# Anahtar istek gövdesinin kanonik hâlidir (canonical_request): sözlük
+# anahtarları sıralanır, sayılar ve sayı gibi yazılmış metinler float'a
+# çevrilir ("8" ile 8 aynıdır).
+# ---------------------------------------------------------------
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = {}     # ad → liderin çalıştırdığı hesaplama sayısı
+        self.coalesced = {}    # ad → başka hesaplamaya bağlanan istek sayısı
+        self.errors = 0
+        self.max_waiters = 0
+
+    # key[0] sayaçlarda kullanılan addır; (sonuç, paylaşıldı mı) döner
+    def do(self, key, fn):
+        name = key[0]
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed[name] = self.executed.get(name, 0) + 1
+            else:
+                call.waiters += 1
+                self.coalesced[name] = self.coalesced.get(name, 0) + 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.max_waiters = max(self.max_waiters, call.waiters)
+                if call.error is not None:
+                    self.errors += 1
+            call.event.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "waiting": sum(c.waiters for c in self._calls.values()),
+                "executed": dict(self.executed),
+                "coalesced": dict(self.coalesced),
+                "errors": self.errors,
+                "max_waiters": self.max_waiters,
+            }
+
+
+def canonical_request(value, ignore=()):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    if isinstance(value, dict):
+        return tuple(sorted(((str(k), canonical_request(v)) for k, v in value.items() if k not in ignore),
+                            key=lambda item: item[0]))
+    if isinstance(value, (list, tuple)):
+        return tuple(canonical_request(v) for v in value)
+    return repr(value)
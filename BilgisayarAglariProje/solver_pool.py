@@ -0,0 +1,271 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import Ag_olusturma as ag
+from solvers import Constraints, get_solver
+
+# ---------------------------------------------------------------
+# ÇÖZÜCÜ İŞLEM HAVUZU
+#
+# ACO / GA / Q-Learning CPU yoğun saf Python döngüleridir; istek
+# thread'lerinde çalışınca GIL yüzünden sunucu tek çekirdeğe kilitlenir.
+# SolverPool bu işleri sınırlı bir süreç (process) havuzuna verir:
+#
+#   - Havuz "fork" ile açılır: çocuk süreçler önceden yüklenmiş grafı
+#     kopyalamadan (copy-on-write) paylaşır, CSV tekrar okunmaz.
+#   - Kuyruk sınırlıdır; doluysa PoolBusy fırlatılır (API → 429).
+#   - Graf canlı güncellenince (sürüm değişince) havuz yeniden açılır,
+#     böylece çocuklar her zaman güncel grafı görür.
+# ---------------------------------------------------------------
+
+POOL_ALGORITHMS = ("Q-Learning", "ACO", "MMAS", "GA")
+
+
+class PoolBusy(Exception):
+    pass
+
+
+class SolverError(Exception):
+    pass
+
+
+# ---------------------------------------------------------------
+# Tek bir algoritmayı filtrelenmiş graf üzerinde çalıştırır ve yolu döndürür.
+# Hem satır içi (inline) modda hem de havuz süreçlerinde kullanılır.
+# Çözücüler ortak arayüzden (solvers.py) adıyla çağrılır.
+# agent: Q-Learning için önceden eğitilmiş (sıcak) ajan, yoksa yenisi açılır
+# planning: Q-Learning planlama modu (None / "dyna" / "sweep")
+# max_delay / min_reliability: kesin QoS kısıtları (qos_routing.py)
+# episodes: Q-Learning bölüm sayısı (None → preset)
+# params: preset parametrelerinin üzerine yazılacak değerler (tuning.py)
+# ---------------------------------------------------------------
+def run_algorithm(G_filtered, algorithm, source, target, min_bandwidth,
+                  w_delay=0.33, w_rel=0.33, w_res=0.34,
+                  deadline_ms=None, tol=0.0, episodes=None, agent=None, planning=None,
+                  max_delay=None, min_reliability=None, params=None):
+    options = {"params": params, "tol": tol}
+    if algorithm == "Q-Learning":
+        options.update(episodes=episodes, agent=agent, planning=planning)
+
+    result = get_solver(algorithm, **options).solve(
+        G_filtered, source, target, (w_delay, w_rel, w_res),
+        Constraints(min_bandwidth, max_delay, min_reliability), budget=deadline_ms)
+    if result.path is None:
+        raise SolverError(result.error)
+    return result.path
+
+
+# ---------------------------------------------------------------
+# Havuz sürecinde çalışan iş. Süre bütçesi mutlak zaman (deadline_at)
+# olarak gelir; kuyrukta beklenen süre de bütçeden düşülür.
+# ---------------------------------------------------------------
+def solve_job(job):
+    deadline_ms = None
+    if job.get("deadline_at") is not None:
+        deadline_ms = max(0.0, (job["deadline_at"] - time.time()) * 1000)
+
+    G_filtered = ag.filter_graph_by_bandwidth(ag.G, job["min_bandwidth"])
+    if job["source"] not in G_filtered.nodes or job["target"] not in G_filtered.nodes:
+        raise KeyError("Kaynak veya hedef düğüm grafikte yok.")
+
+    return run_algorithm(
+        G_filtered, job["algorithm"], job["source"], job["target"], job["min_bandwidth"],
+        job["w_delay"], job["w_rel"], job["w_res"],
+        deadline_ms=deadline_ms, tol=job.get("tol", 0.0), episodes=job.get("episodes"),
+        planning=job.get("planning"),
+        max_delay=job.get("max_delay"),
+        min_reliability=job.get("min_reliability")
+    )
+
+
+# ---------------------------------------------------------------
+# Sınırlı, geri basınçlı (backpressure) süreç havuzu
+# max_workers=0 → havuz kapalı, işler çağıran thread'de çalışır
+# ---------------------------------------------------------------
+class SolverPool:
+    def __init__(self, max_workers=0, max_queue=None):
+        self.max_workers = max_workers
+        self.max_queue = max_workers * 2 if max_queue is None else max_queue
+        self._slots = threading.BoundedSemaphore(max(1, self.max_workers + self.max_queue))
+        self._lock = threading.Lock()
+        self._executor = None
+        self._version = None
+        self.submitted = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self):
+        return self.max_workers > 0
+
+    def _current_executor(self):
+        version = ag.G.graph.get("version", 0)
+        with self._lock:
+            if self._executor is None or self._version != version:
+                if self._executor is not None:
+                    # Eski süreçler ellerindeki işi bitirip kapanır
+                    self._executor.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("fork")
+                )
+                self._version = version
+            return self._executor
+
+    def run(self, fn, *args):
+        if not self.enabled:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PoolBusy("Sunucu meşgul, lütfen daha sonra tekrar deneyin.")
+        try:
+            future = self._current_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        self.submitted += 1
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+# ---------------------------------------------------------------
+# Broker üzerinden dağıtık havuz (broker.py, worker.py)
+#
+# SolverPool ile aynı arayüz: run(solve_job, job). İş JSON olarak
+# broker'a yazılır, herhangi bir makinedeki işçi alır ve sonucu aynı
+# broker'a iş numarasıyla yazar. İşçiler grafı kendi CSV'lerinden bir kez
+# yükler; canlı güncellemeler işle birlikte gönderilen graf durumuyla
+# (NetworkState.snapshot: sürüm + değişen öğelerin son hâli) eşitlenir;
+# iş boyutu düzenleme sayısıyla değil, değişen öğe sayısıyla sınırlıdır.
+#
+#   - Aynı anda en fazla max_in_flight iş; fazlası PoolBusy (API → 429)
+#   - Canlı işçi (son heartbeat WORKER_TIMEOUT_S içinde) yoksa iş burada
+#     çalışır (fallback)
+#   - Sonuç deadline_at + JOB_GRACE_S (bütçe yoksa JOB_TIMEOUT_S) içinde
+#     gelmezse SolverError
+# ---------------------------------------------------------------
+JOB_TIMEOUT_S = 120.0
+JOB_GRACE_S = 5.0
+
+
+class BrokerPool:
+    def __init__(self, broker, max_in_flight=64, snapshot=None, local_workers=0):
+        from broker import WORKER_TIMEOUT_S
+
+        self.broker = broker
+        self.max_in_flight = max_in_flight
+        self.snapshot = snapshot or (lambda: None)
+        self.worker_timeout_s = WORKER_TIMEOUT_S
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._alive = (0.0, 0)      # (kontrol zamanı, canlı işçi sayısı)
+        self.submitted = 0
+        self.rejected = 0
+        self.fallback = 0
+        self.timeouts = 0
+        self.failed = 0
+
+        # "local" broker: işçiler bu süreçte thread olarak çalışır (testler)
+        self._threads = []
+        if local_workers:
+            from worker import Worker
+
+            for i in range(local_workers):
+                worker = Worker(broker, worker_id=f"local-{i}")
+                thread = threading.Thread(target=worker.run, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    @property
+    def enabled(self):
+        return True
+
+    def alive_workers(self):
+        checked, count = self._alive
+        if time.time() - checked > 1.0:
+            workers = self.broker.workers()
+            count = sum(1 for w in workers.values() if w["age_s"] < self.worker_timeout_s)
+            self._alive = (time.time(), count)
+        return count
+
+    def run(self, fn, *args):
+        if fn is not solve_job or not self.alive_workers():
+            self.fallback += 1
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PoolBusy("Sunucu meşgul, lütfen daha sonra tekrar deneyin.")
+        try:
+            job = dict(args[0], id=uuid.uuid4().hex, graph=self.snapshot())
+            self.broker.put_job(json.dumps(job))
+            self.submitted += 1
+
+            timeout = JOB_TIMEOUT_S
+            if job.get("deadline_at") is not None:
+                timeout = max(0.0, job["deadline_at"] - time.time()) + JOB_GRACE_S
+            payload = self.broker.get_result(job["id"], timeout)
+        finally:
+            self._slots.release()
+
+        if payload is None:
+            self.timeouts += 1
+            raise SolverError(f"Çözücü işçisinden {timeout:.0f} s içinde cevap gelmedi.")
+        result = json.loads(payload)
+        if result.get("error") is not None:
+            self.failed += 1
+            raise {"KeyError": KeyError, "SolverError": SolverError}.get(result["kind"], RuntimeError)(result["error"])
+        return result["path"]
+
+    def stats(self):
+        return {
+            "broker": type(self.broker).__name__,
+            "workers": self.broker.workers(),
+            "queue": self.broker.queue_size(),
+            "max_in_flight": self.max_in_flight,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "fallback": self.fallback,
+            "timeouts": self.timeouts,
+            "failed": self.failed,
+        }
+
+    def shutdown(self):
+        self.broker.close()
+
+
+# Ortam değişkenlerinden havuz:
+#   ROUTE_BROKER  : local / tcp://host:port / redis://... → dağıtık havuz
+#                   (ROUTE_BROKER_KEY: tcp kimlik anahtarı, zorunlu; local'de ROUTE_WORKERS
+#                   kadar işçi thread'i açılır)
+#   ROUTE_WORKERS : yerel süreç havuzu (0 → kapalı), ROUTE_QUEUE kuyruk sınırı
+# snapshot: güncel graf durumunu döndüren fonksiyon (uzak işçiler için)
+def pool_from_env(snapshot=None):
+    workers = int(os.environ.get("ROUTE_WORKERS", "0"))
+    queue = os.environ.get("ROUTE_QUEUE")
+    url = os.environ.get("ROUTE_BROKER")
+    if url:
+        from broker import broker_from_url
+
+        broker = broker_from_url(url)
+        return BrokerPool(broker, int(queue) if queue is not None else 64, snapshot,
+                          local_workers=max(1, workers) if url == "local" else 0)
+    return SolverPool(workers, int(queue) if queue is not None else None)
@@ -0,0 +1,339 @@
+import random
+import time
+
+import numpy as np
+
+import Ag_olusturma as ag
+from QLearning_algorithm import QLearningAgent, ValueIterationSolver
+from ACO_algorithm import ACO, MMAS
+from genetik_alg import run_ga
+from exact_solvers import HopLimitedSolver, DEFAULT_MAX_HOPS
+from qos_routing import constrained_shortest_path, violates
+from hub_labels import get_hub_index
+from presets import preset_for
+from time_varying import time_dependent_path
+
+# ---------------------------------------------------------------
+# ORTAK ÇÖZÜCÜ ARAYÜZÜ VE KAYIT DEFTERİ
+#
+# Tüm yol bulucular aynı çağrıyla çalışır:
+#
+#   result = get_solver("ACO").solve(graph, src, dst, weights, constraints, rng, budget)
+#   result = solve("GA", graph, src, dst, weights=(0.5, 0.2, 0.3), budget=300)
+#
+#   graph       : üzerinde çalışılacak graf (global ag.G'ye bakılmaz)
+#   weights     : (w_delay, w_reliability, w_resource)
+#   constraints : Constraints ya da sözlük (min_bandwidth, max_delay,
+#                 min_reliability, max_hops); None → kısıt yok
+#   rng         : tohum (int) ya da random.Random; çözücüler modül düzeyi
+#                 random / np.random kullandığından bunlar tohumlanır
+#   budget      : süre bütçesi (ms); None → çözücünün kendi iterasyon sınırları
+#
+# Dönüş SolveResult'tır: yol, maliyet, gecikme, güvenilirlik ve stats
+# (süre, kesinlik, hata, çözücüye özel sayaçlar). Bandwidth kısıtı grafı
+# filtreleyerek (gerekirse) uygulanır; gecikme / güvenilirlik / hop
+# kısıtlarını sağlamayan sonuçlar burada elenir, böylece kısıtı bilmeyen
+# çözücüler de güvenle kullanılabilir.
+#
+# Yeni algoritma: Solver'dan türetip _solve'u yazın ve @register("Ad")
+# ile kaydedin; havuz (solver_pool), portföy, ayar (tuning) ve
+# karşılaştırmalar onu adıyla çağırır.
+# ---------------------------------------------------------------
+
+DEFAULT_WEIGHTS = (0.33, 0.33, 0.34)
+# tol verildiğinde erken durma sabrı: GA nesil, Q-Learning greedy kontrolü
+# (check_every bölümde bir) sayısı
+GA_PATIENCE = 10
+QLEARNING_PATIENCE = 5
+
+SOLVERS = {}
+
+
+def register(name):
+    def wrap(cls):
+        cls.name = name
+        SOLVERS[name] = cls
+        return cls
+    return wrap
+
+
+# options: çözücüye özel ayarlar (params, tol, episodes, agent, ...)
+def get_solver(name, **options):
+    cls = SOLVERS.get(name)
+    if cls is None:
+        raise ValueError(f"Geçersiz algoritma seçimi: {name}")
+    return cls(**options)
+
+
+def solve(name, graph, source, target, weights=DEFAULT_WEIGHTS, constraints=None, rng=None, budget=None,
+          **options):
+    return get_solver(name, **options).solve(graph, source, target, weights, constraints, rng, budget)
+
+
+class Constraints:
+    def __init__(self, min_bandwidth=0.0, max_delay=None, min_reliability=None, max_hops=None):
+        self.min_bandwidth = min_bandwidth or 0.0
+        self.max_delay = max_delay
+        self.min_reliability = min_reliability
+        self.max_hops = max_hops
+
+    @classmethod
+    def of(cls, value):
+        if value is None:
+            return cls()
+        if isinstance(value, cls):
+            return value
+        return cls(**value)
+
+    @property
+    def has_qos(self):
+        return self.max_delay is not None or self.min_reliability is not None
+
+    def satisfied_by(self, path, G):
+        if self.max_hops is not None and len(path) - 1 > self.max_hops:
+            return False
+        return not violates(path, G, self.max_delay, self.min_reliability)
+
+    def to_dict(self):
+        return {"min_bandwidth": self.min_bandwidth, "max_delay": self.max_delay,
+                "min_reliability": self.min_reliability, "max_hops": self.max_hops}
+
+
+class SolveResult:
+    def __init__(self, solver, path, G, weights, stats):
+        self.solver = solver
+        self.path = path
+        self.stats = stats
+        self.cost = self.delay = self.reliability = None
+        if path is not None:
+            self.cost = ag.weighted_sum_method(path, G, *weights)
+            self.delay = ag.total_delay(path, G)
+            self.reliability = ag.total_reliability(path, G)
+
+    @property
+    def found(self):
+        return self.path is not None
+
+    @property
+    def error(self):
+        return self.stats.get("error")
+
+    def to_dict(self):
+        return {"solver": self.solver, "path": self.path, "cost": self.cost,
+                "delay": self.delay, "reliability": self.reliability, "stats": self.stats}
+
+
+def seed_rng(rng):
+    if rng is None:
+        return None
+    seed = rng.getrandbits(32) if isinstance(rng, random.Random) else int(rng)
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    return seed
+
+
+class Solver:
+    name = None
+    exact = False
+    # True → bandwidth eşiğini kendisi uygular (graf kopyalanmaz)
+    native_bandwidth = False
+
+    def __init__(self, params=None, tol=0.0):
+        self.params = params or {}
+        self.tol = tol
+
+    def preset(self, G):
+        params = preset_for(self.name, G.number_of_nodes())
+        params.update(self.params)
+        return params
+
+    # tol > 0 → en iyi maliyet patience kontrol boyunca tol oranından fazla
+    # iyileşmezse erken durulur (süre bütçesinden bağımsız); tol = 0 → kapalı
+    def stall_limit(self, patience):
+        return patience if self.tol > 0 else None
+
+    def solve(self, graph, source, target, weights=DEFAULT_WEIGHTS, constraints=None, rng=None, budget=None):
+        t0 = time.perf_counter()
+        constraints = Constraints.of(constraints)
+        weights = tuple(weights)
+        stats = {"budget_ms": budget, "seed": seed_rng(rng), "proven": False, "error": None}
+
+        G = graph
+        if (constraints.min_bandwidth and not self.native_bandwidth
+                and (G.graph.get("min_bandwidth") or 0) < constraints.min_bandwidth):
+            G = ag.filter_graph_by_bandwidth(graph, constraints.min_bandwidth)
+
+        path = None
+        if source not in G.nodes or target not in G.nodes:
+            stats["error"] = "Kaynak veya hedef düğüm grafikte yok."
+        else:
+            path = self._solve(G, source, target, weights, constraints, budget, stats)
+            if path is not None and not constraints.satisfied_by(path, G):
+                path, stats["proven"] = None, False
+                stats["error"] = f"{self.name} yolu kısıtları sağlamıyor ({constraints.to_dict()})"
+            elif path is None and stats["error"] is None:
+                stats["error"] = f"{self.name} algoritması uygun yol bulamadı: source={source}, target={target}"
+
+        stats["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        return SolveResult(self.name, path, G, weights, stats)
+
+    # Yol (ya da None) döndürür; stats sözlüğüne kendi sayaçlarını yazabilir
+    def _solve(self, G, source, target, weights, constraints, budget, stats):
+        raise NotImplementedError
+
+
+# ---------------------------------------------------------------
+# Kesin çözücüler
+# ---------------------------------------------------------------
+@register("Constrained")
+class ConstrainedSolver(Solver):
+    exact = True
+    native_bandwidth = True
+
+    def _solve(self, G, source, target, weights, constraints, budget, stats):
+        path, info = constrained_shortest_path(
+            G, source, target, *weights,
+            max_delay=constraints.max_delay, min_reliability=constraints.min_reliability,
+            min_bandwidth=constraints.min_bandwidth or None, deadline_ms=budget)
+        stats.update(info)
+        stats["proven"] = info["method"] in ("unconstrained", "lagrangian", "label")
+        return path
+
+
+# Kısıt yokken Lagrange / etiket adımları atlanır: tek Dijkstra
+@register("Dijkstra")
+class DijkstraSolver(ConstrainedSolver):
+    pass
+
+
+@register("Hop-Limited")
+class HopLimitedPathSolver(Solver):
+    exact = True
+    native_bandwidth = True
+
+    def _solve(self, G, source, target, weights, constraints, budget, stats):
+        max_hops = constraints.max_hops or DEFAULT_MAX_HOPS
+        path = HopLimitedSolver(G, *weights, min_bandwidth=constraints.min_bandwidth or None) \
+            .solve(source, max_hops).get_best_path(target)
+        stats.update(max_hops=max_hops, proven=not constraints.has_qos)
+        return path
+
+
+# Ön işlenmiş hub label indeksi (bellek / diskte yoksa ilk çağrıda kurulur)
+@register("Hub-Label")
+class HubLabelSolver(Solver):
+    exact = True
+    native_bandwidth = True
+
+    def _solve(self, G, source, target, weights, constraints, budget, stats):
+        index = get_hub_index(G, *weights, min_bandwidth=constraints.min_bandwidth or None)
+        stats.update(avg_label=index.avg_label, proven=not constraints.has_qos)
+        return index.path(source, target)
+
+
+@register("Value-Iteration")
+class ValueIterationPathSolver(Solver):
+    native_bandwidth = True
+
+    def _solve(self, G, source, target, weights, constraints, budget, stats):
+        solver = ValueIterationSolver(G, *weights, min_bandwidth=constraints.min_bandwidth or None)
+        return solver.solve(target).get_best_path(source)
+
+
+# Kalkış anına göre zamana bağlı Dijkstra (time_varying.py); series: EdgeSeries.
+# Bandwidth eşiği hop'a varılan slot'taki kapasiteye uygulanır (statik filtre yok).
+@register("Time-Dependent")
+class TimeDependentSolver(Solver):
+    native_bandwidth = True
+
+    def __init__(self, params=None, tol=0.0, series=None, departure_ms=0.0):
+        super().__init__(params, tol)
+        self.series = series
+        self.departure_ms = departure_ms
+
+    def _solve(self, G, source, target, weights, constraints, budget, stats):
+        if self.series is None:
+            stats["error"] = "Zamana bağlı öznitelik verisi yüklü değil (ROUTE_TIME_SERIES)."
+            return None
+        path, info = time_dependent_path(G, self.series, source, target, self.departure_ms, *weights,
+                                         min_bandwidth=constraints.min_bandwidth or None)
+        stats.update(info)
+        stats["proven"] = tuple(weights[1:]) == (0, 0)
+        return path
+
+
+# ---------------------------------------------------------------
+# Sezgisel çözücüler (parametreler presets.py'den, params ile üzerine yazılır)
+# ---------------------------------------------------------------
+@register("ACO")
+class ACOSolver(Solver):
+    algorithm = staticmethod(ACO)
+
+    def _solve(self, G, source, target, weights, constraints, budget, stats):
+        path, _, _ = self.algorithm(
+            G, source, target, *weights, deadline_ms=budget, tol=self.tol,
+            max_delay=constraints.max_delay, min_reliability=constraints.min_reliability,
+            **self.preset(G))
+        return path
+
+
+@register("MMAS")
+class MMASSolver(ACOSolver):
+    algorithm = staticmethod(MMAS)
+
+
+@register("GA")
+class GASolver(Solver):
+    def _solve(self, G, source, target, weights, constraints, budget, stats):
+        params = self.preset(G)
+        if constraints.max_hops is not None:
+            params["max_hops"] = min(params["max_hops"], constraints.max_hops)
+        result = run_ga(source, target, constraints.min_bandwidth, *weights,
+                        deadline_ms=budget, tol=self.tol, max_no_improve=self.stall_limit(GA_PATIENCE),
+                        max_delay=constraints.max_delay, min_reliability=constraints.min_reliability,
+                        graph=G, **params)
+        if result["best_path"] is None:
+            stats["error"] = result.get("error")
+        return result["best_path"]
+
+
+# Preset parametreleriyle (öğrenme oranı, keşif azalması, ...) yeni Q-Learning ajanı
+def make_qlearning_agent(G_filtered, w_delay=0.33, w_rel=0.33, w_res=0.34, planning=None,
+                         max_delay=None, min_reliability=None, params=None):
+    if params is None:
+        params = preset_for("Q-Learning", G_filtered.number_of_nodes())
+    return QLearningAgent(
+        G_filtered,
+        w_delay=w_delay,
+        w_reliability=w_rel,
+        w_resource=w_res,
+        learning_rate=params["learning_rate"],
+        discount_factor=params["discount_factor"],
+        exploration_decay=params["exploration_decay"],
+        planning=planning,
+        max_delay=max_delay,
+        min_reliability=min_reliability
+    )
+
+
+@register("Q-Learning")
+class QLearningSolver(Solver):
+    # agent: önceden eğitilmiş (sıcak) ajan; episodes: None → preset
+    def __init__(self, params=None, tol=0.0, episodes=None, agent=None, planning=None):
+        super().__init__(params, tol)
+        self.episodes = episodes
+        self.agent = agent
+        self.planning = planning
+
+    def _solve(self, G, source, target, weights, constraints, budget, stats):
+        params = self.preset(G)
+        episodes = params["episodes"] if self.episodes is None else self.episodes
+        if self.agent is None:
+            self.agent = make_qlearning_agent(G, *weights, planning=self.planning,
+                                              max_delay=constraints.max_delay,
+                                              min_reliability=constraints.min_reliability, params=params)
+        # Süre bütçesi verilirse episode sayısı sadece üst sınırdır
+        self.agent.train(source, target, episodes=episodes, deadline_ms=budget, tol=self.tol,
+                         max_no_improve=self.stall_limit(QLEARNING_PATIENCE))
+        stats["episodes"] = episodes
+        return self.agent.get_best_path(source, target) or self.agent.best_episode_path
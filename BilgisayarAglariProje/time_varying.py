@@ -0,0 +1,390 @@
+import argparse
+import heapq
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+import Ag_olusturma as ag
+from graph_arrays import get_compiled
+from exact_solvers import trace_path
+
+# ---------------------------------------------------------------
+# ZAMANA BAĞLI LİNK ÖZNİTELİKLERİ VE KALKIŞ ANINA GÖRE YÖNLENDİRME
+#
+# EdgeData.csv'deki gecikme ve kapasite tek bir anlık görüntüdür; linklerin
+# gün içi yük profili EdgeSeries ile verilir:
+#
+#   edges          : (m, 2) kenar uçları (küçük kimlik önce)
+#   <öznitelik>    : (slot sayısı, m) float32 dizi, satır = zaman slot'u
+#                    (link_delay ve/veya bandwidth)
+#   slot_ms        : slot süresi; zaman periyodiktir (slot sayısı × slot_ms,
+#                    varsayılan bir gün): slot = (t // slot_ms) % slot sayısı
+#
+# Diskte bir dizin: meta.json + edges.npy + <öznitelik>.npy. load() dizileri
+# np.load(mmap_mode="r") ile açar: yüzlerce slot olsa da yükleme anlıktır,
+# yalnızca okunan satırların sayfaları belleğe gelir. Slot başına graf
+# kurulmaz; serideki kenar sütunları derlenmiş grafın (graph_arrays) yaylarına
+# bir kez eşlenir ve değerler hop başına bu sütunlardan okunur. Seride
+# olmayan kenarlar (ya da öznitelikler) grafın statik değerini kullanır.
+#
+# Kalkış anı t0 verildiğinde:
+#   path_timing      : gecikme hop hop toplanır; her link, o hop'a varıldığı
+#                      andaki slot'un değeriyle (ara düğümlerin işlem
+#                      gecikmesi statik) → varış anı, zamana bağlı gecikme
+#   time_dependent_path : zamana bağlı Dijkstra. Düğüme en iyi etiketle
+#                      varış anı tutulur, yay maliyeti o anın slot'undan
+#                      hesaplanır (directed_edge_cost ile aynı biçim);
+#                      min_bandwidth eşiği de hop anındaki kapasiteye uygulanır.
+#                      Yalnızca gecikme ağırlığıyla (1, 0, 0) FIFO ağlarda en
+#                      erken varışı verir; slot sınırında gecikme slot
+#                      süresinden fazla düşmedikçe (ms gecikme, dakikalık
+#                      slot'lar) FIFO sağlanır. Karma ağırlıklarda etiket
+#                      başına tek varış anı tutulduğu için sezgiseldir.
+#
+# Canlı güncellemeler (PATCH) statik değerleri değiştirir; seride bulunan
+# kenarlarda seri değerleri geçerli kalır.
+#
+#   python time_varying.py diurnal EdgeSeries --slots 288
+#   python time_varying.py build EdgeSeries --csv EdgeTimeSeries.csv --slot-min 15
+#   python time_varying.py route 8 44 --series EdgeSeries --depart 08:30
+# ---------------------------------------------------------------
+
+DAY_MS = 24 * 3600 * 1000
+SERIES_ATTRS = ("link_delay", "bandwidth")
+# Zaman serisi CSV'si (uzun biçim): src;dst;slot;delay_ms;capacity_mbps
+CSV_COLUMNS = {"delay_ms": "link_delay", "capacity_mbps": "bandwidth"}
+
+
+class EdgeSeries:
+    def __init__(self, edges, values, slot_ms, meta=None):
+        self.edges = edges
+        self.values = values          # ad → (n_slots, m) dizi
+        self.slot_ms = float(slot_ms)
+        self.n_slots = next(iter(values.values())).shape[0] if values else 1
+        self.meta = dict(meta or {})
+
+        # (u, v) → sütun: sıralı anahtarlar + searchsorted
+        self._k = int(edges.max()) + 1 if len(edges) else 1
+        keys = edges[:, 0].astype(np.int64) * self._k + edges[:, 1]
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    @property
+    def m(self):
+        return len(self.edges)
+
+    @property
+    def period_ms(self):
+        return self.slot_ms * self.n_slots
+
+    def slot(self, t_ms):
+        return int(t_ms // self.slot_ms) % self.n_slots
+
+    # Kenar uçlarından (yön önemsiz) seri sütunları; seride olmayanlar -1
+    def columns(self, u_ids, v_ids):
+        u = np.asarray(u_ids, dtype=np.int64)
+        v = np.asarray(v_ids, dtype=np.int64)
+        lo, hi = np.minimum(u, v), np.maximum(u, v)
+        inside = (lo >= 0) & (hi < self._k)
+        keys = np.where(inside, lo * self._k + hi, -1)
+        if not len(self._keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        return np.where(inside & (self._keys[pos] == keys), self._order[pos], -1)
+
+    def info(self):
+        return dict(self.meta, edges=self.m, slots=self.n_slots, slot_ms=self.slot_ms,
+                    attrs=list(self.values), bytes=int(sum(a.nbytes for a in self.values.values())))
+
+    # ---------------- kurulum ----------------
+    # Her slot'ta grafın statik değerleri (CSV / profil buradan başlar)
+    @classmethod
+    def from_graph(cls, G, n_slots, slot_ms=None, attrs=SERIES_ATTRS):
+        edges = np.array(sorted((min(u, v), max(u, v)) for u, v in G.edges()), dtype=np.int64).reshape(-1, 2)
+        static = {name: np.array([G.edges[u, v][name] for u, v in edges.tolist()], dtype=np.float32)
+                  for name in attrs}
+        values = {name: np.tile(col, (n_slots, 1)) for name, col in static.items()}
+        return cls(edges, values, slot_ms or DAY_MS / n_slots)
+
+    # Uzun biçimli CSV (EdgeData.csv gibi ';' ayraçlı, ondalık virgül); verilmeyen
+    # kenar / slot / sütunlar statik değerde kalır
+    @classmethod
+    def from_csv(cls, G, path, slot_ms, n_slots=None):
+        import pandas as pd
+
+        df = pd.read_csv(path, sep=";", encoding="utf-8-sig", decimal=",")
+        if n_slots is None:
+            n_slots = int(df["slot"].max()) + 1
+        series = cls.from_graph(G, n_slots, slot_ms)
+        cols = series.columns(df["src"].to_numpy(), df["dst"].to_numpy())
+        slots = df["slot"].to_numpy(dtype=np.int64)
+        ok = (cols >= 0) & (slots >= 0) & (slots < n_slots)
+        if not ok.all():
+            raise ValueError(f"{int((~ok).sum())} satır grafta olmayan bir kenara ya da slot aralığı dışına işaret ediyor.")
+        for column, name in CSV_COLUMNS.items():
+            if column in df:
+                series.values[name][slots, cols] = df[column].to_numpy(dtype=np.float32)
+        series.meta["source"] = os.path.basename(path)
+        return series
+
+    # Sentetik gün içi profil: her kenar kendi tepe saati (peak_hour ± ~1.5 sa)
+    # çevresinde yüklenir; gecikme (1 + a·yük) ile artar, kapasite (1 - b·yük)
+    # ile düşer. yük = 1 tepe saatinde, 12 saat uzakta 0.
+    @classmethod
+    def diurnal(cls, G, n_slots=96, peak_hour=20.0, delay_amp=(0.2, 1.0), bandwidth_drop=(0.1, 0.5), seed=0):
+        series = cls.from_graph(G, n_slots)
+        rng = np.random.default_rng(seed)
+        m = series.m
+        phase = rng.normal(peak_hour, 1.5, m)
+        hours = (np.arange(n_slots) + 0.5) * series.slot_ms / 3.6e6
+        load = 0.5 * (1 + np.cos(2 * np.pi * (hours[:, None] - phase[None, :]) / 24))
+        delay = series.values["link_delay"]
+        bandwidth = series.values["bandwidth"]
+        delay *= (1 + rng.uniform(*delay_amp, m) * load).astype(np.float32)
+        bandwidth *= (1 - rng.uniform(*bandwidth_drop, m) * load).astype(np.float32)
+        series.meta.update(source="diurnal", peak_hour=peak_hour, seed=seed)
+        return series
+
+    # ---------------- disk ----------------
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "edges.npy"), np.ascontiguousarray(self.edges, dtype=np.int64))
+        for name, arr in self.values.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(arr, dtype=np.float32))
+        meta = dict(self.meta, slot_ms=self.slot_ms, attrs=list(self.values))
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        edges = np.load(os.path.join(path, "edges.npy"))
+        # ndarray görünümü: memmap alt sınıfının tekil erişim yükü olmasın (eşleme base'te yaşar)
+        values = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode).view(np.ndarray)
+                  for name in meta.pop("attrs")}
+        return cls(edges, values, meta.pop("slot_ms"), meta)
+
+
+# ROUTE_TIME_SERIES: EdgeSeries dizini (yoksa zamana bağlı mod kapalı)
+def series_from_env():
+    path = os.environ.get("ROUTE_TIME_SERIES")
+    return EdgeSeries.load(path) if path else None
+
+
+# "HH:MM", "HH:MM:SS" ya da gün içi milisaniye → ms
+def parse_departure(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        ms = float(value)
+    else:
+        try:
+            parts = [float(p) for p in str(value).strip().split(":")]
+        except ValueError:
+            raise ValueError(f"Geçersiz kalkış zamanı: {value} (HH:MM, HH:MM:SS ya da ms)")
+        if len(parts) == 1:
+            ms = parts[0]
+        elif len(parts) in (2, 3):
+            ms = (parts[0] * 3600 + parts[1] * 60 + (parts[2] if len(parts) == 3 else 0)) * 1000
+        else:
+            raise ValueError(f"Geçersiz kalkış zamanı: {value} (HH:MM, HH:MM:SS ya da ms)")
+    if not math.isfinite(ms) or ms < 0:
+        raise ValueError("Kalkış zamanı negatif olamaz.")
+    return ms
+
+
+# ---------------------------------------------------------------
+# Derlenmiş grafın yayları → seri sütunları (graf sürümü başına bir kez)
+# ---------------------------------------------------------------
+class ArcSeries:
+    def __init__(self, series, cg):
+        self.series = series
+        self.version = cg.version
+        cols = series.columns(cg.node_ids[cg.src], cg.node_ids[cg.dst])
+        self.has = cols >= 0
+        self.cols = np.where(self.has, cols, 0)
+        self.static = {"link_delay": cg.link_delay, "bandwidth": cg.bandwidth}
+
+    # lo:hi yaylarının verilen slot'taki değerleri
+    def values(self, name, slot, lo, hi):
+        static = self.static[name][lo:hi]
+        table = self.series.values.get(name)
+        if table is None:
+            return static
+        return np.where(self.has[lo:hi], table[slot, self.cols[lo:hi]], static)
+
+
+_arcs = {}
+_arcs_lock = threading.Lock()
+
+
+def arc_series(series, cg):
+    key = (id(series), id(cg))
+    with _arcs_lock:
+        entry = _arcs.get(key)
+        if entry is not None and entry[0] is series and entry[1] is cg and entry[2].version == cg.version:
+            return entry[2]
+    arcs = ArcSeries(series, cg)
+    with _arcs_lock:
+        if len(_arcs) >= 8:
+            _arcs.pop(next(iter(_arcs)))
+        _arcs[key] = (series, cg, arcs)
+    return arcs
+
+
+# ---------------------------------------------------------------
+# Kalkış anına göre yol metrikleri (hop hop)
+# ---------------------------------------------------------------
+def path_timing(path, G, series, departure_ms):
+    cols = series.columns(path[:-1], path[1:]).tolist()
+    t = departure_ms
+    resource = 0.0
+    hops = []
+    for i in range(len(path) - 1):
+        u, v = path[i], path[i + 1]
+        if i > 0:
+            t += float(G.nodes[u]["processing_delay"])
+        slot = series.slot(t)
+        edge = G.edges[u, v]
+        hop = {"u": u, "v": v, "depart_ms": t, "slot": slot}
+        for name in SERIES_ATTRS:
+            table = series.values.get(name)
+            hop[name] = float(table[slot, cols[i]]) if table is not None and cols[i] >= 0 else float(edge[name])
+        t += hop["link_delay"]
+        resource += 1000 / hop["bandwidth"]
+        hops.append(hop)
+    return {
+        "departure_ms": departure_ms,
+        "arrival_ms": t,
+        "delay": t - departure_ms,
+        "resource_cost": resource,
+        "bottleneck": min((h["bandwidth"] for h in hops), default=0.0),
+        "hops": hops,
+    }
+
+
+# ag.total_delay'in kalkış anına bağlı hâli
+def total_delay_at(path, G, series, departure_ms):
+    if path is None or len(path) < 2:
+        return 0.0
+    return path_timing(path, G, series, departure_ms)["delay"]
+
+
+# ag.weighted_sum_method'un kalkış anına bağlı hâli (güvenilirlik statik)
+def weighted_sum_at(path, G, series, departure_ms, w_delay=0.33, w_reliability=0.33, w_resource=0.34):
+    timing = path_timing(path, G, series, departure_ms)
+    return (w_delay * timing["delay"] + w_reliability * ag.reliability_cost(path, G)
+            + w_resource * timing["resource_cost"])
+
+
+# ---------------------------------------------------------------
+# Zamana bağlı Dijkstra: (yol, bilgi) döner
+# ---------------------------------------------------------------
+def time_dependent_path(G, series, source, target, departure_ms, w_delay=0.33, w_reliability=0.33,
+                        w_resource=0.34, min_bandwidth=None):
+    cg = get_compiled(G)
+    arcs = arc_series(series, cg)
+    s, t = (int(i) for i in cg.index_of([source, target]))
+    info = {"departure_ms": departure_ms, "expanded": 0}
+    if s < 0 or t < 0:
+        return None, info
+
+    # Zamandan bağımsız kısımlar: güvenilirlik ve varılan düğümün işlem gecikmesi
+    static_cost = w_reliability * (cg.neg_log_r_link + cg.neg_log_r_node[cg.dst]) + w_delay * cg.proc[cg.dst]
+    cost = np.full(cg.n, np.inf)
+    clock = np.zeros(cg.n)          # düğümden çıkış anı (varış + işlem gecikmesi)
+    link = np.full(cg.n, -1, dtype=np.int64)
+    done = np.zeros(cg.n, dtype=bool)
+    cost[s] = 0.0
+    clock[s] = departure_ms
+    heap = [(0.0, s)]
+    indptr = cg.indptr.tolist()
+    while heap:
+        c, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        info["expanded"] += 1
+        if u == t:
+            break
+        lo, hi = indptr[u], indptr[u + 1]
+        if lo == hi:
+            continue
+        slot = series.slot(clock[u])
+        delay = arcs.values("link_delay", slot, lo, hi)
+        bandwidth = arcs.values("bandwidth", slot, lo, hi)
+        v = cg.indices[lo:hi]
+        new = c + w_delay * delay + w_resource * 1000.0 / bandwidth + static_cost[lo:hi]
+        better = ~done[v] & (new < cost[v])
+        if min_bandwidth:
+            better &= bandwidth >= min_bandwidth
+        if not better.any():
+            continue
+        vb = v[better]
+        cost[vb] = new[better]
+        clock[vb] = clock[u] + delay[better] + cg.proc[vb]
+        link[vb] = u
+        for item in zip(new[better].tolist(), vb.tolist()):
+            heapq.heappush(heap, item)
+
+    if not done[t]:
+        return None, info
+    path = [int(cg.node_ids[i]) for i in trace_path(link, s, t)]
+    info["arrival_ms"] = float(clock[t] - cg.proc[t]) if s != t else departure_ms
+    return path, info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zamana bağlı link öznitelikleri")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("diurnal", help="statik grafdan sentetik gün içi profil yazar")
+    p.add_argument("out")
+    p.add_argument("--slots", type=int, default=96)
+    p.add_argument("--peak-hour", type=float, default=20.0)
+    p.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("build", help="uzun biçimli CSV'den (src;dst;slot;delay_ms;capacity_mbps) seri yazar")
+    p.add_argument("out")
+    p.add_argument("--csv", required=True)
+    p.add_argument("--slot-min", type=float, default=15.0, help="slot süresi (dakika)")
+    p = sub.add_parser("info", help="seri özeti")
+    p.add_argument("path")
+    p = sub.add_parser("route", help="kalkış anına göre yol")
+    p.add_argument("source", type=int)
+    p.add_argument("target", type=int)
+    p.add_argument("--series", default=os.environ.get("ROUTE_TIME_SERIES"))
+    p.add_argument("--depart", default="00:00", help="HH:MM ya da gün içi ms")
+    p.add_argument("--weights", type=float, nargs=3, default=[0.33, 0.33, 0.34])
+    p.add_argument("--min-bandwidth", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.command == "diurnal":
+        series = EdgeSeries.diurnal(ag.G, args.slots, args.peak_hour, seed=args.seed)
+        series.save(args.out)
+    elif args.command == "build":
+        series = EdgeSeries.from_csv(ag.G, args.csv, args.slot_min * 60 * 1000)
+        series.save(args.out)
+    elif args.command == "info":
+        series = EdgeSeries.load(args.path)
+    else:
+        if not args.series:
+            parser.error("--series (ya da ROUTE_TIME_SERIES) gerekli")
+        series = EdgeSeries.load(args.series)
+        depart = parse_departure(args.depart)
+        path, info = time_dependent_path(ag.G, series, args.source, args.target, depart, *args.weights,
+                                         min_bandwidth=args.min_bandwidth)
+        if path is None:
+            print("Uygun yol bulunamadı.")
+            return
+        timing = path_timing(path, ag.G, series, depart)
+        print(json.dumps({"path": path, "delay": round(timing["delay"], 3),
+                          "static_delay": round(ag.total_delay(path, ag.G), 3),
+                          "slots": [h["slot"] for h in timing["hops"]], "expanded": info["expanded"]}, indent=2))
+        return
+    print(json.dumps(series.info(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# Eğitim ilerleme çubukları ölçümü kirletmesin
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+with contextlib.redirect_stdout(sys.stderr):
+    import Ag_olusturma as ag
+    from lower_bounds import get_goal_bounds
+    from presets import DEFAULT_PRESETS, PRESETS_PATH, preset_for, read_presets_file
+    from solver_pool import SolverError, run_algorithm
+
+# ---------------------------------------------------------------
+# ÇÖZÜCÜ PARAMETRE AYARI (autotuning)
+#
+#   python tuning.py --algorithms ACO,GA --configs 16 --pairs 12
+#   python tuning.py --method random --configs 30 --time-weight 0.05
+#
+# Her algoritma için arama uzayından rastgele konfigürasyonlar çekilir
+# (ilki her zaman mevcut preset'tir, sonuç ondan kötü olamaz) ve demand
+# çiftleri üzerinde değerlendirilir. Amaç (küçük olan iyi):
+#
+#   amaç = ort. fark + time_weight * ort. süre (s)
+#   fark = maliyet / kesin en iyi - 1   (yol bulunamazsa FAIL_GAP)
+#
+# Kesin en iyi, hedefe ters Dijkstra ile bulunur (lower_bounds.py).
+#
+# --method halving (varsayılan): successive halving. İlk turda tüm
+#   konfigürasyonlar birkaç çiftte denenir, her turda en iyi 1/eta kadarı
+#   kalır ve çift sayısı eta katına çıkar; son tur tüm çiftleri kullanır.
+# --method random: tüm konfigürasyonlar tüm çiftlerde.
+#
+# Değerlendirmeler fork ile açılan süreç havuzunda paralel çalışır
+# (--workers, varsayılan çekirdek sayısı). En iyi parametreler graf
+# boyutu (düğüm sayısı) anahtarıyla preset dosyasına yazılır; diğer
+# boyutların ve algoritmaların girdileri korunur. Sunucu dosyayı
+# açılışta okur (presets.py, SOLVER_PRESETS).
+# ---------------------------------------------------------------
+
+TUNED_ALGORITHMS = ("ACO", "MMAS", "GA", "Q-Learning")
+
+# Bulunamayan yolun farkı (%100)
+FAIL_GAP = 1.0
+
+# Parametre → (tür, ...):
+#   int / float: [alt, üst] düzgün, log: log-düzgün, choice: listeden,
+#   decay: 1 - log-düzgün(1 - üst, 1 - alt) (0.99 .. 0.9999 gibi oranlar)
+SEARCH_SPACES = {
+    "ACO": {
+        "n_ants": ("int", 10, 60),
+        "n_iter": ("int", 5, 40),
+        "alpha": ("float", 0.5, 2.0),
+        "beta": ("float", 1.0, 5.0),
+        "rho": ("log", 0.02, 0.5),
+    },
+    "MMAS": {
+        "n_ants": ("int", 10, 60),
+        "n_iter": ("int", 10, 80),
+        "alpha": ("float", 0.5, 2.0),
+        "beta": ("float", 1.0, 5.0),
+        "rho": ("log", 0.01, 0.3),
+        "p_best": ("log", 0.005, 0.2),
+    },
+    "GA": {
+        "pop_size": ("int", 10, 80),
+        "generations": ("int", 10, 120),
+        "mutation_rate": ("float", 0.05, 0.5),
+        "max_hops": ("choice", [4, 5, 6, 7, 8]),
+    },
+    "Q-Learning": {
+        "episodes": ("log", 300, 5000),
+        "learning_rate": ("float", 0.05, 0.5),
+        "discount_factor": ("float", 0.7, 0.99),
+        "exploration_decay": ("decay", 0.99, 0.9999),
+    },
+}
+
+
+def sample_value(spec, rng):
+    kind = spec[0]
+    if kind == "int":
+        return rng.randint(spec[1], spec[2])
+    if kind == "float":
+        return round(rng.uniform(spec[1], spec[2]), 4)
+    if kind == "log":
+        value = math.exp(rng.uniform(math.log(spec[1]), math.log(spec[2])))
+        return int(round(value)) if isinstance(spec[1], int) else round(value, 5)
+    if kind == "choice":
+        return rng.choice(spec[1])
+    if kind == "decay":
+        return round(1 - math.exp(rng.uniform(math.log(1 - spec[2]), math.log(1 - spec[1]))), 6)
+    raise ValueError(f"Bilinmeyen parametre türü: {kind}")
+
+
+def sample_configs(algorithm, n, baseline, rng):
+    space = SEARCH_SPACES[algorithm]
+    configs = [{name: baseline[name] for name in space}]
+    while len(configs) < n:
+        configs.append({name: sample_value(spec, rng) for name, spec in space.items()})
+    return configs
+
+
+# ---------------------------------------------------------------
+# Değerlendirme (havuz süreçlerinde çalışır)
+# ---------------------------------------------------------------
+_filtered = {}
+
+
+def filtered_graph(min_bandwidth):
+    G = _filtered.get(min_bandwidth)
+    if G is None:
+        G = _filtered[min_bandwidth] = ag.filter_graph_by_bandwidth(ag.G, min_bandwidth)
+    return G
+
+
+def evaluate(task):
+    algorithm, params, (source, target, bw, opt_cost), seed, weights, deadline_ms = task
+    random.seed(seed)
+    np.random.seed(seed)
+    G = filtered_graph(bw)
+
+    t0 = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            path = run_algorithm(G, algorithm, source, target, bw, *weights,
+                                 deadline_ms=deadline_ms, params=params)
+    except SolverError:
+        path = None
+    seconds = time.perf_counter() - t0
+
+    gap = FAIL_GAP
+    if path is not None:
+        gap = max(0.0, ag.weighted_sum_method(path, G, *weights) / opt_cost - 1)
+    return gap, seconds
+
+
+# ---------------------------------------------------------------
+# Arama
+# ---------------------------------------------------------------
+class Tuner:
+    def __init__(self, pool, pairs, weights, time_weight, deadline_ms=None, seed=42):
+        self.pool = pool
+        self.pairs = pairs
+        self.weights = weights
+        self.time_weight = time_weight
+        self.deadline_ms = deadline_ms
+        self.seed = seed
+        self.results = {}   # (konfig. no, çift no) → (fark, süre)
+
+    def run(self, algorithm, configs, n_pairs):
+        todo = [(c, p) for c in configs for p in range(n_pairs) if (c, p) not in self.results]
+        tasks = [(algorithm, self.configs[c], self.pairs[p], self.seed + p, self.weights, self.deadline_ms)
+                 for c, p in todo]
+        for key, result in zip(todo, self.pool.map(evaluate, tasks)):
+            self.results[key] = result
+
+    def score(self, c, n_pairs):
+        gaps, times = zip(*(self.results[(c, p)] for p in range(n_pairs)))
+        gap, seconds = sum(gaps) / n_pairs, sum(times) / n_pairs
+        return {"objective": gap + self.time_weight * seconds, "gap": gap, "seconds": seconds}
+
+    def random_search(self, algorithm, configs):
+        self.configs = configs
+        self.results.clear()
+        alive = list(range(len(configs)))
+        self.run(algorithm, alive, len(self.pairs))
+        return alive, len(self.pairs)
+
+    def successive_halving(self, algorithm, configs, eta=2, min_pairs=2):
+        self.configs = configs
+        self.results.clear()
+        alive = list(range(len(configs)))
+        n_pairs = min(min_pairs, len(self.pairs))
+        while True:
+            self.run(algorithm, alive, n_pairs)
+            if len(alive) == 1 or n_pairs == len(self.pairs):
+                return alive, n_pairs
+            alive.sort(key=lambda c: self.score(c, n_pairs)["objective"])
+            alive = alive[:max(1, math.ceil(len(alive) / eta))]
+            n_pairs = min(len(self.pairs), n_pairs * eta)
+
+
+def tuning_pairs(n, use_bandwidth, weights):
+    rows = ag.demand_df.head(n) if n else ag.demand_df
+    pairs = []
+    for _, r in rows.iterrows():
+        source, target = int(r["src"]), int(r["dst"])
+        bw = float(r["demand_mbps"]) if use_bandwidth else 0.0
+        G = filtered_graph(bw)
+        opt_cost = get_goal_bounds(G, target, *weights).cost_to_target(source)
+        if math.isfinite(opt_cost):
+            pairs.append((source, target, bw, opt_cost + ag.path_cost_offset(G, source, target, *weights)))
+    return pairs
+
+
+def write_presets(path, n_nodes, tuned):
+    data = read_presets_file(path) if os.path.exists(path) else {}
+    for algorithm, entry in tuned.items():
+        data.setdefault("presets", {}).setdefault(str(n_nodes), {})[algorithm] = entry["params"]
+        data.setdefault("tuning", {}).setdefault(str(n_nodes), {})[algorithm] = \
+            {k: v for k, v in entry.items() if k != "params"}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ACO / MMAS / GA / Q-Learning parametre ayarı")
+    parser.add_argument("--algorithms", default=",".join(TUNED_ALGORITHMS))
+    parser.add_argument("--method", choices=("halving", "random"), default="halving")
+    parser.add_argument("--configs", type=int, default=16, help="algoritma başına konfigürasyon sayısı")
+    parser.add_argument("--pairs", type=int, default=12, help="kullanılacak demand çifti sayısı (0 → hepsi)")
+    parser.add_argument("--eta", type=int, default=2, help="successive halving: tur başına eleme oranı")
+    parser.add_argument("--min-pairs", type=int, default=2, help="successive halving: ilk turdaki çift sayısı")
+    parser.add_argument("--time-weight", type=float, default=0.1,
+                        help="amaçta 1 saniyenin fark karşılığı (0.1 → 1 s = %%10 fark)")
+    parser.add_argument("--deadline-ms", type=float, default=None, help="çözücü başına süre bütçesi")
+    parser.add_argument("--weights", default="0.33,0.33,0.34", help="w_delay,w_rel,w_res")
+    parser.add_argument("--bandwidth", action="store_true", help="demand_mbps eşiğiyle filtrelenmiş graf")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=PRESETS_PATH)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    weights = tuple(float(w) for w in args.weights.split(","))
+    algorithms = [a.strip() for a in args.algorithms.split(",") if a.strip()]
+    for algorithm in algorithms:
+        if algorithm not in SEARCH_SPACES:
+            parser.error(f"Ayarlanamayan algoritma: {algorithm}")
+
+    pairs = tuning_pairs(args.pairs, args.bandwidth, weights)
+    n_nodes = ag.G.number_of_nodes()
+    rng = random.Random(args.seed)
+    print(f"{n_nodes} düğüm, {len(pairs)} çift, {args.workers} süreç, yöntem: {args.method}")
+
+    tuned = {}
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(args.workers) as pool:
+        tuner = Tuner(pool, pairs, weights, args.time_weight, args.deadline_ms, args.seed)
+        for algorithm in algorithms:
+            configs = sample_configs(algorithm, args.configs, preset_for(algorithm, n_nodes), rng)
+            t0 = time.perf_counter()
+            if args.method == "halving":
+                alive, n_pairs = tuner.successive_halving(algorithm, configs, args.eta, args.min_pairs)
+            else:
+                alive, n_pairs = tuner.random_search(algorithm, configs)
+
+            best = min(alive, key=lambda c: tuner.score(c, n_pairs)["objective"])
+            # Mevcut preset (konfig. 0) son tura kalmadıysa onu da aynı çiftlerde ölç
+            tuner.run(algorithm, [0], n_pairs)
+            baseline = tuner.score(0, n_pairs)
+            if baseline["objective"] <= tuner.score(best, n_pairs)["objective"]:
+                best = 0
+            result = tuner.score(best, n_pairs)
+
+            tuned[algorithm] = dict(
+                params=dict(DEFAULT_PRESETS[algorithm], **configs[best]),
+                objective=round(result["objective"], 5),
+                gap=round(result["gap"], 5),
+                seconds=round(result["seconds"], 4),
+                baseline_objective=round(baseline["objective"], 5),
+                method=args.method,
+                configs=len(configs),
+                pairs=n_pairs,
+                evaluations=len(tuner.results),
+                time_weight=args.time_weight,
+                deadline_ms=args.deadline_ms,
+                tuned_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+            print(f"{algorithm:<12} amaç {baseline['objective']:.4f} → {result['objective']:.4f} "
+                  f"(fark %{result['gap'] * 100:.2f}, {result['seconds']:.3f} s, "
+                  f"{len(tuner.results)} değerlendirme, {time.perf_counter() - t0:.1f} s)  {configs[best]}")
+
+    write_presets(args.out, n_nodes, tuned)
+    print(f"Presetler yazıldı: {args.out} ({n_nodes} düğüm)")
+
+
+if __name__ == "__main__":
+    main()
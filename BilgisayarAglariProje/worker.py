@@ -0,0 +1,127 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+import Ag_olusturma as ag
+from broker import broker_from_url, broker_key
+from graph_arrays import get_compiled
+from network_updates import apply_snapshot
+from solver_pool import solve_job
+
+# ---------------------------------------------------------------
+# ÇÖZÜCÜ İŞÇİSİ
+#
+# Broker'dan (broker.py) iş alır, solve_job ile çözer ve sonucu aynı
+# broker'a iş numarasıyla yazar. Her makinede:
+#
+#   python worker.py --broker tcp://host:5800 -p 4
+#
+#   - Graf (CSV) ve derlenmiş dizileri süreç başına bir kez yüklenir;
+#     -p ile açılan süreçler fork'tan önce yüklenen grafı paylaşır.
+#   - İşle gelen graf durumu (NetworkState.snapshot: sürüm + değişen
+#     öğelerin son hâli) yerel graf daha eskiyse uygulanır (apply_snapshot),
+#     böylece canlı güncellemeler işçilere de yansır.
+#   - Heartbeat thread'i belirli aralıklarla sayaçları broker'a yazar;
+#     BrokerPool yalnızca heartbeat'i taze işçi varken iş gönderir.
+# ---------------------------------------------------------------
+
+HEARTBEAT_S = 2.0
+
+
+class Worker:
+    def __init__(self, broker, worker_id=None, heartbeat_s=HEARTBEAT_S):
+        self.broker = broker
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_s = heartbeat_s
+        self.processed = 0
+        self.failed = 0
+        self.busy = False
+        self.stop = threading.Event()
+
+    def info(self):
+        return {
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy": self.busy,
+            "graph_version": ag.G.graph.get("version", 0),
+            "ts": time.time(),
+        }
+
+    def _beat(self):
+        while not self.stop.is_set():
+            try:
+                self.broker.heartbeat(self.worker_id, json.dumps(self.info()))
+            except (OSError, EOFError):
+                pass
+            self.stop.wait(self.heartbeat_s)
+
+    def handle(self, payload):
+        job = json.loads(payload)
+        self.busy = True
+        try:
+            apply_snapshot(ag.G, job.get("graph"))
+            result = {"path": [int(n) for n in solve_job(job)]}
+            self.processed += 1
+        except Exception as e:
+            result = {"error": str(e.args[0]) if e.args else str(e), "kind": type(e).__name__}
+            self.failed += 1
+        finally:
+            self.busy = False
+        self.broker.put_result(job["id"], json.dumps(result))
+
+    def run(self):
+        get_compiled(ag.G)
+        threading.Thread(target=self._beat, daemon=True).start()
+        while not self.stop.is_set():
+            payload = self.broker.get_job(timeout=1.0)
+            if payload is not None:
+                self.handle(payload)
+
+
+# fork'tan sonra her süreç broker'a kendi bağlantısını açar
+def _run_process(url, authkey, worker_id, heartbeat_s):
+    Worker(broker_from_url(url, authkey), worker_id, heartbeat_s).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çözücü işçisi")
+    parser.add_argument("--broker", default=os.environ.get("ROUTE_BROKER"), help="tcp://host:port veya redis://...")
+    parser.add_argument("--authkey", default=None, help="tcp broker anahtarı (varsayılan: ROUTE_BROKER_KEY)")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="işçi süreç sayısı")
+    parser.add_argument("--heartbeat", type=float, default=HEARTBEAT_S, help="heartbeat aralığı (s)")
+    parser.add_argument("--id", default=None, help="işçi adı (varsayılan: host-pid)")
+    args = parser.parse_args()
+    if not args.broker or args.broker == "local":
+        parser.error("--broker tcp://host:port veya redis://... gerekli")
+
+    authkey = None
+    if args.broker.startswith("tcp:"):
+        try:
+            authkey = broker_key(args.authkey)
+        except RuntimeError as e:
+            parser.error(str(e))
+    get_compiled(ag.G)
+    print(f"{args.processes} işçi → {args.broker} (graf: {ag.G.number_of_nodes()} düğüm, "
+          f"{ag.G.number_of_edges()} kenar)")
+
+    if args.processes == 1:
+        _run_process(args.broker, authkey, args.id, args.heartbeat)
+        return
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_run_process, args=(args.broker, authkey,
+                                                    f"{args.id}-{i}" if args.id else None, args.heartbeat))
+             for i in range(args.processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import gc
+import os
+
+# ---------------------------------------------------------------
+# ÜRETİM GİRİŞ NOKTASI (WSGI)
+#
+#   gunicorn -c gunicorn.conf.py wsgi:application
+#
+# Graf bu modül içe aktarılırken bir kez yüklenir (preload). ACO / GA /
+# Q-Learning istekleri fork ile açılan çözücü süreç havuzunda çalışır;
+# süreçler grafı kopyalamadan (copy-on-write) paylaşır.
+#
+#   ROUTE_WORKERS : çözücü süreç sayısı (varsayılan: CPU sayısı)
+#   ROUTE_QUEUE   : havuz kuyruğu sınırı; dolunca API 429 döner
+#                   (varsayılan: 2 × ROUTE_WORKERS)
+#   ROUTE_BROKER  : verilirse işler yerel havuz yerine broker'daki işçilere
+#                   gider (tcp://host:5800 → python broker.py serve,
+#                   redis://...); işçiler: python worker.py --broker ...
+#   ROUTE_BROKER_KEY : tcp broker kimlik anahtarı (tcp:// için zorunlu)
+# ---------------------------------------------------------------
+
+# CSV dosyaları çalışma dizinine göre okunur
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ROUTE_WORKERS", str(os.cpu_count() or 1))
+
+from app import app  # noqa: E402
+
+application = app
+
+# Yüklenen graf ve tablolar uzun ömürlü: GC taramaları bu nesnelerin
+# sayaçlarına yazıp paylaşılan sayfaları kopyalatmasın
+gc.freeze()